@@ -0,0 +1,84 @@
+"""
+Benchmarks for the Business Plan engine: team cost and scenarios on teams of
+10 to 200 members over 12 to 72 months, and the cost of a 500-item catalog TOW.
+"""
+
+import pytest
+
+from services.business_plan_service import BusinessPlanService
+from synthetic import make_business_plan
+
+# (team members, duration in months) -> median budget in seconds
+TEAM_COST_BUDGET = {(10, 12): 0.02, (50, 36): 0.15, (200, 72): 1.5}
+SCENARIOS_BUDGET = {(10, 12): 0.06, (50, 36): 0.45, (200, 72): 4.5}
+
+
+@pytest.fixture(scope="module", params=list(TEAM_COST_BUDGET), ids=lambda size: f"{size[0]}fte-{size[1]}m")
+def business_plan(request):
+    team_size, duration_months = request.param
+    return request.param, make_business_plan(team_size, duration_months)
+
+
+def _team_cost_args(bp, profile_rates):
+    return dict(
+        team_composition=bp["team_composition"],
+        volume_adjustments=bp["volume_adjustments"],
+        reuse_factor=bp["reuse_factor"],
+        profile_mappings=bp["profile_mappings"],
+        profile_rates=profile_rates,
+        duration_months=bp["duration_months"],
+        default_daily_rate=bp["default_daily_rate"],
+        inflation_pct=bp["inflation_pct"],
+        is_rti=True,
+        quota_lutech=0.8,
+        all_tows=bp["tows"],
+    )
+
+
+@pytest.mark.benchmark(group="calculate_team_cost")
+def test_calculate_team_cost(benchmark, budget, business_plan):
+    size, fixture = business_plan
+    bp = fixture["business_plan"]
+    result = benchmark(BusinessPlanService.calculate_team_cost, **_team_cost_args(bp, fixture["profile_rates"]))
+    assert result["total_cost"] > 0
+    benchmark.extra_info["intervals"] = len(result["intervals"])
+    budget(TEAM_COST_BUDGET[size])
+
+
+@pytest.mark.benchmark(group="calculate_catalog_cost")
+def test_calculate_catalog_cost(benchmark, budget):
+    fixture = make_business_plan(50, 36, catalog_items=500)
+    bp = fixture["business_plan"]
+    result = benchmark(
+        BusinessPlanService.calculate_catalog_cost,
+        tows=bp["tows"],
+        profile_mappings=bp["profile_mappings"],
+        profile_rates=fixture["profile_rates"],
+        duration_months=bp["duration_months"],
+        inflation_pct=bp["inflation_pct"],
+        is_rti=True,
+        quota_lutech=0.8,
+    )
+    assert len(result["by_tow"]["TOW_CAT"]["items"]) == 500
+    budget(0.05)
+
+
+@pytest.mark.benchmark(group="generate_scenarios")
+def test_generate_scenarios(benchmark, budget, business_plan):
+    size, fixture = business_plan
+    bp = fixture["business_plan"]
+    args = _team_cost_args(bp, fixture["profile_rates"])
+    args.pop("reuse_factor")
+    args.pop("inflation_pct")
+    scenarios = benchmark(
+        BusinessPlanService.generate_scenarios,
+        bp_data=bp,
+        base_amount=20_000_000.0 * size[0] / 10,
+        governance_pct=bp["governance_pct"],
+        risk_contingency_pct=bp["risk_contingency_pct"],
+        subcontract_config=bp["subcontract_config"],
+        catalog_cost=1_000_000.0,
+        **args,
+    )
+    assert [s["name"] for s in scenarios] == ["Current/Balanced", "Conservative", "Aggressive"]
+    budget(SCENARIOS_BUDGET[size])
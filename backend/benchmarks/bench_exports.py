@@ -0,0 +1,108 @@
+"""
+Benchmarks for the report generators: scoring Excel and PDF on lots of
+10/50/200 requirements, and the Business Plan Excel on small and large plans.
+"""
+
+import pytest
+
+import main
+import schemas
+from chart_renderer import chart_cache
+from excel_business_plan import generate_business_plan_excel
+from excel_generator import generate_excel_report
+from pdf_generator import generate_pdf_report
+from services.business_plan_service import BusinessPlanService
+from synthetic import make_business_plan, make_calculate_payload, make_lot, make_tech_inputs
+
+# Median budget in seconds per lot size
+EXCEL_BUDGET = {10: 0.5, 50: 1.0, 200: 3.0}
+PDF_BUDGET = {10: 1.5, 50: 1.5, 200: 2.0}
+BP_EXCEL_BUDGET = {(10, 12): 1.5, (200, 72): 60.0}
+
+
+@pytest.fixture(scope="module", params=(10, 50, 200), ids=lambda n: f"{n}reqs")
+def report_kwargs(request):
+    """Generator kwargs for a scored lot, built like main._report_inputs."""
+    lot = make_lot(request.param)
+    tech_inputs = make_tech_inputs(lot)
+    data = schemas.CalculateRequest(**make_calculate_payload(lot, tech_inputs))
+    lot_cfg = schemas.LotConfig(**lot)
+    result = main._compute_score(data, lot_cfg)
+    return request.param, dict(
+        lot_key=lot["name"],
+        lot_config=lot_cfg.model_dump(),
+        base_amount=data.base_amount,
+        my_discount=data.my_discount,
+        competitor_discount=data.competitor_discount,
+        technical_score=result["technical_score"],
+        economic_score=result["economic_score"],
+        total_score=result["total_score"],
+        details=result["details"],
+        weighted_scores=result["weighted_scores"],
+        category_scores={
+            "company_certs": result["category_company_certs"],
+            "resource": result["category_resource"],
+            "reference": result["category_reference"],
+            "project": result["category_project"],
+        },
+        max_tech_score=result.get("calculated_max_tech_score") or lot_cfg.max_tech_score,
+        max_econ_score=lot_cfg.max_econ_score,
+        alpha=lot_cfg.alpha,
+        win_probability=62.5,
+        tech_inputs_full=tech_inputs,
+        rti_quotas={},
+    )
+
+
+@pytest.mark.benchmark(group="generate_excel_report")
+def test_generate_excel_report(benchmark, budget, report_kwargs):
+    n_reqs, kwargs = report_kwargs
+    buffer = benchmark(generate_excel_report, **kwargs)
+    assert buffer.getvalue()[:2] == b"PK"
+    budget(EXCEL_BUDGET[n_reqs])
+
+
+@pytest.mark.benchmark(group="generate_pdf_report")
+def test_generate_pdf_report(benchmark, budget, report_kwargs):
+    """Cold: the chart cache is emptied before each round, so charts are rendered too."""
+    n_reqs, kwargs = report_kwargs
+    buffer = benchmark.pedantic(
+        generate_pdf_report, kwargs=kwargs, setup=chart_cache.clear, rounds=5, warmup_rounds=1,
+    )
+    assert buffer.getvalue()[:4] == b"%PDF"
+    budget(PDF_BUDGET[n_reqs])
+
+
+@pytest.mark.benchmark(group="generate_business_plan_excel")
+@pytest.mark.parametrize("size", list(BP_EXCEL_BUDGET), ids=lambda size: f"{size[0]}fte-{size[1]}m")
+def test_generate_business_plan_excel(benchmark, budget, size):
+    fixture = make_business_plan(*size)
+    bp, profile_rates = fixture["business_plan"], fixture["profile_rates"]
+    team = BusinessPlanService.calculate_team_cost(
+        team_composition=bp["team_composition"], volume_adjustments=bp["volume_adjustments"],
+        reuse_factor=bp["reuse_factor"], profile_mappings=bp["profile_mappings"],
+        profile_rates=profile_rates, duration_months=bp["duration_months"],
+        inflation_pct=bp["inflation_pct"],
+    )
+    catalog = BusinessPlanService.calculate_catalog_cost(
+        tows=bp["tows"], profile_mappings=bp["profile_mappings"], profile_rates=profile_rates,
+        duration_months=bp["duration_months"], inflation_pct=bp["inflation_pct"],
+    )
+    base = team["total_cost"] + catalog["total_cost"]
+    costs = {
+        "team": team["total_cost"], "catalog": catalog["total_cost"], "by_tow": catalog["by_tow"],
+        "governance": base * bp["governance_pct"], "risk": base * bp["risk_contingency_pct"],
+        "subcontract": base * 0.05, "total": base * 1.12,
+    }
+
+    buffer = benchmark.pedantic(
+        generate_business_plan_excel,
+        kwargs=dict(
+            lot_key="Lotto bench", business_plan=bp, costs=costs, clean_team_cost=team["total_cost"],
+            base_amount=base * 1.3, tow_breakdown=team["by_tow"], profile_rates=profile_rates,
+            intervals=team["intervals"], lutech_breakdown=team["by_lutech_profile"],
+        ),
+        rounds=2, warmup_rounds=0,
+    )
+    assert buffer.getvalue()[:2] == b"PK"
+    budget(BP_EXCEL_BUDGET[size])
@@ -0,0 +1,42 @@
+"""
+Benchmarks for certificate verification: verify_folder on generated
+certificate PDFs, digital (embedded text layer) and scanned (rasterised and
+OCR'd; skipped when Tesseract or poppler are not installed).
+"""
+
+import shutil
+
+import pytest
+
+from services.cert_verification_service import OCR_AVAILABLE, CertVerificationService
+from synthetic import write_certificates
+
+pytestmark = pytest.mark.skipif(not OCR_AVAILABLE, reason="OCR dependencies not installed")
+
+FOLDER_SIZE = 20
+
+
+@pytest.fixture(scope="module")
+def service():
+    return CertVerificationService()
+
+
+@pytest.mark.benchmark(group="verify_folder")
+def test_verify_folder_digital(benchmark, budget, service, tmp_path_factory):
+    folder = tmp_path_factory.mktemp("certs_digital")
+    write_certificates(folder, FOLDER_SIZE)
+    result = benchmark(service.verify_folder, str(folder))
+    assert result["success"] and len(result["results"]) == FOLDER_SIZE
+    budget(0.5)
+
+
+@pytest.mark.skipif(
+    not (shutil.which("tesseract") and shutil.which("pdftoppm")), reason="Tesseract/poppler not installed",
+)
+@pytest.mark.benchmark(group="verify_folder")
+def test_verify_folder_scanned(benchmark, budget, service, tmp_path_factory):
+    folder = tmp_path_factory.mktemp("certs_scanned")
+    write_certificates(folder, 4, scanned=True)
+    result = benchmark.pedantic(service.verify_folder, args=(str(folder),), rounds=3, warmup_rounds=0)
+    assert result["success"] and len(result["results"]) == 4
+    budget(60.0)
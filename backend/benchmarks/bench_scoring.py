@@ -0,0 +1,68 @@
+"""
+Benchmarks for the scoring engine: calculate_score on lots of 10/50/200
+requirements (engine run and score-cache hit), Monte Carlo and the discount
+optimizer.
+"""
+
+import pytest
+
+import main
+import schemas
+from services.score_cache import score_cache
+from synthetic import make_calculate_payload, make_lot, make_tech_inputs
+
+LOT_SIZES = (10, 50, 200)
+
+# Median budget in seconds per lot size
+SCORE_BUDGET = {10: 0.003, 50: 0.008, 200: 0.03}
+CACHED_SCORE_BUDGET = {10: 0.004, 50: 0.01, 200: 0.05}
+
+
+@pytest.fixture(scope="module", params=LOT_SIZES, ids=lambda n: f"{n}reqs")
+def scored_lot(request):
+    lot = make_lot(request.param)
+    payload = make_calculate_payload(lot, make_tech_inputs(lot))
+    return request.param, schemas.LotConfig(**lot), schemas.CalculateRequest(**payload)
+
+
+@pytest.mark.benchmark(group="calculate_score")
+def test_calculate_score(benchmark, budget, scored_lot):
+    n_reqs, lot_cfg, data = scored_lot
+    result = benchmark(main._compute_score, data, lot_cfg)
+    assert len(result["weighted_scores"]) == n_reqs
+    budget(SCORE_BUDGET[n_reqs])
+
+
+@pytest.mark.benchmark(group="calculate_score_cached")
+def test_calculate_score_cache_hit(benchmark, budget, scored_lot):
+    """A repeated calculation of an unchanged state: hashing plus the cache lookup."""
+    n_reqs, lot_cfg, data = scored_lot
+    score_cache.clear()
+    expected = main._cached_score(data, lot_cfg)
+    assert benchmark(main._cached_score, data, lot_cfg) == expected
+    budget(CACHED_SCORE_BUDGET[n_reqs])
+
+
+@pytest.mark.benchmark(group="monte_carlo")
+@pytest.mark.parametrize("iterations", [500, 10_000])
+def test_monte_carlo(benchmark, budget, iterations):
+    lot_cfg = schemas.LotConfig(**make_lot(10))
+    data = schemas.MonteCarloRequest(
+        lot_key=lot_cfg.name, base_amount=lot_cfg.base_amount, my_discount=25.0,
+        competitor_discount_mean=30.0, current_tech_score=55.0, iterations=iterations, seed=42,
+    )
+    result = benchmark(main._monte_carlo, data, lot_cfg)
+    assert result["iterations"] == iterations
+    budget(0.001 if iterations <= 500 else 0.005)
+
+
+@pytest.mark.benchmark(group="optimize_discount")
+def test_optimize_discount(benchmark, budget):
+    lot_cfg = schemas.LotConfig(**make_lot(10))
+    data = schemas.OptimizeDiscountRequest(
+        lot_key=lot_cfg.name, base_amount=lot_cfg.base_amount, my_tech_score=55.0,
+        competitor_tech_score=60.0, competitor_discount=30.0, best_offer_discount=35.0,
+    )
+    result = benchmark(main._optimize_discount, data, lot_cfg)
+    assert len(result["scenarios"]) == 4
+    budget(0.01)
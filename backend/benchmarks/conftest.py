@@ -0,0 +1,48 @@
+"""
+Benchmark configuration and shared fixtures.
+
+Like the test suite, the benchmarks run against an isolated SQLite database
+and temporary cache directories; this MUST run before any app module is
+imported. Each benchmark also asserts an absolute time budget (median), so a
+plain run fails on a gross regression even without a saved baseline.
+"""
+import os
+import tempfile
+
+_BENCH_DB = os.path.join(tempfile.gettempdir(), "simulator_poste_bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_BENCH_DB}"
+os.environ.setdefault("ENVIRONMENT", "test")
+os.environ.pop("OIDC_CLIENT_ID", None)
+os.environ["AUTH_DEV_BYPASS"] = "1"
+os.environ["REPORT_CACHE_DIR"] = tempfile.mkdtemp(prefix="simulator_poste_bench_reports_")
+os.environ["PREVIEW_TOKEN_DIR"] = tempfile.mkdtemp(prefix="simulator_poste_bench_previews_")
+os.environ["LOCK_DIR"] = tempfile.mkdtemp(prefix="simulator_poste_bench_locks_")
+os.environ["PROFILE_DIR"] = tempfile.mkdtemp(prefix="simulator_poste_bench_profiles_")
+
+if os.path.exists(_BENCH_DB):
+    os.remove(_BENCH_DB)
+
+import pytest
+
+# Budgets are tuned for a CI runner; slower machines can scale them (e.g. 2.0)
+BUDGET_FACTOR = float(os.getenv("BENCH_BUDGET_FACTOR", "1.0"))
+
+
+@pytest.fixture()
+def budget(benchmark):
+    """
+    Call after benchmark(...) with the median time allowed, in seconds.
+
+    No-op with --benchmark-disable (the function ran once, nothing measured).
+    """
+    def check(seconds: float) -> None:
+        if benchmark.disabled or benchmark.stats is None:
+            return
+        allowed = seconds * BUDGET_FACTOR
+        benchmark.extra_info["budget_seconds"] = allowed
+        median = benchmark.stats.stats.median
+        assert median <= allowed, (
+            f"{benchmark.name}: median {median * 1000:.1f} ms is over its budget of {allowed * 1000:.1f} ms"
+        )
+
+    return check
@@ -0,0 +1,276 @@
+"""
+Synthetic workloads
+Deterministic generators for the benchmark suite: lots of a given number of
+requirements with a matching simulation state, Business Plans of a given team
+size and duration (with a 500-item catalog TOW) and certificate PDF folders
+"""
+
+import random
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import fitz
+
+COMPANY_CERTS = ["ISO 9001", "ISO 27001", "ISO 20000", "ISO 22301", "ISO 14001", "ISO 45001"]
+PRACTICES = ["data_ai", "cloud", "cyber", "dev"]
+SENIORITIES = ["jr", "mid", "sr", "expert"]
+
+
+# --- Lots ---------------------------------------------------------------------
+
+def _requirement(rng: random.Random, index: int) -> Dict[str, Any]:
+    req_id = f"REQ_{index:03d}"
+    kind = rng.choices(["resource", "reference", "project"], weights=(4, 4, 2))[0]
+    req: Dict[str, Any] = {"id": req_id, "label": f"Requisito {index}", "type": kind,
+                           "gara_weight": round(rng.uniform(0.5, 5.0), 2)}
+    if kind == "resource":
+        max_res, max_certs = rng.randint(1, 10), rng.randint(1, 10)
+        req.update(prof_R=rng.randint(1, max_res), prof_C=rng.randint(1, max_certs),
+                   max_res=max_res, max_certs=max_certs, max_points=2 * max_res + max_res * max_certs)
+        return req
+    sub_reqs = [
+        {"id": chr(ord("a") + i), "label": f"Criterio {i + 1}", "weight": rng.choice([0.5, 1.0, 1.5])}
+        for i in range(rng.randint(3, 10))
+    ]
+    req.update(
+        sub_reqs=sub_reqs,
+        max_points=sum(s["weight"] * 5 for s in sub_reqs),
+        bonus_label="Attestazione Cliente (+3)", bonus_val=3.0,
+        attestazione_score=2.0,
+        custom_metrics=[{"id": f"m{i}", "label": f"Metrica {i}", "min_score": 0.0, "max_score": 4.0}
+                        for i in range(rng.randint(0, 2))],
+    )
+    return req
+
+
+def make_lot(n_reqs: int, seed: int = 1) -> Dict[str, Any]:
+    """A lot config (as stored, see schemas.LotConfig) with `n_reqs` requirements."""
+    rng = random.Random(seed)
+    reqs = [_requirement(rng, i) for i in range(n_reqs)]
+    # Gara weights add up to the technical maximum, as in a real tender
+    certs_weight = float(len(COMPANY_CERTS))
+    scale = (70.0 - certs_weight) / sum(r["gara_weight"] for r in reqs)
+    for req in reqs:
+        req["gara_weight"] = round(req["gara_weight"] * scale, 4)
+    return {
+        "name": f"Lotto bench {n_reqs}",
+        "base_amount": 10_000_000.0,
+        "max_tech_score": 70.0,
+        "max_econ_score": 30.0,
+        "alpha": 0.3,
+        "company_certs": [
+            {"label": label, "points": 2.0, "points_partial": 1.0, "gara_weight": 1.0} for label in COMPANY_CERTS
+        ],
+        "reqs": reqs,
+    }
+
+
+def make_tech_inputs(lot: Dict[str, Any], seed: int = 1) -> Dict[str, Dict[str, Any]]:
+    """A fully filled state (`tech_inputs` keyed by requirement id) for the lot."""
+    rng = random.Random(seed)
+    inputs = {}
+    for req in lot["reqs"]:
+        if req["type"] == "resource":
+            r_val = rng.randint(0, req["max_res"])
+            inputs[req["id"]] = {"r_val": r_val, "c_val": rng.randint(0, min(r_val, req["max_certs"]))}
+        else:
+            inputs[req["id"]] = {
+                "sub_req_vals": [{"sub_id": s["id"], "val": rng.randint(0, 5)} for s in req["sub_reqs"]],
+                "bonus_active": rng.random() < 0.5,
+                "attestazione_active": rng.random() < 0.5,
+                "custom_metric_vals": {m["id"]: rng.uniform(0, 4) for m in req["custom_metrics"]},
+            }
+    return inputs
+
+
+def make_calculate_payload(lot: Dict[str, Any], tech_inputs: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Body of POST /api/calculate for the lot and state."""
+    return {
+        "lot_key": lot["name"],
+        "base_amount": lot["base_amount"],
+        "competitor_discount": 30.0,
+        "my_discount": 25.0,
+        "tech_inputs": [{"req_id": req_id, **values} for req_id, values in tech_inputs.items()],
+        "company_certs_status": {label: ("all" if i % 3 else "partial") for i, label in enumerate(COMPANY_CERTS)},
+    }
+
+
+# --- Business Plans ------------------------------------------------------------
+
+def _periods(rng: random.Random, duration_months: int, count: int) -> List[Tuple[int, int]]:
+    """`count` consecutive periods covering the whole duration."""
+    cuts = sorted(rng.sample(range(2, duration_months + 1), min(count, duration_months) - 1))
+    starts = [1] + cuts
+    ends = [c - 1 for c in cuts] + [duration_months]
+    return list(zip(starts, ends))
+
+
+def _mix(rng: random.Random, lutech_profiles: List[str]) -> List[Dict[str, Any]]:
+    chosen = rng.sample(lutech_profiles, rng.randint(1, 3))
+    weights = [rng.randint(1, 10) for _ in chosen]
+    pcts = [round(100 * w / sum(weights), 2) for w in weights]
+    pcts[-1] = round(100 - sum(pcts[:-1]), 2)
+    return [{"lutech_profile": lid, "pct": pct} for lid, pct in zip(chosen, pcts)]
+
+
+def _catalog_tow(rng: random.Random, tow_id: str, poste_profiles: List[str], n_items: int) -> Dict[str, Any]:
+    n_groups = max(1, n_items // 25)
+    items, groups = [], []
+    for g in range(n_groups):
+        item_ids = [f"{tow_id}_I{g * 25 + i:04d}" for i in range(min(25, n_items - g * 25))]
+        weights = [rng.randint(1, 10) for _ in item_ids]
+        for item_id, weight in zip(item_ids, weights):
+            items.append({
+                "id": item_id,
+                "label": f"Voce {item_id}",
+                "price_base": round(rng.uniform(500, 50_000), 2),
+                "group_pct": round(100 * weight / sum(weights), 4),
+                "target_margin_pct": rng.choice([None, 15.0, 20.0, 25.0]),
+                "profile_mix": [{"poste_profile": p, "pct": 100 / 2} for p in rng.sample(poste_profiles, 2)],
+            })
+        groups.append({
+            "id": f"{tow_id}_G{g}", "label": f"Gruppo {g}", "item_ids": item_ids,
+            "target_value": round(rng.uniform(50_000, 500_000), 2),
+            "reuse_factor": rng.choice([None, 0.0, 0.1]),
+        })
+    half = len(poste_profiles) // 2
+    return {
+        "tow_id": tow_id, "label": f"Catalogo {tow_id}", "type": "catalogo",
+        "weight_pct": 20.0, "lutech_pct": 80.0,
+        "total_fte": 12.0,
+        "total_catalog_value": sum(g["target_value"] for g in groups),
+        "target_margin_pct": 20.0,
+        "sconto_gara_pct": 10.0,
+        "catalog_items": items,
+        "catalog_groups": groups,
+        "catalog_clusters": [
+            {"id": "C1", "label": "Cluster 1", "poste_profiles": poste_profiles[:half], "required_pct": 50,
+             "constraint_type": "minimum"},
+            {"id": "C2", "label": "Cluster 2", "poste_profiles": poste_profiles[half:], "required_pct": 50,
+             "constraint_type": "maximum"},
+        ],
+    }
+
+
+def make_business_plan(
+    team_size: int, duration_months: int, n_tows: int = 8, catalog_items: int = 500, seed: int = 1,
+) -> Dict[str, Any]:
+    """
+    A Business Plan (as stored, see schemas.BusinessPlanCreate) plus the
+    `profile_rates` the endpoints resolve from the practices.
+
+    Members are spread over `n_tows` TOWs, each Poste profile maps to a
+    time-varying mix of Lutech profiles and volumes change over a few periods,
+    so every interval boundary of the engine is exercised.
+    """
+    rng = random.Random(seed)
+    lutech_profiles = [f"{p}:{s}" for p in PRACTICES for s in SENIORITIES]
+    profile_rates = {lid: float(rng.randint(250, 750)) for lid in lutech_profiles}
+    poste_profiles = [f"P{i:03d}" for i in range(max(4, team_size // 2))]
+    tow_ids = [f"TOW_{i:02d}" for i in range(n_tows)]
+
+    team = []
+    for i in range(team_size):
+        allocated = rng.sample(tow_ids, rng.randint(1, 3))
+        weights = [rng.randint(1, 10) for _ in allocated]
+        team.append({
+            "profile_id": poste_profiles[i % len(poste_profiles)],
+            "label": f"Risorsa {i}",
+            "seniority": rng.choice(SENIORITIES),
+            "fte": round(rng.uniform(0.2, 3.0), 2),
+            "tow_allocation": {tid: round(100 * w / sum(weights), 2) for tid, w in zip(allocated, weights)},
+        })
+
+    profile_mappings = {
+        profile_id: [
+            {"month_start": start, "month_end": end, "mix": _mix(rng, lutech_profiles)}
+            for start, end in _periods(rng, duration_months, rng.randint(1, 3))
+        ]
+        for profile_id in poste_profiles
+        if rng.random() >= 0.1  # the others fall back to the Poste profile rate
+    }
+
+    volume_periods = [
+        {
+            "month_start": start, "month_end": end,
+            "by_tow": {tid: round(rng.uniform(0.8, 1.1), 2) for tid in rng.sample(tow_ids, n_tows // 2)},
+            "by_profile": {m["profile_id"]: round(rng.uniform(0.7, 1.0), 2) for m in rng.sample(team, len(team) // 4)},
+        }
+        for start, end in _periods(rng, duration_months, 3)
+    ]
+
+    tows = [
+        {"tow_id": tid, "label": f"TOW {tid}", "type": "task", "weight_pct": round(80 / n_tows, 2),
+         "lutech_pct": rng.choice([None, 60.0, 100.0])}
+        for tid in tow_ids
+    ]
+    tows.append(_catalog_tow(rng, "TOW_CAT", poste_profiles, catalog_items))
+
+    business_plan = {
+        "duration_months": duration_months,
+        "start_year": 2026,
+        "start_month": 1,
+        "days_per_fte": 220.0,
+        "default_daily_rate": 300.0,
+        "governance_pct": 0.04,
+        "risk_contingency_pct": 0.03,
+        "team_composition": team,
+        "tows": tows,
+        "volume_adjustments": {"periods": volume_periods},
+        "reuse_factor": 0.05,
+        "profile_mappings": profile_mappings,
+        "subcontract_config": {"tow_split": {tow_ids[0]: 5.0}, "partner": "Partner", "avg_daily_rate": 280.0},
+        "governance_mode": "percentage",
+        "inflation_pct": 2.0,
+    }
+    return {"business_plan": business_plan, "profile_rates": profile_rates}
+
+
+# --- Certificates --------------------------------------------------------------
+
+CERTIFICATES = [
+    ("Amazon Web Services", "AWS Certified Solutions Architect - Associate", "Validation Number ABC123XYZ"),
+    ("Microsoft", "Microsoft Certified: Azure Administrator Associate", "Certification number: H123-4567"),
+    ("Google Cloud", "Google Cloud Certified Professional Cloud Architect", "Credential ID 9876543"),
+    ("Red Hat", "Red Hat Certified Engineer (RHCE)", "Certificate number 180-123-456"),
+    ("Project Management Institute", "Project Management Professional (PMP)", "PMP Number: 1234567"),
+]
+NAMES = ["Mario Rossi", "Giulia Bianchi", "Luca Verdi", "Anna Neri", "Paolo Russo"]
+
+
+def _certificate_text(index: int) -> str:
+    vendor, title, credential = CERTIFICATES[index % len(CERTIFICATES)]
+    return (
+        f"{vendor}\n{title}\n"
+        f"This certificate is issued to {NAMES[index % len(NAMES)]}\n"
+        f"Issued: 01/02/2024  Expires: 01/02/{2027 + index % 3}\n{credential}\n"
+    )
+
+
+def write_certificates(folder: Path, count: int, scanned: bool = False) -> List[Path]:
+    """
+    Write `count` two-page certificate PDFs into `folder`.
+
+    Digital PDFs carry a text layer; scanned ones hold only a page image, so
+    verification has to rasterise and OCR them.
+    """
+    folder.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(count):
+        doc = fitz.open()
+        for page_text in (_certificate_text(i), "Terms and conditions\n" * 5):
+            page = doc.new_page()
+            page.insert_text((50, 80), page_text, fontsize=14)
+        if scanned:
+            image_doc = fitz.open()
+            for page in doc:
+                pixmap = page.get_pixmap(dpi=150)
+                image_page = image_doc.new_page(width=page.rect.width, height=page.rect.height)
+                image_page.insert_image(image_page.rect, pixmap=pixmap)
+            doc.close()
+            doc = image_doc
+        path = folder / f"{'scan' if scanned else 'cert'}_{i:03d}.pdf"
+        doc.save(str(path))
+        doc.close()
+        paths.append(path)
+    return paths
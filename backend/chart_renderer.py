@@ -0,0 +1,220 @@
+"""
+Chart Renderer for PDF reports
+Renders report charts to PNG with matplotlib's object-oriented API and caches
+them by their inputs
+"""
+
+import io
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Circle, Wedge
+
+logger = logging.getLogger(__name__)
+
+CHART_DPI = 150
+CHART_CACHE_SIZE = 256
+
+ChartSpec = Tuple[str, Tuple[Any, ...]]
+
+
+def _new_axes(figsize: Tuple[float, float], **subplot_kw):
+    """Figure bound to its own Agg canvas: no pyplot global state, safe across threads."""
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot(**subplot_kw)
+
+
+def _to_png(fig: Figure) -> bytes:
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=CHART_DPI, bbox_inches='tight',
+                facecolor='white', edgecolor='none')
+    return buf.getvalue()
+
+
+def render_gauge(value: float, max_value: float, title: str) -> bytes:
+    """Semicircular gauge chart"""
+    fig, ax = _new_axes((2.8, 1.8), aspect='equal')
+
+    pct = min(100, max(0, (value / max_value) * 100)) if max_value > 0 else 0
+
+    # Background arc
+    ax.add_patch(Wedge(center=(0, 0), r=1, theta1=0, theta2=180,
+                       facecolor='#e9ecef', edgecolor='none'))
+
+    # Color based on percentage
+    if pct >= 70:
+        color = '#28a745'
+    elif pct >= 40:
+        color = '#ffc107'
+    else:
+        color = '#dc3545'
+
+    # Value arc
+    angle = 180 * (pct / 100)
+    ax.add_patch(Wedge(center=(0, 0), r=1, theta1=0, theta2=angle,
+                       facecolor=color, edgecolor='none'))
+
+    # Inner circle
+    ax.add_patch(Circle((0, 0), 0.6, facecolor='white', edgecolor='none'))
+
+    # Value text
+    ax.text(0, 0.1, f'{value:.1f}', ha='center', va='center',
+            fontsize=12, fontweight='bold', color='#333333')
+    ax.text(0, -0.2, f'/ {max_value:.0f}', ha='center', va='center',
+            fontsize=7, color='#6c757d')
+
+    ax.set_xlim(-1.2, 1.2)
+    ax.set_ylim(-0.3, 1.2)
+    ax.axis('off')
+    ax.set_title(title, fontsize=9, pad=3, fontweight='bold')
+
+    return _to_png(fig)
+
+
+def render_score_curve(base_amount: float, competitor_discount: float,
+                       alpha: float, max_tech_score: float,
+                       max_econ_score: float, tech_score: float) -> bytes:
+    """Discount scenario chart (curva punteggio)"""
+    fig, ax = _new_axes((6, 3.5))
+
+    discounts = list(range(1, 101))
+    econ_scores = []
+    total_scores = []
+
+    p_best = base_amount * (1 - competitor_discount / 100)
+
+    for d in discounts:
+        p_off = base_amount * (1 - d / 100)
+        p_actual_best = min(p_off, p_best)
+
+        if p_actual_best > 0:
+            ratio = p_off / p_actual_best
+            if ratio <= 1:
+                econ = max_econ_score * (1 - (ratio ** alpha))
+            else:
+                econ = 0
+        else:
+            econ = 0
+
+        econ_scores.append(econ)
+        total_scores.append(tech_score + econ)
+
+    ax.plot(discounts, econ_scores, color='#FFCC00', linewidth=2, label='Score Econ.')
+    ax.plot(discounts, total_scores, color='#1E3A5F', linewidth=2, label='TOTALE')
+
+    ax.set_xlabel('Sconto %', fontsize=10)
+    ax.set_ylabel('Punteggio', fontsize=10)
+    ax.set_title('Curva Punteggio per Scenario Sconto', fontsize=11, fontweight='bold')
+    ax.legend(loc='upper left', fontsize=8)
+    ax.grid(alpha=0.3, linestyle='--')
+    ax.set_xlim(0, 100)
+    ax.set_ylim(0, max_tech_score + max_econ_score + 5)
+
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+
+    fig.tight_layout()
+    return _to_png(fig)
+
+
+def render_rti_pie(quotas: Tuple[Tuple[str, float], ...]) -> Optional[bytes]:
+    """RTI quotas pie chart from (company, quota) pairs, Lutech first"""
+    if not quotas:
+        return None
+
+    labels = [label for label, _ in quotas]
+    sizes = [size for _, size in quotas]
+    colors_list = ['#0066CC']  # Lutech
+    colors_list += ['#6366F1', '#8B5CF6', '#EC4899'][:len(labels)-1]
+
+    # Filter out zero values
+    filtered = [(l, s, c) for l, s, c in zip(labels, sizes, colors_list) if s > 0]
+    if not filtered:
+        return None
+
+    labels, sizes, colors_list = zip(*filtered)
+
+    fig, ax = _new_axes((4, 3))
+    ax.pie(
+        sizes, labels=labels, autopct='%1.0f%%',
+        colors=colors_list, startangle=90,
+        textprops={'fontsize': 8}
+    )
+    ax.set_title('Quote RTI', fontsize=10, fontweight='bold')
+
+    fig.tight_layout()
+    return _to_png(fig)
+
+
+RENDERERS: Dict[str, Callable[..., Optional[bytes]]] = {
+    'gauge': render_gauge,
+    'score_curve': render_score_curve,
+    'rti_pie': render_rti_pie,
+}
+
+
+def render_chart(spec: ChartSpec) -> Optional[bytes]:
+    """Render one (kind, args) spec."""
+    kind, args = spec
+    return RENDERERS[kind](*args)
+
+
+class ChartCache:
+    """
+    LRU cache of rendered PNGs keyed by chart kind and inputs.
+
+    Identical inputs always give the same image, so re-exporting a lot whose
+    scores did not change (or another lot with the same gauges) skips
+    matplotlib entirely.
+    """
+
+    def __init__(self, max_entries: int = CHART_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[ChartSpec, Optional[bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, spec: ChartSpec) -> Tuple[bool, Optional[bytes]]:
+        with self._lock:
+            if spec in self._entries:
+                self._entries.move_to_end(spec)
+                self.hits += 1
+                return True, self._entries[spec]
+            self.misses += 1
+            return False, None
+
+    def put(self, spec: ChartSpec, png: Optional[bytes]) -> None:
+        with self._lock:
+            self._entries[spec] = png
+            self._entries.move_to_end(spec)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+chart_cache = ChartCache()
+
+
+def get_chart(kind: str, *args) -> Optional[io.BytesIO]:
+    """
+    PNG of a chart as a BytesIO ready for reportlab, rendered once per distinct input.
+
+    Returns:
+        None when the chart has nothing to show (e.g. an RTI pie of zero quotas)
+    """
+    spec = (kind, tuple(args))
+    found, png = chart_cache.get(spec)
+    if not found:
+        png = render_chart(spec)
+        chart_cache.put(spec, png)
+    return io.BytesIO(png) if png is not None else None
@@ -16,6 +16,11 @@ os.environ.setdefault("ENVIRONMENT", "test")
 # The bypass is fail-closed by default, so it must be explicitly opted into.
 os.environ.pop("OIDC_CLIENT_ID", None)
 os.environ["AUTH_DEV_BYPASS"] = "1"
+# Generated reports are cached on disk; keep the test run's cache apart.
+os.environ["REPORT_CACHE_DIR"] = tempfile.mkdtemp(prefix="simulator_poste_reports_")
+os.environ["PREVIEW_TOKEN_DIR"] = tempfile.mkdtemp(prefix="simulator_poste_previews_")
+os.environ["LOCK_DIR"] = tempfile.mkdtemp(prefix="simulator_poste_locks_")
+os.environ["PROFILE_DIR"] = tempfile.mkdtemp(prefix="simulator_poste_profiles_")
 
 # Start from a clean DB each session; tables are (re)created when `main` imports.
 if os.path.exists(_TEST_DB):
@@ -23,6 +28,9 @@ if os.path.exists(_TEST_DB):
 
 import pytest
 
+# The benchmark suite has its own configuration (run it with `pytest benchmarks`)
+collect_ignore = ["benchmarks"]
+
 
 @pytest.fixture(scope="session", autouse=True)
 def _seeded_database():
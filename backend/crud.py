@@ -3,7 +3,8 @@ CRUD operations for database models
 Handles creation, retrieval, and updating of lot configurations and master data
 """
 
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional, Dict, Any, Tuple
 import json
 import os
@@ -13,6 +14,7 @@ import threading
 from pathlib import Path
 
 import models, schemas
+from services import data_versions  # noqa: F401 -- registers the per-table change counters
 from vendor_defaults import DEFAULT_VENDORS
 from logging_config import get_logger
 
@@ -183,8 +185,16 @@ def seed_initial_data(db: Session) -> None:
 
 
 def get_lot_configs(db: Session) -> List[models.LotConfigModel]:
-    """Retrieve all lot configurations"""
-    return db.query(models.LotConfigModel).all()
+    """Retrieve all lot configurations (with their requirement, certification and state rows)"""
+    return (
+        db.query(models.LotConfigModel)
+        .options(
+            selectinload(models.LotConfigModel.requirement_rows),
+            selectinload(models.LotConfigModel.company_cert_rows),
+            selectinload(models.LotConfigModel.state_rows),
+        )
+        .all()
+    )
 
 
 def get_lot_config(db: Session, lot_key: str) -> Optional[models.LotConfigModel]:
@@ -196,6 +206,74 @@ def get_lot_config(db: Session, lot_key: str) -> Optional[models.LotConfigModel]
     )
 
 
+def get_lot_scoring_config(db: Session, lot_key: str) -> Optional[schemas.LotConfig]:
+    """
+    Lot configuration as the scoring engine needs it: requirements and company
+    certifications, without the saved simulation state (which is never loaded).
+    """
+    db_lot = (
+        db.query(models.LotConfigModel)
+        .options(
+            selectinload(models.LotConfigModel.requirement_rows),
+            selectinload(models.LotConfigModel.company_cert_rows),
+        )
+        .filter(models.LotConfigModel.name == lot_key)
+        .first()
+    )
+    if not db_lot:
+        return None
+    return schemas.LotConfig(
+        name=db_lot.name,
+        base_amount=db_lot.base_amount,
+        max_tech_score=db_lot.max_tech_score,
+        max_econ_score=db_lot.max_econ_score,
+        max_raw_score=db_lot.max_raw_score,
+        alpha=db_lot.alpha,
+        economic_formula=db_lot.economic_formula,
+        company_certs=db_lot.company_certs,
+        reqs=db_lot.reqs,
+        state={},
+        rti_enabled=db_lot.rti_enabled,
+        rti_companies=db_lot.rti_companies or [],
+        rti_quotas=db_lot.rti_quotas or {},
+        is_active=db_lot.is_active,
+    )
+
+
+# Columns of lot_configs that held requirements, certifications and state as
+# JSON before they moved to their own tables
+LEGACY_LOT_JSON_COLUMNS = ("company_certs", "reqs", "state")
+
+
+def migrate_lot_json_columns(db: Session) -> int:
+    """
+    Move lots stored by older versions (JSON columns on lot_configs) into the
+    requirement / certification / state tables, then clear the old columns.
+
+    Idempotent: a cleared column is NULL and is skipped. Returns the number of
+    lots migrated.
+    """
+    columns = {c["name"] for c in inspect(db.get_bind()).get_columns("lot_configs")}
+    legacy = [column for column in LEGACY_LOT_JSON_COLUMNS if column in columns]
+    if not legacy:
+        return 0
+
+    pending = " OR ".join(f"{column} IS NOT NULL" for column in legacy)
+    rows = db.execute(text(f"SELECT name, {', '.join(legacy)} FROM lot_configs WHERE {pending}")).mappings().all()
+    for row in rows:
+        db_lot = get_lot_config(db, row["name"])
+        for column in legacy:
+            value = json.loads(row[column]) if isinstance(row[column], str) else row[column]
+            if value is not None:
+                setattr(db_lot, column, value)
+    if rows:
+        db.flush()
+        db.execute(text(f"UPDATE lot_configs SET {', '.join(f'{column} = NULL' for column in legacy)}"))
+        logger.info(f"Migrated {len(rows)} lots from JSON columns to requirement/state rows")
+    db.commit()
+    return len(rows)
+
+
 def create_lot_config(
     db: Session, lot_config: schemas.LotConfig
 ) -> models.LotConfigModel:
@@ -223,9 +301,14 @@ def create_lot_config(
 
 
 def update_lot_config(
-    db: Session, lot_key: str, lot_config: schemas.LotConfig
+    db: Session, lot_key: str, lot_config: schemas.LotConfig, commit: bool = True
 ) -> Optional[models.LotConfigModel]:
-    """Update an existing lot configuration"""
+    """
+    Update an existing lot configuration
+
+    Unchanged fields and requirements issue no writes. With commit=False the
+    caller commits (together with its own changes to the lot).
+    """
     db_lot = get_lot_config(db, lot_key)
     if db_lot:
         db_lot.name = lot_config.name
@@ -291,8 +374,9 @@ def update_lot_config(
         # Update is_active flag
         db_lot.is_active = lot_config.is_active
 
-        db.commit()
-        db.refresh(db_lot)
+        if commit:
+            db.commit()
+            db.refresh(db_lot)
     return db_lot
 
 
@@ -549,6 +633,11 @@ def seed_ocr_settings(db: Session) -> None:
             "value": "600",
             "description": "DPI resolution for PDF to image conversion"
         },
+        {
+            "key": "ocr_workers",
+            "value": "2",
+            "description": "Parallel OCR workers when verifying an uploaded ZIP"
+        },
     ]
     
     for setting_data in default_settings:
@@ -763,3 +852,144 @@ def seed_practices(db: Session) -> None:
         db.add(db_practice)
 
     db.commit()
+
+
+# ============================================================================
+# Certificate Verification Jobs CRUD
+# ============================================================================
+
+def create_cert_job(
+    db: Session,
+    job_id: str,
+    source_type: str,
+    source_path: str,
+    source_name: Optional[str] = None,
+    lot_key: Optional[str] = None,
+    req_filter: Optional[str] = None,
+    expected_certs_map: Optional[Dict[str, List[str]]] = None,
+    created_by: Optional[str] = None,
+) -> models.CertVerificationJobModel:
+    """Create a queued certificate verification job"""
+    db_job = models.CertVerificationJobModel(
+        id=job_id,
+        status="queued",
+        source_type=source_type,
+        source_path=source_path,
+        source_name=source_name,
+        lot_key=lot_key,
+        req_filter=req_filter,
+        expected_certs_map=expected_certs_map or {},
+        created_by=created_by,
+    )
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+
+def get_cert_job(db: Session, job_id: str) -> Optional[models.CertVerificationJobModel]:
+    """Retrieve a certificate verification job by id"""
+    return db.query(models.CertVerificationJobModel).filter(
+        models.CertVerificationJobModel.id == job_id
+    ).first()
+
+
+def get_cert_jobs(
+    db: Session, statuses: Optional[List[str]] = None, limit: Optional[int] = None
+) -> List[models.CertVerificationJobModel]:
+    """Retrieve certificate verification jobs, newest first"""
+    query = db.query(models.CertVerificationJobModel)
+    if statuses:
+        query = query.filter(models.CertVerificationJobModel.status.in_(statuses))
+    query = query.order_by(models.CertVerificationJobModel.created_at.desc())
+    if limit:
+        query = query.limit(limit)
+    return query.all()
+
+
+def get_cert_job_files(db: Session, job_id: str) -> List[models.CertVerificationJobFileModel]:
+    """Retrieve the per-file results of a job, in processing order"""
+    return db.query(models.CertVerificationJobFileModel).filter(
+        models.CertVerificationJobFileModel.job_id == job_id
+    ).order_by(models.CertVerificationJobFileModel.id).all()
+
+
+def get_cert_job_done_filenames(db: Session, job_id: str) -> set:
+    """Relative filenames already verified for a job (used to skip them on resume)"""
+    rows = db.query(models.CertVerificationJobFileModel.filename).filter(
+        models.CertVerificationJobFileModel.job_id == job_id
+    ).all()
+    return {row[0] for row in rows}
+
+
+def add_cert_job_file(
+    db: Session, job: models.CertVerificationJobModel, filename: str, result: Dict[str, Any]
+) -> None:
+    """Store one verified file and advance the job progress in the same commit"""
+    db.add(models.CertVerificationJobFileModel(
+        job_id=job.id,
+        filename=filename,
+        status=result.get("status"),
+        result=result,
+    ))
+    job.processed = (job.processed or 0) + 1
+    db.commit()
+
+
+def delete_cert_job(db: Session, job_id: str) -> bool:
+    """Delete a job and its per-file results"""
+    db_job = get_cert_job(db, job_id)
+    if not db_job:
+        return False
+    db.query(models.CertVerificationJobFileModel).filter(
+        models.CertVerificationJobFileModel.job_id == job_id
+    ).delete()
+    db.delete(db_job)
+    db.commit()
+    return True
+
+
+# ============================================================================
+# Certificate Verification Manifest CRUD
+# ============================================================================
+
+def get_cert_manifest_entries(db: Session, path_prefix: str) -> Dict[str, models.CertVerificationManifestModel]:
+    """Retrieve manifest entries for files under a folder, keyed by path"""
+    rows = db.query(models.CertVerificationManifestModel).filter(
+        models.CertVerificationManifestModel.path.startswith(path_prefix, autoescape=True)
+    ).all()
+    return {row.path: row for row in rows}
+
+
+def upsert_cert_manifest_entry(
+    db: Session,
+    path: str,
+    size: int,
+    mtime: float,
+    content_hash: str,
+    config_hash: str,
+    result: Dict[str, Any],
+) -> models.CertVerificationManifestModel:
+    """Create or replace the manifest entry of a file"""
+    entry = db.get(models.CertVerificationManifestModel, path)
+    if entry is None:
+        entry = models.CertVerificationManifestModel(path=path)
+        db.add(entry)
+    entry.size = size
+    entry.mtime = mtime
+    entry.content_hash = content_hash
+    entry.config_hash = config_hash
+    entry.result = result
+    db.commit()
+    return entry
+
+
+def delete_cert_manifest_entries(db: Session, paths: List[str]) -> int:
+    """Delete manifest entries of files that no longer exist"""
+    if not paths:
+        return 0
+    deleted = db.query(models.CertVerificationManifestModel).filter(
+        models.CertVerificationManifestModel.path.in_(paths)
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
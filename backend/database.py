@@ -1,39 +1,164 @@
 """
 Database configuration and setup for SQLite
+
+SQLite runs in WAL mode: readers never block the writer and vice versa, and
+concurrent writers queue on the busy timeout instead of failing. Reads that
+never write use `ReadSessionLocal`, a separate pool of query-only connections,
+so a long write transaction (OCR job, import) does not hold up the read pool.
+
+Interactive endpoints (config, scoring, simulation) are `async def` and read
+through `AsyncReadSessionLocal` (aiosqlite), so they do not occupy a slot of
+the threadpool that sync endpoints (OCR, exports) can exhaust.
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 import os
 
+from metrics import count_db_query
+
 # Database URL - using SQLite in project root
 DATABASE_URL = os.environ.get(
     "DATABASE_URL",
     "sqlite:///./simulator_poste.db"
 )
 
-# Create engine with SQLite-specific options
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
-    echo=False  # Set to True for SQL logging
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+# Storage tuning (SQLite only)
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.environ.get("SQLITE_CACHE_SIZE_KB", str(32 * 1024)))  # per connection
+SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+READ_POOL_SIZE = int(os.environ.get("DB_READ_POOL_SIZE", "10"))
+
+# Same database through an asyncio driver; other backends must name theirs
+ASYNC_DATABASE_URL = os.environ.get("ASYNC_DATABASE_URL") or (
+    make_url(DATABASE_URL).set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    if IS_SQLITE else None
 )
 
-# Enable foreign key support for SQLite
-from sqlalchemy import event
-@event.listens_for(engine, "connect")
-def set_sqlite_pragma(dbapi_connection, connection_record):
-    if "sqlite" in DATABASE_URL:
+
+def _is_file_database(url: str) -> bool:
+    database = make_url(url).database
+    return bool(database) and database != ":memory:" and not database.startswith("file::memory:")
+
+
+def sqlite_pragmas(read_only: bool = False) -> list:
+    """PRAGMA statements run on every new SQLite connection."""
+    pragmas = [
+        "PRAGMA foreign_keys=ON",
+        f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+        "PRAGMA synchronous=NORMAL",  # durable with WAL, without an fsync per commit
+        f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}",
+        f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    return pragmas
+
+
+def _set_sqlite_pragmas(target_engine, read_only: bool) -> None:
+    @event.listens_for(target_engine, "connect")
+    def set_sqlite_pragma(dbapi_connection, connection_record):
         cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
+        for pragma in sqlite_pragmas(read_only):
+            cursor.execute(pragma)
         cursor.close()
 
-# Session factory
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    """Every engine (sync, read-only, async) feeds the per-request query count."""
+    count_db_query()
+
+
+def _create_engine(read_only: bool = False):
+    kwargs = {}
+    if IS_SQLITE:
+        # busy_timeout is also passed as the driver timeout (seconds) so
+        # BEGIN waits for a concurrent writer instead of raising "database is locked"
+        kwargs["connect_args"] = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+        if read_only:
+            kwargs.update(pool_size=READ_POOL_SIZE, max_overflow=READ_POOL_SIZE)
+    new_engine = create_engine(DATABASE_URL, echo=False, **kwargs)  # echo=True for SQL logging
+
+    if IS_SQLITE:
+        _set_sqlite_pragmas(new_engine, read_only)
+
+    return new_engine
+
+
+def _create_async_read_engine():
+    kwargs = {}
+    if IS_SQLITE:
+        kwargs["connect_args"] = {"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+        if _is_file_database(DATABASE_URL):
+            kwargs.update(pool_size=READ_POOL_SIZE, max_overflow=READ_POOL_SIZE)
+    new_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False, **kwargs)
+    if IS_SQLITE:
+        _set_sqlite_pragmas(new_engine.sync_engine, read_only=True)
+    return new_engine
+
+
+# Engine for sessions that write
+engine = _create_engine()
+
+# WAL is a property of the database file: switch it once, from the write engine
+if IS_SQLITE and _is_file_database(DATABASE_URL):
+    with engine.connect() as _conn:
+        _conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+
+# Read-only connections get their own pool; an in-memory database cannot be
+# shared between connections, so it keeps using the write engine
+read_engine = _create_engine(read_only=True) if not IS_SQLITE or _is_file_database(DATABASE_URL) else engine
+
+# Session factories
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
     bind=engine
 )
 
+ReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=read_engine
+)
+
+# Query-only sessions for async endpoints. An in-memory SQLite database lives
+# in the connections of the sync engine, so it cannot be shared here.
+async_read_engine = (
+    _create_async_read_engine()
+    if ASYNC_DATABASE_URL and (not IS_SQLITE or _is_file_database(DATABASE_URL)) else None
+)
+AsyncReadSessionLocal = (
+    async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
+    if async_read_engine is not None else None
+)
+
+
+def checkpoint() -> None:
+    """Fold the WAL into the main database file (before copying the file as a backup)."""
+    if IS_SQLITE:
+        with engine.connect() as conn:
+            conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+
+
+def dispose_engines() -> None:
+    """Close every pooled connection (before the database file is replaced)."""
+    engine.dispose()
+    if read_engine is not engine:
+        read_engine.dispose()
+
+
+async def dispose_async_engines() -> None:
+    """Close the async read pool (from the event loop that uses it)."""
+    if async_read_engine is not None:
+        await async_read_engine.dispose()
+
+
 # Base class for models
 Base = declarative_base()
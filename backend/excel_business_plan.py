@@ -6,13 +6,15 @@ THIS IS A FULLY FORMULA-DRIVEN WORKBOOK - all calculations happen in Excel.
 
 import io
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, BinaryIO, List, Optional
 
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.formatting.rule import ColorScaleRule, FormulaRule
 from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.datavalidation import DataValidation
+from export_streaming import save_workbook, streamed_sheet
 from logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -54,6 +56,20 @@ LEFT = Alignment(horizontal='left', vertical='center')
 RIGHT = Alignment(horizontal='right', vertical='center')
 
 
+def _named_styles() -> List[NamedStyle]:
+    """
+    Named styles registered on each workbook.
+
+    A cell assigned a named style gets its font/fill/border/alignment in one
+    step instead of hashing each style object per cell; worth it only for
+    multi-attribute styles (a lone number_format is already a cheap lookup).
+    NamedStyle binds to a workbook, so fresh instances are built per generator.
+    """
+    return [
+        NamedStyle(name='bp_header', font=HEADER_FONT, fill=HEADER_FILL, alignment=CENTER, border=THIN_BORDER),
+    ]
+
+
 class BusinessPlanExcelGenerator:
     """
     Generates a FULLY FORMULA-DRIVEN Business Plan Excel.
@@ -93,11 +109,13 @@ class BusinessPlanExcelGenerator:
         self.intervals = intervals or []
 
         self.wb = Workbook()
+        for style in _named_styles():
+            self.wb.add_named_style(style)
 
         # Named ranges for cross-sheet references
         self.named_ranges = {}
 
-    def generate(self) -> io.BytesIO:
+    def generate(self, output: Optional[BinaryIO] = None) -> BinaryIO:
         if 'Sheet' in self.wb.sheetnames:
             del self.wb['Sheet']
 
@@ -129,8 +147,8 @@ class BusinessPlanExcelGenerator:
                 logger.error(f"Error creating sheet '{sheet_name}': {e}", exc_info=True)
                 raise RuntimeError(f"Errore nel foglio '{sheet_name}': {e}") from e
 
-        buffer = io.BytesIO()
-        self.wb.save(buffer)
+        buffer = output if output is not None else io.BytesIO()
+        save_workbook(self.wb, buffer)
         buffer.seek(0)
         return buffer
 
@@ -149,11 +167,32 @@ class BusinessPlanExcelGenerator:
 
     def _add_header_row(self, ws, row: int, headers: List[str], start_col: int = 1):
         for i, h in enumerate(headers):
-            cell = ws.cell(row=row, column=start_col + i, value=h)
-            cell.font = HEADER_FONT
-            cell.fill = HEADER_FILL
-            cell.alignment = CENTER
-            cell.border = THIN_BORDER
+            ws.cell(row=row, column=start_col + i, value=h).style = 'bp_header'
+
+    # Streamed sheets (see export_streaming.streamed_sheet) are written row by row with these cells
+    def _row_cell(self, ws, value=None, font=None, number_format=None) -> WriteOnlyCell:
+        cell = WriteOnlyCell(ws, value=value)
+        if font is not None:
+            cell.font = font
+        if number_format is not None:
+            cell.number_format = number_format
+        return cell
+
+    def _input_row_cell(self, ws, value, number_format=None) -> WriteOnlyCell:
+        cell = self._row_cell(ws, value, number_format=number_format)
+        self._style_input_cell(cell)
+        return cell
+
+    def _formula_row_cell(self, ws, value, number_format=None) -> WriteOnlyCell:
+        cell = self._row_cell(ws, value, number_format=number_format)
+        self._style_formula_cell(cell)
+        return cell
+
+    def _header_row_cells(self, ws, headers: List[str]) -> List[WriteOnlyCell]:
+        cells = [WriteOnlyCell(ws, value=h) for h in headers]
+        for cell in cells:
+            cell.style = 'bp_header'
+        return cells
 
     # ========== SHEET 1: PARAMETRI (Central input sheet) ==========
     def _create_params_sheet(self):
@@ -1609,32 +1648,33 @@ class BusinessPlanExcelGenerator:
 
     # ========== SHEET 8.5: CATALOGO (Margin First) ==========
     def _create_catalog_sheet(self):
-        ws = self.wb.create_sheet("CATALOGO")
+        # One row per catalog item: streamed to disk, so rows are appended in order
+        ws = streamed_sheet(self.wb, "CATALOGO")
         
-        ws.column_dimensions['A'].width = 15
-        ws.column_dimensions['B'].width = 30
-        ws.column_dimensions['C'].width = 15
-        ws.column_dimensions['D'].width = 15
-        ws.column_dimensions['E'].width = 15
-        ws.column_dimensions['F'].width = 15
-        ws.column_dimensions['G'].width = 15
-        ws.column_dimensions['H'].width = 15
-        ws.column_dimensions['I'].width = 15
-        ws.column_dimensions['J'].width = 15
+        for col in 'ABCDEFGHIJ':
+            ws.column_dimensions[col].width = 30 if col == 'B' else 15
         
-        ws['A1'] = "DETTAGLIO TOW A CATALOGO (MARGIN-FIRST)"
-        ws['A1'].font = TITLE_FONT
+        row = 1
+
+        def append(*cells) -> int:
+            nonlocal row
+            ws.append(list(cells))
+            row += 1
+            return row - 1
+        
+        append(self._row_cell(ws, "DETTAGLIO TOW A CATALOGO (MARGIN-FIRST)", font=TITLE_FONT))
+        append()
         
         catalog_tows = [t for t in (self.bp.get('tows') or self.bp.get('tow_config') or []) if t.get('type', '') == 'catalogo']
         
         if not catalog_tows:
-            ws['A3'] = "Nessun TOW a catalogo presente."
-            ws['B3'] = 0
+            append("Nessun TOW a catalogo presente.", 0)
             self.named_ranges['CATALOG_COST'] = "CATALOGO!$B$3"
             return
             
-        row = 4
+        append()
         total_costs_cells = []
+        total_fill = PatternFill(start_color='E2EFDA', end_color='E2EFDA', fill_type='solid')
         
         for tow in catalog_tows:
             tow_id = tow.get('tow_id', tow.get('id', ''))
@@ -1644,53 +1684,24 @@ class BusinessPlanExcelGenerator:
             target_margin = float(tow.get('target_margin_pct', 20) or 20) / 100.0
             def_reuse = float(tow.get('catalog_reuse_factor', 0) or 0)
             
-            ws['A' + str(row)] = f"TOW: {tow_label} ({tow_id})"
-            ws['A' + str(row)].font = BOLD_FONT
-            row += 1
+            append(self._row_cell(ws, f"TOW: {tow_label} ({tow_id})", font=BOLD_FONT))
             
             # Parametri base del TOW
-            ws['A' + str(row)] = "FTE di Riferimento"
-            ws['B' + str(row)] = ref_total_fte
-            self._style_input_cell(ws['B' + str(row)])
-            ref_fte_cell = f"B{row}"
-            row += 1
-            
-            ws['A' + str(row)] = "Valore Catalogo Totale"
-            ws['B' + str(row)] = total_catalog_value
-            self._style_input_cell(ws['B' + str(row)])
-            tot_val_cell = f"B{row}"
-            row += 1
-            
-            ws['A' + str(row)] = "Margine Target Default"
-            ws['B' + str(row)] = target_margin
-            ws['B' + str(row)].number_format = '0.0%'
-            self._style_input_cell(ws['B' + str(row)])
-            def_margin_cell = f"B{row}"
-            row += 1
-            
-            ws['A' + str(row)] = "Riuso Default"
-            ws['B' + str(row)] = def_reuse
-            ws['B' + str(row)].number_format = '0.0%'
-            self._style_input_cell(ws['B' + str(row)])
-            def_reuse_cell = f"B{row}"
-            row += 1
+            ref_fte_cell = f"B{append('FTE di Riferimento', self._input_row_cell(ws, ref_total_fte))}"
+            tot_val_cell = f"B{append('Valore Catalogo Totale', self._input_row_cell(ws, total_catalog_value))}"
+            def_margin_cell = f"B{append('Margine Target Default', self._input_row_cell(ws, target_margin, '0.0%'))}"
+            def_reuse_cell = f"B{append('Riuso Default', self._input_row_cell(ws, def_reuse, '0.0%'))}"
 
-            ws['A' + str(row)] = "Quota RTI Lutech"
             # Get actual lutech_pct for this TOW
             l_pct = tow.get('lutech_pct')
             if l_pct is None:
                 l_pct = self.quota_lutech * 100
-            
-            ws['B' + str(row)] = float(l_pct) / 100
-            ws['B' + str(row)].number_format = '0.0%'
-            self._style_input_cell(ws['B' + str(row)])
-            rti_quota_cell = f"B{row}"
-            row += 2
+            rti_quota_cell = f"B{append('Quota RTI Lutech', self._input_row_cell(ws, float(l_pct) / 100, '0.0%'))}"
+            append()
             
             # Intestazioni voci
             headers = ['ID Voce', 'Descrizione', 'Target Gruppo', 'Riuso Grp.', 'Peso %', 'Tariffa/gg', 'Margine %', 'FTE Eff. Lutech', 'Costo Lutech', 'Vendita']
-            self._add_header_row(ws, row, headers)
-            row += 1
+            append(*self._header_row_cells(ws, headers))
             
             items_start = row
             
@@ -1726,122 +1737,85 @@ class BusinessPlanExcelGenerator:
                     if ci.get('id') == item_id:
                         avg_rate = ci.get('avg_daily_rate', 250.0)
                         break
-                        
-                ws.cell(row=row, column=1, value=item_id).border = THIN_BORDER
-                ws.cell(row=row, column=2, value=item_label).border = THIN_BORDER
-                
-                c_tgt = ws.cell(row=row, column=3, value=group_target)
-                self._style_input_cell(c_tgt)
-                c_tgt.number_format = '#,##0.00'
                 
-                c_reuse = ws.cell(row=row, column=4, value=reuse_val)
-                self._style_input_cell(c_reuse)
-                c_reuse.number_format = '0.0%'
-                
-                c_pct = ws.cell(row=row, column=5, value=item_pct)
-                self._style_input_cell(c_pct)
-                c_pct.number_format = '0.0%'
-                
-                c_rate = ws.cell(row=row, column=6, value=avg_rate)
-                self._style_input_cell(c_rate)
-                c_rate.number_format = '#,##0.00'
-                
-                c_margin = ws.cell(row=row, column=7, value=margin_val)
-                self._style_input_cell(c_margin)
-                c_margin.number_format = '0.0%'
-                
-                # FTE Reale
-                c_fte = ws.cell(row=row, column=8)
-                c_fte.value = f"=IF({tot_val_cell}>0, (C{row}/{tot_val_cell})*{ref_fte_cell}*(1-D{row})*E{row}*{rti_quota_cell}, 0)"
-                self._style_formula_cell(c_fte)
-                c_fte.number_format = '0.0000'
-
-                
-                # Costo (Assenza Inflazione per Catalogo come da specifica)
-                c_cost = ws.cell(row=row, column=9)
-                # Formula: FTE_Reale * Tariffa * (Durata/12) * GG_Anno
-                c_cost.value = f"=H{row}*F{row}*({self.named_ranges['DURATA_MESI']}/12)*{self.named_ranges['GG_ANNO']}"
-                self._style_formula_cell(c_cost)
-                c_cost.number_format = '#,##0.00'
-                
-                # Vendita
-                c_sell = ws.cell(row=row, column=10)
-                c_sell.value = f"=IF(1-G{row}>0, I{row}/(1-G{row}), I{row})"
-                self._style_formula_cell(c_sell)
-                c_sell.number_format = '#,##0.00'
-                
-                row += 1
+                c_id = self._row_cell(ws, item_id)
+                c_id.border = THIN_BORDER
+                c_label = self._row_cell(ws, item_label)
+                c_label.border = THIN_BORDER
+                append(
+                    c_id,
+                    c_label,
+                    self._input_row_cell(ws, group_target, '#,##0.00'),
+                    self._input_row_cell(ws, reuse_val, '0.0%'),
+                    self._input_row_cell(ws, item_pct, '0.0%'),
+                    self._input_row_cell(ws, avg_rate, '#,##0.00'),
+                    self._input_row_cell(ws, margin_val, '0.0%'),
+                    # FTE Reale
+                    self._formula_row_cell(
+                        ws, f"=IF({tot_val_cell}>0, (C{row}/{tot_val_cell})*{ref_fte_cell}*(1-D{row})*E{row}*{rti_quota_cell}, 0)", '0.0000',
+                    ),
+                    # Costo (Assenza Inflazione per Catalogo come da specifica)
+                    # Formula: FTE_Reale * Tariffa * (Durata/12) * GG_Anno
+                    self._formula_row_cell(
+                        ws, f"=H{row}*F{row}*({self.named_ranges['DURATA_MESI']}/12)*{self.named_ranges['GG_ANNO']}", '#,##0.00',
+                    ),
+                    # Vendita
+                    self._formula_row_cell(ws, f"=IF(1-G{row}>0, I{row}/(1-G{row}), I{row})", '#,##0.00'),
+                )
                 
             items_end = row - 1
             
-            ws.cell(row=row, column=1, value="TOTALE TOW").font = BOLD_FONT
-            c_tot_cost = ws.cell(row=row, column=9)
-            if items_end >= items_start:
-                c_tot_cost.value = f"=SUM(I{items_start}:I{items_end})"
-            else:
-                c_tot_cost.value = 0
-            self._style_formula_cell(c_tot_cost)
+            total_cells = [self._row_cell(ws) for _ in range(10)]
+            total_cells[0].value = "TOTALE TOW"
+            total_cells[0].font = BOLD_FONT
+            c_tot_cost = total_cells[8]
+            c_tot_cost.value = f"=SUM(I{items_start}:I{items_end})" if items_end >= items_start else 0
             c_tot_cost.font = BOLD_FONT
             c_tot_cost.number_format = '#,##0.00'
+            for cell in total_cells:
+                cell.fill = total_fill
+                cell.border = THIN_BORDER
+            total_costs_cells.append(f"I{append(*total_cells)}")
+            append()
+            append()
             
-            total_costs_cells.append(f"I{row}")
-            
-            from openpyxl.styles import PatternFill
-            for col in range(1, 11):
-                ws.cell(row=row, column=col).fill = PatternFill(start_color='E2EFDA', end_color='E2EFDA', fill_type='solid')
-                ws.cell(row=row, column=col).border = THIN_BORDER
-                
-            row += 3
-            
-        ws['A' + str(row)] = "COSTO TOTALE CATALOGO"
-        ws['A' + str(row)].font = BOLD_FONT
-        
-        c_overall = ws['B' + str(row)]
-        if total_costs_cells:
-            c_overall.value = "=" + "+".join(total_costs_cells)
-        else:
-            c_overall.value = 0
-        self._style_formula_cell(c_overall)
+        c_overall = self._formula_row_cell(ws, "=" + "+".join(total_costs_cells) if total_costs_cells else 0, '#,##0.00')
         c_overall.font = BOLD_FONT
-        c_overall.number_format = '#,##0.00'
-        
-        self.named_ranges['CATALOG_COST'] = f"CATALOGO!$B${row}"
-        row += 2
+        self.named_ranges['CATALOG_COST'] = f"CATALOGO!$B${append(self._row_cell(ws, 'COSTO TOTALE CATALOGO', font=BOLD_FONT), c_overall)}"
+        append()
         
         # --- SUMMARY FOR TARIFFS (Steps 4 & 5 Verification) ---
-        ws.cell(row=row, column=1, value="RIEPILOGO TARIFFE CATALOGO").font = SECTION_FONT
-        row += 1
+        append(self._row_cell(ws, "RIEPILOGO TARIFFE CATALOGO", font=SECTION_FONT))
         
-        ws.cell(row=row, column=1, value="Totale FTE Mappati")
         # Sum of column H (FTE Reale) for all items
-        ws.cell(row=row, column=2, value=f"=SUM(H{items_start}:H{items_end})")
-        ws.cell(row=row, column=2).number_format = '0.00'
-        mapped_fte_ref = f"B{row}"
-        row += 1
+        mapped_fte_ref = f"B{append('Totale FTE Mappati', self._row_cell(ws, f'=SUM(H{items_start}:H{items_end})', number_format='0.00'))}"
         
-        ws.cell(row=row, column=1, value="Costo Giornaliero Pesato (Nominale)")
         # Sum of (FTE * Rate) - this is easier to verify
-        ws.cell(row=row, column=2, value=f"=SUMPRODUCT(H{items_start}:H{items_end},F{items_start}:F{items_end})")
-        ws.cell(row=row, column=2).number_format = '#,##0'
         weighted_daily_ref = f"B{row}"
-        row += 1
+        append(
+            "Costo Giornaliero Pesato (Nominale)",
+            self._row_cell(ws, f"=SUMPRODUCT(H{items_start}:H{items_end},F{items_start}:F{items_end})", number_format='#,##0'),
+        )
         
-        ws.cell(row=row, column=1, value="Tariffa Media Nominale (/gg)")
-        ws.cell(row=row, column=2, value=f"=IF({mapped_fte_ref}>0, {weighted_daily_ref}/{mapped_fte_ref}, 0)")
-        ws.cell(row=row, column=2).font = BOLD_FONT
-        ws.cell(row=row, column=2).number_format = '#,##0'
-        row += 1
+        append(
+            "Tariffa Media Nominale (/gg)",
+            self._row_cell(ws, f"=IF({mapped_fte_ref}>0, {weighted_daily_ref}/{mapped_fte_ref}, 0)", font=BOLD_FONT, number_format='#,##0'),
+        )
         
-        ws.cell(row=row, column=1, value="Tariffa Media Effettiva (/gg)")
         # Eff_Rate = Total_Project_Cost / (Duration/12 * Days_per_year * Mapped_FTE)
-        ws.cell(row=row, column=2, value=f"=IF({mapped_fte_ref}>0, {self.named_ranges['CATALOG_COST']}/(({self.named_ranges['DURATA_MESI']}/12)*{self.named_ranges['GG_ANNO']}*{mapped_fte_ref}), 0)")
-        ws.cell(row=row, column=2).font = BOLD_FONT
-        ws.cell(row=row, column=2).number_format = '#,##0'
-        row += 1
+        append(
+            "Tariffa Media Effettiva (/gg)",
+            self._row_cell(
+                ws,
+                f"=IF({mapped_fte_ref}>0, {self.named_ranges['CATALOG_COST']}/(({self.named_ranges['DURATA_MESI']}/12)*{self.named_ranges['GG_ANNO']}*{mapped_fte_ref}), 0)",
+                font=BOLD_FONT, number_format='#,##0',
+            ),
+        )
         
         # Add informative label
-        ws.cell(row=row, column=1, value="Nota: La Tariffa Effettiva include l'incidenza di Inflazione e Riuso.")
-        ws.cell(row=row, column=1).font = Font(italic=True, size=9, color='666666')
+        append(self._row_cell(
+            ws, "Nota: La Tariffa Effettiva include l'incidenza di Inflazione e Riuso.", font=Font(italic=True, size=9, color='666666'),
+        ))
 
     # ========== SHEET 8.6: GOVERNANCE ==========
     def _create_governance_sheet(self):
@@ -2054,11 +2028,12 @@ class BusinessPlanExcelGenerator:
 
     # ========== SHEET 11.5: CRONOPROGRAMMA (TIMELINE) ==========
     def _create_timeline_sheet(self):
-        ws = self.wb.create_sheet("CRONOPROGRAMMA")
+        # One row per interval: streamed to disk, so rows are appended in order
+        ws = streamed_sheet(self.wb, "CRONOPROGRAMMA")
         self.wb.sheet_state = 'hidden' # We can hide it or leave it visible for audit
         
-        ws['A1'] = "CRONOPROGRAMMA CALCOLI MESE-PER-MESE"
-        ws['A1'].font = TITLE_FONT
+        ws.append([self._row_cell(ws, "CRONOPROGRAMMA CALCOLI MESE-PER-MESE", font=TITLE_FONT)])
+        ws.append([])
         
         duration = int(self.bp.get('duration_months', 36))
         
@@ -2067,40 +2042,40 @@ class BusinessPlanExcelGenerator:
         headers = ['Membro Team', 'Profilo Poste', 'Profilo Lutech', 'TOW', 'Mese Inizio', 'Mese Fine']
         for m in range(1, duration + 1):
             headers.append(f"Mese {m}")
-        self._add_header_row(ws, row, headers)
+        ws.append(self._header_row_cells(ws, headers))
         
         row += 1
         data_start = row
         
         for interval in self.intervals:
-            ws.cell(row=row, column=1, value=interval.get('member', ''))
-            ws.cell(row=row, column=2, value=interval.get('poste_profile', ''))
-            ws.cell(row=row, column=3, value=interval.get('lutech_profile', ''))
-            
-            ws.cell(row=row, column=5, value=interval.get('start', 1))
-            ws.cell(row=row, column=6, value=interval.get('end', duration))
-            
             start_m = interval.get('start', 1)
             end_m = interval.get('end', duration)
             fte_eff = interval.get('fte_eff', 0)
+            cells = [
+                interval.get('member', ''),
+                interval.get('poste_profile', ''),
+                interval.get('lutech_profile', ''),
+                None,
+                start_m,
+                end_m,
+            ]
             
             lutech_id = interval.get('lutech_profile', '')
+            # Month formulas only differ by the inflation year: build the shared part once
+            monthly_cost = (
+                f"=({fte_eff} * ({self.named_ranges['GG_ANNO']}/12)) * "
+                f"IFERROR(VLOOKUP(\"{lutech_id}\", {self.named_ranges['CATALOGO_RANGE']}, 3, FALSE), {self.named_ranges['TARIFFA_DEFAULT']}) * "
+                f"((1 + {self.named_ranges['INFLATION_PCT']}/100)^"
+            )
             
             for m in range(1, duration + 1):
-                col = 6 + m
                 if start_m <= m <= end_m:
                     # Apply inflation
                     year_idx = (m - 1) // 12
-                    
-                    formula_str = (
-                        f"=({fte_eff} * ({self.named_ranges['GG_ANNO']}/12)) * "
-                        f"IFERROR(VLOOKUP(\"{lutech_id}\", {self.named_ranges['CATALOGO_RANGE']}, 3, FALSE), {self.named_ranges['TARIFFA_DEFAULT']}) * "
-                        f"((1 + {self.named_ranges['INFLATION_PCT']}/100)^{year_idx})"
-                    )
-                    ws.cell(row=row, column=col, value=formula_str)
-                    ws.cell(row=row, column=col).number_format = '#,##0.00'
+                    cells.append(self._row_cell(ws, f"{monthly_cost}{year_idx})", number_format='#,##0.00'))
                 else:
-                    ws.cell(row=row, column=col, value=0)
+                    cells.append(0)
+            ws.append(cells)
             row += 1
             
         data_end = row - 1 if row > data_start else data_start
@@ -2414,7 +2389,8 @@ def generate_business_plan_excel(
     profile_labels: Optional[Dict[str, Dict[str, str]]] = None,
     intervals: Optional[List[Dict[str, Any]]] = None,
     lutech_breakdown: Optional[Dict[str, Any]] = None,
-) -> io.BytesIO:
+    output: Optional[BinaryIO] = None,
+) -> BinaryIO:
     generator = BusinessPlanExcelGenerator(
         lot_key=lot_key,
         business_plan=business_plan,
@@ -2430,4 +2406,4 @@ def generate_business_plan_excel(
         intervals=intervals,
         lutech_breakdown=lutech_breakdown,
     )
-    return generator.generate()
+    return generator.generate(output)
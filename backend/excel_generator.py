@@ -5,7 +5,7 @@ Generates professional multi-sheet Excel reports with formulas and advanced form
 
 import io
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, BinaryIO, List, Optional
 
 from openpyxl import Workbook
 from openpyxl.styles import (
@@ -140,8 +140,8 @@ class ExcelReportGenerator:
         for i, company in enumerate(self.lot_config.get('rti_companies', []) or []):
             self.company_colors[company] = partner_colors[i % len(partner_colors)]
 
-    def generate(self) -> io.BytesIO:
-        """Generate the complete Excel report"""
+    def generate(self, output: Optional[BinaryIO] = None) -> BinaryIO:
+        """Generate the complete Excel report into `output` (a new BytesIO by default)"""
         if 'Sheet' in self.wb.sheetnames:
             del self.wb['Sheet']
         
@@ -163,7 +163,7 @@ class ExcelReportGenerator:
         
         self.wb.active = self.wb['Dashboard']
         
-        buffer = io.BytesIO()
+        buffer = output if output is not None else io.BytesIO()
         self.wb.save(buffer)
         buffer.seek(0)
         return buffer
@@ -1834,8 +1834,9 @@ def generate_excel_report(
     prof_certs_resources: Optional[Dict[str, int]] = None,
     prof_certs_weights: Optional[Dict[str, float]] = None,
     company_certs_status: Optional[Dict[str, str]] = None,
-) -> io.BytesIO:
-    """Generate Excel report"""
+    output: Optional[BinaryIO] = None,
+) -> BinaryIO:
+    """Generate Excel report (into `output` when given, e.g. a spooled temp file)"""
     generator = ExcelReportGenerator(
         lot_key=lot_key,
         lot_config=lot_config,
@@ -1859,4 +1860,4 @@ def generate_excel_report(
         company_certs_status=company_certs_status,
     )
 
-    return generator.generate()
+    return generator.generate(output)
@@ -0,0 +1,276 @@
+"""
+Executors
+Named thread pools per workload class ("interactive" scoring and simulation,
+"export" reports, "ocr" certificate verification), each with its own size and
+queue-depth limit, so a burst of one class cannot starve the others
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, TypeVar
+
+from fastapi.responses import StreamingResponse
+
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_END = object()
+
+executor_wait = REGISTRY.histogram(
+    "simulator_executor_wait_seconds", "Time a job waited in its pool's queue before a thread took it", ("pool",),
+)
+
+
+class PoolSaturated(Exception):
+    """The pool's workers are busy and its queue is full; the caller should retry later."""
+
+    def __init__(self, pool: "WorkloadPool"):
+        super().__init__(f"Executor pool '{pool.name}' is saturated")
+        self.pool = pool
+
+
+class PoolSlot:
+    """An admitted job: counts against the pool's capacity until released."""
+
+    def __init__(self, pool: "WorkloadPool"):
+        self.pool = pool
+        self.admitted_at = time.perf_counter()
+        self.streaming = False  # handed over to a started WorkloadPool.iterate
+        self._released = False
+
+    def release(self) -> None:
+        with self.pool._lock:
+            if self._released:
+                return
+            self._released = True
+            self.pool._in_flight -= 1
+            self.pool._completed += 1
+
+
+class WorkloadPool:
+    """
+    Thread pool that admits at most `workers + max_queue` jobs at a time.
+
+    A job beyond that is rejected with PoolSaturated (served as 429) instead of
+    waiting behind the others, so clients back off while the pool drains.
+    """
+
+    def __init__(self, name: str, workers: int, max_queue: int):
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"pool-{name}")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._queued = 0
+        self._running = 0
+        self._max_queued = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._wait_count = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    def reserve(self) -> PoolSlot:
+        """Admit a job or raise PoolSaturated. The caller must release() the slot."""
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise PoolSaturated(self)
+            self._in_flight += 1
+            self._submitted += 1
+        return PoolSlot(self)
+
+    def _submit(self, func: Callable[..., T], *args: Any) -> "Future[T]":
+        queued_at = time.perf_counter()
+
+        def task():
+            waited = time.perf_counter() - queued_at
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._wait_count += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            executor_wait.observe(waited, pool=self.name)
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        with self._lock:
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+        # The caller's context (request-scoped metrics, profiling) follows the job
+        future = self.executor.submit(contextvars.copy_context().run, task)
+
+        def discard(done: Future) -> None:
+            if done.cancelled():  # never started: leave the queue
+                with self._lock:
+                    self._queued -= 1
+
+        future.add_done_callback(discard)
+        return future
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run `func` on the pool without blocking the event loop; raises PoolSaturated when full."""
+        slot = self.reserve()
+        try:
+            future = self._submit(partial(func, *args, **kwargs))
+        except BaseException:
+            slot.release()
+            raise
+        # Released when the work really ends, even if the awaiting request is cancelled
+        future.add_done_callback(lambda _: slot.release())
+        return await asyncio.wrap_future(future)
+
+    async def iterate(self, iterator: Iterator[T], slot: PoolSlot) -> AsyncIterator[T]:
+        """
+        Drive a blocking iterator on the pool, one item per step, for a StreamingResponse.
+
+        `slot` is reserved by the endpoint before it answers, so a saturated
+        pool is reported as 429 rather than inside an already started stream.
+        Serve it with `stream()`: a body that is never started never reaches
+        this generator's `finally`, and only the response can free the slot.
+        """
+        slot.streaming = True
+        step = None
+        try:
+            while True:
+                step = self._submit(next, iterator, _END)
+                item = await asyncio.wrap_future(step)
+                if item is _END:
+                    break
+                yield item
+        finally:
+            if step is not None and not step.done():
+                # The step still runs; close after it
+                step.add_done_callback(lambda _: _close_stream(iterator, slot))
+            else:
+                _close_stream(iterator, slot)
+
+    def stream(self, iterator: Iterator[Any], slot: PoolSlot, **kwargs: Any) -> StreamingResponse:
+        """StreamingResponse over `iterate()` that releases `slot` however the response ends."""
+        return PooledStreamingResponse(self, iterator, slot, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "running": self._running,
+                "queued": self._queued,
+                "max_queued": self._max_queued,
+                "submitted": self._submitted,
+                "rejected": self._rejected,
+                "completed": self._completed,
+                "wait_seconds_avg": round(self._wait_total / self._wait_count, 6) if self._wait_count else 0.0,
+                "wait_seconds_max": round(self._wait_max, 6),
+            }
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _close_stream(iterator: Iterator[Any], slot: PoolSlot) -> None:
+    close = getattr(iterator, "close", None)
+    try:
+        if close is not None:
+            close()
+    finally:
+        slot.release()
+
+
+class PooledStreamingResponse(StreamingResponse):
+    """
+    Streamed body driven by `WorkloadPool.iterate`.
+
+    A client that disconnects before the response starts makes Starlette give
+    up without iterating the body, so the generator's cleanup never runs: the
+    response closes the body itself and frees the slot if it was never handed
+    over to the stream.
+    """
+
+    def __init__(self, pool: WorkloadPool, iterator: Iterator[Any], slot: PoolSlot, **kwargs: Any):
+        super().__init__(pool.iterate(iterator, slot), **kwargs)
+        self._iterator = iterator
+        self._slot = slot
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.body_iterator.aclose()  # runs iterate's cleanup if it started
+            if not self._slot.streaming:
+                _close_stream(self._iterator, self._slot)
+
+
+def _pool_from_env(name: str, workers: int, max_queue: int) -> WorkloadPool:
+    prefix = f"POOL_{name.upper()}"
+    return WorkloadPool(
+        name,
+        workers=int(os.getenv(f"{prefix}_WORKERS", str(workers))),
+        max_queue=int(os.getenv(f"{prefix}_QUEUE", str(max_queue))),
+    )
+
+
+_CPU_COUNT = os.cpu_count() or 1
+
+pools: Dict[str, WorkloadPool] = {
+    # Scoring, simulations, Monte Carlo: short jobs the UI waits on
+    "interactive": _pool_from_env("interactive", _CPU_COUNT, 64),
+    # openpyxl/matplotlib/PDF reports: slow, so few at a time
+    "export": _pool_from_env("export", 2, 8),
+    # Certificate uploads; each one runs `ocr_workers` Tesseract threads of its own
+    "ocr": _pool_from_env("ocr", 1, 4),
+}
+
+
+async def run_cpu(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run `func` on the interactive pool without blocking the event loop."""
+    return await pools["interactive"].run(func, *args, **kwargs)
+
+
+def executor_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: pool.stats() for name, pool in pools.items()}
+
+
+def _register_pool_metrics() -> None:
+    def collect(field: str):
+        return lambda: [((name,), stats[field]) for name, stats in executor_stats().items()]
+
+    for name, field, documentation in (
+        ("simulator_executor_workers", "workers", "Threads of the pool"),
+        ("simulator_executor_in_flight", "in_flight", "Admitted jobs not finished yet (running or queued)"),
+        ("simulator_executor_running", "running", "Jobs running on a pool thread"),
+        ("simulator_executor_queued", "queued", "Jobs waiting for a pool thread (queue depth)"),
+    ):
+        REGISTRY.gauge_family(name, documentation, ("pool",), collect(field))
+    REGISTRY.gauge_family(
+        "simulator_executor_rejected_total", "Jobs rejected with 429 because the pool was full", ("pool",),
+        collect("rejected"), kind="counter",
+    )
+
+
+_register_pool_metrics()
+
+
+def shutdown_executors() -> None:
+    for pool in pools.values():
+        pool.shutdown()
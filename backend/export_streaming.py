@@ -0,0 +1,93 @@
+"""
+Export Streaming Helpers
+Spools generated reports to a temporary file and streams them to the client in fixed-size chunks,
+and lets the row-proportional sheets of a workbook be written to disk as they are produced
+"""
+
+import datetime
+import tempfile
+from typing import BinaryIO, Dict, Iterator, Optional
+from zipfile import ZIP_DEFLATED, ZipFile
+
+from fastapi.responses import StreamingResponse
+from openpyxl import Workbook
+from openpyxl.drawing.spreadsheet_drawing import SpreadsheetDrawing
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
+from openpyxl.writer.excel import ExcelWriter
+
+# Exports up to this size stay in memory, larger ones roll over to a temp file
+SPOOL_MAX_MEMORY = 4 * 1024 * 1024
+STREAM_CHUNK_SIZE = 64 * 1024
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+REPORT_MEDIA_TYPES = {"pdf": "application/pdf", "xlsx": XLSX_MEDIA_TYPE}
+
+
+def spooled_output() -> BinaryIO:
+    """Binary file a generator can save into without keeping large exports in memory."""
+    return tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY, mode="w+b")
+
+
+def iter_chunks(fileobj: BinaryIO, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield the file from the start in `chunk_size` blocks, closing it when done or aborted."""
+    try:
+        fileobj.seek(0)
+        while chunk := fileobj.read(chunk_size):
+            yield chunk
+    finally:
+        fileobj.close()
+
+
+def attachment_response(
+    fileobj: BinaryIO,
+    filename: str,
+    media_type: str = XLSX_MEDIA_TYPE,
+    extra_headers: Optional[Dict[str, str]] = None,
+) -> StreamingResponse:
+    """StreamingResponse downloading `fileobj` as `filename`, with a Content-Length when known."""
+    size = fileobj.seek(0, 2)
+    headers = {
+        "Content-Disposition": f"attachment; filename={filename}",
+        "Access-Control-Expose-Headers": "Content-Disposition",
+        "Content-Length": str(size),
+        **(extra_headers or {}),
+    }
+    return StreamingResponse(iter_chunks(fileobj), media_type=media_type, headers=headers)
+
+
+def streamed_sheet(wb: Workbook, title: str) -> WriteOnlyWorksheet:
+    """
+    Add a write-only sheet to a regular workbook.
+
+    Its rows go to a temporary file as they are appended, so the memory of a
+    sheet with one row per interval or catalog item stays flat as rows grow.
+    Rows must be appended in order (`ws.append`), column widths set before the
+    first one, and the workbook saved with `save_workbook`.
+    """
+    ws = WriteOnlyWorksheet(wb, title)
+    wb._sheets.append(ws)
+    return ws
+
+
+class _MixedExcelWriter(ExcelWriter):
+    """ExcelWriter that accepts write-only sheets in a regular workbook."""
+
+    def write_worksheet(self, ws):
+        if not isinstance(ws, WriteOnlyWorksheet):
+            return super().write_worksheet(ws)
+        ws._drawing = SpreadsheetDrawing()
+        ws._drawing.charts = ws._charts
+        ws._drawing.images = ws._images
+        if not ws.closed:
+            ws.close()
+        writer = ws._writer
+        ws._rels = writer._rels
+        self._archive.write(writer.out, ws.path[1:])
+        self.manifest.append(ws)
+        writer.cleanup()
+
+
+def save_workbook(wb: Workbook, output: BinaryIO) -> None:
+    """Save a workbook that may hold `streamed_sheet`s into `output` (openpyxl's Workbook.save otherwise)."""
+    wb.properties.modified = datetime.datetime.now(tz=datetime.timezone.utc).replace(tzinfo=None)
+    _MixedExcelWriter(wb, ZipFile(output, "w", ZIP_DEFLATED, allowZip64=True)).save()
@@ -1,12 +1,15 @@
 from fastapi import FastAPI, APIRouter, Depends, HTTPException, Request, status, UploadFile, File
-from fastapi.responses import StreamingResponse, JSONResponse, FileResponse
+from fastapi.responses import StreamingResponse, JSONResponse, FileResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import text
-from typing import List, Dict, Any, Optional
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy import func, select, text
+from typing import Any, Callable, Dict, List, Literal, Optional, Union
 from datetime import datetime, timezone
 from contextlib import asynccontextmanager
 import uvicorn
@@ -32,17 +35,37 @@ from reportlab.platypus import (
 import matplotlib.pyplot as plt
 import matplotlib
 
-import crud, models, schemas
-from database import SessionLocal, engine
+import crud, metrics, models, schemas
+from database import (
+    SessionLocal, ReadSessionLocal, AsyncReadSessionLocal, engine, checkpoint, dispose_engines,
+    dispose_async_engines,
+)
+from executors import PoolSaturated, executor_stats, pools, run_cpu, shutdown_executors
+from process_coordination import startup_lock
+from profiling import PROFILE_HEADER, PROFILE_QUERY_PARAM, StackSampler, profile_store, slow_requests
 from logging_config import setup_logging, get_logger
 from auth import OIDCMiddleware, OIDCConfig, get_current_user
 from services.scoring_service import ScoringService
+from services.score_cache import score_cache, state_hash
+from services.artifact_cache import parse_if_none_match, report_cache, report_key
+from services.bulk_export_service import shutdown_export_processes
+from services.cert_matcher import CertMatcher, VendorDetector
+from services.data_versions import VersionedCache, advance_versions, get_versions
+from services.json_patch import PatchError, PatchTestFailed, apply_patch
 from services.business_plan_service import BusinessPlanService
 from services.lot_validation_service import blocking_issues, validate_lot_config
+from services.cert_verification_service import (
+    build_expected_certs_map as _build_expected_certs_map,
+    zip_member_is_safe as _zip_member_is_safe,
+)
+from services.cert_job_service import job_runner as cert_job_runner
 from routers.config_validation import router as config_validation_router
+from routers.cert_jobs import router as cert_jobs_router
+from chart_renderer import chart_cache
 from pdf_generator import generate_pdf_report
 from excel_generator import generate_excel_report
 from excel_business_plan import generate_business_plan_excel
+from export_streaming import attachment_response, spooled_output, REPORT_MEDIA_TYPES
 
 # Setup structured logging
 setup_logging()
@@ -121,35 +144,15 @@ def run_migrations():
     logger.info("Database migrations completed")
 
 
-# Run migrations before create_all to add missing columns
-run_migrations()
-
-models.Base.metadata.create_all(bind=engine)
+# Run migrations before create_all to add missing columns. Every worker imports
+# this module; the lock makes concurrent workers take turns.
+with startup_lock():
+    run_migrations()
+    models.Base.metadata.create_all(bind=engine)
 
 matplotlib.use("Agg")
 
 
-def _build_expected_certs_map(lot_config: Optional[models.LotConfigModel]) -> Dict[str, List[str]]:
-    """Return req_id -> expected professional cert names for OCR result enrichment."""
-    expected_certs_map: Dict[str, List[str]] = {}
-    if not lot_config or not lot_config.reqs:
-        return expected_certs_map
-
-    for req in lot_config.reqs:
-        req_id = req.get("id", "")
-        selected_certs = req.get("selected_prof_certs", [])
-        if req_id and selected_certs:
-            expected_certs_map[req_id] = selected_certs
-
-    return expected_certs_map
-
-
-def _zip_member_is_safe(extract_dir: str, member: str) -> bool:
-    base_dir = os.path.realpath(extract_dir)
-    member_path = os.path.realpath(os.path.join(base_dir, member))
-    return os.path.commonpath([base_dir, member_path]) == base_dir
-
-
 def run_auto_migrations():
     """Add missing columns to existing tables (lightweight auto-migration for SQLite)."""
     import sqlalchemy
@@ -160,6 +163,7 @@ def run_auto_migrations():
     migrations = [
         ("master_data", "prof_certs_resources", "TEXT", "'{}'"),
         ("master_data", "prof_certs_vendors", "TEXT", "'{}'"),
+        ("lot_configs", "version", "INTEGER NOT NULL", "1"),
     ]
 
     for table, col, col_type, default_val in migrations:
@@ -178,28 +182,54 @@ def run_auto_migrations():
                     logger.warning(f"Auto-migration: failed to add {table}.{col}: {e}")
 
 
+def initialize_database():
+    """
+    Auto-migrations and seeding, one process at a time.
+
+    Runs in every worker's startup (and once in startup.sh before gunicorn);
+    seeding is idempotent, so the workers that get the lock later find
+    nothing left to do.
+    """
+    with startup_lock():
+        db = SessionLocal()
+        try:
+            run_auto_migrations()
+            crud.migrate_lot_json_columns(db)
+            crud.seed_initial_data(db)
+            crud.seed_practices(db)
+            logger.info("Database seeded successfully")
+        except Exception as e:
+            logger.error("Failed to seed database", exc_info=True)
+            raise
+        finally:
+            db.close()
+
+
 # Lifespan event handler (replaces deprecated on_event)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Handle application startup and shutdown"""
     # Startup
     logger.info("Application starting up", extra={"event": "startup"})
-    db = SessionLocal()
+    initialize_database()
+    # Under gunicorn, share this worker's metrics with the one that serves the scrape
+    metrics.REGISTRY.start_snapshots()
+
+    # One worker (the leader) runs certificate verification jobs, resuming
+    # those interrupted by a restart; the others leave new jobs queued for it
     try:
-        run_auto_migrations()
-        crud.seed_initial_data(db)
-        crud.seed_practices(db)
-        logger.info("Database seeded successfully")
-    except Exception as e:
-        logger.error("Failed to seed database", exc_info=True)
-        raise
-    finally:
-        db.close()
+        cert_job_runner.start()
+    except Exception:
+        logger.error("Failed to start certificate verification jobs", exc_info=True)
     logger.info("Application startup complete")
 
     yield
 
-    # Shutdown (if needed in future)
+    # Shutdown: stop picking up queued jobs (they resume on next startup)
+    cert_job_runner.shutdown()
+    shutdown_executors()
+    shutdown_export_processes()
+    await dispose_async_engines()
     logger.info("Application shutting down")
 
 
@@ -275,6 +305,69 @@ app.add_middleware(
     max_age=600,  # Cache preflight for 10 minutes
 )
 
+# --- Request profiling (registered before OIDC so it runs inside it, with the user known) ---
+
+def _profiling_requested(request: Request) -> bool:
+    flag = request.headers.get(PROFILE_HEADER) or request.query_params.get(PROFILE_QUERY_PARAM)
+    return (flag or "").lower() in ("1", "true", "yes")
+
+
+class _FinishingResponse:
+    """
+    Runs `on_close` once the wrapped response ends, however it ends: a client
+    that disconnects before the response starts never iterates the body, so a
+    hook in the body generator would never run.
+    """
+
+    def __init__(self, response: Response, on_close: Callable[[], None]):
+        self.response = response
+        self.on_close = on_close
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await self.response(scope, receive, send)
+        finally:
+            self.on_close()
+
+
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    """
+    Slow-request watchdog for every request, and an opt-in sampling profile
+    (X-Profile: 1 or ?profile=1, admins only) whose report id is returned in
+    X-Profile-Id and downloadable from /api/system/profiles/{id}.
+    """
+    label = f"{request.method} {request.url.path}"
+    token = slow_requests.start(label)
+    sampler = profile_id = None
+    if _profiling_requested(request) and _is_admin(request, getattr(request.state, "user", None)):
+        profile_id = profile_store.new_id()
+        sampler = StackSampler().start()
+
+    def finish(status_code: int) -> None:
+        slow_requests.finish(token)
+        if sampler is not None:
+            sampler.stop()
+            profile_store.save(profile_id, sampler, f"{label} -> {status_code}")
+            logger.info(f"Profiled {label}: report {profile_id}")
+
+    try:
+        response = await call_next(request)
+    except BaseException:
+        finish(500)
+        raise
+    if token is None and sampler is None:
+        return response
+
+    if profile_id is not None:
+        response.headers["X-Profile-Id"] = profile_id
+        response.headers["Access-Control-Expose-Headers"] = ", ".join(
+            filter(None, (response.headers.get("Access-Control-Expose-Headers"), "X-Profile-Id"))
+        )
+    # Streamed bodies (exports, SSE) are still being produced: stop at their end
+    return _FinishingResponse(response, lambda: finish(response.status_code))
+
+
 # --- OIDC Authentication Middleware ---
 # Initialize OIDC configuration
 oidc_config = OIDCConfig()
@@ -316,6 +409,17 @@ async def database_exception_handler(request: Request, exc: SQLAlchemyError):
     )
 
 
+@app.exception_handler(PoolSaturated)
+async def pool_saturated_handler(request: Request, exc: PoolSaturated):
+    """Backpressure: the workload's executor pool is full, the client should retry"""
+    logger.warning(f"Executor pool '{exc.pool.name}' saturated, rejecting {request.method} {request.url.path}")
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": "Server occupato: troppe elaborazioni in corso, riprova tra qualche secondo"},
+        headers={"Retry-After": "5"},
+    )
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Catch-all handler for unhandled exceptions"""
@@ -369,6 +473,25 @@ async def security_headers(request: Request, call_next):
     return response
 
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Latency, status and DB query count per route template (see /metrics)."""
+    start = time.perf_counter()
+    status_code = 500
+    with metrics.request_scope() as queries:
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            # Route templates keep the label set bounded; unmatched paths share one label
+            route = request.scope.get("route")
+            labels = {"method": request.method, "route": getattr(route, "path", "<unmatched>")}
+            metrics.http_request_duration.observe(time.perf_counter() - start, **labels)
+            metrics.http_requests.inc(status=str(status_code), **labels)
+            metrics.http_request_db_queries.observe(queries[0], **labels)
+
+
 # --- DB Dependency ---
 def get_db():
     db = SessionLocal()
@@ -378,6 +501,39 @@ def get_db():
         db.close()
 
 
+def get_read_db():
+    """Session on the query-only pool, for endpoints that never write."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    """
+    Async query-only session, for the interactive endpoints.
+
+    Sync ORM code (crud) runs on it through `await db.run_sync(...)`; the
+    handler itself never takes a threadpool slot.
+    """
+    if AsyncReadSessionLocal is None:
+        raise RuntimeError("Async database access needs ASYNC_DATABASE_URL (or a file-based SQLite database)")
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+def _is_admin(request: Request, user: Optional[dict]) -> bool:
+    if getattr(request.state, "auth_dev_bypass", False):
+        return True
+    if not user:
+        return False
+    allow = [e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()]
+    email = (user.get("email") or "").lower()
+    sub = (user.get("sub") or "").lower()
+    return bool(allow) and (email in allow or sub in allow)
+
+
 def require_admin(request: Request, user: dict = Depends(get_current_user)) -> dict:
     """Authorization gate for destructive/admin endpoints.
 
@@ -385,12 +541,7 @@ def require_admin(request: Request, user: dict = Depends(get_current_user)) -> d
     - Otherwise the caller's email/sub must be in the ADMIN_EMAILS allowlist.
     - Fails closed: if no allowlist is configured, access is denied.
     """
-    if getattr(request.state, "auth_dev_bypass", False):
-        return user
-    allow = [e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()]
-    email = (user.get("email") or "").lower()
-    sub = (user.get("sub") or "").lower()
-    if allow and (email in allow or sub in allow):
+    if _is_admin(request, user):
         return user
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
 
@@ -398,7 +549,7 @@ def require_admin(request: Request, user: dict = Depends(get_current_user)) -> d
 # --- HEALTH CHECK & MONITORING ENDPOINTS ---
 
 @app.get("/health", tags=["Monitoring"])
-def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_async_read_db)):
     """
     Comprehensive health check endpoint for monitoring
     Returns detailed system health status
@@ -412,7 +563,7 @@ def health_check(db: Session = Depends(get_db)):
 
     # Check database connectivity
     try:
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         health_status["checks"]["database"] = {
             "status": "healthy",
             "message": "Database connection OK"
@@ -427,7 +578,7 @@ def health_check(db: Session = Depends(get_db)):
 
     # Check if lot configs exist
     try:
-        lot_count = db.query(models.LotConfigModel).count()
+        lot_count = await db.scalar(select(func.count()).select_from(models.LotConfigModel))
         health_status["checks"]["lot_configs"] = {
             "status": "healthy" if lot_count > 0 else "warning",
             "count": lot_count,
@@ -442,7 +593,7 @@ def health_check(db: Session = Depends(get_db)):
 
     # Check master data
     try:
-        master_data = crud.get_master_data(db)
+        master_data = await db.run_sync(crud.get_master_data)
         health_status["checks"]["master_data"] = {
             "status": "healthy" if master_data else "warning",
             "message": "OK" if master_data else "Master data not initialized"
@@ -460,14 +611,14 @@ def health_check(db: Session = Depends(get_db)):
 
 
 @app.get("/health/ready", tags=["Monitoring"])
-def readiness_check(db: Session = Depends(get_db)):
+async def readiness_check(db: AsyncSession = Depends(get_async_read_db)):
     """
     Kubernetes-style readiness probe
     Returns 200 only if app is fully ready to serve traffic
     """
     try:
         # Quick database check - just verify connection works
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         return {"status": "ready", "timestamp": datetime.now(timezone.utc).isoformat()}
     except Exception as e:
         logger.warning("Readiness check failed", extra={"error": str(e)})
@@ -490,11 +641,17 @@ def liveness_check():
 
 
 @app.get("/metrics", tags=["Monitoring"])
-def metrics_endpoint():
+def metrics_endpoint(format: Literal["prometheus", "json"] = "prometheus"):
     """
-    Basic metrics endpoint for monitoring
-    Returns system resource usage and application statistics
+    Metrics endpoint for monitoring
+
+    Prometheus text format by default: request latency per route, DB queries
+    per request, hot-path stage timers, cache hits/misses, executor pools and
+    process resources. `?format=json` returns the resource usage snapshot with
+    the executor pools' queue depth / wait time.
     """
+    if format == "prometheus":
+        return Response(content=metrics.REGISTRY.render(), media_type=metrics.PROMETHEUS_CONTENT_TYPE)
     try:
         import psutil
         import os
@@ -515,13 +672,15 @@ def metrics_endpoint():
                 "memory_total_gb": round(psutil.virtual_memory().total / 1024 / 1024 / 1024, 2),
                 "memory_available_gb": round(psutil.virtual_memory().available / 1024 / 1024 / 1024, 2),
                 "memory_percent": round(psutil.virtual_memory().percent, 2)
-            }
+            },
+            "executors": executor_stats(),
         }
     except ImportError:
         logger.warning("psutil not installed, metrics limited")
         return {
             "timestamp": datetime.now(timezone.utc).isoformat(),
-            "message": "Install psutil for detailed metrics"
+            "message": "Install psutil for detailed metrics",
+            "executors": executor_stats(),
         }
     except Exception as e:
         logger.error("Metrics endpoint failed", exc_info=True)
@@ -634,6 +793,7 @@ _SQLITE_MAGIC = b"SQLite format 3\x00"
 def export_database(db: Session = Depends(get_db), _: dict = Depends(require_admin)):
     """Export the entire SQLite database. Admin only."""
     db.commit()
+    checkpoint()  # committed pages may still be in the WAL file
 
     db_path = get_sqlite_db_path()
     logger.info(f"Exporting database from path: {db_path}")
@@ -671,8 +831,12 @@ async def import_database(file: UploadFile = File(...), db=Depends(get_db), _: d
 
         db_path = get_sqlite_db_path()
 
-        from database import engine
-        engine.dispose()
+        previous_versions = get_versions(db)
+        db.close()
+        if os.path.exists(db_path):
+            checkpoint()
+        dispose_engines()
+        await dispose_async_engines()
 
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
 
@@ -682,8 +846,22 @@ async def import_database(file: UploadFile = File(...), db=Depends(get_db), _: d
             shutil.copy2(db_path, backup_path)
             logger.info(f"Backed up current database to {backup_path}")
 
+        # The old WAL / shared-memory files belong to the replaced database
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
         shutil.move(tmp_path, db_path)
         tmp_path = None  # moved
+
+        # Bring a backup taken by an older version up to the current schema,
+        # then make other workers drop caches built from the previous database
+        models.Base.metadata.create_all(bind=engine)
+        version_db = SessionLocal()
+        try:
+            crud.migrate_lot_json_columns(version_db)
+            advance_versions(version_db, previous_versions)
+        finally:
+            version_db.close()
         logger.info(f"Database successfully restored from {file.filename} to {db_path}")
         return {"status": "success", "message": "Database ripristinato con successo"}
     except HTTPException:
@@ -696,6 +874,25 @@ async def import_database(file: UploadFile = File(...), db=Depends(get_db), _: d
             os.remove(tmp_path)
 
 
+@api_router.get("/system/profiles")
+def list_profiles(_: dict = Depends(require_admin)):
+    """Request profiles recorded with X-Profile: 1 (or ?profile=1), newest first. Admin only."""
+    return profile_store.list()
+
+
+@api_router.get("/system/profiles/{profile_id}")
+def download_profile(profile_id: str, format: Literal["txt", "folded"] = "txt", _: dict = Depends(require_admin)):
+    """
+    Download a request profile. Admin only.
+
+    `txt` ranks functions by samples; `folded` holds the collapsed stacks
+    for flamegraph.pl or https://www.speedscope.app.
+    """
+    path = profile_store.path(profile_id, format)
+    if path is None or not path.exists():
+        raise HTTPException(status_code=404, detail="Profilo non trovato")
+    return FileResponse(path=path, filename=path.name, media_type="text/plain; charset=utf-8")
+
 
 def calculate_max_points_for_req(req):
     """
@@ -823,20 +1020,26 @@ def normalize_sub_req_ids(lot_config: schemas.LotConfig) -> schemas.LotConfig:
     return schemas.LotConfig.model_validate(config_dict)
 
 
+def _lot_configs(db: Session) -> Dict[str, schemas.LotConfig]:
+    return {
+        c.name: normalize_sub_req_ids(schemas.LotConfig.model_validate(c))
+        for c in crud.get_lot_configs(db)
+    }
+
+
 @api_router.get("/config", response_model=Dict[str, schemas.LotConfig])
-def get_config(db: Session = Depends(get_db)):
-    configs = crud.get_lot_configs(db)
-    result = {}
-    for c in configs:
-        lot_config = schemas.LotConfig.model_validate(c)
-        lot_config = normalize_sub_req_ids(lot_config)
-        result[c.name] = lot_config
-    return result
+async def get_config(db: AsyncSession = Depends(get_async_read_db)):
+    return await db.run_sync(_lot_configs)
 
 
-@api_router.get("/master-data", response_model=schemas.MasterData)
-def get_master_data(db: Session = Depends(get_db)):
+def _master_data(db: Session) -> Optional[schemas.MasterData]:
     master_data = crud.get_master_data(db)
+    return schemas.MasterData.model_validate(master_data) if master_data else None
+
+
+@api_router.get("/master-data", response_model=schemas.MasterData)
+async def get_master_data(db: AsyncSession = Depends(get_async_read_db)):
+    master_data = await db.run_sync(_master_data)
     if not master_data:
         raise HTTPException(status_code=404, detail="Master data not found")
     return master_data
@@ -847,6 +1050,26 @@ def update_master_data(data: schemas.MasterData, db: Session = Depends(get_db)):
     return crud.update_master_data(db, data)
 
 
+def _build_prof_cert_matcher(db: Session) -> CertMatcher:
+    master = crud.get_master_data(db)
+    return CertMatcher(list(master.prof_certs or []) if master else [])
+
+
+# Per-worker indexes, rebuilt when any worker changes master data / vendor configs
+prof_cert_matcher = VersionedCache(("master_data",), _build_prof_cert_matcher)
+vendor_detectors = VersionedCache(
+    ("vendor_configs",), lambda db: VendorDetector(crud.get_vendor_configs(db, enabled_only=False))
+)
+
+metrics.register_caches({
+    "score": score_cache,
+    "report": report_cache,
+    "chart": chart_cache,
+    "prof_cert_matcher": prof_cert_matcher,
+    "vendor_detectors": vendor_detectors,
+})
+
+
 def _resolve_vendor_key(raw_vendor: str, vendor_configs: list) -> str:
     """Map a raw vendor string (from CSV) to an existing VendorConfig key without DB writes.
     Checks key, display name, and aliases (all case-insensitive).
@@ -897,12 +1120,7 @@ def _get_or_create_vendor(db, raw_vendor: str, vendor_configs: list) -> str:
 @api_router.post("/master-data/import-certs/preview")
 async def preview_cert_list(file: UploadFile = File(...), db: Session = Depends(get_db)):
     """Fuzzy-match CSV cert names against existing master data certs. Returns exact/partial/presumed/unmatched."""
-    import csv, io as _io, unicodedata
-    from difflib import SequenceMatcher
-
-    def _normalize(s: str) -> str:
-        s = unicodedata.normalize("NFD", s.lower())
-        return "".join(c for c in s if unicodedata.category(c) != "Mn")
+    import csv, io as _io
 
     content = await file.read()
     text = content.decode("utf-8-sig", errors="replace")
@@ -921,7 +1139,6 @@ async def preview_cert_list(file: UploadFile = File(...), db: Session = Depends(
     master = crud.get_master_data(db)
     if not master:
         raise HTTPException(status_code=404, detail="Master data not found")
-    existing_certs = list(master.prof_certs or [])
     vendor_configs = crud.get_vendor_configs(db, enabled_only=False)
     # Parse CSV: collect unique cert_name -> raw_vendor
     csv_certs: dict = {}
@@ -932,17 +1149,12 @@ async def preview_cert_list(file: UploadFile = File(...), db: Session = Depends(
             csv_certs[cert_name] = raw_vendor
     # Fuzzy match each CSV cert against existing master certs
     exact, partial, presumed, unmatched = [], [], [], []
-    normalized_existing = {_normalize(c): c for c in existing_certs}
+    matcher = prof_cert_matcher.get(db)
     for cert_name, raw_vendor in csv_certs.items():
-        norm = _normalize(cert_name)
-        if norm in normalized_existing:
-            exact.append({"file_cert": cert_name, "matched_cert": normalized_existing[norm], "similarity": 1.0, "csv_vendor": raw_vendor})
+        best_match, best_ratio = matcher.match(cert_name)
+        if best_ratio == 1.0:
+            exact.append({"file_cert": cert_name, "matched_cert": best_match, "similarity": 1.0, "csv_vendor": raw_vendor})
             continue
-        best_ratio, best_match = 0.0, None
-        for ex_cert in existing_certs:
-            ratio = SequenceMatcher(None, norm, _normalize(ex_cert)).ratio()
-            if ratio > best_ratio:
-                best_ratio, best_match = ratio, ex_cert
         if best_ratio >= 0.6:
             partial.append({"file_cert": cert_name, "matched_cert": best_match, "similarity": best_ratio, "csv_vendor": raw_vendor})
         elif best_ratio >= 0.3:
@@ -1018,70 +1230,31 @@ async def confirm_cert_list(body: dict, db: Session = Depends(get_db)):
 
 @api_router.post("/master-data/import-lutech-resources/preview")
 async def preview_lutech_resources(file: UploadFile = File(...), db: Session = Depends(get_db)):
-    """Parse a CSV of Lutech certified resources and return fuzzy match results."""
-    import csv, io as _io, unicodedata
-    from difflib import SequenceMatcher
-
-    def _normalize(s: str) -> str:
-        s = unicodedata.normalize("NFD", s.lower())
-        return "".join(c for c in s if unicodedata.category(c) != "Mn")
-
-    content = await file.read()
-    text = content.decode("utf-8-sig", errors="replace")
-    sep = ";" if text.count(";") > text.count(",") else ","
-    first_line = text.splitlines()[0][:80] if text.strip() else "(empty)"
-    logger.info(f"[preview] sep='{sep}' first_line={first_line!r}")
+    """Parse a CSV of Lutech certified resources and return fuzzy match results.
+    The upload is parsed as a stream; the aggregate is kept behind `preview_token` for confirm."""
+    from services.csv_import_service import (
+        LUTECH_HEADER_KEYWORDS, LUTECH_POSITIONAL_FIELDS, aggregate_lutech_resources, iter_csv_rows,
+        lutech_preview_tokens,
+    )
 
-    # Parse CSV — support both header and headerless (positional) formats
-    # Expected columns: resource_id/name, cert_name, vendor (vendor optional)
-    lines = [l for l in text.splitlines() if l.strip()]
-    cert_counts: dict = {}
-    cert_vendors: dict = {}
+    # Expected columns: resource_id/name, cert_name, vendor (vendor optional) — header or positional
     vendor_configs = crud.get_vendor_configs(db, enabled_only=False)
-    if lines:
-        first_cols = [c.strip() for c in lines[0].split(sep)]
-        # Detect header: if first row values look like known column names
-        _header_keywords = {"cert_name", "nome_certificazione", "certification", "resource_name", "resource_id", "vendor"}
-        has_header = any(c.lower() in _header_keywords for c in first_cols)
-
-        reader = csv.DictReader(_io.StringIO(text), delimiter=sep)
-        if not has_header:
-            # Positional: col0=resource, col1=cert_name, col2=vendor (optional)
-            reader = csv.DictReader(
-                _io.StringIO(text), delimiter=sep,
-                fieldnames=["resource_id", "cert_name", "vendor"]
-            )
-
-        logger.info(f"[preview] has_header={has_header} fieldnames={getattr(reader, 'fieldnames', None)}")
-        for row in reader:
-            cert_name = (row.get("cert_name") or row.get("nome_certificazione") or row.get("certification") or "").strip()
-            if not cert_name:
-                continue
-            cert_counts[cert_name] = cert_counts.get(cert_name, 0) + 1
-            # Resolve vendor from CSV against existing VendorConfigs (read-only)
-            raw_vendor = (row.get("vendor") or "").strip()
-            if raw_vendor and not cert_vendors.get(cert_name):
-                cert_vendors[cert_name] = _resolve_vendor_key(raw_vendor, vendor_configs)
-        logger.info(f"[preview] parsed {len(cert_counts)} unique certs, {len(cert_vendors)} with vendor. sample: {dict(list(cert_vendors.items())[:3])}")
+    rows = iter_csv_rows(file.file, LUTECH_HEADER_KEYWORDS, LUTECH_POSITIONAL_FIELDS)
+    cert_counts, cert_vendors = await run_in_threadpool(
+        aggregate_lutech_resources, rows, lambda raw: _resolve_vendor_key(raw, vendor_configs)
+    )
+    logger.info(f"[preview] parsed {len(cert_counts)} unique certs, {len(cert_vendors)} with vendor. sample: {dict(list(cert_vendors.items())[:3])}")
 
-    master = crud.get_master_data(db)
-    known_certs = list(master.prof_certs or []) if master else []
-    known_norm = {_normalize(c): c for c in known_certs}
+    matcher = prof_cert_matcher.get(db)
 
     exact, partial, presumed, unmatched = [], [], [], []
     for file_cert, count in cert_counts.items():
-        norm = _normalize(file_cert)
         cv = cert_vendors.get(file_cert, "")
-        # Check exact match first (case-insensitive)
-        if norm in known_norm:
-            exact.append({"file_cert": file_cert, "matched_cert": known_norm[norm], "count": count, "similarity": 1.0, "csv_vendor": cv})
+        # Exact match (case/accent-insensitive) or best fuzzy match among indexed candidates
+        best_cert, best_ratio = matcher.match(file_cert)
+        if best_ratio == 1.0:
+            exact.append({"file_cert": file_cert, "matched_cert": best_cert, "count": count, "similarity": 1.0, "csv_vendor": cv})
             continue
-        # Find best fuzzy match
-        best_ratio, best_cert = 0.0, None
-        for kn, kc in known_norm.items():
-            r = SequenceMatcher(None, norm, kn).ratio()
-            if r > best_ratio:
-                best_ratio, best_cert = r, kc
         if best_ratio >= 0.60:
             partial.append({"file_cert": file_cert, "matched_cert": best_cert, "count": count, "similarity": round(best_ratio, 3), "csv_vendor": cv})
         elif best_ratio >= 0.30:
@@ -1090,27 +1263,16 @@ async def preview_lutech_resources(file: UploadFile = File(...), db: Session = D
             unmatched.append({"file_cert": file_cert, "count": count, "csv_vendor": cv})
 
     # Auto-detect vendor for items without explicit CSV vendor (fallback)
-    import re as _re
-
-    def _detect_vendor(cert_name: str) -> str:
-        cert_lower = cert_name.lower()
-        for vc in vendor_configs:
-            for alias in (vc.aliases or []):
-                if alias.lower() in cert_lower:
-                    return vc.key
-            for pattern in (vc.cert_patterns or []):
-                try:
-                    if _re.search(pattern, cert_lower, _re.IGNORECASE):
-                        return vc.key
-                except Exception as e:
-                    logger.debug(f"Skipping invalid cert pattern '{pattern}' for vendor {vc.key}: {e}")
-        return ""
-
+    vendor_detector = vendor_detectors.get(db)
     for item in unmatched:
         # CSV vendor takes priority; fall back to pattern-based detection
-        item["suggested_vendor"] = item["csv_vendor"] or _detect_vendor(item["file_cert"])
+        item["suggested_vendor"] = item["csv_vendor"] or vendor_detector.detect(item["file_cert"])
 
-    return {"exact": exact, "partial": partial, "presumed": presumed, "unmatched": unmatched}
+    preview_token = lutech_preview_tokens.put({"cert_counts": cert_counts, "cert_vendors": cert_vendors})
+    return {
+        "exact": exact, "partial": partial, "presumed": presumed, "unmatched": unmatched,
+        "preview_token": preview_token,
+    }
 
 
 @api_router.post("/master-data/import-lutech-resources/confirm")
@@ -1118,10 +1280,24 @@ async def confirm_lutech_resources(
     payload: dict,
     db: Session = Depends(get_db)
 ):
-    """Apply accepted fuzzy matches with delta/overwrite mode + optional cert creation."""
+    """Apply accepted fuzzy matches with delta/overwrite mode + optional cert creation.
+    With `preview_token`, counts and CSV vendors come from the parsed preview instead of the payload."""
+    from services.csv_import_service import lutech_preview_tokens
+
     accepted = payload.get("accepted", [])
     to_create = payload.get("to_create", [])       # [{file_cert, vendor_key, count}]
     mode = payload.get("mode", "delta")             # "delta" | "overwrite"
+    preview_token = payload.get("preview_token")
+    if preview_token:
+        parsed = lutech_preview_tokens.get(preview_token)
+        if parsed is None:
+            raise HTTPException(status_code=410, detail="Anteprima scaduta: ricaricare il file CSV.")
+        counts, csv_vendors = parsed["cert_counts"], parsed["cert_vendors"]
+        accepted = [
+            {**m, "count": counts.get(m.get("file_cert"), 0), "csv_vendor": csv_vendors.get(m.get("file_cert"), "")}
+            for m in accepted
+        ]
+        to_create = [{**item, "count": counts.get(item.get("file_cert"), 0)} for item in to_create]
     logger.info(f"[confirm] mode={mode} accepted={len(accepted)} to_create={len(to_create)}")
     if to_create:
         logger.info(f"[confirm] to_create sample: {to_create[:3]}")
@@ -1186,26 +1362,16 @@ async def confirm_lutech_resources(
     master_schema.prof_certs_vendors = vendors_dict
     master_schema.prof_certs_resources = resources_dict
     crud.update_master_data(db, master_schema)
+    if preview_token:
+        lutech_preview_tokens.discard(preview_token)
     return {"updated": updated, "created": created}
 
 
-@api_router.post("/config/state")
-def update_lot_state(
-    lot_key: str, state: schemas.SimulationState, db: Session = Depends(get_db)
-):
-    logger.info(f"State update requested for lot: {lot_key}")
-    logger.debug(f"State data: {state.model_dump()}")
-
-    lot = crud.get_lot_config(db, lot_key)
-    if not lot:
-        logger.warning(f"Lot not found: {lot_key}")
-        raise HTTPException(status_code=404, detail="Lot not found")
-
-    state_payload = state.model_dump()
-
+def _clean_state(state_payload: Dict[str, Any], company_certs: List[Dict], reqs: List[Dict]) -> Dict[str, Any]:
+    """Drop certification statuses and tech inputs that do not belong to the lot."""
     valid_cert_labels = {
         cert.get("label")
-        for cert in (lot.company_certs or [])
+        for cert in (company_certs or [])
         if isinstance(cert, dict) and cert.get("label")
     }
     valid_cert_statuses = {"all", "partial", "none"}
@@ -1217,7 +1383,7 @@ def update_lot_state(
 
     valid_req_ids = {
         req.get("id")
-        for req in (lot.reqs or [])
+        for req in (reqs or [])
         if isinstance(req, dict) and req.get("id")
     }
     state_payload["tech_inputs"] = {
@@ -1225,12 +1391,26 @@ def update_lot_state(
         for req_id, value in (state_payload.get("tech_inputs") or {}).items()
         if req_id in valid_req_ids
     }
+    return state_payload
+
+
+@api_router.post("/config/state")
+def update_lot_state(
+    lot_key: str, state: schemas.SimulationState, db: Session = Depends(get_db)
+):
+    logger.info(f"State update requested for lot: {lot_key}")
+    logger.debug(f"State data: {state.model_dump()}")
 
-    lot.state = state_payload
+    lot = crud.get_lot_config(db, lot_key)
+    if not lot:
+        logger.warning(f"Lot not found: {lot_key}")
+        raise HTTPException(status_code=404, detail="Lot not found")
+
+    lot.state = _clean_state(state.model_dump(), lot.company_certs, lot.reqs)
     db.commit()
 
     logger.info(f"State saved successfully for lot: {lot_key}")
-    return {"status": "success"}
+    return {"status": "success", "version": lot.version}
 
 
 @api_router.post("/config", response_model=Dict[str, schemas.LotConfig])
@@ -1257,6 +1437,125 @@ def update_config(
     return {c.name: schemas.LotConfig.model_validate(c) for c in configs}
 
 
+# --- Delta updates (PATCH) ---------------------------------------------------
+# A PATCH body is either a merge patch (JSON object, RFC 7396) or a JSON Patch
+# (array of operations, RFC 6902). Each one touches a single lot, validates
+# only that lot and writes only the rows it changes. The lot version is the
+# ETag: send it back in If-Match and a concurrent edit yields 412.
+
+LotPatch = Union[List[Dict[str, Any]], Dict[str, Any]]
+
+
+def _lot_etag(lot: models.LotConfigModel) -> str:
+    return f'"{lot.version}"'
+
+
+def _patchable_lot(db: Session, lot_key: str, request: Request) -> models.LotConfigModel:
+    lot = crud.get_lot_config(db, lot_key)
+    if not lot:
+        raise HTTPException(status_code=404, detail="Lotto non trovato")
+    if_match = request.headers.get("if-match")
+    if if_match and if_match.strip() != "*":
+        if _lot_etag(lot) not in {tag.strip() for tag in if_match.split(",")}:
+            raise HTTPException(
+                status_code=412,
+                detail="Il lotto è stato modificato da un'altra sessione: ricaricare e riprovare",
+                headers={"ETag": _lot_etag(lot)},
+            )
+    return lot
+
+
+def _apply_lot_patch(document: Any, patch: LotPatch) -> Any:
+    try:
+        return apply_patch(document, patch)
+    except PatchTestFailed as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except PatchError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def _validated(model, data: Any):
+    try:
+        return model.model_validate(data)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+
+
+def _commit_lot_patch(db: Session, lot: models.LotConfigModel, response: Response) -> None:
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise HTTPException(
+            status_code=412, detail="Il lotto è stato modificato da un'altra sessione: ricaricare e riprovare"
+        )
+    response.headers["ETag"] = _lot_etag(lot)
+
+
+@api_router.patch("/config/{lot_key}", response_model=schemas.LotConfig)
+def patch_lot(
+    lot_key: str, patch: LotPatch, request: Request, response: Response, db: Session = Depends(get_db)
+):
+    """Apply a patch to one lot: configuration fields, requirements, certifications and state."""
+    lot = _patchable_lot(db, lot_key, request)
+    current = schemas.LotConfig.model_validate(lot).model_dump(exclude={"version"})
+    patched = _apply_lot_patch(current, patch)
+    if not isinstance(patched, dict) or patched.get("name") != lot_key:
+        raise HTTPException(status_code=422, detail="Il nome del lotto non può essere modificato")
+    lot_config = _validated(schemas.LotConfig, patched)
+
+    blocking = blocking_issues(validate_lot_config(lot_config, crud.get_master_data(db)))
+    if blocking:
+        raise HTTPException(status_code=422, detail={"lot": lot_key, "issues": blocking})
+
+    if lot_config.state != current["state"]:
+        state = _validated(schemas.SimulationState, lot_config.state or {}).model_dump()
+        lot.state = _clean_state(state, lot_config.company_certs, lot_config.reqs)
+    crud.update_lot_config(db, lot_key, lot_config, commit=False)
+    _commit_lot_patch(db, lot, response)
+    logger.info(f"Lot patched: {lot_key} (version {lot.version})")
+    return schemas.LotConfig.model_validate(lot)
+
+
+@api_router.patch("/config/{lot_key}/req/{req_id}")
+def patch_requirement(
+    lot_key: str, req_id: str, patch: LotPatch, request: Request, response: Response,
+    db: Session = Depends(get_db),
+):
+    """Apply a patch to one requirement; only its row is rewritten."""
+    lot = _patchable_lot(db, lot_key, request)
+    reqs = lot.reqs
+    index = next((i for i, r in enumerate(reqs) if r.get("id") == req_id), None)
+    if index is None:
+        raise HTTPException(status_code=404, detail="Requisito non trovato")
+    patched = _apply_lot_patch(reqs[index], patch)
+    if not isinstance(patched, dict) or patched.get("id") != req_id:
+        raise HTTPException(status_code=422, detail="L'id del requisito non può essere modificato")
+
+    new_reqs = [*reqs[:index], patched, *reqs[index + 1:]]
+    lot_config = schemas.LotConfig.model_validate(lot).model_copy(update={"reqs": new_reqs})
+    blocking = blocking_issues(validate_lot_config(lot_config, crud.get_master_data(db)))
+    if blocking:
+        raise HTTPException(status_code=422, detail={"lot": lot_key, "issues": blocking})
+
+    lot.reqs = new_reqs
+    _commit_lot_patch(db, lot, response)
+    return {"req": patched, "version": lot.version}
+
+
+@api_router.patch("/config/{lot_key}/state")
+def patch_lot_state(
+    lot_key: str, patch: LotPatch, request: Request, response: Response, db: Session = Depends(get_db)
+):
+    """Apply a patch to a lot's simulation state (the autosave path)."""
+    lot = _patchable_lot(db, lot_key, request)
+    current = _validated(schemas.SimulationState, lot.state or {}).model_dump()
+    state = _validated(schemas.SimulationState, _apply_lot_patch(current, patch)).model_dump()
+    lot.state = _clean_state(state, lot.company_certs, lot.reqs)
+    _commit_lot_patch(db, lot, response)
+    return {"status": "success", "version": lot.version}
+
+
 @api_router.post("/config/add", response_model=schemas.LotConfig)
 def add_lot(lot_key: str, db: Session = Depends(get_db)):
     if crud.get_lot_config(db, lot_key):
@@ -1330,11 +1629,15 @@ def download_config_template(db: Session = Depends(get_db)):
 
 
 @api_router.get("/lots/{lot_key}/export")
-def export_lot_config(lot_key: str, db: Session = Depends(get_db)):
+async def export_lot_config(lot_key: str, db: Session = Depends(get_read_db)):
     """
     Export a lot configuration to an Excel file.
     Creates a populated template with all the lot's configuration data.
     """
+    return await pools["export"].run(_export_lot_config, lot_key, db)
+
+
+def _export_lot_config(lot_key: str, db: Session):
     from services.excel_config_service import ExcelConfigService
     
     # Get lot config from database
@@ -1530,22 +1833,23 @@ def update_requirement_criteria(
     if not lot:
         raise HTTPException(status_code=404, detail="Lotto non trovato")
 
-    req = next((r for r in lot.reqs if r["id"] == req_id), None)
-    if not req:
+    reqs = lot.reqs
+    if not any(r["id"] == req_id for r in reqs):
         raise HTTPException(status_code=404, detail="Requisito non trovato")
 
+    # Only this requirement's row is rewritten
     criteria_list = [c.dict() for c in criteria]
-    req["criteria"] = criteria_list
-    req["sub_reqs"] = criteria_list
-
-    # This is tricky because JSON field is not tracked deeply
+    lot.reqs = [
+        {**r, "criteria": criteria_list, "sub_reqs": criteria_list} if r["id"] == req_id else r
+        for r in reqs
+    ]
     db.commit()
 
     return {"status": "success", "message": f"Criteri aggiornati per {req_id}"}
 
 
 @api_router.get("/config/{lot_key}/req/{req_id}/criteria")
-def get_requirement_criteria(lot_key: str, req_id: str, db: Session = Depends(get_db)):
+def get_requirement_criteria(lot_key: str, req_id: str, db: Session = Depends(get_read_db)):
     lot = crud.get_lot_config(db, lot_key)
     if not lot:
         raise HTTPException(status_code=404, detail="Lotto non trovato")
@@ -1566,8 +1870,36 @@ def get_requirement_criteria(lot_key: str, req_id: str, db: Session = Depends(ge
     }
 
 
+def _scoring_config(lot_cfg: Optional[schemas.LotConfig], lot_key: str) -> schemas.LotConfig:
+    if not lot_cfg:
+        logger.warning(f"Lot not found: {lot_key}")
+        raise HTTPException(status_code=404, detail="Lot not found")
+    return lot_cfg
+
+
+def calculate_score(data: schemas.CalculateRequest, db: Session) -> Dict[str, Any]:
+    """
+    Score a lot. Results are cached briefly per (lot, state hash), so exports and
+    repeated recalculations of an unchanged state reuse the same engine run.
+    """
+    lot_cfg = _scoring_config(crud.get_lot_scoring_config(db, data.lot_key), data.lot_key)
+    return _cached_score(data, lot_cfg)
+
+
+def _cached_score(data: schemas.CalculateRequest, lot_cfg: schemas.LotConfig) -> Dict[str, Any]:
+    digest = state_hash(data.model_dump(mode="json"), lot_cfg.model_dump(mode="json"))
+    return score_cache.get_or_compute(data.lot_key, digest, lambda: _compute_score(data, lot_cfg))
+
+
 @api_router.post("/calculate")
-def calculate_score(data: schemas.CalculateRequest, db: Session = Depends(get_db)):
+async def calculate(data: schemas.CalculateRequest, db: AsyncSession = Depends(get_async_read_db)):
+    """Score a lot (see calculate_score); the engine runs on the interactive pool."""
+    lot_cfg = _scoring_config(await db.run_sync(crud.get_lot_scoring_config, data.lot_key), data.lot_key)
+    return await run_cpu(_cached_score, data, lot_cfg)
+
+
+def _compute_score(data: schemas.CalculateRequest, lot_cfg: schemas.LotConfig) -> Dict[str, Any]:
+    stages = metrics.StageTimer("calculate_score")
     logger.info(
         "Score calculation requested",
         extra={
@@ -1576,12 +1908,6 @@ def calculate_score(data: schemas.CalculateRequest, db: Session = Depends(get_db
             "competitor_discount": data.competitor_discount
         }
     )
-    lot_cfg_db = crud.get_lot_config(db, data.lot_key)
-    if not lot_cfg_db:
-        logger.warning(f"Lot not found: {data.lot_key}")
-        raise HTTPException(status_code=404, detail="Lot not found")
-
-    lot_cfg = schemas.LotConfig.model_validate(lot_cfg_db)
 
     p_comp = data.base_amount * (1 - (data.competitor_discount / 100))
     p_off = data.base_amount * (1 - (data.my_discount / 100))
@@ -1591,6 +1917,7 @@ def calculate_score(data: schemas.CalculateRequest, db: Session = Depends(get_db
     competitor_econ_score = calculate_economic_score(
         data.base_amount, p_comp, p_off, lot_cfg.alpha, lot_cfg.max_econ_score
     )
+    stages.lap("economic")
 
     # === 1. CALCULATE RAW SCORES ===
 
@@ -1688,6 +2015,8 @@ def calculate_score(data: schemas.CalculateRequest, db: Session = Depends(get_db
         req_id = req_dict.get("id")
         max_raw_scores[req_id] = calculate_max_points_for_req(req_dict)
 
+    stages.lap("raw_scores")
+
     # === 2. CALCULATE WEIGHTED SCORES (WITH FORMULA) ===
 
     # Company Certifications - Weighted Score
@@ -1801,10 +2130,13 @@ def calculate_score(data: schemas.CalculateRequest, db: Session = Depends(get_db
     # Total technical score = sum of all categories
     tech_score = category_company_certs + category_resource + category_reference + category_project
 
+    stages.lap("weighted_scores")
+
     # === 3. AUTO-CALCULATE MAX SCORES ===
     calculated_max_tech_score = calculate_lot_max_tech_score(lot_cfg)
     calculated_max_raw_score = calculate_lot_max_raw_score(lot_cfg)
     calculated_max_econ_score = 100.0 - calculated_max_tech_score
+    stages.lap("max_scores")
 
     result = {
         "technical_score": round(tech_score, 2),
@@ -1838,16 +2170,17 @@ def calculate_score(data: schemas.CalculateRequest, db: Session = Depends(get_db
         }
     )
 
+    stages.total()
     return result
 
 
 @api_router.post("/simulate")
-def simulate(data: schemas.SimulationRequest, db: Session = Depends(get_db)):
-    lot_cfg_db = crud.get_lot_config(db, data.lot_key)
-    if not lot_cfg_db:
-        raise HTTPException(status_code=404, detail="Lot not found")
-    lot_cfg = schemas.LotConfig.model_validate(lot_cfg_db)
+async def simulate(data: schemas.SimulationRequest, db: AsyncSession = Depends(get_async_read_db)):
+    lot_cfg = _scoring_config(await db.run_sync(crud.get_lot_scoring_config, data.lot_key), data.lot_key)
+    return await run_cpu(_simulate, data, lot_cfg)
+
 
+def _simulate(data: schemas.SimulationRequest, lot_cfg: schemas.LotConfig) -> List[Dict[str, Any]]:
     # Clamp tech score to lot maximum to prevent invalid totals
     clamped_tech_score = min(data.current_tech_score, lot_cfg.max_tech_score)
 
@@ -1878,14 +2211,18 @@ def simulate(data: schemas.SimulationRequest, db: Session = Depends(get_db)):
 
 
 @api_router.post("/monte-carlo")
-def monte_carlo_simulation(
-    data: schemas.MonteCarloRequest, db: Session = Depends(get_db)
-):
-    lot_cfg_db = crud.get_lot_config(db, data.lot_key)
-    if not lot_cfg_db:
-        raise HTTPException(status_code=404, detail="Lot not found")
-    lot_cfg = schemas.LotConfig.model_validate(lot_cfg_db)
+async def monte_carlo(data: schemas.MonteCarloRequest, db: AsyncSession = Depends(get_async_read_db)):
+    lot_cfg = _scoring_config(await db.run_sync(crud.get_lot_scoring_config, data.lot_key), data.lot_key)
+    return await run_cpu(_monte_carlo, data, lot_cfg)
+
+
+def monte_carlo_simulation(data: schemas.MonteCarloRequest, db: Session) -> Dict[str, Any]:
+    """Monte Carlo win probability (sync, for report generation)."""
+    lot_cfg = _scoring_config(crud.get_lot_scoring_config(db, data.lot_key), data.lot_key)
+    return _monte_carlo(data, lot_cfg)
+
 
+def _monte_carlo(data: schemas.MonteCarloRequest, lot_cfg: schemas.LotConfig) -> Dict[str, Any]:
     max_tech = lot_cfg.max_tech_score
     max_econ = lot_cfg.max_econ_score
 
@@ -1894,12 +2231,13 @@ def monte_carlo_simulation(
     comp_tech_std = data.competitor_tech_score_std
 
     # Vectorized Monte Carlo (equivalent to the previous per-iteration loop).
+    rng = np.random.default_rng(data.seed) if data.seed is not None else np.random
     comp_discounts = np.clip(
-        np.random.normal(data.competitor_discount_mean, data.competitor_discount_std, data.iterations),
+        rng.normal(data.competitor_discount_mean, data.competitor_discount_std, data.iterations),
         0, 100,
     )
     comp_tech_scores = np.clip(
-        np.random.normal(comp_tech_mean, comp_tech_std, data.iterations),
+        rng.normal(comp_tech_mean, comp_tech_std, data.iterations),
         0, max_tech,
     )
 
@@ -1931,7 +2269,9 @@ def monte_carlo_simulation(
 
 
 @api_router.post("/optimize-discount")
-def optimize_discount(data: schemas.OptimizeDiscountRequest, db: Session = Depends(get_db)):
+async def optimize_discount(
+    data: schemas.OptimizeDiscountRequest, db: AsyncSession = Depends(get_async_read_db)
+):
     """
     Intelligent discount optimizer: suggests optimal discount to beat a specific competitor
     Returns 4 scenarios: Conservativo (70-80%), Bilanciato (80-90%), Aggressivo (90-95%), Max (95%+)
@@ -1939,11 +2279,11 @@ def optimize_discount(data: schemas.OptimizeDiscountRequest, db: Session = Depen
     logger.info(f"Discount optimization requested for lot: {data.lot_key}")
 
     # Get lot configuration
-    lot_cfg_db = crud.get_lot_config(db, data.lot_key)
-    if not lot_cfg_db:
-        raise HTTPException(status_code=404, detail="Lot not found")
-    lot_cfg = schemas.LotConfig.model_validate(lot_cfg_db)
+    lot_cfg = _scoring_config(await db.run_sync(crud.get_lot_scoring_config, data.lot_key), data.lot_key)
+    return await run_cpu(_optimize_discount, data, lot_cfg)
 
+
+def _optimize_discount(data: schemas.OptimizeDiscountRequest, lot_cfg: schemas.LotConfig) -> Dict[str, Any]:
     # Calculate base prices
     p_base = data.base_amount
     p_comp = p_base * (1 - data.competitor_discount / 100)
@@ -2085,124 +2425,297 @@ def optimize_discount(data: schemas.OptimizeDiscountRequest, db: Session = Depen
     }
 
 
+def _export_state(lot: models.LotConfigModel, data: schemas.ExportPDFRequest) -> Dict[str, Any]:
+    """Scoring state of an export request, falling back to the lot's saved state."""
+    saved = lot.state or {}
+    if data.tech_inputs_full is not None:
+        tech_inputs = {
+            req_id: value.model_dump(exclude_unset=True) if value is not None else {}
+            for req_id, value in data.tech_inputs_full.items()
+        }
+    else:
+        tech_inputs = saved.get("tech_inputs") or {}
+    return {
+        "my_discount": data.my_discount,
+        "competitor_discount": data.competitor_discount,
+        "tech_inputs": tech_inputs,
+        "company_certs": data.company_certs_status if data.company_certs_status is not None else saved.get("company_certs") or {},
+    }
+
+
+def _report_inputs(
+    db: Session,
+    lot: models.LotConfigModel,
+    state: Dict[str, Any],
+    win_probability: float,
+    base_amount: Optional[float] = None,
+    rti_quotas: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """
+    Report generator kwargs for a lot state, scored server-side by calculate_score.
+
+    Reports therefore always match the engine; the score cache makes this free
+    when the dashboard has just calculated the same state.
+    """
+    tech_inputs = state.get("tech_inputs") or {}
+    result = calculate_score(_state_calculate_request(lot, state, tech_inputs, base_amount), db)
+    return dict(
+        lot_key=lot.name,
+        lot_config=schemas.LotConfig.model_validate(lot).model_dump(),
+        base_amount=base_amount or lot.base_amount,
+        my_discount=state.get("my_discount", 0.0),
+        competitor_discount=state.get("competitor_discount", 30.0),
+        technical_score=result["technical_score"],
+        economic_score=result["economic_score"],
+        total_score=result["total_score"],
+        details=result["details"],
+        weighted_scores=result["weighted_scores"],
+        category_scores={
+            "company_certs": result["category_company_certs"],
+            "resource": result["category_resource"],
+            "reference": result["category_reference"],
+            "project": result["category_project"],
+        },
+        max_tech_score=result.get("calculated_max_tech_score") or lot.max_tech_score,
+        max_econ_score=lot.max_econ_score,
+        alpha=lot.alpha,
+        win_probability=win_probability,
+        tech_inputs_full=tech_inputs,
+        rti_quotas=rti_quotas or lot.rti_quotas or {},
+    )
+
+
+def _cached_report(request: Request, fmt: str, kwargs: Dict[str, Any], filename: str):
+    """
+    Serve a report from the on-disk artifact cache, generating it only on a miss.
+
+    The ETag is the cache key (generator version + every generator argument),
+    so an unchanged lot and state answer If-None-Match with 304 Not Modified.
+    Report generation has no side effects, so this also applies to the POST exports.
+    """
+    key = report_key(fmt, kwargs)
+    etag = f'"{key}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "Access-Control-Expose-Headers": "Content-Disposition, ETag",
+    }
+    if parse_if_none_match(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    fileobj = report_cache.open(key, fmt)
+    if fileobj is None:
+        with metrics.timed("report", fmt):
+            if fmt == "pdf":
+                fileobj = generate_pdf_report(**kwargs)
+            else:
+                # Spooled to disk when large, then streamed in chunks
+                fileobj = generate_excel_report(**kwargs, output=spooled_output())
+        report_cache.put(key, fmt, fileobj)
+    else:
+        logger.info(f"Serving cached report {filename}")
+    return attachment_response(fileobj, filename, REPORT_MEDIA_TYPES[fmt], extra_headers=headers)
+
+
+def _report_filename(lot_key: str, fmt: str) -> str:
+    safe_lot_key = lot_key.replace(' ', '_').replace('/', '_')
+    return f"report_{safe_lot_key}.{fmt}"
+
+
 @api_router.post("/export-pdf")
-def export_pdf(data: schemas.ExportPDFRequest, db: Session = Depends(get_db)):
+async def export_pdf(data: schemas.ExportPDFRequest, request: Request, db: Session = Depends(get_read_db)):
     """
     Export comprehensive PDF report matching Excel structure with
     professional formatting and branding.
     """
+    return await pools["export"].run(_export_pdf, data, request, db)
+
+
+def _export_pdf(data: schemas.ExportPDFRequest, request: Request, db: Session):
     logger.info(f"PDF export requested for lot: {data.lot_key}")
 
     # Get lot configuration
     lot_cfg_db = crud.get_lot_config(db, data.lot_key)
     if not lot_cfg_db:
         raise HTTPException(status_code=404, detail="Lot not found")
-    lot_cfg = schemas.LotConfig.model_validate(lot_cfg_db)
-
-    # Generate PDF using the comprehensive generator (same data as Excel)
-    buffer = generate_pdf_report(
-        lot_key=data.lot_key,
-        lot_config=lot_cfg.model_dump(),
-        base_amount=data.base_amount,
-        my_discount=data.my_discount,
-        competitor_discount=data.competitor_discount,
-        technical_score=data.technical_score,
-        economic_score=data.economic_score,
-        total_score=data.total_score,
-        details=data.details,
-        weighted_scores=data.weighted_scores,
-        category_scores=data.category_scores,
-        max_tech_score=data.max_tech_score,
-        max_econ_score=data.max_econ_score,
-        alpha=data.alpha,
-        win_probability=data.win_probability,
-        tech_inputs_full=data.tech_inputs_full,
-        rti_quotas=data.rti_quotas,
-    )
 
-    logger.info(f"PDF export completed for lot: {data.lot_key}")
+    # Same data as Excel
+    kwargs = _report_inputs(
+        db, lot_cfg_db, _export_state(lot_cfg_db, data), data.win_probability, data.base_amount, data.rti_quotas,
+    )
+    return _cached_report(request, "pdf", kwargs, _report_filename(data.lot_key, "pdf"))
 
-    # Create safe filename
-    safe_lot_key = data.lot_key.replace(' ', '_').replace('/', '_')
-    filename = f"report_{safe_lot_key}.pdf"
 
-    return StreamingResponse(
-        buffer,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}",
-            "Access-Control-Expose-Headers": "Content-Disposition",
-        },
-    )
+def _prof_certs_resources(db: Session) -> Dict[str, int]:
+    """prof_certs_resources from master data (coerce any legacy List values to int)"""
+    try:
+        master_data_obj = db.query(models.MasterDataModel).filter_by(id="1").first()
+        if master_data_obj:
+            raw = master_data_obj.prof_certs_resources or {}
+            return {
+                k: (len(v) if isinstance(v, list) else int(v or 0))
+                for k, v in raw.items()
+            }
+    except Exception as e:
+        logger.warning(f"Failed to read prof_certs_resources: {e}")
+    return {}
 
 
 @api_router.post("/export-excel")
-def export_excel(data: schemas.ExportExcelRequest, db: Session = Depends(get_db)):
+async def export_excel(data: schemas.ExportExcelRequest, request: Request, db: Session = Depends(get_read_db)):
     """
     Export comprehensive Excel report with multiple sheets, formulas,
     conditional formatting, and RTI contribution analysis.
     """
+    return await pools["export"].run(_export_excel, data, request, db)
+
+
+def _export_excel(data: schemas.ExportExcelRequest, request: Request, db: Session):
     logger.info(f"Excel export requested for lot: {data.lot_key}")
 
     # Get lot configuration
     lot_cfg_db = crud.get_lot_config(db, data.lot_key)
     if not lot_cfg_db:
         raise HTTPException(status_code=404, detail="Lot not found")
-    lot_cfg = schemas.LotConfig.model_validate(lot_cfg_db)
-
-    # Get prof_certs_resources from master data (coerce any legacy List values to int)
-    prof_certs_resources = {}
-    try:
-        master_data_obj = db.query(models.MasterDataModel).filter_by(id="1").first()
-        if master_data_obj:
-            raw = master_data_obj.prof_certs_resources or {}
-            prof_certs_resources = {
-                k: (len(v) if isinstance(v, list) else int(v or 0))
-                for k, v in raw.items()
-            }
-    except Exception as e:
-        logger.warning(f"Failed to read prof_certs_resources: {e}")
 
-    # Generate Excel report
-    buffer = generate_excel_report(
-        lot_key=data.lot_key,
-        lot_config=lot_cfg.model_dump(),
-        base_amount=data.base_amount,
-        my_discount=data.my_discount,
-        competitor_discount=data.competitor_discount,
-        technical_score=data.technical_score,
-        economic_score=data.economic_score,
-        total_score=data.total_score,
-        details=data.details,
-        weighted_scores=data.weighted_scores,
-        category_scores=data.category_scores,
-        max_tech_score=data.max_tech_score,
-        max_econ_score=data.max_econ_score,
-        alpha=data.alpha,
-        win_probability=data.win_probability,
-        tech_inputs_full=data.tech_inputs_full,
-        rti_quotas=data.rti_quotas,
-        prof_certs_resources=prof_certs_resources,
+    state = _export_state(lot_cfg_db, data)
+    kwargs = _report_inputs(db, lot_cfg_db, state, data.win_probability, data.base_amount, data.rti_quotas)
+    kwargs.update(
+        prof_certs_resources=_prof_certs_resources(db),
         prof_certs_weights=data.prof_certs_weights,
-        company_certs_status=data.company_certs_status,
+        company_certs_status=state["company_certs"],
     )
+    return _cached_report(request, "xlsx", kwargs, _report_filename(data.lot_key, "xlsx"))
 
-    logger.info(f"Excel export completed for lot: {data.lot_key}")
 
-    # Create safe filename
-    safe_lot_key = data.lot_key.replace(' ', '_').replace('/', '_')
-    filename = f"report_{safe_lot_key}.xlsx"
+def _lot_report_inputs(db: Session, lot: models.LotConfigModel) -> Dict[str, Any]:
+    """
+    Report generator kwargs for a lot's saved state, with the win probability
+    from the same 500-iteration Monte Carlo run the dashboard uses.
+
+    The run is seeded from the state, so an unchanged lot yields the same
+    report (and the same artifact cache entry) every time.
+    """
+    state = dict(lot.state or {})
+    result = calculate_score(_state_calculate_request(lot, state, state.get("tech_inputs") or {}), db)
+    simulation = monte_carlo_simulation(
+        schemas.MonteCarloRequest(
+            lot_key=lot.name,
+            base_amount=lot.base_amount,
+            my_discount=state.get("my_discount", 0.0),
+            competitor_discount_mean=state.get("competitor_discount", 30.0),
+            current_tech_score=result["technical_score"],
+            competitor_tech_score_mean=state.get("competitor_tech_score", lot.max_tech_score),
+            seed=int(state_hash(lot.name, state)[:8], 16),
+        ),
+        db,
+    )
+    return _report_inputs(db, lot, state, simulation["win_probability"])
+
+
+def _lot_report_kwargs(
+    lot: models.LotConfigModel, fmt: str, inputs: Dict[str, Any], prof_certs_resources: Dict[str, int],
+) -> Dict[str, Any]:
+    """Generator kwargs of one report format for a lot's saved state."""
+    kwargs = dict(inputs)
+    if fmt == "xlsx":
+        kwargs.update(
+            prof_certs_resources=prof_certs_resources,
+            company_certs_status=(lot.state or {}).get("company_certs") or {},
+        )
+    return kwargs
+
+
+@api_router.get("/lots/{lot_key}/report/{fmt}")
+async def export_lot_report(
+    lot_key: str, fmt: Literal["pdf", "xlsx"], request: Request, db: Session = Depends(get_read_db),
+):
+    """
+    Download a lot's PDF/XLSX report scored from its saved state.
+
+    Cacheable by the browser: repeat downloads of an unchanged lot revalidate
+    with If-None-Match and get 304 Not Modified.
+    """
+    return await pools["export"].run(_export_lot_report, lot_key, fmt, request, db)
+
 
-    return StreamingResponse(
-        buffer,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+def _export_lot_report(lot_key: str, fmt: str, request: Request, db: Session):
+    lot = crud.get_lot_config(db, lot_key)
+    if not lot:
+        raise HTTPException(status_code=404, detail="Lot not found")
+    try:
+        inputs = _lot_report_inputs(db, lot)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Stato del lotto non valido: {e}")
+    prof_certs_resources = _prof_certs_resources(db) if fmt == "xlsx" else {}
+    kwargs = _lot_report_kwargs(lot, fmt, inputs, prof_certs_resources)
+    return _cached_report(request, fmt, kwargs, _report_filename(lot.name, fmt))
+
+
+@api_router.post("/export-reports")
+async def export_reports_bulk(data: schemas.BulkExportRequest, db: Session = Depends(get_read_db)):
+    """
+    Export the reports of several lots (default: all active lots) as one ZIP.
+
+    Each lot is scored from its saved state; reports already in the artifact
+    cache are added first, the others are rendered in worker processes and
+    added to the ZIP as they finish, so the download starts right away. Lots
+    that cannot be scored are listed in errori.json inside the archive.
+    The whole export, streaming included, holds one slot of the export pool.
+    """
+    from services.bulk_export_service import iter_reports_zip
+
+    pool = pools["export"]
+    slot = pool.reserve()
+    try:
+        jobs, skipped = await pool.run(_bulk_export_jobs, data, db)
+    except BaseException:
+        slot.release()
+        raise
+
+    return pool.stream(
+        iter_reports_zip(jobs, skipped, cache=report_cache), slot,
+        media_type="application/zip",
         headers={
-            "Content-Disposition": f"attachment; filename={filename}",
+            "Content-Disposition": "attachment; filename=report_lotti.zip",
             "Access-Control-Expose-Headers": "Content-Disposition",
         },
     )
 
 
+def _bulk_export_jobs(data: schemas.BulkExportRequest, db: Session):
+    """(filename, format, generator kwargs) of every report to export, and the lots skipped."""
+    if data.lot_keys is None:
+        lots = [lot for lot in crud.get_lot_configs(db) if lot.is_active]
+    else:
+        lots = []
+        for lot_key in dict.fromkeys(data.lot_keys):
+            lot = crud.get_lot_config(db, lot_key)
+            if not lot:
+                raise HTTPException(status_code=404, detail=f"Lot not found: {lot_key}")
+            lots.append(lot)
+    if not lots:
+        raise HTTPException(status_code=400, detail="Nessun lotto da esportare")
+
+    logger.info(f"Bulk export requested for {len(lots)} lots: {data.formats}")
+    formats = list(dict.fromkeys(data.formats))
+    prof_certs_resources = _prof_certs_resources(db) if "xlsx" in formats else {}
+
+    jobs, skipped = [], {}
+    for lot in lots:
+        try:
+            inputs = _lot_report_inputs(db, lot)
+        except (HTTPException, ValueError) as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            logger.warning(f"Bulk export: lot {lot.name} skipped: {detail}")
+            skipped[lot.name] = detail
+            continue
+        for fmt in formats:
+            kwargs = _lot_report_kwargs(lot, fmt, inputs, prof_certs_resources)
+            jobs.append((_report_filename(lot.name, fmt), fmt, kwargs))
+    return jobs, skipped
+
+
 # --- CERTIFICATE VERIFICATION ENDPOINTS ---
 
 @api_router.get("/verify-certs/status")
@@ -2222,10 +2735,25 @@ def get_cert_verification_status():
         }
 
 
+@api_router.get("/verify-certs/rule-timings")
+def get_cert_rule_timings(limit: Optional[int] = None, reset: bool = False):
+    """
+    Per-rule timing of the OCR text extraction regexes (most expensive first).
+    
+    Counters are process-wide; call with reset=true before a batch to profile it.
+    """
+    from services.cert_extraction_rules import get_rule_timing_report, reset_rule_timings
+    report = get_rule_timing_report(limit)
+    if reset:
+        reset_rule_timings()
+    return {"rules": report}
+
+
 @api_router.post("/verify-certs")
-def verify_certificates(
+async def verify_certificates(
     folder_path: str,
     lot_key: Optional[str] = None,
+    incremental: bool = False,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
@@ -2235,20 +2763,18 @@ def verify_certificates(
     Args:
         folder_path: Absolute path to the folder containing PDF certificates
         lot_key: Optional lot key to get expected cert names from Requisiti Tecnici
+        incremental: Only verify new/changed files, reuse the last result for the others
     
     Returns:
         Verification results with summary and per-file details
     """
-    # Normalize path: strip quotes, expand user, normalize, map /Users/<user>/... -> /host_home/<rest> if exists (Docker)
-    raw_path = folder_path.strip().strip("'").strip('"').strip()
-    normalized_path = os.path.normpath(os.path.expanduser(raw_path)) if raw_path else ""
-    if normalized_path.startswith("/Users/"):
-        parts = normalized_path.split("/", 3)  # ["", "Users", "user", "rest"]
-        if len(parts) >= 4:
-            candidate = "/host_home/" + parts[3]
-            if os.path.exists(candidate):
-                normalized_path = candidate
-    folder_path = normalized_path
+    return await pools["ocr"].run(_verify_certificates, folder_path, lot_key, incremental, db)
+
+
+def _verify_certificates(folder_path: str, lot_key: Optional[str], incremental: bool, db: Session):
+    # Normalize path: strip quotes, expand user, map /Users/<user>/... -> /host_home/<rest> (Docker)
+    from services.cert_verification_service import normalize_folder_path
+    folder_path = normalize_folder_path(folder_path)
     
     logger.info(f"Certificate verification requested for folder: {folder_path}, lot_key: {lot_key}")
     
@@ -2270,7 +2796,11 @@ def verify_certificates(
         vendors = CertVerificationService.load_vendors_from_db(db)
         settings = CertVerificationService.load_settings_from_db(db)
         service = CertVerificationService(vendors=vendors, settings=settings)
-        results = service.verify_folder(folder_path, req_filter=None)
+        manifest = None
+        if incremental and os.path.isdir(folder_path):
+            from services.cert_manifest_service import FolderManifest
+            manifest = FolderManifest(db, folder_path, service.config_fingerprint())
+        results = service.verify_folder(folder_path, req_filter=None, manifest=manifest)
         
         # Enrich results with expected cert names from lot config
         if expected_certs_map and results.get("results"):
@@ -2308,26 +2838,21 @@ def verify_certificates(
 def verify_certificates_stream(
     folder_path: str,
     lot_key: Optional[str] = None,
+    incremental: bool = False,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
     """
     Stream certificate verification progress using Server-Sent Events (SSE).
     Sends progress events for each file processed, then a final 'done' event with complete results.
+    With `incremental`, unchanged files reuse their last result (progress events carry `cached`).
     """
     import json
     from pathlib import Path
     
-    # Normalize path (same as regular endpoint)
-    raw_path = folder_path.strip().strip("'").strip('"').strip()
-    normalized_path = os.path.normpath(os.path.expanduser(raw_path)) if raw_path else ""
-    if normalized_path.startswith("/Users/"):
-        parts = normalized_path.split("/", 3)
-        if len(parts) >= 4:
-            candidate = "/host_home/" + parts[3]
-            if os.path.exists(candidate):
-                normalized_path = candidate
-    folder_path = normalized_path
+    # Normalize path: strip quotes, expand user, map /Users/<user>/... -> /host_home/<rest> (Docker)
+    from services.cert_verification_service import normalize_folder_path
+    folder_path = normalize_folder_path(folder_path)
     
     # Build expected_certs_map from lot config
     expected_certs_map = {}
@@ -2335,13 +2860,16 @@ def verify_certificates_stream(
         expected_certs_map = _build_expected_certs_map(crud.get_lot_config(db, lot_key))
     
     # Load vendors and settings from DB before generator (captured in closure)
-    from services.cert_verification_service import CertVerificationService, OCR_AVAILABLE
+    from services.cert_verification_service import (
+        CertVerificationService, OCR_AVAILABLE, find_pdf_files, summarize_results
+    )
     vendors = CertVerificationService.load_vendors_from_db(db)
     settings = CertVerificationService.load_settings_from_db(db)
     
     def generate():
         cancelled = False
         results = []  # Initialize early for GeneratorExit handling
+        manifest = manifest_db = None
         try:
             if not OCR_AVAILABLE:
                 yield f"data: {json.dumps({'type': 'error', 'message': 'OCR not available'})}\n\n"
@@ -2353,7 +2881,7 @@ def verify_certificates_stream(
                 return
             
             # Find all PDFs
-            pdf_files = list(folder.rglob("*.pdf")) + list(folder.rglob("*.PDF"))
+            pdf_files = find_pdf_files(folder)
             total = len(pdf_files)
             
             if total == 0:
@@ -2364,14 +2892,17 @@ def verify_certificates_stream(
             yield f"data: {json.dumps({'type': 'start', 'total': total})}\n\n"
             
             service = CertVerificationService(vendors=vendors, settings=settings)
+            if incremental:
+                from services.cert_manifest_service import FolderManifest
+                manifest_db = SessionLocal()
+                manifest = FolderManifest(manifest_db, folder_path, service.config_fingerprint())
             
             for i, pdf_path in enumerate(pdf_files):
-                # Send progress update
-                yield f"data: {json.dumps({'type': 'progress', 'current': i + 1, 'total': total, 'filename': pdf_path.name})}\n\n"
+                # Process file (or reuse its last result in incremental mode)
+                result_dict, cached = service.verify_certificate_cached(pdf_path, manifest)
                 
-                # Process file
-                result = service.verify_certificate(str(pdf_path))
-                result_dict = result.to_dict()
+                # Send progress update
+                yield f"data: {json.dumps({'type': 'progress', 'current': i + 1, 'total': total, 'filename': pdf_path.name, 'cached': cached})}\n\n"
                 
                 # Store relative path from folder root for retry support
                 try:
@@ -2387,32 +2918,7 @@ def verify_certificates_stream(
                 
                 results.append(result_dict)
             
-            # Build summary
-            summary = {
-                "total": len(results),
-                "valid": sum(1 for r in results if r["status"] == "valid"),
-                "expired": sum(1 for r in results if r["status"] == "expired"),
-                "mismatch": sum(1 for r in results if r["status"] == "mismatch"),
-                "unreadable": sum(1 for r in results if r["status"] == "unreadable"),
-                "error": sum(1 for r in results if r["status"] == "error"),
-                "by_requirement": {},
-                "by_resource": {},
-            }
-            
-            for r in results:
-                req = r["req_code"]
-                if req not in summary["by_requirement"]:
-                    summary["by_requirement"][req] = {"total": 0, "valid": 0}
-                summary["by_requirement"][req]["total"] += 1
-                if r["status"] == "valid":
-                    summary["by_requirement"][req]["valid"] += 1
-                    
-                res = r["resource_name"]
-                if res not in summary["by_resource"]:
-                    summary["by_resource"][res] = {"total": 0, "valid": 0}
-                summary["by_resource"][res]["total"] += 1
-                if r["status"] == "valid":
-                    summary["by_resource"][res]["valid"] += 1
+            summary = summarize_results(results)
             
             final_result = {
                 "success": True,
@@ -2420,6 +2926,8 @@ def verify_certificates_stream(
                 "results": results,
                 "summary": summary
             }
+            if manifest is not None:
+                final_result["incremental"] = {**manifest.stats(), "removed": manifest.prune()}
             
             yield f"data: {json.dumps({'type': 'done', 'results': final_result})}\n\n"
             
@@ -2431,11 +2939,15 @@ def verify_certificates_stream(
             logger.error(f"Streaming cert verification error: {e}", exc_info=True)
             yield f"data: {json.dumps({'type': 'error', 'message': 'Certificate verification failed'})}\n\n"
         finally:
+            if manifest_db is not None:
+                manifest_db.close()
             if cancelled:
                 logger.debug("SSE stream cancelled by client")
     
-    return StreamingResponse(
-        generate(),
+    # The whole verification holds one slot of the OCR pool; 429 when it is full
+    slot = pools["ocr"].reserve()
+    return pools["ocr"].stream(
+        generate(), slot,
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -2445,8 +2957,105 @@ def verify_certificates_stream(
     )
 
 
+@api_router.post("/verify-certs/reconcile")
+def reconcile_certificates(data: schemas.CertReconcileRequest, db: Session = Depends(get_db)):
+    """
+    Reconcile a batch of verified certificates with every lot's resource requirements.
+    
+    Each result is matched (fuzzy, trigram index) to the master/selected professional
+    certifications; per requirement the response reports the resources holding
+    valid matching certificates and the R / C values that can be claimed.
+    """
+    from services.cert_reconciliation_service import reconcile_results
+    
+    results = _cert_results_for(db, data.job_id, data.results)
+    return reconcile_results(db, results, data.lot_keys)
+
+
+def _cert_results_for(db: Session, job_id: Optional[str], results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Verification results of a stored job, or the inline results when no job is given."""
+    if not job_id:
+        return results
+    from services.cert_job_service import job_results
+    job = crud.get_cert_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_results(db, job)
+
+
+def _state_calculate_request(
+    lot: models.LotConfigModel,
+    state: Dict[str, Any],
+    tech_inputs: Dict[str, Any],
+    base_amount: Optional[float] = None,
+) -> schemas.CalculateRequest:
+    """CalculateRequest for a lot state (as saved by POST /lots/{lot_key}/state)."""
+    return schemas.CalculateRequest(
+        lot_key=lot.name,
+        base_amount=base_amount or lot.base_amount,
+        competitor_discount=state.get("competitor_discount", 30.0),
+        my_discount=state.get("my_discount", 0.0),
+        company_certs_status=state.get("company_certs") or {},
+        tech_inputs=[
+            schemas.TechInput(req_id=req_id, **{k: v for k, v in (value or {}).items() if k != "req_id"})
+            for req_id, value in tech_inputs.items()
+        ],
+    )
+
+
+@api_router.post("/verify-certs/score")
+def score_verified_certificates(data: schemas.CertScoringRequest, db: Session = Depends(get_db)):
+    """
+    Turn a verification run into tech_inputs for a lot and score them.
+    
+    Resource requirements get R / C from the reconciled certificates (respecting
+    prof_R, prof_C, max_res, max_certs); the other inputs come from the saved
+    state. Both the saved and the proposed inputs are scored so the response
+    carries the delta. With apply=true the proposed tech_inputs are saved.
+    """
+    from services.cert_reconciliation_service import coverage_to_tech_inputs, reconcile_results
+    
+    lot = crud.get_lot_config(db, data.lot_key)
+    if not lot:
+        raise HTTPException(status_code=404, detail="Lot not found")
+    
+    results = _cert_results_for(db, data.job_id, data.results)
+    coverage = reconcile_results(db, results, [lot.name])["lots"][lot.name]["requirements"]
+    
+    state = dict(lot.state or {})
+    saved_inputs = state.get("tech_inputs") or {}
+    tech_inputs = coverage_to_tech_inputs(coverage, saved_inputs, lot.reqs or [])
+    
+    saved = calculate_score(_state_calculate_request(lot, state, saved_inputs), db)
+    proposed = calculate_score(_state_calculate_request(lot, state, tech_inputs), db)
+    
+    score_keys = ("technical_score", "total_score", "raw_technical_score", "category_resource")
+    delta = {key: round(proposed[key] - saved[key], 2) for key in score_keys}
+    delta["weighted_scores"] = {
+        req_id: round(score - saved["weighted_scores"].get(req_id, 0.0), 2)
+        for req_id, score in proposed["weighted_scores"].items()
+        if score != saved["weighted_scores"].get(req_id, 0.0)
+    }
+    
+    if data.apply:
+        state["tech_inputs"] = tech_inputs
+        lot.state = state
+        db.commit()
+        logger.info(f"Verified certificates applied to lot state: {lot.name}")
+    
+    return {
+        "lot_key": lot.name,
+        "applied": data.apply,
+        "coverage": coverage,
+        "tech_inputs": tech_inputs,
+        "saved": saved,
+        "proposed": proposed,
+        "delta": delta,
+    }
+
+
 @api_router.post("/verify-certs/single")
-def verify_single_certificate(pdf_path: str, db: Session = Depends(get_db)):
+async def verify_single_certificate(pdf_path: str, db: Session = Depends(get_db)):
     """
     Verify a single PDF certificate using OCR.
 
@@ -2458,6 +3067,10 @@ def verify_single_certificate(pdf_path: str, db: Session = Depends(get_db)):
     Returns:
         Verification result with extracted data
     """
+    return await pools["ocr"].run(_verify_single_certificate, pdf_path, db)
+
+
+def _verify_single_certificate(pdf_path: str, db: Session):
     logger.info("Single certificate verification requested")
 
     # Confine to the upload/extraction area (cert ZIPs extract under tempdir).
@@ -2495,6 +3108,35 @@ def verify_single_certificate(pdf_path: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Certificate verification failed")
 
 
+def _open_cert_zip(upload: UploadFile):
+    """
+    Open an uploaded certificate ZIP in place and list its PDF members.
+    
+    The archive is read straight from the upload's spooled file: nothing is
+    copied or extracted up front. Form files stay open until the response has
+    been sent, so streaming responses can keep reading members.
+    """
+    from services.cert_verification_service import zip_pdf_members
+    
+    try:
+        zip_ref = zipfile.ZipFile(upload.file, 'r')
+    except zipfile.BadZipFile:
+        raise HTTPException(
+            status_code=400,
+            detail="Il file ZIP non è valido o è corrotto"
+        )
+    try:
+        members = zip_pdf_members(zip_ref)
+    except ValueError:
+        zip_ref.close()
+        # Security: reject archives with path traversal entries
+        raise HTTPException(
+            status_code=400,
+            detail="ZIP file contains unsafe paths"
+        )
+    return zip_ref, members
+
+
 @api_router.post("/verify-certs/upload")
 async def verify_certs_upload(
     file: UploadFile = File(...),
@@ -2506,7 +3148,8 @@ async def verify_certs_upload(
     Verify certificates from an uploaded ZIP file.
     
     The ZIP can contain PDF files directly or a folder structure with PDFs.
-    Files are extracted to a temporary directory, processed, then cleaned up.
+    PDFs are read from the archive one at a time and verified by a small
+    pool of OCR workers; the archive itself is never extracted.
     
     Args:
         file: ZIP file containing PDF certificates
@@ -2526,7 +3169,9 @@ async def verify_certs_upload(
         )
     
     try:
-        from services.cert_verification_service import CertVerificationService, OCR_AVAILABLE
+        from services.cert_verification_service import (
+            CertVerificationService, OCR_AVAILABLE, summarize_results
+        )
         
         if not OCR_AVAILABLE:
             raise HTTPException(
@@ -2534,49 +3179,8 @@ async def verify_certs_upload(
                 detail="OCR dependencies not available on this server"
             )
         
-        # Create temporary directory for extraction
-        temp_dir = tempfile.mkdtemp(prefix="cert_verify_")
-        logger.info(f"Created temp directory: {temp_dir}")
-        
-        try:
-            # Save uploaded file to temp location
-            zip_path = os.path.join(temp_dir, "upload.zip")
-            with open(zip_path, "wb") as f:
-                content = await file.read()
-                f.write(content)
-            
-            # Extract ZIP
-            extract_dir = os.path.join(temp_dir, "extracted")
-            os.makedirs(extract_dir, exist_ok=True)
-            
-            try:
-                with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                    # Security: check for path traversal attacks
-                    for member in zip_ref.namelist():
-                        if not _zip_member_is_safe(extract_dir, member):
-                            raise HTTPException(
-                                status_code=400,
-                                detail="ZIP file contains unsafe paths"
-                            )
-                    zip_ref.extractall(extract_dir)
-            except zipfile.BadZipFile:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Il file ZIP non è valido o è corrotto"
-                )
-            
-            # Remove __MACOSX folder if present (macOS artifact)
-            macosx_dir = os.path.join(extract_dir, "__MACOSX")
-            if os.path.exists(macosx_dir):
-                shutil.rmtree(macosx_dir)
-            
-            # Check if there's a single folder inside, if so use that as root
-            items = [f for f in os.listdir(extract_dir) if not f.startswith('.')]
-            if len(items) == 1:
-                single_item = os.path.join(extract_dir, items[0])
-                if os.path.isdir(single_item):
-                    extract_dir = single_item
-            
+        zip_ref, members = _open_cert_zip(file)
+        with zip_ref:
             # Load vendors and settings from database
             vendors = CertVerificationService.load_vendors_from_db(db)
             settings = CertVerificationService.load_settings_from_db(db)
@@ -2587,29 +3191,31 @@ async def verify_certs_upload(
             if lot_key:
                 expected_certs_map = _build_expected_certs_map(crud.get_lot_config(db, lot_key))
             
-            # Verify folder
-            result = service.verify_folder(extract_dir, req_filter=req_filter)
-            
-            # Enrich results with expected cert names
-            if expected_certs_map and result.get("results"):
-                for r in result["results"]:
-                    req_code = r.get("req_code", "")
-                    if req_code in expected_certs_map:
-                        r["expected_cert_names"] = expected_certs_map[req_code]
-            
-            # Add upload info to result
-            result["upload_filename"] = file.filename
+            def verify_all():
+                return sorted(service.verify_zip(zip_ref, members), key=lambda item: item[0])
             
-            logger.info(f"ZIP verification complete: {result.get('summary', {}).get('total', 0)} files processed")
-            return result
-            
-        finally:
-            # Always cleanup temp directory
-            try:
-                shutil.rmtree(temp_dir)
-                logger.info(f"Cleaned up temp directory: {temp_dir}")
-            except Exception as cleanup_err:
-                logger.warning(f"Failed to cleanup temp directory {temp_dir}: {cleanup_err}")
+            results = []
+            for _, _, result_dict in await pools["ocr"].run(verify_all):
+                # Apply filter
+                if req_filter and result_dict.get("req_code") != req_filter:
+                    continue
+                # Enrich results with expected cert names
+                req_code = result_dict.get("req_code", "")
+                if req_code in expected_certs_map:
+                    result_dict["expected_cert_names"] = expected_certs_map[req_code]
+                results.append(result_dict)
+        
+        result = {
+            "success": True,
+            "upload_filename": file.filename,
+            "results": results,
+            "summary": summarize_results(results),
+        }
+        if not members:
+            result["warning"] = "No PDF files found in ZIP"
+        
+        logger.info(f"ZIP verification complete: {len(results)} files processed")
+        return result
     
     except HTTPException:
         raise
@@ -2631,6 +3237,7 @@ async def verify_certs_upload_stream(
     Verify certificates from uploaded ZIP with streaming progress (SSE).
     
     Returns Server-Sent Events with progress updates during processing.
+    Progress is reported as each PDF finishes; OCR workers run in parallel.
     """
     logger.info(f"ZIP upload streaming verification: {file.filename}")
     
@@ -2642,7 +3249,9 @@ async def verify_certs_upload_stream(
         )
     
     try:
-        from services.cert_verification_service import CertVerificationService, OCR_AVAILABLE
+        from services.cert_verification_service import (
+            CertVerificationService, OCR_AVAILABLE, summarize_results
+        )
         
         if not OCR_AVAILABLE:
             raise HTTPException(
@@ -2652,8 +3261,7 @@ async def verify_certs_upload_stream(
     except ImportError:
         raise HTTPException(status_code=503, detail="OCR dependencies not available")
 
-    # Read file content upfront (can't read inside generator)
-    file_content = await file.read()
+    zip_ref, members = _open_cert_zip(file)
     upload_filename = file.filename
     
     # Load DB data upfront
@@ -2665,51 +3273,13 @@ async def verify_certs_upload_stream(
         expected_certs_map = _build_expected_certs_map(crud.get_lot_config(db, lot_key))
     
     import json
-    from pathlib import Path
     
     def generate():
-        temp_dir = None
         results = []
         cancelled = False
         
         try:
-            # Create temp directory
-            temp_dir = tempfile.mkdtemp(prefix="cert_verify_stream_")
-            
-            # Save and extract ZIP
-            zip_path = os.path.join(temp_dir, "upload.zip")
-            with open(zip_path, "wb") as f:
-                f.write(file_content)
-            
-            extract_dir = os.path.join(temp_dir, "extracted")
-            os.makedirs(extract_dir)
-            
-            try:
-                with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                    for member in zip_ref.namelist():
-                        if not _zip_member_is_safe(extract_dir, member):
-                            yield f"data: {json.dumps({'type': 'error', 'message': 'ZIP contains unsafe paths'})}\n\n"
-                            return
-                    zip_ref.extractall(extract_dir)
-            except zipfile.BadZipFile:
-                yield f"data: {json.dumps({'type': 'error', 'message': 'Invalid or corrupted ZIP file'})}\n\n"
-                return
-            
-            # Remove macOS artifacts
-            macosx_dir = os.path.join(extract_dir, "__MACOSX")
-            if os.path.exists(macosx_dir):
-                shutil.rmtree(macosx_dir)
-            
-            # Check for single root folder
-            items = [f for f in os.listdir(extract_dir) if not f.startswith('.')]
-            if len(items) == 1:
-                single_item = os.path.join(extract_dir, items[0])
-                if os.path.isdir(single_item):
-                    extract_dir = single_item
-            
-            folder = Path(extract_dir)
-            pdf_files = list(folder.rglob("*.pdf")) + list(folder.rglob("*.PDF"))
-            total = len(pdf_files)
+            total = len(members)
             
             if total == 0:
                 yield f"data: {json.dumps({'type': 'done', 'results': {'success': True, 'warning': 'No PDF files found in ZIP', 'results': [], 'summary': {'total': 0}}})}\n\n"
@@ -2719,12 +3289,13 @@ async def verify_certs_upload_stream(
             
             service = CertVerificationService(vendors=vendors, settings=settings)
             
-            for i, pdf_path in enumerate(pdf_files):
-                yield f"data: {json.dumps({'type': 'progress', 'current': i + 1, 'total': total, 'filename': pdf_path.name})}\n\n"
-                
-                result = service.verify_certificate(str(pdf_path))
-                result_dict = result.to_dict()
-                
+            completed = []
+            for index, filename, result_dict in service.verify_zip(zip_ref, members):
+                yield f"data: {json.dumps({'type': 'progress', 'current': len(completed) + 1, 'total': total, 'filename': os.path.basename(filename)})}\n\n"
+                completed.append((index, result_dict))
+            
+            # Report in archive order, as the folder endpoints do
+            for _, result_dict in sorted(completed, key=lambda item: item[0]):
                 req_code = result_dict.get("req_code", "")
                 if req_code and req_code in expected_certs_map:
                     result_dict["expected_cert_names"] = expected_certs_map[req_code]
@@ -2735,32 +3306,7 @@ async def verify_certs_upload_stream(
                 
                 results.append(result_dict)
             
-            # Build summary
-            summary = {
-                "total": len(results),
-                "valid": sum(1 for r in results if r["status"] == "valid"),
-                "expired": sum(1 for r in results if r["status"] == "expired"),
-                "mismatch": sum(1 for r in results if r["status"] == "mismatch"),
-                "unreadable": sum(1 for r in results if r["status"] == "unreadable"),
-                "error": sum(1 for r in results if r["status"] == "error"),
-                "by_requirement": {},
-                "by_resource": {},
-            }
-            
-            for r in results:
-                req = r["req_code"]
-                if req not in summary["by_requirement"]:
-                    summary["by_requirement"][req] = {"total": 0, "valid": 0}
-                summary["by_requirement"][req]["total"] += 1
-                if r["status"] == "valid":
-                    summary["by_requirement"][req]["valid"] += 1
-                
-                res = r["resource_name"]
-                if res not in summary["by_resource"]:
-                    summary["by_resource"][res] = {"total": 0, "valid": 0}
-                summary["by_resource"][res]["total"] += 1
-                if r["status"] == "valid":
-                    summary["by_resource"][res]["valid"] += 1
+            summary = summarize_results(results)
             
             final_result = {
                 "success": True,
@@ -2773,22 +3319,24 @@ async def verify_certs_upload_stream(
             
         except GeneratorExit:
             cancelled = True
-            logger.info(f"SSE client disconnected during ZIP verification (processed {len(results)} files)")
+            logger.info(f"SSE client disconnected during ZIP verification of {upload_filename}")
         except Exception as e:
             logger.error(f"Streaming ZIP verification error: {e}", exc_info=True)
             yield f"data: {json.dumps({'type': 'error', 'message': 'Certificate verification failed'})}\n\n"
         finally:
-            # Cleanup temp directory
-            if temp_dir:
-                try:
-                    shutil.rmtree(temp_dir)
-                except Exception as e:
-                    logger.debug(f"Failed to clean up temp dir {temp_dir}: {e}")
+            zip_ref.close()
             if cancelled:
                 logger.debug("SSE stream cancelled by client")
     
-    return StreamingResponse(
-        generate(),
+    # The whole verification holds one slot of the OCR pool; 429 when it is full
+    try:
+        slot = pools["ocr"].reserve()
+    except PoolSaturated:
+        zip_ref.close()
+        raise
+    
+    return pools["ocr"].stream(
+        generate(), slot,
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -2805,7 +3353,7 @@ def get_vendor_configs(
     enabled_only: bool = False,
     skip: int = 0,
     limit: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all vendor configurations for certificate verification with optional pagination."""
     vendors = crud.get_vendor_configs(db, enabled_only=enabled_only, skip=skip, limit=limit)
@@ -2822,7 +3370,7 @@ def get_vendor_configs(
 
 
 @api_router.get("/vendor-configs/{key}", response_model=schemas.VendorConfig)
-def get_vendor_config(key: str, db: Session = Depends(get_db)):
+def get_vendor_config(key: str, db: Session = Depends(get_read_db)):
     """Get a specific vendor configuration."""
     vendor = crud.get_vendor_config(db, key.lower())
     if not vendor:
@@ -2878,14 +3426,14 @@ def delete_vendor_config(key: str, db: Session = Depends(get_db)):
 # --- OCR SETTINGS ENDPOINTS ---
 
 @api_router.get("/ocr-settings", response_model=List[schemas.OCRSetting])
-def get_ocr_settings(db: Session = Depends(get_db)):
+def get_ocr_settings(db: Session = Depends(get_read_db)):
     """Get all OCR settings."""
     settings = crud.get_ocr_settings(db)
     return [schemas.OCRSetting(key=s.key, value=s.value, description=s.description) for s in settings]
 
 
 @api_router.get("/ocr-settings/{key}", response_model=schemas.OCRSetting)
-def get_ocr_setting(key: str, db: Session = Depends(get_db)):
+def get_ocr_setting(key: str, db: Session = Depends(get_read_db)):
     """Get a specific OCR setting."""
     setting = crud.get_ocr_setting(db, key)
     if not setting:
@@ -2910,7 +3458,7 @@ def delete_ocr_setting(key: str, db: Session = Depends(get_db)):
 
 
 @api_router.get("/cert-verification-config", response_model=schemas.CertVerificationConfig)
-def get_cert_verification_config(db: Session = Depends(get_db)):
+def get_cert_verification_config(db: Session = Depends(get_read_db)):
     """Get complete certificate verification configuration (vendors + settings)."""
     vendors = crud.get_vendor_configs(db)
     settings = crud.get_ocr_settings(db)
@@ -2936,7 +3484,7 @@ bp_router = APIRouter(prefix="/api/business-plan", tags=["Business Plan"])
 
 
 @bp_router.get("/{lot_key}", response_model=Optional[schemas.BusinessPlanResponse])
-def get_business_plan(lot_key: str, db: Session = Depends(get_db)):
+def get_business_plan(lot_key: str, db: Session = Depends(get_read_db)):
     """Get business plan for a lot"""
     lot = crud.get_lot_config(db, lot_key)
     if not lot:
@@ -3127,7 +3675,7 @@ def calculate_business_plan(
 
 
 @bp_router.get("/{lot_key}/scenarios")
-def get_business_plan_scenarios(lot_key: str, db: Session = Depends(get_db)):
+def get_business_plan_scenarios(lot_key: str, db: Session = Depends(get_read_db)):
     """Generate 3 scenarios (Conservative/Balanced/Aggressive) for a business plan"""
     bp = crud.get_business_plan(db, lot_key)
     if not bp:
@@ -3222,7 +3770,7 @@ def get_business_plan_scenarios(lot_key: str, db: Session = Depends(get_db)):
 def find_discount_for_target(
     lot_key: str,
     target_margin: float = 15.0,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Find the discount needed to reach a target margin"""
     bp = crud.get_business_plan(db, lot_key)
@@ -3310,31 +3858,39 @@ def find_discount_for_target(
 
 
 @bp_router.post("/export-excel")
-def export_business_plan_excel(data: schemas.ExportBusinessPlanRequest, db: Session = Depends(get_db)):
+async def export_business_plan_excel(data: schemas.ExportBusinessPlanRequest, db: Session = Depends(get_db)):
     """
     Export Business Plan comprehensive Excel report with multiple sheets,
     formulas, conditional formatting, and validations.
     """
+    return await pools["export"].run(_export_business_plan_excel, data)
+
+
+def _export_business_plan_excel(data: schemas.ExportBusinessPlanRequest):
     logger.info(f"Business Plan Excel export requested for lot: {data.lot_key}")
 
-    # Generate Excel report
+    # Generate Excel report (spooled to disk when large, then streamed in chunks)
+    output = spooled_output()
     try:
-        buffer = generate_business_plan_excel(
-            lot_key=data.lot_key,
-            business_plan=data.business_plan,
-            costs=data.costs,
-            clean_team_cost=data.clean_team_cost,
-            base_amount=data.base_amount,
-            is_rti=data.is_rti,
-            quota_lutech=data.quota_lutech,
-            scenarios=data.scenarios,
-            tow_breakdown=data.tow_breakdown,
-            profile_rates=data.profile_rates,
-            profile_labels=data.profile_labels,
-            intervals=data.intervals,
-            lutech_breakdown=data.lutech_breakdown,
-        )
+        with metrics.timed("report", "business_plan_xlsx"):
+            buffer = generate_business_plan_excel(
+                lot_key=data.lot_key,
+                business_plan=data.business_plan,
+                costs=data.costs,
+                clean_team_cost=data.clean_team_cost,
+                base_amount=data.base_amount,
+                is_rti=data.is_rti,
+                quota_lutech=data.quota_lutech,
+                scenarios=data.scenarios,
+                tow_breakdown=data.tow_breakdown,
+                profile_rates=data.profile_rates,
+                profile_labels=data.profile_labels,
+                intervals=data.intervals,
+                lutech_breakdown=data.lutech_breakdown,
+                output=output,
+            )
     except Exception as e:
+        output.close()
         logger.error(f"Error generating Business Plan Excel: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Errore nella generazione dell'Excel")
 
@@ -3344,22 +3900,15 @@ def export_business_plan_excel(data: schemas.ExportBusinessPlanRequest, db: Sess
     safe_lot_key = data.lot_key.replace(' ', '_').replace('/', '_')
     filename = f"business_plan_{safe_lot_key}.xlsx"
 
-    return StreamingResponse(
-        buffer,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}",
-            "Access-Control-Expose-Headers": "Content-Disposition",
-        },
-    )
+    return attachment_response(buffer, filename)
 
 
 @api_router.post("/business-plan-export")
-def export_business_plan_excel_alias(data: schemas.ExportBusinessPlanRequest, db: Session = Depends(get_db)):
+async def export_business_plan_excel_alias(data: schemas.ExportBusinessPlanRequest, db: Session = Depends(get_db)):
     """
     Alias for Business Plan Excel export to avoid router issues.
     """
-    return export_business_plan_excel(data, db)
+    return await export_business_plan_excel(data, db)
 
 
 @bp_router.post("/{lot_key}/import")
@@ -3437,7 +3986,7 @@ practice_router = APIRouter(prefix="/api/practices", tags=["Practices"])
 
 
 @practice_router.get("/", response_model=List[schemas.PracticeResponse])
-def get_practices(db: Session = Depends(get_db)):
+def get_practices(db: Session = Depends(get_read_db)):
     """Get all practices"""
     return crud.get_practices(db)
 
@@ -3452,7 +4001,7 @@ def create_practice(data: schemas.PracticeCreate, db: Session = Depends(get_db))
 
 
 @practice_router.get("/{practice_id}", response_model=schemas.PracticeResponse)
-def get_practice(practice_id: str, db: Session = Depends(get_db)):
+def get_practice(practice_id: str, db: Session = Depends(get_read_db)):
     """Get a specific practice"""
     practice = crud.get_practice(db, practice_id)
     if not practice:
@@ -3638,6 +4187,7 @@ async def chat(
 
 # Register all routers - included early for priority
 app.include_router(config_validation_router)
+app.include_router(cert_jobs_router)
 app.include_router(api_router)
 app.include_router(bp_router)
 app.include_router(practice_router)
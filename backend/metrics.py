@@ -0,0 +1,402 @@
+"""
+Metrics
+Process-wide counters, gauges and histograms rendered in the Prometheus text
+exposition format: request latency per route, DB queries per request, stage
+timers of the hot paths and cache hit ratios
+
+With several gunicorn workers (METRICS_MULTIPROC_DIR set), each worker
+periodically writes its values to a file in that directory and a scrape,
+whichever worker serves it, sums the counters and histograms of all workers
+(exited ones included, so totals never go back) and reports the live gauges of
+the running workers with a `pid` label.
+"""
+
+import abc
+import atexit
+import bisect
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+# Seconds: from a cached score (~1ms) to a large Excel export or OCR batch
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+# Shared by the gunicorn workers of one instance; startup.sh empties it before they start
+MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR") or None
+# How stale another worker's values can be in a scrape
+SNAPSHOT_SECONDS = float(os.getenv("METRICS_SNAPSHOT_SECONDS", "5"))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_sample(name: str, labels: Dict[str, str], value: float) -> str:
+    if labels:
+        rendered = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+        name = f"{name}{{{rendered}}}"
+    if value == float("inf"):
+        return f"{name} +Inf"
+    return f"{name} {value:.10g}"
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else f"{bound:.10g}"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class _Metric(abc.ABC):
+    kind = "untyped"
+    # Summed across workers; otherwise reported per worker with a `pid` label
+    aggregate = True
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abc.abstractmethod
+    def samples(self) -> List[Sample]:
+        """Current values, as (sample name, labels, value)."""
+
+    def render(self, samples: Optional[List[Sample]] = None) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(_format_sample(*sample) for sample in (self.samples() if samples is None else samples))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: Dict[LabelValues, List[float]] = {}  # per-bucket counts, then sum, then count
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return int(series[-1]) if series else 0
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        samples = []
+        for key, series in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_bound(bound)}, cumulative))
+            samples.append((f"{self.name}_sum", labels, series[-2]))
+            samples.append((f"{self.name}_count", labels, series[-1]))
+        return samples
+
+
+class GaugeFamily(_Metric):
+    """Values read at scrape time from `collect()`, e.g. the live state of a pool or cache."""
+
+    aggregate = False
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str],
+        collect: Callable[[], Iterable[Tuple[LabelValues, float]]], kind: str = "gauge",
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self._collect = collect
+
+    def samples(self) -> List[Sample]:
+        return [(self.name, dict(zip(self.labelnames, key)), float(value)) for key, value in self._collect()]
+
+
+def _merge(metric: _Metric, snapshots: List[Tuple[int, Dict[str, List[Sample]]]]) -> List[Sample]:
+    """One metric's samples across the workers' snapshots."""
+    if metric.aggregate:
+        totals: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        labels_of: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Dict[str, str]] = {}
+        for _, snapshot in snapshots:
+            for name, labels, value in snapshot.get(metric.name, ()):
+                key = (name, tuple(labels.items()))
+                totals[key] = totals.get(key, 0.0) + value
+                labels_of.setdefault(key, labels)
+        return [(name, labels_of[(name, labels)], value) for (name, labels), value in totals.items()]
+    return [
+        (name, {**labels, "pid": str(pid)}, value)
+        for pid, snapshot in snapshots if _pid_alive(pid)
+        for name, labels, value in snapshot.get(metric.name, ())
+    ]
+
+
+class Registry:
+    def __init__(self, multiprocess_dir: Optional[str] = None):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self.multiprocess_dir = multiprocess_dir
+        self._snapshot_thread: Optional[threading.Thread] = None
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge_family(
+        self, name: str, documentation: str, labelnames: Sequence[str],
+        collect: Callable[[], Iterable[Tuple[LabelValues, float]]], kind: str = "gauge",
+    ) -> GaugeFamily:
+        return self.register(GaugeFamily(name, documentation, labelnames, collect, kind))
+
+    def _collect(self) -> Dict[str, List[Sample]]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        collected = {}
+        for metric in metrics:
+            try:
+                collected[metric.name] = metric.samples()
+            except Exception:
+                logger.warning(f"Could not collect metric {metric.name}", exc_info=True)
+        return collected
+
+    def write_snapshot(self) -> None:
+        """Write this process's values to `<multiprocess_dir>/<pid>.json` for the other workers."""
+        path = os.path.join(self.multiprocess_dir, f"{os.getpid()}.json")
+        os.makedirs(self.multiprocess_dir, exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self._collect(), f)
+        os.replace(path + ".tmp", path)
+
+    def _read_snapshots(self) -> List[Tuple[int, Dict[str, List[Sample]]]]:
+        snapshots = []
+        for path in sorted(glob.glob(os.path.join(self.multiprocess_dir, "*.json"))):
+            try:
+                pid = int(os.path.basename(path)[:-len(".json")])
+                with open(path, encoding="utf-8") as f:
+                    snapshots.append((pid, json.load(f)))
+            except (ValueError, OSError):
+                logger.warning(f"Skipping unreadable metrics snapshot {path}", exc_info=True)
+        return snapshots
+
+    def start_snapshots(self, interval: float = SNAPSHOT_SECONDS) -> None:
+        """Keep this worker's snapshot fresh (and write a last one at exit); no-op in single-process mode."""
+        if self.multiprocess_dir is None or self._snapshot_thread is not None:
+            return
+
+        def run():
+            while True:
+                try:
+                    self.write_snapshot()
+                except Exception:
+                    logger.warning("Could not write the metrics snapshot", exc_info=True)
+                time.sleep(interval)
+
+        self._snapshot_thread = threading.Thread(target=run, name="metrics-snapshot", daemon=True)
+        self._snapshot_thread.start()
+        atexit.register(self.write_snapshot)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format (version 0.0.4), across workers in multiprocess mode."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        if self.multiprocess_dir is None:
+            collected = self._collect()
+        else:
+            self.write_snapshot()
+            snapshots = self._read_snapshots()
+            collected = {metric.name: _merge(metric, snapshots) for metric in metrics}
+        lines: List[str] = []
+        for metric in metrics:
+            if metric.name in collected:
+                lines.extend(metric.render(collected[metric.name]))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry(MULTIPROC_DIR)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+http_request_duration = REGISTRY.histogram(
+    "simulator_http_request_duration_seconds",
+    "Time until the response headers are sent, per route template",
+    ("method", "route"),
+)
+http_requests = REGISTRY.counter(
+    "simulator_http_requests_total", "HTTP requests per route template and status code",
+    ("method", "route", "status"),
+)
+http_request_db_queries = REGISTRY.histogram(
+    "simulator_http_request_db_queries", "Database queries issued while serving one request",
+    ("method", "route"), buckets=QUERY_COUNT_BUCKETS,
+)
+db_queries = REGISTRY.counter("simulator_db_queries_total", "Database queries issued by the backend")
+stage_duration = REGISTRY.histogram(
+    "simulator_stage_duration_seconds",
+    "Duration of a stage of a hot path (scoring, business plan costs, OCR, report generation)",
+    ("operation", "stage"),
+)
+
+# Per-request DB query counter; a mutable holder so threads running the request's work
+# (which receive a copy of the context) add to the same count
+_request_queries: ContextVar[Optional[List[int]]] = ContextVar("request_queries", default=None)
+
+
+@contextmanager
+def request_scope() -> Iterator[List[int]]:
+    """Count the DB queries issued while the block (and work it hands to threads) runs."""
+    holder = [0]
+    token = _request_queries.set(holder)
+    try:
+        yield holder
+    finally:
+        _request_queries.reset(token)
+
+
+def count_db_query() -> None:
+    db_queries.inc()
+    holder = _request_queries.get()
+    if holder is not None:
+        holder[0] += 1
+
+
+@contextmanager
+def timed(operation: str, stage: str = "total") -> Iterator[None]:
+    """Time a block (or, as a decorator, each call) into the stage histogram."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_duration.observe(time.perf_counter() - start, operation=operation, stage=stage)
+
+
+class StageTimer:
+    """
+    Consecutive stages of one run: each lap() records the time since the
+    previous lap (or the start), and total() the time since the start.
+    """
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.started = self._last = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        now = time.perf_counter()
+        stage_duration.observe(now - self._last, operation=self.operation, stage=stage)
+        self._last = now
+
+    def total(self) -> None:
+        stage_duration.observe(time.perf_counter() - self.started, operation=self.operation, stage="total")
+
+
+def register_caches(caches: Dict[str, object]) -> None:
+    """
+    Export hits/misses of caches that keep `hits` and `misses` counters
+    (score, report, chart caches...). The ratio is computed in PromQL.
+    """
+    def collect(attribute: str):
+        return lambda: [((name,), getattr(cache, attribute)) for name, cache in caches.items()]
+
+    REGISTRY.gauge_family(
+        "simulator_cache_hits_total", "Cache hits since start (or the cache's last clear)", ("cache",),
+        collect("hits"), kind="counter",
+    )
+    REGISTRY.gauge_family(
+        "simulator_cache_misses_total", "Cache misses since start (or the cache's last clear)", ("cache",),
+        collect("misses"), kind="counter",
+    )
+
+
+def _register_process_metrics() -> None:
+    try:
+        import psutil
+    except ImportError:
+        logger.warning("psutil not installed, process metrics not exported")
+        return
+    process = psutil.Process()
+
+    def cpu_seconds():
+        times = process.cpu_times()
+        return [((), times.user + times.system)]
+
+    REGISTRY.gauge_family(
+        "process_resident_memory_bytes", "Resident memory of this worker process", (),
+        lambda: [((), process.memory_info().rss)],
+    )
+    REGISTRY.gauge_family(
+        "process_cpu_seconds_total", "User and system CPU time of this worker process", (), cpu_seconds,
+        kind="counter",
+    )
+    REGISTRY.gauge_family("process_threads", "Threads of this worker process", (), lambda: [((), process.num_threads())])
+
+
+_register_process_metrics()
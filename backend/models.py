@@ -2,9 +2,11 @@
 SQLAlchemy database models for Poste Tender Simulator
 """
 
-from sqlalchemy import Column, String, Float, JSON, Text, Boolean, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, String, Float, JSON, Text, Boolean, Integer, DateTime, ForeignKey, event, inspect
 from sqlalchemy.dialects.sqlite import JSON as SQLiteJSON
+from sqlalchemy.orm import Session, relationship
 from datetime import datetime, timezone
+import copy
 from database import Base
 
 
@@ -17,6 +19,16 @@ class LotConfigModel(Base):
     """
     Database model for Lot Configuration
     Stores all tender lot configurations and their state
+
+    Requirements, company certifications and the simulation state live in
+    child tables (one row per requirement / certification / state entry) and
+    are exposed here as the plain lists and dict the API works with. Assigning
+    them writes only the rows whose content changed, and loading a lot reads
+    each of them only when it is accessed.
+
+    `version` increases with every change to the lot or its rows and guards
+    each UPDATE (optimistic concurrency): a write based on a stale copy fails
+    with StaleDataError instead of overwriting the newer one.
     """
 
     __tablename__ = "lot_configs"
@@ -29,10 +41,17 @@ class LotConfigModel(Base):
     alpha = Column(Float, default=0.3)
     economic_formula = Column(String(50), default="interp_alpha")
 
-    # JSON fields for complex structures
-    company_certs = Column(SQLiteJSON, default=list)
-    reqs = Column(SQLiteJSON, default=list)
-    state = Column(SQLiteJSON, default=dict)
+    requirement_rows = relationship(
+        "LotRequirementModel", order_by="LotRequirementModel.position",
+        cascade="all, delete-orphan", passive_deletes=True,
+    )
+    company_cert_rows = relationship(
+        "LotCompanyCertModel", order_by="LotCompanyCertModel.position",
+        cascade="all, delete-orphan", passive_deletes=True,
+    )
+    state_rows = relationship(
+        "LotStateEntryModel", cascade="all, delete-orphan", passive_deletes=True,
+    )
     
     # RTI (joint venture) configuration
     rti_enabled = Column(Boolean, default=False)
@@ -42,6 +61,153 @@ class LotConfigModel(Base):
     # Active/closed flag for filtering
     is_active = Column(Boolean, default=True)  # True = active, False = closed
 
+    version = Column(Integer, nullable=False, default=1)
+
+    __mapper_args__ = {"version_id_col": version, "version_id_generator": False}
+
+    def bump_version(self) -> None:
+        """Count a change once per flush (new lots start at 1)."""
+        state = inspect(self)
+        if state.persistent and not state.attrs.version.history.has_changes():
+            self.version = (self.version or 0) + 1
+
+    @property
+    def reqs(self) -> list:
+        return [row.data for row in self.requirement_rows]
+
+    @reqs.setter
+    def reqs(self, reqs: list) -> None:
+        self.requirement_rows = _sync_list_rows(
+            self, self.requirement_rows, reqs or [], "id", LotRequirementModel, "req_id"
+        )
+
+    @property
+    def company_certs(self) -> list:
+        return [row.data for row in self.company_cert_rows]
+
+    @company_certs.setter
+    def company_certs(self, company_certs: list) -> None:
+        self.company_cert_rows = _sync_list_rows(
+            self, self.company_cert_rows, company_certs or [], "label", LotCompanyCertModel, "label"
+        )
+
+    @property
+    def state(self) -> dict:
+        state = {}
+        # The item-less row of a field sorts first, so it never overwrites its items
+        for row in sorted(self.state_rows, key=lambda r: (r.field, r.item)):
+            if row.item == "":
+                state[row.field] = row.value
+            else:
+                state.setdefault(row.field, {})[row.item] = row.value
+        return state
+
+    @state.setter
+    def state(self, state: dict) -> None:
+        entries = {}
+        for field, value in (state or {}).items():
+            if field in LotStateEntryModel.ITEM_FIELDS and isinstance(value, dict) and value:
+                entries.update({(field, str(item)): item_value for item, item_value in value.items()})
+            else:
+                entries[(field, "")] = value
+        existing = {(row.field, row.item): row for row in self.state_rows}
+        rows, changed = [], len(existing) != len(entries)
+        for key, value in entries.items():
+            row = existing.get(key)
+            if row is None:
+                row, changed = LotStateEntryModel(field=key[0], item=key[1], value=copy.deepcopy(value)), True
+            elif row.value != value:
+                row.value, changed = copy.deepcopy(value), True
+            rows.append(row)
+        self.state_rows = rows
+        if changed:
+            self.bump_version()
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_modified_lot_versions(session: Session, flush_context, instances) -> None:
+    # Column changes; changes to the child rows are counted by the property setters
+    for obj in session.dirty:
+        if isinstance(obj, LotConfigModel) and session.is_modified(obj, include_collections=False):
+            obj.bump_version()
+
+
+def _sync_list_rows(lot, current: list, items: list, id_field: str, row_model, key_column: str) -> list:
+    """
+    Rows for `items`, reusing the current row of every item whose key is unchanged.
+
+    Only rows whose content or position differ get UPDATEd; rows left out are
+    deleted by the delete-orphan cascade. Items without a usable (unique) key
+    are keyed by position. The lot's version is bumped if anything changed.
+    """
+    existing = {getattr(row, key_column): row for row in current}
+    rows, seen, changed = [], set(), False
+    for position, item in enumerate(items):
+        key = item.get(id_field) if isinstance(item, dict) else None
+        key = str(key) if key not in (None, "") else None
+        if key is None or key in seen or key.startswith("#"):
+            key = f"#{position}"
+        seen.add(key)
+        row = existing.pop(key, None)
+        if row is None:
+            row, changed = row_model(position=position, data=copy.deepcopy(item), **{key_column: key}), True
+        else:
+            if row.data != item:
+                row.data, changed = copy.deepcopy(item), True
+            if row.position != position:
+                row.position, changed = position, True
+        rows.append(row)
+    if changed or existing:
+        lot.bump_version()
+    return rows
+
+
+class LotRequirementModel(Base):
+    """One requirement of a lot, with its criteria"""
+
+    __tablename__ = "lot_requirements"
+
+    lot_name = Column(
+        String(255), ForeignKey("lot_configs.name", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True
+    )
+    req_id = Column(String(255), primary_key=True)  # Requirement "id" ("#<position>" when missing)
+    position = Column(Integer, nullable=False, default=0)
+    data = Column(SQLiteJSON, nullable=False)  # The requirement as the API sees it
+
+
+class LotCompanyCertModel(Base):
+    """One company certification scored by a lot"""
+
+    __tablename__ = "lot_company_certs"
+
+    lot_name = Column(
+        String(255), ForeignKey("lot_configs.name", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True
+    )
+    label = Column(String(255), primary_key=True)  # Certification label ("#<position>" when missing)
+    position = Column(Integer, nullable=False, default=0)
+    data = Column(SQLiteJSON, nullable=False)  # {"label": ..., "points": ...}
+
+
+class LotStateEntryModel(Base):
+    """
+    One entry of a lot's saved simulation state.
+
+    Scalar fields (discounts, competitor scores) get a row each; the per-item
+    maps in ITEM_FIELDS get a row per requirement / certification, so an
+    autosave that changes one input rewrites one row.
+    """
+
+    __tablename__ = "lot_state_entries"
+
+    ITEM_FIELDS = ("tech_inputs", "company_certs")
+
+    lot_name = Column(
+        String(255), ForeignKey("lot_configs.name", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True
+    )
+    field = Column(String(100), primary_key=True)  # e.g. "my_discount", "tech_inputs"
+    item = Column(String(255), primary_key=True, default="")  # Requirement id / cert label; "" for the whole field
+    value = Column(SQLiteJSON, nullable=True)
+
 
 class MasterDataModel(Base):
     """
@@ -213,3 +379,81 @@ class BusinessPlanModel(Base):
 
     # NOTA: I campi tow_costs, tow_prices, total_cost, total_price, margin_pct
     # sono stati rimossi perché ora calcolati dinamicamente da calculate_team_cost()
+
+
+# ============================================================================
+# Certificate Verification Jobs
+# ============================================================================
+
+class CertVerificationJobModel(Base):
+    """
+    Background certificate verification job.
+    Survives client disconnects and server restarts: unfinished jobs are
+    re-queued at startup and skip the files already verified.
+    """
+
+    __tablename__ = "cert_verification_jobs"
+
+    id = Column(String(32), primary_key=True, index=True)  # uuid4 hex
+    status = Column(String(20), default="queued", index=True)  # queued | running | completed | failed | cancelled
+    source_type = Column(String(10), nullable=False)  # "folder" | "zip"
+    source_path = Column(Text, nullable=False)  # Folder to scan, or stored ZIP path
+    source_name = Column(String(500), nullable=True)  # Original folder path / upload filename (display only)
+    lot_key = Column(String(255), nullable=True)
+    req_filter = Column(String(255), nullable=True)
+    # req_id -> expected cert names, snapshot of the lot config at submission
+    expected_certs_map = Column(SQLiteJSON, default=dict)
+    total = Column(Integer, default=0)
+    processed = Column(Integer, default=0)
+    summary = Column(SQLiteJSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_by = Column(String(255), nullable=True)
+    created_at = Column(DateTime, default=utc_now)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class CertVerificationJobFileModel(Base):
+    """Per-file result of a verification job (one row per verified PDF)."""
+
+    __tablename__ = "cert_verification_job_files"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String(32), ForeignKey("cert_verification_jobs.id", ondelete="CASCADE"), nullable=False, index=True)
+    filename = Column(Text, nullable=False)  # Path relative to the job root
+    status = Column(String(20), nullable=True)
+    result = Column(SQLiteJSON, default=dict)  # CertVerificationResult.to_dict() (+ expected_cert_names)
+
+
+class CertVerificationManifestModel(Base):
+    """
+    Last verification result of a certificate file, for incremental folder runs.
+
+    A file is re-verified only when its size/mtime and content hash change, or
+    when the vendor/OCR configuration it was verified with (config_hash) differs.
+    """
+
+    __tablename__ = "cert_verification_manifest"
+
+    path = Column(Text, primary_key=True)  # Absolute (real) path of the PDF
+    size = Column(Integer, nullable=False)
+    mtime = Column(Float, nullable=False)
+    content_hash = Column(String(64), nullable=False)  # sha256 hex
+    config_hash = Column(String(64), nullable=False)
+    result = Column(SQLiteJSON, default=dict)  # CertVerificationResult.to_dict()
+    verified_at = Column(DateTime, default=utc_now, onupdate=utc_now)
+
+
+class DataVersionModel(Base):
+    """
+    Change counter per table, bumped in the same transaction as every ORM write.
+
+    Each worker process keeps its own caches of derived data (e.g. the
+    certificate matcher index); comparing the counter tells it whether
+    another worker changed the underlying rows.
+    """
+
+    __tablename__ = "data_versions"
+
+    scope = Column(String(64), primary_key=True)  # Table name
+    version = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,50 @@
+/**
+ * Runs the frontend Business Plan engine (calculateTeamCost) on parity cases.
+ *
+ * Reads {"repeat": n, "cases": [{id, bp, lutech_rates}]} on stdin and writes
+ * {id: {total, by_tow, by_lutech_profile, seconds}} on stdout, where `seconds`
+ * is the best of `repeat` runs (module loading excluded).
+ * Used by bp_parity.py: `node bp_engine_runner.mjs < cases.json`.
+ */
+import { register } from 'node:module';
+import { performance } from 'node:perf_hooks';
+
+register('./vite_env_hooks.mjs', import.meta.url);
+
+// stdout carries the results: the engine's logging goes to stderr
+console.log = console.info = console.debug = console.error;
+
+const ENGINE = new URL(
+  '../../frontend/src/features/business-plan/utils/businessPlanEngine.js', import.meta.url,
+);
+
+const readStdin = async () => {
+  const chunks = [];
+  for await (const chunk of process.stdin) chunks.push(chunk);
+  return JSON.parse(Buffer.concat(chunks).toString('utf-8'));
+};
+
+const breakdown = (entries) => Object.fromEntries(
+  Object.entries(entries).map(([key, entry]) => [key, { cost: entry.cost, days: entry.days }]),
+);
+
+const { calculateTeamCost } = await import(ENGINE.href);
+const { repeat = 1, cases } = await readStdin();
+
+const results = {};
+for (const { id, bp, lutech_rates: rates } of cases) {
+  let result;
+  let best = Infinity;
+  for (let i = 0; i < Math.max(1, repeat); i++) {
+    const started = performance.now();
+    result = calculateTeamCost(bp, rates, {});
+    best = Math.min(best, performance.now() - started);
+  }
+  results[id] = {
+    total: result.total,
+    by_tow: breakdown(result.byTow),
+    by_lutech_profile: breakdown(result.byLutechProfile),
+    seconds: best / 1000,
+  };
+}
+process.stdout.write(JSON.stringify(results));
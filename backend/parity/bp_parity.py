@@ -0,0 +1,401 @@
+"""
+Business Plan engine parity
+Golden-vector check that the Python team cost engine
+(BusinessPlanService.calculate_team_cost) and the frontend engine
+(businessPlanEngine.js calculateTeamCost) agree on the total, by_tow and
+by_lutech_profile, within rounding tolerance
+
+The corpus (bp_corpus.json) holds randomised Business Plans with the frontend
+engine's results as expected values, so the Python side is checked without
+Node. With Node installed the frontend engine is run live too (offline: the
+sources are loaded straight from frontend/src).
+
+    python -m parity.bp_parity              # compare both engines, print timings
+    python -m parity.bp_parity --write      # regenerate the corpus (needs node)
+
+Unmapped profiles are grouped under "__default__" by the frontend and compared
+against the sum of the Python per-profile entries.
+
+The random cases stay inside the inputs on which the two engines agree. Each
+known difference has a hand-built vector instead (divergence_cases), stored
+with the mismatches it produces: the check fails if a divergence changes or
+disappears, so fixing one means regenerating the corpus.
+- unmapped profiles: the frontend does not apply inflation to their rate;
+- under RTI, a TOW without lutech_pct: the frontend assumes 100%, the backend
+  the lot's quota_lutech;
+- months outside every volume adjustment period: the frontend applies the
+  first period's TOW factors, the backend none;
+- profiles mapped over different periods: the backend splits each member's
+  intervals at every profile's mapping boundaries, the frontend only at the
+  member's own; inflation follows the interval's first month, so an interval
+  crossing a year boundary is escalated differently (and wrongly in both).
+"""
+
+import argparse
+import json
+import logging
+import random
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.business_plan_service import BusinessPlanService
+
+logger = logging.getLogger(__name__)
+
+PARITY_DIR = Path(__file__).resolve().parent
+CORPUS_PATH = PARITY_DIR / "bp_corpus.json"
+RUNNER_PATH = PARITY_DIR / "bp_engine_runner.mjs"
+
+CORPUS_SEED = 20260101
+CORPUS_SIZE = 50
+
+# Both engines round days to 0.01 per interval and profile; the factors are
+# multiplied in a different order, so a value on a .005 boundary can round the
+# other way. Costs follow at the highest daily rate. Logic changes show up far
+# above these bounds.
+DAYS_TOLERANCE = 0.1
+RELATIVE_TOLERANCE = 1e-4
+
+UNMAPPED_KEY = "__default__"
+PRACTICES = ["data_ai", "cloud", "cyber", "dev"]
+SENIORITIES = ["jr", "mid", "sr", "expert"]
+
+
+# --- Corpus ---------------------------------------------------------------------
+
+def _periods(rng: random.Random, duration_months: int, count: int) -> List[Tuple[int, int]]:
+    """`count` consecutive periods covering the whole duration."""
+    cuts = sorted(rng.sample(range(2, duration_months + 1), min(count, duration_months) - 1))
+    return list(zip([1] + cuts, [c - 1 for c in cuts] + [duration_months]))
+
+
+def _mix(rng: random.Random, lutech_profiles: List[str]) -> List[Dict[str, Any]]:
+    chosen = rng.sample(lutech_profiles, rng.randint(1, 3))
+    weights = [rng.randint(1, 10) for _ in chosen]
+    pcts = [round(100 * w / sum(weights), 2) for w in weights]
+    pcts[-1] = round(100 - sum(pcts[:-1]), 2)
+    return [{"lutech_profile": lid, "pct": pct} for lid, pct in zip(chosen, pcts)]
+
+
+def generate_case(rng: random.Random, case_id: str) -> Dict[str, Any]:
+    """One randomised Business Plan, in the API format (decimal percentages)."""
+    duration_months = rng.choice([6, 12, 18, 24, 36, 48, 60, 72])
+    is_rti = rng.random() < 0.5
+    inflation_pct = rng.choice([0.0, 0.0, 1.5, 2.0, 3.0])
+    lutech_profiles = [f"{p}:{s}" for p in PRACTICES for s in SENIORITIES]
+    lutech_rates = {lid: float(rng.randint(200, 800)) for lid in lutech_profiles}
+    tow_ids = [f"TOW_{i}" for i in range(rng.randint(1, 5))]
+    poste_profiles = [f"P{i:02d}" for i in range(rng.randint(1, 8))]
+
+    team = []
+    for i in range(rng.randint(1, 12)):
+        allocated = rng.sample(tow_ids, rng.randint(0, len(tow_ids)))
+        member = {
+            "profile_id": rng.choice(poste_profiles),
+            "label": f"Risorsa {i}",
+            "fte": round(rng.uniform(0.1, 4.0), 2),
+            "tow_allocation": {tid: float(rng.randint(5, 100)) for tid in allocated},
+        }
+        if rng.random() < 0.15:
+            member["manual_days_year"] = float(rng.randint(50, 400))
+        team.append(member)
+
+    # Same mapping periods for every profile, different mixes (see the module docstring)
+    mapping_periods = _periods(rng, duration_months, rng.randint(1, 3))
+    profile_mappings = {}
+    for profile_id in poste_profiles:
+        if inflation_pct == 0 and rng.random() < 0.2:
+            continue  # unmapped: default daily rate
+        profile_mappings[profile_id] = [
+            {"month_start": start, "month_end": end, "mix": _mix(rng, lutech_profiles)}
+            for start, end in mapping_periods
+        ]
+
+    volume_periods = [
+        {
+            "month_start": start, "month_end": end,
+            "by_tow": {tid: round(rng.uniform(0.6, 1.2), 2) for tid in tow_ids if rng.random() < 0.5},
+            "by_profile": {pid: round(rng.uniform(0.6, 1.2), 2) for pid in poste_profiles if rng.random() < 0.3},
+        }
+        for start, end in _periods(rng, duration_months, rng.randint(1, 3))
+    ]
+
+    tows = [
+        {"tow_id": tid, "label": f"TOW {tid}", "type": "task",
+         "lutech_pct": float(rng.choice([40, 60, 75, 100])) if is_rti else None}
+        for tid in tow_ids
+    ]
+
+    return {
+        "id": case_id,
+        "bp": {
+            "duration_months": duration_months,
+            "days_per_fte": float(rng.choice([200, 220, 220])),
+            "default_daily_rate": float(rng.choice([250, 300])),
+            "reuse_factor": rng.choice([0.0, 0.05, 0.1, 0.25]),
+            "inflation_pct": inflation_pct,
+            "is_rti": is_rti,
+            "quota_lutech": rng.choice([0.6, 0.7, 1.0]) if is_rti else 1.0,
+            "team_composition": team,
+            "tows": tows,
+            "profile_mappings": profile_mappings,
+            "volume_adjustments": {"periods": volume_periods},
+        },
+        "lutech_rates": lutech_rates,
+    }
+
+
+def _divergence_case(case_id: str, note: str, **bp: Any) -> Dict[str, Any]:
+    member = {"profile_id": "P00", "label": "Risorsa 0", "fte": 1.0, "tow_allocation": {"TOW_A": 100.0}}
+    base = {
+        "duration_months": 24, "days_per_fte": 220.0, "default_daily_rate": 300.0, "reuse_factor": 0.0,
+        "inflation_pct": 0.0, "is_rti": False, "quota_lutech": 1.0, "team_composition": [member],
+        "tows": [{"tow_id": "TOW_A", "label": "TOW A", "type": "task", "lutech_pct": None}],
+        "profile_mappings": {"P00": [{"month_start": 1, "month_end": 24, "mix": [{"lutech_profile": "dev:sr", "pct": 100.0}]}]},
+        "volume_adjustments": {"periods": [{"month_start": 1, "month_end": 24, "by_tow": {}, "by_profile": {}}]},
+    }
+    return {"id": case_id, "divergence": note, "bp": {**base, **bp}, "lutech_rates": {"dev:sr": 500.0, "dev:jr": 300.0}}
+
+
+def divergence_cases() -> List[Dict[str, Any]]:
+    """One minimal vector per known difference between the engines (see the module docstring)."""
+    two_members = [
+        {"profile_id": "P00", "label": "Risorsa 0", "fte": 1.0, "tow_allocation": {"TOW_A": 100.0}},
+        {"profile_id": "P01", "label": "Risorsa 1", "fte": 1.0, "tow_allocation": {"TOW_A": 100.0}},
+    ]
+    return [
+        _divergence_case(
+            "divergence-unmapped-inflation", "the frontend does not inflate the default rate of unmapped profiles",
+            inflation_pct=3.0, profile_mappings={},
+            volume_adjustments={"periods": [
+                {"month_start": 1, "month_end": 12, "by_tow": {}, "by_profile": {}},
+                {"month_start": 13, "month_end": 24, "by_tow": {}, "by_profile": {}},
+            ]},
+        ),
+        _divergence_case(
+            "divergence-rti-missing-lutech-pct", "under RTI the frontend assumes 100% for a TOW without lutech_pct",
+            is_rti=True, quota_lutech=0.7,
+        ),
+        _divergence_case(
+            "divergence-volume-gap", "outside every volume period the frontend applies the first period's factors",
+            volume_adjustments={"periods": [{"month_start": 1, "month_end": 12, "by_tow": {"TOW_A": 0.5}, "by_profile": {}}]},
+        ),
+        _divergence_case(
+            "divergence-mapping-periods", "mapping boundaries of other profiles split the backend's intervals",
+            inflation_pct=2.0, team_composition=two_members,
+            profile_mappings={
+                "P00": [{"month_start": 1, "month_end": 24, "mix": [{"lutech_profile": "dev:sr", "pct": 100.0}]}],
+                "P01": [
+                    {"month_start": 1, "month_end": 18, "mix": [{"lutech_profile": "dev:jr", "pct": 100.0}]},
+                    {"month_start": 19, "month_end": 24, "mix": [{"lutech_profile": "dev:sr", "pct": 100.0}]},
+                ],
+            },
+        ),
+    ]
+
+
+def generate_corpus(count: int = CORPUS_SIZE, seed: int = CORPUS_SEED) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [generate_case(rng, f"case-{i:03d}") for i in range(count)]
+
+
+def load_corpus(path: Path = CORPUS_PATH) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["cases"]
+
+
+# --- Engines ----------------------------------------------------------------------
+
+def _breakdown(entries: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    return {key: {"cost": entry["cost"], "days": entry["days"]} for key, entry in entries.items()}
+
+
+def python_engine(case: Dict[str, Any], repeat: int = 1) -> Dict[str, Any]:
+    """The Python engine's result for a case, called like the /calculate endpoint."""
+    bp = case["bp"]
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        result = BusinessPlanService.calculate_team_cost(
+            team_composition=bp["team_composition"],
+            volume_adjustments=bp["volume_adjustments"],
+            reuse_factor=bp["reuse_factor"],
+            profile_mappings=bp["profile_mappings"],
+            profile_rates=case["lutech_rates"],
+            duration_months=bp["duration_months"],
+            default_daily_rate=bp["default_daily_rate"],
+            inflation_pct=bp["inflation_pct"],
+            days_per_fte=bp["days_per_fte"],
+            is_rti=bp["is_rti"],
+            quota_lutech=bp["quota_lutech"],
+            all_tows=bp["tows"],
+        )
+        best = min(best, time.perf_counter() - started)
+
+    # Unmapped members are keyed by their Poste profile here, grouped in the frontend
+    by_lutech_profile: Dict[str, Dict[str, float]] = {}
+    for key, entry in _breakdown(result["by_lutech_profile"]).items():
+        key = key if key in case["lutech_rates"] else UNMAPPED_KEY
+        total = by_lutech_profile.setdefault(key, {"cost": 0.0, "days": 0.0})
+        total["cost"] += entry["cost"]
+        total["days"] += entry["days"]
+
+    return {
+        "total": result["total_cost"],
+        "by_tow": _breakdown(result["by_tow"]),
+        "by_lutech_profile": by_lutech_profile,
+        "seconds": best,
+    }
+
+
+def node_available() -> bool:
+    return shutil.which("node") is not None
+
+
+def _frontend_bp(bp: Dict[str, Any]) -> Dict[str, Any]:
+    """The Business Plan as the frontend holds it (normalizeBPForUI: reuse in 0-100)."""
+    return {**bp, "reuse_factor": bp["reuse_factor"] * 100}
+
+
+def js_engine(cases: List[Dict[str, Any]], repeat: int = 1) -> Dict[str, Dict[str, Any]]:
+    """Results of the frontend engine for the cases, keyed by case id (runs node)."""
+    if not node_available():
+        raise RuntimeError("node non trovato: installa Node.js per eseguire il motore frontend")
+    payload = {
+        "repeat": repeat,
+        "cases": [
+            {"id": case["id"], "bp": _frontend_bp(case["bp"]), "lutech_rates": case["lutech_rates"]}
+            for case in cases
+        ],
+    }
+    completed = subprocess.run(
+        ["node", str(RUNNER_PATH)], input=json.dumps(payload), capture_output=True, text=True, timeout=300,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Frontend engine failed: {completed.stderr.strip()}")
+    return json.loads(completed.stdout)
+
+
+# --- Comparison -------------------------------------------------------------------
+
+def _close(expected: float, actual: float, tolerance: float) -> bool:
+    return abs(expected - actual) <= tolerance + RELATIVE_TOLERANCE * abs(expected)
+
+
+def compare(case: Dict[str, Any], expected: Dict[str, Any], actual: Dict[str, Any]) -> List[str]:
+    """Differences beyond tolerance between two engine results, as readable lines."""
+    max_rate = max([*case["lutech_rates"].values(), case["bp"]["default_daily_rate"]])
+    # Each rounded day can move the cost by up to the highest (inflated) daily rate
+    inflation = (1 + case["bp"]["inflation_pct"] / 100) ** ((case["bp"]["duration_months"] - 1) // 12)
+    cost_tolerance = DAYS_TOLERANCE * max_rate * inflation
+
+    mismatches = []
+    if not _close(expected["total"], actual["total"], cost_tolerance * max(1, len(expected["by_tow"]))):
+        mismatches.append(f"total: expected {expected['total']}, got {actual['total']}")
+    for section in ("by_tow", "by_lutech_profile"):
+        expected_entries, actual_entries = expected[section], actual[section]
+        for key in sorted(set(expected_entries) ^ set(actual_entries)):
+            side = "missing" if key in expected_entries else "unexpected"
+            mismatches.append(f"{section}[{key}]: {side}")
+        for key in sorted(set(expected_entries) & set(actual_entries)):
+            for field, tolerance in (("days", DAYS_TOLERANCE), ("cost", cost_tolerance)):
+                want, got = expected_entries[key][field], actual_entries[key][field]
+                if not _close(want, got, tolerance):
+                    mismatches.append(f"{section}[{key}].{field}: expected {want}, got {got}")
+    return mismatches
+
+
+def _expected(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: result[key] for key in ("total", "by_tow", "by_lutech_profile")}
+
+
+def write_corpus(path: Path = CORPUS_PATH, count: int = CORPUS_SIZE, seed: int = CORPUS_SEED) -> None:
+    """
+    Regenerate the corpus with the frontend engine's results as expected values;
+    divergence vectors also record the mismatches the Python engine gives.
+    """
+    cases = generate_corpus(count, seed) + divergence_cases()
+    results = js_engine(cases)
+    for case in cases:
+        case["expected"] = _expected(results[case["id"]])
+        if "divergence" in case:
+            case["python_mismatches"] = compare(case, case["expected"], python_engine(case))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"seed": seed, "cases": cases}, f, indent=1, sort_keys=True)
+        f.write("\n")
+
+
+def run(cases: List[Dict[str, Any]], live: bool, repeat: int = 1) -> Dict[str, Any]:
+    """
+    Compare the Python engine (and, when `live`, the frontend engine run now)
+    with the expected values; returns the mismatches, the known divergences
+    still reproduced and per-engine timings.
+    """
+    js_results = js_engine(cases, repeat) if live else {}
+    report: Dict[str, Any] = {"cases": len(cases), "mismatches": {}, "known_divergences": {}, "timings": {}}
+    for case in cases:
+        engines = {"python": python_engine(case, repeat)}
+        if live:
+            engines["js"] = js_results[case["id"]]
+        for name, result in engines.items():
+            lines = compare(case, case["expected"], result)
+            documented = case.get("python_mismatches", []) if name == "python" else []
+            if lines == documented:
+                if documented:
+                    report["known_divergences"][case["id"]] = case["divergence"]
+            elif documented:
+                report["mismatches"][f"{case['id']} ({name})"] = [
+                    f"known divergence changed ({case['divergence']}), expected:", *documented, "got:", *lines,
+                ]
+            else:
+                report["mismatches"][f"{case['id']} ({name})"] = lines
+        report["timings"][case["id"]] = {name: result["seconds"] for name, result in engines.items()}
+    return report
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    engines = sorted({name for timing in report["timings"].values() for name in timing})
+    width = max([10, *map(len, report["timings"])]) + 2
+    print(f"{'case':<{width}}" + "".join(f"{name + ' (ms)':>14}" for name in engines))
+    for case_id, timing in report["timings"].items():
+        print(f"{case_id:<{width}}" + "".join(f"{timing[name] * 1000:>14.3f}" for name in engines))
+    totals = {name: sum(t[name] for t in report["timings"].values()) for name in engines}
+    print(f"{'total':<{width}}" + "".join(f"{totals[name] * 1000:>14.3f}" for name in engines))
+    print()
+    for case_id, note in report["known_divergences"].items():
+        print(f"KNOWN DIVERGENCE {case_id}: {note}")
+    if not report["mismatches"]:
+        known = len(report["known_divergences"])
+        print(f"OK: {report['cases']} cases, engines agree within tolerance ({known} known divergences)")
+    for label, lines in report["mismatches"].items():
+        print(f"MISMATCH {label}")
+        for line in lines:
+            print(f"  {line}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Parity check between the Python and frontend BP engines")
+    parser.add_argument("--write", action="store_true", help="regenerate the corpus (needs node)")
+    parser.add_argument("--count", type=int, default=CORPUS_SIZE, help="cases when regenerating")
+    parser.add_argument("--seed", type=int, default=CORPUS_SEED, help="seed when regenerating")
+    parser.add_argument("--no-js", action="store_true", help="check only the Python engine")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case; timings are the best run")
+    parser.add_argument("--report", type=Path, help="also write the report (mismatches, timings) as JSON")
+    args = parser.parse_args(argv)
+
+    if args.write:
+        write_corpus(CORPUS_PATH, args.count, args.seed)
+        print(f"Corpus written to {CORPUS_PATH}")
+    report = run(load_corpus(), live=not args.no_js and node_available(), repeat=args.repeat)
+    _print_report(report)
+    if args.report:
+        args.report.write_text(json.dumps(report, indent=1), encoding="utf-8")
+    return 1 if report["mismatches"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,28 @@
+/**
+ * Module hooks that let Node load the frontend sources the way Vite serves them:
+ * extensionless relative imports resolve to `.js` files and `import.meta.env`
+ * is defined (production mode).
+ */
+import path from 'node:path';
+
+const FRONTEND_SRC = new URL('../../frontend/src/', import.meta.url).href;
+
+export async function resolve(specifier, context, nextResolve) {
+  try {
+    return await nextResolve(specifier, context);
+  } catch (err) {
+    if (err.code === 'ERR_MODULE_NOT_FOUND' && specifier.startsWith('.') && !path.extname(specifier)) {
+      return nextResolve(`${specifier}.js`, context);
+    }
+    throw err;
+  }
+}
+
+export async function load(url, context, nextLoad) {
+  const result = await nextLoad(url, context);
+  if (result.format === 'module' && url.startsWith(FRONTEND_SRC)) {
+    const env = "import.meta.env = { PROD: true, DEV: false, MODE: 'production' };\n";
+    return { ...result, source: env + String(result.source) };
+  }
+  return result;
+}
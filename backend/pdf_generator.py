@@ -8,11 +8,6 @@ import os
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-from matplotlib.patches import Wedge, Circle
-
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -24,6 +19,8 @@ from reportlab.platypus import (
 )
 from reportlab.pdfgen import canvas
 
+from chart_renderer import get_chart
+
 # ============================================================================
 # CONSTANTS
 # ============================================================================
@@ -121,139 +118,22 @@ class NumberedCanvas(canvas.Canvas):
 
 def create_gauge_chart(value: float, max_value: float, title: str) -> io.BytesIO:
     """Create a semicircular gauge chart"""
-    fig, ax = plt.subplots(figsize=(2.8, 1.8), subplot_kw={'aspect': 'equal'})
-
-    pct = min(100, max(0, (value / max_value) * 100)) if max_value > 0 else 0
-
-    # Background arc
-    bg_wedge = Wedge(center=(0, 0), r=1, theta1=0, theta2=180,
-                     facecolor='#e9ecef', edgecolor='none')
-    ax.add_patch(bg_wedge)
-
-    # Color based on percentage
-    if pct >= 70:
-        color = '#28a745'
-    elif pct >= 40:
-        color = '#ffc107'
-    else:
-        color = '#dc3545'
-
-    # Value arc
-    angle = 180 * (pct / 100)
-    value_wedge = Wedge(center=(0, 0), r=1, theta1=0, theta2=angle,
-                        facecolor=color, edgecolor='none')
-    ax.add_patch(value_wedge)
-
-    # Inner circle
-    inner_circle = Circle((0, 0), 0.6, facecolor='white', edgecolor='none')
-    ax.add_patch(inner_circle)
-
-    # Value text
-    ax.text(0, 0.1, f'{value:.1f}', ha='center', va='center',
-            fontsize=12, fontweight='bold', color='#333333')
-    ax.text(0, -0.2, f'/ {max_value:.0f}', ha='center', va='center',
-            fontsize=7, color='#6c757d')
-
-    ax.set_xlim(-1.2, 1.2)
-    ax.set_ylim(-0.3, 1.2)
-    ax.axis('off')
-    ax.set_title(title, fontsize=9, pad=3, fontweight='bold')
-
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', dpi=150, bbox_inches='tight',
-                facecolor='white', edgecolor='none')
-    plt.close()
-    buf.seek(0)
-    return buf
+    return get_chart('gauge', value, max_value, title)
 
 
 def create_score_curve_chart(base_amount: float, competitor_discount: float,
                               alpha: float, max_tech_score: float,
                               max_econ_score: float, tech_score: float) -> io.BytesIO:
     """Create discount scenario chart (curva punteggio)"""
-    fig, ax = plt.subplots(figsize=(6, 3.5))
-
-    discounts = list(range(1, 101))
-    econ_scores = []
-    total_scores = []
-
-    p_best = base_amount * (1 - competitor_discount / 100)
-
-    for d in discounts:
-        p_off = base_amount * (1 - d / 100)
-        p_actual_best = min(p_off, p_best)
-
-        if p_actual_best > 0:
-            ratio = p_off / p_actual_best
-            if ratio <= 1:
-                econ = max_econ_score * (1 - (ratio ** alpha))
-            else:
-                econ = 0
-        else:
-            econ = 0
-
-        econ_scores.append(econ)
-        total_scores.append(tech_score + econ)
-
-    ax.plot(discounts, econ_scores, color='#FFCC00', linewidth=2, label='Score Econ.')
-    ax.plot(discounts, total_scores, color='#1E3A5F', linewidth=2, label='TOTALE')
-
-    ax.set_xlabel('Sconto %', fontsize=10)
-    ax.set_ylabel('Punteggio', fontsize=10)
-    ax.set_title('Curva Punteggio per Scenario Sconto', fontsize=11, fontweight='bold')
-    ax.legend(loc='upper left', fontsize=8)
-    ax.grid(alpha=0.3, linestyle='--')
-    ax.set_xlim(0, 100)
-    ax.set_ylim(0, max_tech_score + max_econ_score + 5)
-
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-
-    plt.tight_layout()
-
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', dpi=150, bbox_inches='tight',
-                facecolor='white', edgecolor='none')
-    plt.close()
-    buf.seek(0)
-    return buf
+    return get_chart('score_curve', base_amount, competitor_discount, alpha,
+                     max_tech_score, max_econ_score, tech_score)
 
 
 def create_rti_pie_chart(rti_quotas: Dict[str, float]) -> io.BytesIO:
     """Create RTI quotas pie chart"""
     if not rti_quotas:
         return None
-
-    fig, ax = plt.subplots(figsize=(4, 3))
-
-    labels = list(rti_quotas.keys())
-    sizes = list(rti_quotas.values())
-    colors_list = ['#0066CC']  # Lutech
-    colors_list += ['#6366F1', '#8B5CF6', '#EC4899'][:len(labels)-1]
-
-    # Filter out zero values
-    filtered = [(l, s, c) for l, s, c in zip(labels, sizes, colors_list) if s > 0]
-    if not filtered:
-        return None
-
-    labels, sizes, colors_list = zip(*filtered)
-
-    wedges, texts, autotexts = ax.pie(
-        sizes, labels=labels, autopct='%1.0f%%',
-        colors=colors_list, startangle=90,
-        textprops={'fontsize': 8}
-    )
-
-    ax.set_title('Quote RTI', fontsize=10, fontweight='bold')
-
-    plt.tight_layout()
-
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', dpi=150, bbox_inches='tight',
-                facecolor='white', edgecolor='none')
-    plt.close()
-    buf.seek(0)
-    return buf
+    return get_chart('rti_pie', tuple(rti_quotas.items()))
 
 
 # ============================================================================
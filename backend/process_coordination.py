@@ -0,0 +1,96 @@
+"""
+Process Coordination
+File locks that let several gunicorn workers share one SQLite database: one-at-a-time
+startup (migrations, seeding) and a single leader process for background jobs
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import IO, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+from database import DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+# Workers coordinate through lock files on the same host; the name is scoped to the database
+LOCK_DIR = os.getenv("LOCK_DIR", tempfile.gettempdir())
+_LOCK_PREFIX = "simulator_poste_" + hashlib.sha1(DATABASE_URL.encode("utf-8")).hexdigest()[:12]
+
+
+def lock_path(name: str) -> str:
+    return os.path.join(LOCK_DIR, f"{_LOCK_PREFIX}.{name}.lock")
+
+
+def _open_lock_file(name: str) -> IO:
+    os.makedirs(LOCK_DIR, exist_ok=True)
+    return open(lock_path(name), "a+")
+
+
+@contextmanager
+def startup_lock(name: str = "startup") -> Iterator[None]:
+    """
+    Hold an exclusive inter-process lock for the block.
+
+    Migrations and seeding run inside it, so when several workers start at once
+    they take turns and the later ones find the work already done.
+    """
+    lock_file = _open_lock_file(name)
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+    finally:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+        lock_file.close()
+
+
+class LeaderLock:
+    """
+    Non-blocking lock held for the lifetime of the process that wins it.
+
+    The operating system releases it when the holder exits (even on a crash),
+    so another worker can take over by calling try_acquire() again.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._file: Optional[IO] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_leader(self) -> bool:
+        return self._file is not None
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self._file is not None:
+                return True
+            lock_file = _open_lock_file(self.name)
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    lock_file.close()
+                    return False
+            self._file = lock_file
+        logger.info(f"Process {os.getpid()} is now the {self.name} leader")
+        return True
+
+    def release(self) -> None:
+        with self._lock:
+            if self._file is None:
+                return
+            if fcntl is not None:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
@@ -0,0 +1,251 @@
+"""
+Profiling
+Opt-in sampling profiler for single requests (reports kept on disk for download)
+and a watchdog that logs the call stacks of requests running past a threshold
+"""
+
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Shared by the server processes on this host, so any worker can serve a report
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "simulator_poste_profiles"))
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+PROFILE_MAX_REPORTS = int(os.getenv("PROFILE_MAX_REPORTS", "50"))
+SLOW_REQUEST_SECONDS = float(os.getenv("SLOW_REQUEST_SECONDS", "10"))  # 0 disables the watchdog
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+_MAX_DEPTH = 64
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Innermost frames of threads that are waiting, not working (pool workers, the event loop)
+_IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+    ("queue.py", "get"),
+    ("socket.py", "accept"),
+    ("profiling.py", "_run"),  # the slow-request watchdog between checks
+}
+
+
+def _short_path(filename: str) -> str:
+    if filename.startswith(_BACKEND_DIR):
+        return os.path.relpath(filename, _BACKEND_DIR)
+    marker = f"site-packages{os.sep}"
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    return os.path.basename(filename)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _is_idle(frame) -> bool:
+    return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in _IDLE_FRAMES
+
+
+def busy_thread_frames(exclude: Tuple[int, ...] = ()) -> Dict[int, object]:
+    """Current innermost frame of every thread that is doing work."""
+    return {
+        ident: frame for ident, frame in sys._current_frames().items()
+        if ident not in exclude and not _is_idle(frame)
+    }
+
+
+class StackSampler:
+    """
+    Samples the call stacks of all busy threads every `interval` seconds.
+
+    Process-wide on purpose: request work runs on the event loop, the executor
+    pools and the threadpool, so no single thread holds the whole picture.
+    Requests served at the same time by the same worker show up too.
+    """
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL_MS / 1000):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.threads = set()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self.started = self.stopped = None
+
+    def start(self) -> "StackSampler":
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.stopped = time.perf_counter()
+
+    def _run(self) -> None:
+        own = (threading.get_ident(),)
+        while not self._stop.wait(self.interval):
+            for ident, frame in busy_thread_frames(exclude=own).items():
+                stack = []
+                while frame is not None and len(stack) < _MAX_DEPTH:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                self.stacks[tuple(reversed(stack))] += 1
+                self.threads.add(ident)
+            self.samples += 1
+
+    def folded(self) -> str:
+        """Collapsed stacks ("a;b;c count"), readable by flamegraph.pl and speedscope."""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def report(self, title: str, limit: int = 40) -> str:
+        """Functions ranked by samples on the stack (inclusive) and at its top (self)."""
+        inclusive: Counter = Counter()
+        own: Counter = Counter()
+        for stack, count in self.stacks.items():
+            for label in set(stack):
+                inclusive[label] += count
+            own[stack[-1]] += count
+        total = sum(self.stacks.values()) or 1
+        duration = (self.stopped or time.perf_counter()) - self.started
+
+        lines = [
+            title,
+            f"Duration: {duration:.3f} s, samples: {self.samples} every {self.interval * 1000:g} ms, "
+            f"busy threads seen: {len(self.threads)}",
+            "",
+        ]
+        for heading, counts in (("Inclusive (on the stack)", inclusive), ("Self (running the code)", own)):
+            lines.append(f"{heading}:")
+            lines.append(f"{'samples':>8} {'%':>6}  function")
+            for label, count in counts.most_common(limit):
+                lines.append(f"{count:>8} {count * 100 / total:>5.1f}%  {label}")
+            lines.append("")
+        return "\n".join(lines)
+
+
+class ProfileStore:
+    """Profile reports on disk: `<id>.txt` (summary) and `<id>.folded` (collapsed stacks)."""
+
+    FORMATS = ("txt", "folded")
+
+    def __init__(self, directory: str = PROFILE_DIR, max_reports: int = PROFILE_MAX_REPORTS):
+        self.directory = Path(directory)
+        self.max_reports = max_reports
+
+    def new_id(self) -> str:
+        return uuid.uuid4().hex
+
+    def path(self, profile_id: str, fmt: str) -> Optional[Path]:
+        if not PROFILE_ID_RE.match(profile_id) or fmt not in self.FORMATS:
+            return None
+        return self.directory / f"{profile_id}.{fmt}"
+
+    def save(self, profile_id: str, sampler: StackSampler, title: str) -> None:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.path(profile_id, "folded").write_text(sampler.folded(), encoding="utf-8")
+            # The summary is written last: list() only shows complete reports
+            self.path(profile_id, "txt").write_text(sampler.report(title), encoding="utf-8")
+        except OSError as e:
+            logger.warning(f"Could not store profile {profile_id}: {e}")
+            return
+        self._prune()
+
+    def list(self) -> List[Dict[str, object]]:
+        """Stored reports, newest first."""
+        reports = []
+        for path in self.directory.glob("*.txt"):
+            try:
+                stat = path.stat()
+                with open(path, encoding="utf-8") as f:
+                    title = f.readline().strip()
+            except OSError:
+                continue
+            reports.append({"id": path.stem, "title": title, "created_at": stat.st_mtime})
+        return sorted(reports, key=lambda report: report["created_at"], reverse=True)
+
+    def _prune(self) -> None:
+        for report in self.list()[self.max_reports:]:
+            for fmt in self.FORMATS:
+                self.path(report["id"], fmt).unlink(missing_ok=True)
+
+
+profile_store = ProfileStore()
+
+
+class SlowRequestMonitor:
+    """
+    Logs the stacks of busy threads once for each request still running after
+    `threshold` seconds, so a slow request in production shows where it spends time.
+    """
+
+    def __init__(self, threshold: float = SLOW_REQUEST_SECONDS):
+        self.threshold = threshold
+        self._active: Dict[int, List] = {}  # token -> [label, started, logged]
+        self._lock = threading.Lock()
+        self._next_token = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, label: str) -> Optional[int]:
+        if self.threshold <= 0:
+            return None
+        with self._lock:
+            self._next_token += 1
+            token = self._next_token
+            self._active[token] = [label, time.monotonic(), False]
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="slow-request-monitor", daemon=True)
+                self._thread.start()
+        return token
+
+    def finish(self, token: Optional[int]) -> None:
+        if token is None:
+            return
+        with self._lock:
+            entry = self._active.pop(token, None)
+        if entry is not None and entry[2]:
+            logger.warning(f"Slow request {entry[0]} finished after {time.monotonic() - entry[1]:.1f}s")
+
+    def check(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            due = [entry for entry in self._active.values() if not entry[2] and now - entry[1] >= self.threshold]
+            for entry in due:
+                entry[2] = True
+        if not due:
+            return
+        stacks = "\n".join(
+            f"Thread {ident}:\n{''.join(traceback.format_stack(frame, limit=_MAX_DEPTH))}"
+            for ident, frame in busy_thread_frames(exclude=(threading.get_ident(),)).items()
+        )
+        for label, started, _ in due:
+            logger.warning(f"Slow request {label}: running for {now - started:.1f}s, busy threads:\n{stacks}")
+
+    def _run(self) -> None:
+        interval = max(0.1, min(1.0, self.threshold / 2))
+        while True:
+            time.sleep(interval)
+            try:
+                self.check()
+            except Exception:
+                logger.debug("Slow request check failed", exc_info=True)
+
+
+slow_requests = SlowRequestMonitor()
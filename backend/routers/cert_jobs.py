@@ -0,0 +1,256 @@
+"""
+Background certificate verification jobs.
+
+Submit a folder or a ZIP, get a job id back, then poll or stream progress.
+Jobs are persisted in the database and resumed at startup, so a verification
+is no longer tied to the browser tab that started it.
+"""
+
+import json
+import os
+import shutil
+import time
+import zipfile
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+import crud
+import models
+from auth import get_current_user
+from database import ReadSessionLocal, SessionLocal
+from logging_config import get_logger
+from services.cert_job_service import (
+    ACTIVE_STATUSES,
+    FINAL_STATUSES,
+    job_runner,
+    job_to_dict,
+    job_upload_dir,
+    new_job_id,
+)
+from services.cert_verification_service import (
+    OCR_AVAILABLE,
+    build_expected_certs_map,
+    normalize_folder_path,
+    zip_pdf_members,
+)
+
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/api/verify-certs/jobs", tags=["cert-verification-jobs"])
+
+JOB_STREAM_POLL_SECONDS = 1.0
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _require_ocr():
+    if not OCR_AVAILABLE:
+        raise HTTPException(status_code=503, detail="OCR dependencies not available")
+
+
+def _get_job_or_404(db: Session, job_id: str):
+    job = crud.get_cert_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("")
+def submit_folder_job(
+    folder_path: str,
+    lot_key: Optional[str] = None,
+    req_filter: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """Queue verification of every PDF under a server-side folder."""
+    _require_ocr()
+    folder_path = normalize_folder_path(folder_path)
+    if not folder_path or not os.path.isdir(folder_path):
+        raise HTTPException(status_code=404, detail=f"Folder not found: {folder_path}")
+
+    job = crud.create_cert_job(
+        db,
+        job_id=new_job_id(),
+        source_type="folder",
+        source_path=folder_path,
+        source_name=folder_path,
+        lot_key=lot_key,
+        req_filter=req_filter,
+        expected_certs_map=build_expected_certs_map(crud.get_lot_config(db, lot_key)) if lot_key else {},
+        created_by=(current_user or {}).get("email"),
+    )
+    job_runner.submit(job.id)
+    logger.info(f"Cert verification job {job.id} queued for folder {folder_path}")
+    return job_to_dict(db, job)
+
+
+@router.post("/upload")
+async def submit_zip_job(
+    file: UploadFile = File(...),
+    lot_key: Optional[str] = None,
+    req_filter: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """Queue verification of a ZIP of PDF certificates; the ZIP is kept (not extracted) until the job ends."""
+    _require_ocr()
+    if not file.filename or not file.filename.lower().endswith('.zip'):
+        raise HTTPException(status_code=400, detail="Il file deve essere un archivio ZIP")
+
+    job_id = new_job_id()
+    job_dir = job_upload_dir(job_id)
+    os.makedirs(job_dir, exist_ok=True)
+    zip_path = os.path.join(job_dir, "upload.zip")
+    try:
+        with open(zip_path, "wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                f.write(chunk)
+        try:
+            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                zip_pdf_members(zip_ref)
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=400, detail="Il file ZIP non è valido o è corrotto")
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ZIP file contains unsafe paths")
+    except Exception:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        raise
+
+    job = crud.create_cert_job(
+        db,
+        job_id=job_id,
+        source_type="zip",
+        source_path=zip_path,
+        source_name=file.filename,
+        lot_key=lot_key,
+        req_filter=req_filter,
+        expected_certs_map=build_expected_certs_map(crud.get_lot_config(db, lot_key)) if lot_key else {},
+        created_by=(current_user or {}).get("email"),
+    )
+    job_runner.submit(job.id)
+    logger.info(f"Cert verification job {job.id} queued for upload {file.filename}")
+    return job_to_dict(db, job)
+
+
+@router.get("")
+def list_jobs(status: Optional[str] = None, limit: int = 50, db: Session = Depends(get_read_db)):
+    """List jobs, newest first (without per-file results)."""
+    statuses = [s.strip() for s in status.split(",")] if status else None
+    return [job_to_dict(db, job, include_results=False) for job in crud.get_cert_jobs(db, statuses, limit)]
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str, include_results: bool = True, db: Session = Depends(get_read_db)):
+    """Job status and progress; completed jobs include the full verification results."""
+    return job_to_dict(db, _get_job_or_404(db, job_id), include_results=include_results)
+
+
+@router.get("/{job_id}/stream")
+def stream_job(job_id: str, db: Session = Depends(get_read_db)):
+    """
+    Stream job progress as Server-Sent Events ('start', 'progress', 'done', 'error').
+    Disconnecting only stops the stream: the job keeps running.
+    """
+    _get_job_or_404(db, job_id)
+
+    def generate():
+        last_processed = -1
+        started = False
+        try:
+            while True:
+                poll_db = ReadSessionLocal()
+                try:
+                    job = crud.get_cert_job(poll_db, job_id)
+                    if not job:
+                        yield f"data: {json.dumps({'type': 'error', 'message': 'Job not found'})}\n\n"
+                        return
+                    if not started and (job.total or job.status in FINAL_STATUSES):
+                        started = True
+                        yield f"data: {json.dumps({'type': 'start', 'job_id': job.id, 'total': job.total or 0})}\n\n"
+                    if job.processed != last_processed and job.total:
+                        last_processed = job.processed
+                        yield f"data: {json.dumps({'type': 'progress', 'job_id': job.id, 'current': job.processed, 'total': job.total})}\n\n"
+                    if job.status == "failed":
+                        yield f"data: {json.dumps({'type': 'error', 'job_id': job.id, 'message': job.error or 'Certificate verification failed'})}\n\n"
+                        return
+                    if job.status in FINAL_STATUSES:
+                        payload = job_to_dict(poll_db, job)
+                        yield f"data: {json.dumps({'type': 'done', 'job_id': job.id, 'status': job.status, 'results': payload.get('results')})}\n\n"
+                        return
+                finally:
+                    poll_db.close()
+                time.sleep(JOB_STREAM_POLL_SECONDS)
+        except GeneratorExit:
+            logger.info(f"SSE client disconnected from cert job {job_id}; job continues in background")
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        }
+    )
+
+
+@router.post("/{job_id}/cancel")
+def cancel_job(job_id: str, db: Session = Depends(get_db)):
+    """Stop a queued/running job; results verified so far are kept."""
+    job = _get_job_or_404(db, job_id)
+    if job.status not in ACTIVE_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Job is already {job.status}")
+    if job_runner.cancel(job_id):
+        # The worker stops before the next file and marks the job cancelled
+        return {"id": job_id, "status": "cancelling"}
+    # Not owned by this process (e.g. left over by a crashed worker): mark it directly
+    job.status = "cancelled"
+    job.finished_at = models.utc_now()
+    db.commit()
+    return {"id": job_id, "status": "cancelled"}
+
+
+@router.post("/{job_id}/resume")
+def resume_job(job_id: str, db: Session = Depends(get_db)):
+    """Re-queue a failed job; files already verified are skipped."""
+    job = _get_job_or_404(db, job_id)
+    if job.status != "failed":
+        raise HTTPException(status_code=409, detail="Only failed jobs can be resumed")
+    if job.source_type == "zip" and not os.path.exists(job.source_path):
+        raise HTTPException(status_code=410, detail="Uploaded ZIP no longer available")
+    job.status = "queued"
+    job.finished_at = None
+    db.commit()
+    job_runner.submit(job_id)
+    return job_to_dict(db, job, include_results=False)
+
+
+@router.delete("/{job_id}")
+def delete_job(job_id: str, db: Session = Depends(get_db)):
+    """Delete a finished job, its results and any stored upload."""
+    job = _get_job_or_404(db, job_id)
+    if job.status in ACTIVE_STATUSES:
+        raise HTTPException(status_code=409, detail="Cancel the job before deleting it")
+    if job.source_type == "zip":
+        shutil.rmtree(os.path.dirname(job.source_path), ignore_errors=True)
+    crud.delete_cert_job(db, job_id)
+    return {"message": f"Job {job_id} deleted"}
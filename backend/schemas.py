@@ -61,6 +61,7 @@ class LotConfig(BaseModel):
     rti_companies: List[str] = Field(default_factory=list)  # RTI partner companies (excludes Lutech)
     rti_quotas: Dict[str, float] = Field(default_factory=dict)  # Company quotas: {"Lutech": 70, "Partner1": 30, ...}
     is_active: bool = True  # Whether lot is active (True) or closed (False)
+    version: Optional[int] = None  # Row version; PATCH clients send it back as If-Match (ignored on POST)
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -104,6 +105,12 @@ class TechInput(BaseModel):
     custom_metric_vals: Optional[Dict[str, float]] = None # {metric_id: value}
 
 
+class StateTechInput(TechInput):
+    """Technical input as kept in a lot state: keyed by req_id, with report-only extras (notes, assigned_company)"""
+    model_config = ConfigDict(extra="allow")
+    req_id: Optional[str] = None
+
+
 class CalculateRequest(BaseModel):
     """Request to calculate scores"""
     lot_key: str
@@ -131,6 +138,21 @@ class CalculateRequest(BaseModel):
         return result
 
 
+class CertReconcileRequest(BaseModel):
+    """Request to reconcile certificate verification results with lot requirements"""
+    results: List[Dict[str, Any]] = Field(default_factory=list)  # /verify-certs results
+    job_id: Optional[str] = None  # ...or the results of a stored verification job
+    lot_keys: Optional[List[str]] = None  # Restrict to these lots (default: all)
+
+
+class CertScoringRequest(BaseModel):
+    """Request to turn verified certificates into tech_inputs for a lot and score them"""
+    lot_key: str
+    job_id: Optional[str] = None  # Stored verification job...
+    results: List[Dict[str, Any]] = Field(default_factory=list)  # ...or inline /verify-certs results
+    apply: bool = False  # Save the computed tech_inputs into the lot state
+
+
 class SimulationRequest(BaseModel):
     """Request to run simulation"""
     lot_key: str
@@ -151,6 +173,7 @@ class MonteCarloRequest(BaseModel):
     competitor_tech_score_mean: Optional[float] = Field(default=None, ge=0, description="Competitor tech score mean (if None, uses 90% of max)")
     competitor_tech_score_std: float = Field(default=3.0, ge=0, description="Standard deviation of competitor tech score (default: 3.0 points based on typical variance)")
     iterations: int = Field(ge=1, le=10000, default=500, description="Iterations must be between 1 and 10000")
+    seed: Optional[int] = Field(default=None, ge=0, description="Random seed for a reproducible run (reports)")
 
 
 class OptimizeDiscountRequest(BaseModel):
@@ -164,46 +187,29 @@ class OptimizeDiscountRequest(BaseModel):
 
 
 class ExportPDFRequest(BaseModel):
-    """Request to export PDF report - mirrors ExportExcelRequest for consistency"""
+    """Request to export PDF report - mirrors ExportExcelRequest for consistency.
+
+    Scores are computed server-side from these inputs; any posted scores are ignored.
+    """
     lot_key: str
-    base_amount: float
-    technical_score: float
-    economic_score: float
-    total_score: float
-    my_discount: float
-    competitor_discount: float
-    alpha: float = 0.3
+    base_amount: Optional[float] = Field(default=None, gt=0)  # None = lot base amount
+    my_discount: float = Field(ge=0, le=100)
+    competitor_discount: float = Field(ge=0, le=100)
     win_probability: float = 50.0
-    details: Dict[str, float] = Field(default_factory=dict)
-    weighted_scores: Dict[str, float] = Field(default_factory=dict)
-    category_scores: Dict[str, float] = Field(default_factory=dict)  # {company_certs, resource, reference, project}
-    max_tech_score: float = 60.0
-    max_econ_score: float = 40.0
-    tech_inputs_full: Dict[str, Any] = Field(default_factory=dict)
-    rti_quotas: Dict[str, float] = Field(default_factory=dict)  # Company quotas for RTI
+    tech_inputs_full: Optional[Dict[str, Optional[StateTechInput]]] = None  # None = lot's saved tech_inputs
+    company_certs_status: Optional[Dict[str, str]] = None  # None = lot's saved company_certs
+    rti_quotas: Dict[str, float] = Field(default_factory=dict)  # Company quotas for RTI (empty = lot quotas)
 
 
-class ExportExcelRequest(BaseModel):
+class ExportExcelRequest(ExportPDFRequest):
     """Request to export Excel report"""
-    lot_key: str
-    base_amount: float
-    technical_score: float
-    economic_score: float
-    total_score: float
-    my_discount: float
-    competitor_discount: float
-    alpha: float = 0.3
-    win_probability: float = 50.0
-    details: Dict[str, float] = Field(default_factory=dict)
-    weighted_scores: Dict[str, float] = Field(default_factory=dict)
-    category_scores: Dict[str, float] = Field(default_factory=dict)  # {company_certs, resource, reference, project}
-    max_tech_score: float = 60.0
-    max_econ_score: float = 40.0
-    tech_inputs_full: Dict[str, Any] = Field(default_factory=dict)  # Full tech inputs with cert_company_counts, assigned_company
-    rti_quotas: Dict[str, float] = Field(default_factory=dict)  # Company quotas for RTI
-    prof_certs_resources: Dict[str, int] = Field(default_factory=dict)  # cert_label -> Lutech resource count
     prof_certs_weights: Dict[str, float] = Field(default_factory=dict)  # cert_label -> weight (0.1-1.0)
-    company_certs_status: Dict[str, str] = Field(default_factory=dict)  # cert_label -> "all"|"partial"|"none"
+
+
+class BulkExportRequest(BaseModel):
+    """Request to export the reports of several lots as one ZIP, scored from their saved state"""
+    lot_keys: Optional[List[str]] = None  # None = all active lots
+    formats: List[Literal["pdf", "xlsx"]] = Field(default_factory=lambda: ["pdf", "xlsx"], min_length=1)
 
 
 class ExportBusinessPlanRequest(BaseModel):
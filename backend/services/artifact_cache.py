@@ -0,0 +1,140 @@
+"""
+Report Artifact Cache
+Stores generated PDF/XLSX reports on disk, keyed by a hash of everything that shapes them
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional
+
+from services.score_cache import state_hash
+
+logger = logging.getLogger(__name__)
+
+REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "simulator_poste_reports"))
+REPORT_CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Modules whose source defines what a report looks like
+GENERATOR_MODULES = {
+    "pdf": ("pdf_generator.py", "chart_renderer.py"),
+    "xlsx": ("excel_generator.py",),
+}
+
+
+@lru_cache(maxsize=None)
+def generator_version(fmt: str) -> str:
+    """Digest of the generator sources, so a deploy that changes a report invalidates it."""
+    backend_dir = Path(__file__).resolve().parent.parent
+    digest = hashlib.sha256()
+    for name in GENERATOR_MODULES[fmt]:
+        digest.update((backend_dir / name).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def report_key(fmt: str, kwargs: Dict[str, Any]) -> str:
+    """
+    Cache key of a report: generator version plus every generator argument.
+
+    The arguments carry the lot configuration, the scoring state and the
+    computed scores, so any change to them yields a new key.
+    """
+    return state_hash(fmt, generator_version(fmt), kwargs)
+
+
+def parse_if_none_match(header: Optional[str], etag: str) -> bool:
+    """True when an If-None-Match header value matches `etag` (weak comparison)."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in tags
+
+
+class ArtifactCache:
+    """
+    Size-bounded on-disk cache of generated reports.
+
+    Files are named `<key>.<fmt>` and written atomically. A hit refreshes the
+    file's mtime; when the directory grows past `max_bytes` the least recently
+    used files are deleted. Callers get an open file handle, which stays
+    readable even if the file is evicted while it is being streamed.
+    """
+
+    def __init__(self, directory: str = REPORT_CACHE_DIR, max_bytes: int = REPORT_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str, fmt: str) -> Path:
+        return self.directory / f"{key}.{fmt}"
+
+    def open(self, key: str, fmt: str) -> Optional[BinaryIO]:
+        """Open the cached report for reading, or None on a miss."""
+        path = self._path(key, fmt)
+        try:
+            fileobj = open(path, "rb")
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return fileobj
+
+    def put(self, key: str, fmt: str, fileobj: BinaryIO) -> None:
+        """Copy a generated report (read from its start) into the cache."""
+        tmp_path = None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fileobj.seek(0)
+            with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as tmp:
+                tmp_path = tmp.name
+                shutil.copyfileobj(fileobj, tmp)
+            os.replace(tmp_path, self._path(key, fmt))
+        except OSError as e:
+            logger.warning(f"Could not cache report {key}.{fmt}: {e}")
+            if tmp_path:
+                Path(tmp_path).unlink(missing_ok=True)
+            return
+        finally:
+            fileobj.seek(0)
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            files = []
+            for path in self.directory.glob("*.*"):
+                if path.suffix == ".tmp":
+                    continue
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                logger.debug(f"Evicted cached report {path.name}")
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in self.directory.glob("*.*"):
+                path.unlink(missing_ok=True)
+            self.hits = self.misses = 0
+
+
+report_cache = ArtifactCache()
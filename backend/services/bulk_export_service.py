@@ -0,0 +1,200 @@
+"""
+Bulk Export Service
+Generates PDF/XLSX reports for many lots in a process pool and streams them into one ZIP
+"""
+
+import io
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import threading
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from executors import pools
+from services.artifact_cache import ArtifactCache, report_key
+
+logger = logging.getLogger(__name__)
+
+REPORT_FORMATS = ("pdf", "xlsx")
+DEFAULT_EXPORT_WORKERS = 2
+
+# (archive name, format, generator kwargs)
+ReportJob = Tuple[str, str, Dict[str, Any]]
+
+
+def render_report(fmt: str, kwargs: Dict[str, Any]) -> bytes:
+    """Render one report; module-level so worker processes can run it."""
+    if fmt == "pdf":
+        from pdf_generator import generate_pdf_report
+        return generate_pdf_report(**kwargs).getvalue()
+    if fmt == "xlsx":
+        from excel_generator import generate_excel_report
+        return generate_excel_report(**kwargs).getvalue()
+    raise ValueError(f"Unknown report format: {fmt}")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable sink collecting what ZipFile writes until the response drains it."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _run_inline(jobs: List[ReportJob]) -> Iterator[Tuple[ReportJob, Optional[bytes], Optional[str]]]:
+    for job in jobs:
+        try:
+            yield job, render_report(job[1], job[2]), None
+        except Exception as e:
+            logger.error(f"Report {job[0]} failed: {e}", exc_info=True)
+            yield job, None, str(e)
+
+
+_processes: Optional[ProcessPoolExecutor] = None
+_processes_lock = threading.Lock()
+
+
+def _export_processes() -> ProcessPoolExecutor:
+    """
+    Worker processes shared by every bulk export, one per export pool worker.
+
+    Concurrent exports queue their reports here instead of spawning processes
+    of their own, so the export pool's bound also bounds the processes.
+    """
+    global _processes
+    with _processes_lock:
+        if _processes is None:
+            workers = max(1, min(pools["export"].workers, os.cpu_count() or 1))
+            _processes = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _processes
+
+
+def _discard_processes(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken process pool so the next export starts a fresh one."""
+    global _processes
+    with _processes_lock:
+        if _processes is pool:
+            _processes = None
+    pool.shutdown(wait=False)  # its futures have all failed with BrokenProcessPool
+
+
+def shutdown_export_processes() -> None:
+    global _processes
+    with _processes_lock:
+        pool, _processes = _processes, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_pool(jobs: List[ReportJob]) -> Iterator[Tuple[ReportJob, Optional[bytes], Optional[str]]]:
+    """Yield reports in completion order; falls back to inline rendering if the pool breaks."""
+    pool = _export_processes()
+    # Every job not yet yielded, finished or not, so none is lost if the pool breaks
+    pending: Dict[Future, ReportJob] = {}
+    unsubmitted = list(jobs)
+    try:
+        while unsubmitted:
+            arcname, fmt, kwargs = unsubmitted[0]
+            pending[pool.submit(render_report, fmt, kwargs)] = unsubmitted.pop(0)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = pending[future]
+                try:
+                    content, error = future.result(), None
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    logger.error(f"Report {job[0]} failed: {e}", exc_info=True)
+                    content, error = None, str(e)
+                del pending[future]
+                yield job, content, error
+    except BrokenProcessPool as e:
+        logger.warning(f"Export worker pool failed, rendering remaining reports inline: {e}")
+        _discard_processes(pool)
+        for future, job in list(pending.items()):
+            # Reports finished before the pool broke are kept; the rest are rendered here
+            if future.done() and not future.cancelled() and future.exception() is None:
+                yield job, future.result(), None
+            else:
+                yield from _run_inline([job])
+        yield from _run_inline(unsubmitted)
+    finally:
+        # The pool is shared: only this export's queued reports are withdrawn
+        for future in pending:
+            future.cancel()
+
+
+def iter_reports_zip(
+    jobs: List[ReportJob],
+    skipped: Optional[Dict[str, str]] = None,
+    max_workers: int = DEFAULT_EXPORT_WORKERS,
+    cache: Optional[ArtifactCache] = None,
+) -> Iterator[bytes]:
+    """
+    Stream a ZIP of the rendered reports, adding each one as soon as it is ready.
+
+    Reports found in `cache` are added first; the others are rendered in
+    the shared worker processes (reportlab and openpyxl are CPU-bound and hold
+    the GIL) and stored in `cache`. Failed reports are left out and listed,
+    with `skipped` lots, in errori.json at the end of the archive.
+
+    Yields:
+        ZIP bytes, one chunk per finished report
+    """
+    errors = dict(skipped or {})
+    keys: Dict[str, str] = {}
+    cached: List[Tuple[str, BinaryIO]] = []
+    to_render: List[ReportJob] = []
+    for job in jobs:
+        arcname, fmt, kwargs = job
+        fileobj = None
+        if cache is not None:
+            keys[arcname] = report_key(fmt, kwargs)
+            fileobj = cache.open(keys[arcname], fmt)
+        if fileobj is None:
+            to_render.append(job)
+        else:
+            cached.append((arcname, fileobj))
+
+    written = 0
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for arcname, fileobj in cached:
+            with fileobj, zf.open(arcname, "w") as entry:
+                shutil.copyfileobj(fileobj, entry)
+            written += 1
+            yield sink.drain()
+
+        workers = max(1, min(max_workers, os.cpu_count() or 1, len(to_render)))
+        results = _run_pool(to_render) if workers > 1 else _run_inline(to_render)
+        for (arcname, fmt, _kwargs), content, error in results:
+            if error is not None:
+                errors[arcname] = error
+                continue
+            zf.writestr(arcname, content)
+            if cache is not None:
+                cache.put(keys[arcname], fmt, io.BytesIO(content))
+            written += 1
+            yield sink.drain()
+        if errors:
+            zf.writestr("errori.json", json.dumps(errors, indent=2, ensure_ascii=False))
+    logger.info(f"Bulk export completed: {written}/{len(jobs)} reports ({len(cached)} cached)")
+    yield sink.drain()
@@ -6,6 +6,8 @@ Calcoli di costo, margine e scenari per gare Poste.
 from typing import Dict, Any, List, Optional, TYPE_CHECKING
 import logging
 
+from metrics import timed
+
 logger = logging.getLogger(__name__)
 
 
@@ -69,6 +71,7 @@ class BusinessPlanService:
         return effort * (1 - reuse_factor)
 
     @staticmethod
+    @timed("business_plan", "team_cost")
     def calculate_team_cost(
         team_composition: List[Dict[str, Any]],
         volume_adjustments: Dict[str, Any],
@@ -607,6 +610,7 @@ class BusinessPlanService:
         return result
 
     @staticmethod
+    @timed("business_plan", "catalog_cost")
     def calculate_catalog_cost(
         tows: List[Any],
         profile_mappings: Dict[str, Any],
@@ -824,6 +828,7 @@ class BusinessPlanService:
         }
 
     @staticmethod
+    @timed("business_plan", "governance_cost")
     def calculate_governance_cost(
         bp_data: Dict[str, Any],
         profile_rates: Dict[str, float],
@@ -0,0 +1,324 @@
+"""
+Certificate Extraction Rules
+Precompiled regex rules for OCR text extraction, with per-rule timing
+"""
+
+import json
+import hashlib
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Date pattern with context keywords for better identification
+DATE_PATTERN_GENERIC = r'(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4}|\d{4}[\/\-\.]\d{1,2}[\/\-\.]\d{1,2}|(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+\d{1,2},?\s*\d{4}|\d{1,2}\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s*\d{4})'
+
+# Expiry/end dates (allow newlines between keyword and date)
+EXPIRY_DATE_PATTERNS = [
+    ("expires", rf'expir(?:es?|ation|y)\s*(?:date)?\s*[:\-]?\s*{DATE_PATTERN_GENERIC}'),
+    ("valid_until", rf'valid\s*(?:until|thru|through|to)\s*[:\-]?\s*{DATE_PATTERN_GENERIC}'),
+    ("ends", rf'end(?:s|ing)?\s*(?:date)?\s*[:\-]?\s*{DATE_PATTERN_GENERIC}'),
+]
+
+# Issue/start dates
+ISSUE_DATE_PATTERNS = [
+    ("issued", rf'issue[d]?\s*(?:date|on)?\s*[:\-]?\s*{DATE_PATTERN_GENERIC}'),
+    ("valid_from", rf'valid\s*(?:from|since)\s*[:\-]?\s*{DATE_PATTERN_GENERIC}'),
+    ("effective", rf'effective\s*(?:from|date|day)?\s*[:\-]?\s*{DATE_PATTERN_GENERIC}'),
+    ("starts", rf'start(?:s|ing)?\s*(?:date)?\s*[:\-]?\s*{DATE_PATTERN_GENERIC}'),
+    ("date_registered", rf'date\s*(?:registered|of\s*issue)\s*[:\-]?\s*{DATE_PATTERN_GENERIC}'),
+]
+
+# Month names for date terminators
+_MONTHS = r'(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)'
+
+# Common certification title patterns - order matters, more specific first
+CERT_NAME_PATTERNS = [
+    # Cisco patterns - must be before generic ones (include months as terminators for expiration dates)
+    rf'Cisco\s+Certified\s+Specialist\s*[-–]\s*([A-Za-z][A-Za-z\s\-]+?)(?:\s+Issued|\s+Date|\s+Cisco|\s+Expir|\s+{_MONTHS}|\s+CSCO|\s+\d{{4}}|\s*$)',
+    rf'Cisco\s+Certified\s+([A-Za-z][A-Za-z\s\-]+?)(?:\s+Issued|\s+Date|\s+Cisco|\s+Expir|\s+{_MONTHS}|\s+CSCO|\s+\d{{4}}|\s*$)',
+    r'(CCNA|CCNP|CCIE|CCDA|CCDP)\s*[-–]?\s*([A-Za-z][A-Za-z\s\-]*?)(?:\s+Issued|\s+Date|\s+Cisco|\s*$)',
+    # Microsoft patterns (English)
+    r'Microsoft\s+Certified[:\s]+([A-Za-z][A-Za-z\s\-]+?(?:Expert|Associate|Fundamentals))',
+    # Microsoft Italian - "Certificato Microsoft:" pattern (Italian cert names)
+    r'Certificat[oi]\s+Microsoft[:\s]+([A-Za-zÀ-ÿ][A-Za-zÀ-ÿ\s\-]+?)(?:\s+ID\s+della|\s+Numero|\s+Verifica|\s+Credential|\s*$)',
+    # Microsoft Italian - "Certificazione Microsoft:" alternate pattern  
+    r'Certificazione\s+Microsoft[:\s]+([A-Za-zÀ-ÿ][A-Za-zÀ-ÿ\s\-]+?)(?:\s+ID|\s+Numero|\s+Verifica|\s*$)',
+    # ServiceNow - capture full cert name (greedy until Issued/line-end)
+    r'requirements\s+for\s+(.+?)(?:\s+Issued|\s+Certification)',
+    r'requirements\s+for\s+([A-Za-z][A-Za-z\s\-]+(?:Administrator|Developer|Specialist|Manager|Expert))',
+    # Red Hat - allow more chars
+    r'RED\s*HAT\s+CERTIFIED\s+([A-Z][A-Za-z\s\-]+)(?:\s+Red|\s+Issued)',
+    r'Red\s*Hat\s+Certified\s+([A-Za-z][A-Za-z\s\-]+)(?:\s+Red|\s+Issued)',
+    r'certified\s+as\s+a\s+RED\s+HAT\s+([A-Z][A-Za-z\s\-]+)',
+    # AWS
+    r'AWS\s+Certified\s+([A-Za-z][A-Za-z\s\-]+?)(?:\s+Validation|\s+Badge|\s+AWS|\s+Issued)',
+    # Google Cloud (more variants)
+    r'Google\s+Cloud\s+(?:Certified\s+)?([A-Za-z][A-Za-z\s\-]+?)(?:\s+Credential|\s+Google|\s+Issued)',
+    r'Google\s+Cloud\s+([A-Za-z][A-Za-z\s\-]+?)(?:Professional|Associate)',
+    # Oracle
+    r'Oracle\s+Certified\s+([A-Za-z][A-Za-z\s\-]+?)(?:\s+Oracle|\s+Credential|\s+Issued)',
+    # SAP
+    r'SAP\s+Certified\s+([A-Za-z][A-Za-z\s\-]+?)(?:\s+SAP|\s+Credential|\s+Issued)',
+    # VMware / VCP / VCAP
+    r'VMware\s+Certified\s+([A-Za-z][A-Za-z\s\-]+?)(?:\s+Professional|\s+Advanced|\s+Design|\s+VCAP|\s+VCP)',
+    r'VCP[\-\s]*(?:\d{2}|[A-Z]{2,})?\s*([A-Za-z][A-Za-z\s\-]+?)(?:\s+Certification|\s+Issued)',
+    # PMI/PMP / ITIL
+    r'(Project\s+Management\s+Professional)',
+    r'(ITIL\s+\d\s+[A-Za-z][A-Za-z\s\-]+?)(?:\s+Certificate|\s+ITIL|\s+Axelos|\s+Issued)',  # ITIL 4 Managing Professional
+    r'ITIL\s+(?:v\d\s+)?([A-Za-z][A-Za-z\s\-]+?)(?:\s+Certificate|\s+ITIL|\s+Axelos|\s+Issued)',
+    # PRINCE2 / PeopleCert / Axelos - full name patterns FIRST
+    r'(PRINCE2®?\s+Foundation\s+Certificate(?:\s+in\s+Project\s+Management)?)',
+    r'(PRINCE2®?\s+Practitioner\s+Certificate(?:\s+in\s+Project\s+Management)?)',
+    r'(PRINCE2®?\s+Agile\s+(?:Foundation|Practitioner)(?:\s+Certificate)?)',
+    r'PeopleCert[:\s]+([A-Za-z][A-Za-z\s\-0-9]+?)(?:\s+Certificate|\s+Issued|\s+Valid|\s*$)',
+    r'Axelos[:\s]+([A-Za-z][A-Za-z\s\-0-9]+?)(?:\s+Certificate|\s+Issued|\s+Valid|\s*$)',
+    # PRINCE2 fallback - only level name if full pattern didn't match
+    r'(PRINCE2®?\s+(?:Foundation|Practitioner|Agile))',
+    # IAPP - Privacy certifications - specific patterns first
+    r'(CIPP(?:/[A-Z]{1,2})?)',  # CIPP, CIPP/E, CIPP/US, CIPP/C, etc.
+    r'(CIPM)',  # Certified Information Privacy Manager
+    r'(CIPT)',  # Certified Information Privacy Technologist
+    r'(FIP)',   # Fellow of Information Privacy
+    r'confer\s+upon.*?the\s+designation\s+of\s+([A-Z]{3,5}(?:/[A-Z]{1,2})?)',  # IAPP "confer upon X the designation of CIPM"
+    r'(Certified\s+Information\s+Privacy\s+(?:Professional|Manager|Technologist))',  # Full IAPP cert name
+    r'knowledge\s+of[.\s]+information\s+privacy\s+management.*(CIPM)',  # Map "information privacy management" context to CIPM
+    # ISACA - Governance/Audit certifications
+    r'(CGEIT)',  # Certified in Governance of Enterprise IT
+    r'(CISA)',   # Certified Information Systems Auditor
+    r'(CISM)',   # Certified Information Security Manager
+    r'(CRISC)',  # Certified in Risk and Information Systems Control
+    r'(CDPSE)',  # Certified Data Privacy Solutions Engineer
+    r'qualified\s+as\s+(?:a\s+)?Certified\s+in\s+(?:the\s+)?(Governance\s+of\s+Enterprise\s+IT)',  # CGEIT full name
+    r'Certified\s+in\s+(?:the\s+)?(Governance\s+of\s+Enterprise\s+IT)',
+    r'Certified\s+Information\s+(Systems?\s+Auditor)',
+    r'Certified\s+Information\s+(Security\s+Manager)',
+    r'Certified\s+in\s+(Risk\s+and\s+Information\s+Systems?\s+Control)',
+    # The Open Group - TOGAF
+    r'(TOGAF\s+\d+\s+Certified)',  # TOGAF 9 Certified
+    r'(TOGAF\s+\d+\s+Foundation)',
+    r'(TOGAF\s+\d+\s+Practitioner)',
+    r'TOGAF\s+\d+\s+Certification.*at\s+the\s+(TOGAF\s+\d+\s+Certified)\s+level',
+    r'requirements\s+of\s+the\s+(TOGAF\s+\d+)\s+Certification',
+    r'(ArchiMate\s+\d+\s+(?:Foundation|Practitioner|Certified))',
+    # APMG - Agile/Programme Management
+    r'(Agile\s+Project\s+Management\s+(?:Foundation|Practitioner))',
+    r'(AgilePM\s+(?:Foundation|Practitioner))',
+    r'(MSP\s+(?:Foundation|Practitioner|Advanced\s+Practitioner))',
+    r'(Managing\s+Successful\s+Programmes?\s+(?:Foundation|Practitioner))',
+    r'(MoR\s+(?:Foundation|Practitioner))',  # Management of Risk
+    r'(Management\s+of\s+Risk\s+(?:Foundation|Practitioner))',
+    r'(P3O\s+(?:Foundation|Practitioner))',
+    r'(Change\s+Management\s+(?:Foundation|Practitioner))',
+    r'APMG.*?(Agile\s+Project\s+Management)\s*(?:Foundation|Practitioner)',  # APMG Agile PM
+    # Generic patterns
+    r'Certificate\s+of\s+([A-Za-z][A-Za-z\s\-]+?)(?:\s+Issued|\s+Date|\s+This)',
+    r'certified\s+as\s+(?:a|an)?\s*([A-Za-z][A-Za-z\s\-]+?)(?:\s+on|\s+by|\s+Issued|\s+Date)',
+    # Fallback: any "Certified <Title>" stopping before date-like text
+    r'Certified\s+([A-Za-z][A-Za-z\s\-]+?)(?:\s+Issued|\s+Date|\s+Expiration|\s+Valid|\s+Certification)'
+]
+
+# Words that should NEVER appear in cert names: cut from the first one to the end
+CERT_NAME_GARBAGE_WORDS = [
+    'Issued', 'ID', 'Credential', 'Number', 'No',
+    'Ottenuta', 'Scadenza', 'Verific',
+    'THE', 'WORLD', 'WORKS', 'WITH', 'Jayney', 'Howson', 'UL', 'Uf',
+]
+
+# Fallback: vendor-specific code patterns (for common formats)
+CERT_CODE_FALLBACK_PATTERNS = {
+    "aws": r"(SAA-C\d+|DVA-C\d+|SOA-C\d+|CLF-C\d+)",
+    "microsoft": r"(AZ-\d+|MS-\d+|DP-\d+|AI-\d+|PL-\d+)",
+    "sap": r"(C_\w+_\d+|E_\w+_\d+|P_\w+_\d+)",
+    "oracle": r"(1Z0-\d+)",
+    "redhat": r"(EX\d+)",
+}
+
+# Vendor cert_patterns that look like codes (contain digits/code formats)
+_CODE_LIKE_PATTERN = re.compile(r'\\d|[A-Z]{2,}[-_]\\d', re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class Rule:
+    """A named, compiled extraction pattern."""
+    name: str
+    regex: "re.Pattern"
+
+
+class RuleTimings:
+    """Process-wide per-rule counters: calls, matches and time spent searching."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, List[float]] = {}  # name -> [calls, matches, seconds]
+        self._patterns: Dict[str, str] = {}
+
+    def record(self, rule: Rule, elapsed: float, matched: bool) -> None:
+        with self._lock:
+            stats = self._stats.get(rule.name)
+            if stats is None:
+                stats = self._stats[rule.name] = [0, 0, 0.0]
+                self._patterns[rule.name] = rule.regex.pattern
+            stats[0] += 1
+            stats[1] += 1 if matched else 0
+            stats[2] += elapsed
+
+    def report(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Rules sorted by total search time, most expensive first."""
+        with self._lock:
+            rows = [
+                {
+                    "rule": name,
+                    "calls": int(calls),
+                    "matches": int(matches),
+                    "total_ms": round(seconds * 1000, 3),
+                    "avg_us": round(seconds / calls * 1_000_000, 1) if calls else 0.0,
+                    "pattern": self._patterns[name][:120],
+                }
+                for name, (calls, matches, seconds) in self._stats.items()
+            ]
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows[:limit] if limit else rows
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._patterns.clear()
+
+
+rule_timings = RuleTimings()
+
+
+def _compile_rules(prefix: str, patterns: Sequence[Tuple[str, str]], flags: int = 0) -> List[Rule]:
+    """Compile (name, pattern) pairs; invalid user-supplied patterns are skipped with a warning."""
+    rules = []
+    for name, pattern in patterns:
+        try:
+            rules.append(Rule(f"{prefix}.{name}", re.compile(pattern, flags)))
+        except re.error as e:
+            logger.warning(f"Skipping invalid extraction pattern {prefix}.{name} ({pattern!r}): {e}")
+    return rules
+
+
+def _indexed(patterns: Sequence[str]) -> List[Tuple[str, str]]:
+    return [(str(i), pattern) for i, pattern in enumerate(patterns)]
+
+
+class RuleSet:
+    """
+    Ordered rules scanned by priority: the first rule that matches wins.
+
+    Rules are kept as separate patterns instead of one merged alternation
+    because the priority order (not the position in the text) decides which
+    rule wins, and callers may reject a match and continue with the next rule.
+    Every search is timed into `rule_timings`.
+    """
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = rules
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def scan(self, text: str) -> Iterator[Tuple[Rule, "re.Match"]]:
+        """Yield (rule, match) for each rule matching `text`, in priority order."""
+        for rule in self.rules:
+            start = time.perf_counter()
+            match = rule.regex.search(text)
+            rule_timings.record(rule, time.perf_counter() - start, match is not None)
+            if match:
+                yield rule, match
+
+    def first(self, text: str) -> Optional["re.Match"]:
+        """First match in priority order, or None."""
+        for _, match in self.scan(text):
+            return match
+        return None
+
+    def count(self, text: str) -> int:
+        """Number of rules matching `text`."""
+        return sum(1 for _ in self.scan(text))
+
+    def findall(self, text: str) -> List[Any]:
+        """Concatenated findall() results of every rule, in rule order."""
+        found: List[Any] = []
+        for rule in self.rules:
+            start = time.perf_counter()
+            matches = rule.regex.findall(text)
+            rule_timings.record(rule, time.perf_counter() - start, bool(matches))
+            found.extend(matches)
+        return found
+
+
+# Static rules, compiled once per process
+EXPIRY_DATE_RULES = RuleSet(_compile_rules("expiry_date", EXPIRY_DATE_PATTERNS, re.IGNORECASE | re.DOTALL))
+ISSUE_DATE_RULES = RuleSet(_compile_rules("issue_date", ISSUE_DATE_PATTERNS, re.IGNORECASE | re.DOTALL))
+CERT_NAME_RULES = RuleSet(_compile_rules("cert_name", _indexed(CERT_NAME_PATTERNS), re.IGNORECASE))
+CERT_NAME_GARBAGE_RE = re.compile(
+    r'\s+(?:' + '|'.join(CERT_NAME_GARBAGE_WORDS) + r').*$', re.IGNORECASE
+)
+CERT_CODE_FALLBACK_RULES = {
+    vendor: RuleSet(_compile_rules("cert_code_fallback", [(vendor, pattern)]))
+    for vendor, pattern in CERT_CODE_FALLBACK_PATTERNS.items()
+}
+
+
+class ExtractionRules:
+    """Rules derived from the vendor configuration and the `date_patterns` setting."""
+
+    def __init__(self, vendors: Dict[str, Any], date_patterns: Sequence[str]):
+        self.date_patterns = RuleSet(_compile_rules("date_patterns", _indexed(date_patterns), re.IGNORECASE))
+        self.vendor_patterns: Dict[str, RuleSet] = {}
+        self.vendor_code_patterns: Dict[str, RuleSet] = {}
+        self.vendor_aliases: Dict[str, List["re.Pattern"]] = {}
+        for vendor_key, vendor_info in vendors.items():
+            patterns = _indexed(vendor_info.get("cert_patterns", []))
+            self.vendor_patterns[vendor_key] = RuleSet(_compile_rules(f"vendor.{vendor_key}", patterns))
+            self.vendor_code_patterns[vendor_key] = RuleSet(_compile_rules(
+                f"vendor_code.{vendor_key}",
+                [(name, pattern) for name, pattern in patterns if _CODE_LIKE_PATTERN.search(pattern)],
+                re.IGNORECASE,
+            ))
+            self.vendor_aliases[vendor_key] = [
+                re.compile(rf"\b{re.escape(alias)}\b") for alias in vendor_info.get("aliases", []) if alias
+            ]
+
+
+_rules_cache: Dict[str, ExtractionRules] = {}
+_rules_cache_lock = threading.Lock()
+_RULES_CACHE_SIZE = 8
+
+
+def get_extraction_rules(vendors: Dict[str, Any], date_patterns: Sequence[str]) -> ExtractionRules:
+    """
+    Compiled rules for a configuration, shared process-wide.
+
+    Keyed on a hash of the vendors and date patterns, so services built from
+    the same settings (one per request) reuse the same compiled patterns and
+    an edit in the settings UI yields a fresh set.
+    """
+    key = hashlib.sha256(
+        json.dumps({"vendors": vendors, "date_patterns": list(date_patterns)}, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    with _rules_cache_lock:
+        rules = _rules_cache.get(key)
+        if rules is None:
+            rules = ExtractionRules(vendors, date_patterns)
+            if len(_rules_cache) >= _RULES_CACHE_SIZE:
+                _rules_cache.pop(next(iter(_rules_cache)))
+            _rules_cache[key] = rules
+        return rules
+
+
+def get_rule_timing_report(limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Per-rule timing since process start (or the last reset), most expensive first."""
+    return rule_timings.report(limit)
+
+
+def reset_rule_timings() -> None:
+    rule_timings.reset()
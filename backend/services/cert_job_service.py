@@ -0,0 +1,308 @@
+"""
+Certificate Verification Job Service
+Runs folder/ZIP certificate verifications as persistent background jobs
+"""
+
+import os
+import shutil
+import logging
+import threading
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import crud
+import models
+from database import SessionLocal
+from process_coordination import LeaderLock
+from services.cert_verification_service import (
+    CertVerificationService,
+    find_pdf_files,
+    summarize_results,
+    zip_pdf_members,
+)
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+FINAL_STATUSES = ("completed", "failed", "cancelled")
+
+# How often processes check for the leader lock and the leader for queued jobs
+JOB_POLL_SECONDS = float(os.environ.get("CERT_JOB_POLL_SECONDS", "2"))
+
+
+def get_jobs_dir() -> str:
+    """
+    Directory holding uploaded ZIPs of pending jobs.
+    Must survive restarts for ZIP jobs to be resumable: defaults to a
+    `cert_jobs` folder next to the SQLite database (the /data volume in Docker/Kyma).
+    """
+    configured = os.environ.get("CERT_JOBS_DIR")
+    if configured:
+        return configured
+    db_path = os.environ.get("DB_PATH")
+    base_dir = os.path.dirname(os.path.abspath(db_path)) if db_path else os.path.dirname(
+        os.path.dirname(os.path.abspath(__file__))
+    )
+    return os.path.join(base_dir, "cert_jobs")
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex
+
+
+def job_upload_dir(job_id: str) -> str:
+    return os.path.join(get_jobs_dir(), job_id)
+
+
+def job_results(db, job: models.CertVerificationJobModel) -> List[Dict[str, Any]]:
+    """Per-file results of a job in processing order, with the job's req_filter applied."""
+    results = [row.result for row in crud.get_cert_job_files(db, job.id)]
+    if job.req_filter:
+        results = [r for r in results if r.get("req_code") == job.req_filter]
+    return results
+
+
+def job_to_dict(db, job: models.CertVerificationJobModel, include_results: bool = True) -> Dict[str, Any]:
+    """Serialize a job; completed jobs carry the same payload as /verify-certs."""
+    data = {
+        "id": job.id,
+        "status": job.status,
+        "source_type": job.source_type,
+        "source_name": job.source_name,
+        "lot_key": job.lot_key,
+        "req_filter": job.req_filter,
+        "total": job.total or 0,
+        "processed": job.processed or 0,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+    if include_results and job.status in ("completed", "cancelled"):
+        results = job_results(db, job)
+        data["results"] = {
+            "success": True,
+            "folder" if job.source_type == "folder" else "upload_filename": job.source_name,
+            "results": results,
+            "summary": job.summary if job.status == "completed" and job.summary else summarize_results(results),
+        }
+    return data
+
+
+def run_job(job_id: str, is_cancelled=lambda: False, is_stopping=lambda: False) -> None:
+    """
+    Execute (or resume) a verification job.
+
+    Files whose relative path already has a stored result are skipped, so a
+    job interrupted by a restart continues where it stopped. Progress is
+    committed after every file. `is_stopping` (server shutdown) leaves the
+    job running in the table so the next startup resumes it. Stored ZIPs are
+    read member by member, never extracted.
+    """
+    db = SessionLocal()
+    zip_ref = None
+    verified = None
+    try:
+        job = crud.get_cert_job(db, job_id)
+        if not job or job.status in FINAL_STATUSES:
+            return
+        if is_cancelled():
+            _finish(db, job, "cancelled")
+            return
+
+        job.status = "running"
+        job.started_at = job.started_at or models.utc_now()
+        job.error = None
+        db.commit()
+
+        vendors = CertVerificationService.load_vendors_from_db(db)
+        settings = CertVerificationService.load_settings_from_db(db)
+        service = CertVerificationService(vendors=vendors, settings=settings)
+        expected_certs_map = job.expected_certs_map or {}
+        done = crud.get_cert_job_done_filenames(db, job.id)
+
+        if job.source_type == "zip":
+            zip_ref = zipfile.ZipFile(job.source_path, 'r')
+            members = zip_pdf_members(zip_ref)
+            total = len(members)
+            pending = [m for m in members if m[1] not in done]
+            verified = ((name, result_dict) for _, name, result_dict in service.verify_zip(zip_ref, pending))
+        else:
+            folder = Path(job.source_path)
+            if not folder.exists():
+                _finish(db, job, "failed", error=f"Folder not found: {job.source_name or job.source_path}")
+                return
+            pdf_files = find_pdf_files(folder)
+            total = len(pdf_files)
+            verified = _verify_files(service, folder, pdf_files, done)
+
+        job.total = total
+        job.processed = len(done)
+        db.commit()
+        if done:
+            logger.info(f"Resuming cert job {job.id}: {len(done)}/{total} files already verified")
+
+        for relative_path, result_dict in verified:
+            req_code = result_dict.get("req_code", "")
+            if req_code and req_code in expected_certs_map:
+                result_dict["expected_cert_names"] = expected_certs_map[req_code]
+            crud.add_cert_job_file(db, job, relative_path, result_dict)
+            if is_stopping():
+                logger.info(f"Cert job {job.id} interrupted by shutdown after {job.processed} files")
+                return
+            # job.status is reloaded after each commit: another worker may have cancelled it
+            if is_cancelled() or job.status == "cancelled":
+                _finish(db, job, "cancelled")
+                return
+
+        _finish(db, job, "completed", summary=summarize_results(job_results(db, job)))
+        logger.info(f"Cert job {job.id} completed: {job.processed} files")
+
+    except Exception as e:
+        logger.error(f"Cert job {job_id} failed: {e}", exc_info=True)
+        db.rollback()
+        job = crud.get_cert_job(db, job_id)
+        if job:
+            _finish(db, job, "failed", error="Certificate verification failed")
+    finally:
+        if verified is not None:
+            verified.close()
+        if zip_ref is not None:
+            zip_ref.close()
+        db.close()
+
+
+def _verify_files(service: CertVerificationService, folder: Path, pdf_files: List[Path], done: set):
+    """Verify folder PDFs not yet in `done`, yielding (relative path, result dict)."""
+    for pdf_path in pdf_files:
+        relative_path = str(pdf_path.relative_to(folder))
+        if relative_path in done:
+            continue
+        result_dict = service.verify_certificate(str(pdf_path)).to_dict()
+        result_dict["filename"] = relative_path
+        yield relative_path, result_dict
+
+
+def _finish(db, job: models.CertVerificationJobModel, status: str, summary=None, error: Optional[str] = None) -> None:
+    job.status = status
+    job.summary = summary
+    job.error = error
+    job.finished_at = models.utc_now()
+    db.commit()
+    if job.source_type == "zip" and status in ("completed", "cancelled"):
+        shutil.rmtree(os.path.dirname(job.source_path), ignore_errors=True)
+
+
+class CertJobRunner:
+    """
+    Bounded background executor for verification jobs (one OCR run per worker).
+
+    With several server processes only the one holding the leader lock runs
+    jobs: start() makes each process poll for the lock, and the leader polls
+    the jobs table, so a job queued by any process (or left running by a
+    leader that died) is picked up once. Without start() (scripts, tests)
+    jobs run in the calling process.
+    """
+
+    def __init__(self, max_workers: int = 1, poll_seconds: float = JOB_POLL_SECONDS):
+        self.max_workers = max_workers
+        self.poll_seconds = poll_seconds
+        self.leader = LeaderLock("cert-jobs")
+        self._coordinated = False
+        self._poller: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending: set = set()
+        self._cancelled: set = set()
+        self._stopping = False
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="cert-job"
+                )
+            return self._executor
+
+    def submit(self, job_id: str) -> None:
+        """Queue a job unless it is already queued/running in this process (or another process leads)."""
+        if self._coordinated and not self.leader.is_leader:
+            return  # Stays queued in the table; the leader's poll picks it up
+        with self._lock:
+            if job_id in self._pending:
+                return
+            self._stopping = False
+            self._pending.add(job_id)
+        self._get_executor().submit(self._run, job_id)
+
+    def _run(self, job_id: str) -> None:
+        try:
+            run_job(
+                job_id,
+                is_cancelled=lambda: job_id in self._cancelled,
+                is_stopping=lambda: self._stopping,
+            )
+        finally:
+            with self._lock:
+                self._pending.discard(job_id)
+                self._cancelled.discard(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Request cancellation; returns True if the job is queued/running here."""
+        with self._lock:
+            if job_id not in self._pending:
+                return False
+            self._cancelled.add(job_id)
+            return True
+
+    def resume_pending(self) -> List[str]:
+        """Queue the jobs left queued/running in the table (by a request or a previous leader)."""
+        db = SessionLocal()
+        try:
+            job_ids = [job.id for job in crud.get_cert_jobs(db, statuses=list(ACTIVE_STATUSES))]
+        finally:
+            db.close()
+        with self._lock:
+            new_ids = [job_id for job_id in job_ids if job_id not in self._pending]
+        for job_id in reversed(new_ids):  # oldest first
+            self.submit(job_id)
+        if new_ids:
+            logger.info(f"Picked up {len(new_ids)} pending certificate verification jobs")
+        return new_ids
+
+    def start(self) -> None:
+        """Join leader election and start polling for jobs (call at server startup)."""
+        self._coordinated = True
+        self._stopping = False
+        self._wake.clear()
+        if self.leader.try_acquire():
+            self.resume_pending()
+        if self._poller is None or not self._poller.is_alive():
+            self._poller = threading.Thread(target=self._poll, name="cert-job-poller", daemon=True)
+            self._poller.start()
+
+    def _poll(self) -> None:
+        while not self._wake.wait(self.poll_seconds):
+            try:
+                if self.leader.try_acquire():
+                    self.resume_pending()
+            except Exception:
+                logger.error("Certificate job poll failed", exc_info=True)
+
+    def shutdown(self) -> None:
+        """Stop after the file in progress; unfinished jobs resume at next startup."""
+        self._wake.set()
+        with self._lock:
+            self._stopping = True
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+        # The leader lock is kept until the process exits, so no other worker
+        # resumes a job while this one is finishing its current file
+
+
+job_runner = CertJobRunner(max_workers=int(os.environ.get("CERT_JOB_WORKERS", "1")))
@@ -0,0 +1,101 @@
+"""
+Certificate Manifest Service
+Incremental folder verification: reuses the last result of unchanged PDFs
+"""
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import crud
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Statuses worth remembering: the others depend on transient conditions
+# (cloud placeholder not yet downloaded, OCR crash) and are retried next run
+NON_CACHEABLE_STATUSES = ("error", "not_downloaded", "unprocessed")
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FolderManifest:
+    """
+    Stored per-file results for one folder, keyed on path, size, mtime and content hash.
+
+    A file matching its entry on size and mtime is reused without being read;
+    when only the mtime differs (copied or touched file) the content hash
+    decides. Entries verified under another vendor/OCR configuration are ignored.
+    """
+
+    def __init__(self, db, folder: str, config_hash: str):
+        self.db = db
+        self.config_hash = config_hash
+        self.prefix = os.path.join(os.path.realpath(folder), "")
+        self.entries = crud.get_cert_manifest_entries(db, self.prefix)
+        self.seen = set()
+        self.cached = 0
+        self.verified = 0
+
+    def lookup(self, pdf_path: Path) -> Optional[Dict[str, Any]]:
+        """
+        Last result of an unchanged file, or None if it must be (re)verified.
+
+        Returns:
+            A copy of the stored CertVerificationResult dict
+        """
+        key = os.path.realpath(pdf_path)
+        self.seen.add(key)
+        entry = self.entries.get(key)
+        if entry is None or entry.config_hash != self.config_hash:
+            return None
+
+        stat = os.stat(key)
+        if entry.size != stat.st_size:
+            return None
+        if entry.mtime != stat.st_mtime:
+            if file_sha256(key) != entry.content_hash:
+                return None
+            entry.mtime = stat.st_mtime
+            self.db.commit()
+
+        self.cached += 1
+        return dict(entry.result)
+
+    def store(self, pdf_path: Path, result_dict: Dict[str, Any]) -> None:
+        """Remember the result of a freshly verified file."""
+        self.verified += 1
+        if result_dict.get("status") in NON_CACHEABLE_STATUSES:
+            return
+        key = os.path.realpath(pdf_path)
+        stat = os.stat(key)
+        self.entries[key] = crud.upsert_cert_manifest_entry(
+            self.db,
+            path=key,
+            size=stat.st_size,
+            mtime=stat.st_mtime,
+            content_hash=file_sha256(key),
+            config_hash=self.config_hash,
+            result=dict(result_dict),
+        )
+
+    def prune(self) -> int:
+        """Forget files under the folder that were not seen in this run (deleted/renamed)."""
+        stale = [path for path in self.entries if path not in self.seen]
+        removed = crud.delete_cert_manifest_entries(self.db, stale)
+        for path in stale:
+            self.entries.pop(path, None)
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        return {"cached": self.cached, "verified": self.verified}
@@ -0,0 +1,128 @@
+"""
+Certificate Name Matcher
+Bounded fuzzy matching of imported certification names against master data
+"""
+
+import heapq
+import logging
+import re
+import unicodedata
+from collections import Counter
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.fuzzy_index import normalize_label, trigrams
+
+logger = logging.getLogger(__name__)
+
+# Candidates (by shared trigrams) scored with SequenceMatcher for each query
+DEFAULT_CANDIDATES = 25
+
+
+@lru_cache(maxsize=16384)
+def fold_case(text: str) -> str:
+    """Lowercase and strip accents, keeping punctuation (key used for exact matches and ratios)."""
+    decomposed = unicodedata.normalize("NFD", text.lower())
+    return "".join(c for c in decomposed if unicodedata.category(c) != "Mn")
+
+
+class CertMatcher:
+    """
+    Matches names against a fixed list of known certifications.
+
+    Exact matches (case and accent insensitive) are a dict lookup. Otherwise
+    an inverted trigram index picks the `candidates` known names sharing the
+    most trigrams with the query, and only those are scored with
+    SequenceMatcher.ratio() — the same measure the import previews always
+    used, so thresholds keep their meaning. Each known name keeps its own
+    SequenceMatcher, so its lookup tables are built once.
+    """
+
+    def __init__(self, known_certs: Iterable[str], candidates: int = DEFAULT_CANDIDATES):
+        self.candidates = candidates
+        self._certs: List[str] = []
+        self._folded: List[str] = []
+        self._exact: Dict[str, str] = {}
+        self._postings: Dict[str, List[int]] = {}
+        self._matchers: Dict[int, SequenceMatcher] = {}
+        for cert in known_certs:
+            folded = fold_case(cert)
+            self._exact[folded] = cert
+            cert_id = len(self._certs)
+            self._certs.append(cert)
+            self._folded.append(folded)
+            for gram in trigrams(normalize_label(cert)):
+                self._postings.setdefault(gram, []).append(cert_id)
+
+    def _matcher(self, cert_id: int) -> SequenceMatcher:
+        matcher = self._matchers.get(cert_id)
+        if matcher is None:
+            matcher = SequenceMatcher(None, "", self._folded[cert_id])
+            self._matchers[cert_id] = matcher
+        return matcher
+
+    def match(self, name: str) -> Tuple[Optional[str], float]:
+        """
+        Best known certification for `name`.
+
+        Returns:
+            (matched_cert, ratio) — ratio 1.0 for exact matches, (None, 0.0)
+            when no known name shares a trigram with `name`
+        """
+        folded = fold_case(name)
+        if folded in self._exact:
+            return self._exact[folded], 1.0
+
+        shared = Counter()
+        for gram in trigrams(normalize_label(name)):
+            for cert_id in self._postings.get(gram, ()):
+                shared[cert_id] += 1
+        top = heapq.nlargest(self.candidates, shared.items(), key=lambda item: item[1])
+
+        best_ratio, best_id = 0.0, None
+        # Known-list order on ties, as the exhaustive scan did
+        for cert_id in sorted(cert_id for cert_id, _ in top):
+            matcher = self._matcher(cert_id)
+            matcher.set_seq1(folded)
+            if matcher.real_quick_ratio() <= best_ratio or matcher.quick_ratio() <= best_ratio:
+                continue
+            ratio = matcher.ratio()
+            if ratio > best_ratio:
+                best_ratio, best_id = ratio, cert_id
+        return (self._certs[best_id] if best_id is not None else None), best_ratio
+
+
+class VendorDetector:
+    """
+    Guesses the vendor of a certification name from VendorConfig aliases and cert_patterns.
+
+    Aliases are lowercased and patterns compiled once per import instead of
+    once per row; results are memoised per name.
+    """
+
+    def __init__(self, vendor_configs: Iterable):
+        self._vendors: List[Tuple[str, List[str], List[re.Pattern]]] = []
+        for vc in vendor_configs:
+            patterns = []
+            for pattern in (vc.cert_patterns or []):
+                try:
+                    patterns.append(re.compile(pattern, re.IGNORECASE))
+                except re.error as e:
+                    logger.debug(f"Skipping invalid cert pattern '{pattern}' for vendor {vc.key}: {e}")
+            self._vendors.append((vc.key, [a.lower() for a in (vc.aliases or [])], patterns))
+        self._cache: Dict[str, str] = {}
+
+    def detect(self, cert_name: str) -> str:
+        """Vendor key for `cert_name`, or "" when nothing matches."""
+        if cert_name not in self._cache:
+            self._cache[cert_name] = self._detect(cert_name.lower())
+        return self._cache[cert_name]
+
+    def _detect(self, cert_lower: str) -> str:
+        for key, aliases, patterns in self._vendors:
+            if any(alias in cert_lower for alias in aliases):
+                return key
+            if any(pattern.search(cert_lower) for pattern in patterns):
+                return key
+        return ""
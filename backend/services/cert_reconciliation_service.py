@@ -0,0 +1,221 @@
+"""
+Certificate Reconciliation Service
+Matches a batch of verification results against every lot's requirements
+and computes how many resources (R) and certificates (C) can be claimed
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import crud
+from services.fuzzy_index import DEFAULT_MIN_SCORE, TrigramIndex, normalize_label
+
+logger = logging.getLogger(__name__)
+
+# Only verified, in-date certificates can be claimed in the technical offer
+CLAIMABLE_STATUSES = ("valid",)
+
+
+def resource_key(name: Optional[str]) -> str:
+    """Identity of a resource: normalized name tokens in sorted order ("Rossi Mario" == "Mario Rossi")."""
+    return " ".join(sorted(normalize_label(name or "").split()))
+
+
+def requirement_caps(req: Dict[str, Any]) -> Tuple[int, int]:
+    """Max R and max C per certificate for a resource requirement (same rule as the tech evaluator)."""
+    max_r = req.get("prof_R") if isinstance(req.get("prof_R"), int) else req.get("max_res")
+    max_c = req.get("prof_C") if isinstance(req.get("prof_C"), int) else req.get("max_certs")
+    return int(max_r if isinstance(max_r, int) else 1), int(max_c if isinstance(max_c, int) else 1)
+
+
+class CertReconciler:
+    """
+    Reconciles verification results with lot requirements in bulk.
+
+    The certificate index (master prof_certs plus every lot's
+    selected_prof_certs) is built once; each distinct certificate name in the
+    batch is matched once through the trigram index.
+    """
+
+    def __init__(
+        self,
+        lots: Dict[str, Dict[str, Any]],
+        master_certs: Iterable[str] = (),
+        min_score: float = DEFAULT_MIN_SCORE,
+    ):
+        self.lots = lots
+        self.min_score = min_score
+        self.index = TrigramIndex(master_certs)
+        # Normalized cert label -> [(lot_key, req)] selecting it
+        self._selected_by: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+        # lot_key -> normalized req id -> req (to honour req codes in filenames)
+        self._req_ids: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for lot_key, lot in lots.items():
+            resource_reqs = [r for r in lot.get("reqs", []) if r.get("type") == "resource"]
+            self._req_ids[lot_key] = {normalize_label(r.get("id", "")): r for r in resource_reqs}
+            for req in resource_reqs:
+                for cert in req.get("selected_prof_certs") or []:
+                    self.index.add(cert)
+                    self._selected_by.setdefault(normalize_label(cert), []).append((lot_key, req))
+        self._match_cache: Dict[Tuple[str, ...], Optional[Tuple[str, float]]] = {}
+
+    def match_cert(self, result: Dict[str, Any]) -> Optional[Tuple[str, float]]:
+        """Best indexed certificate for a result, trying OCR name, filename name and code."""
+        queries = tuple(
+            q for q in (result.get("cert_name_detected"), result.get("cert_name_from_file"), result.get("cert_code_detected"))
+            if q
+        )
+        if queries not in self._match_cache:
+            best = None
+            for query in queries:
+                match = self.index.best(query, self.min_score)
+                if match and (best is None or match[1] > best[1]):
+                    best = match
+            self._match_cache[queries] = best
+        return self._match_cache[queries]
+
+    def _target_reqs(self, cert_label: str, req_code: Optional[str]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Requirements a matched certificate counts for; a req code in the filename pins its lot's requirement."""
+        targets = []
+        pinned = normalize_label(req_code or "")
+        for lot_key, req in self._selected_by.get(normalize_label(cert_label), []):
+            lot_reqs = self._req_ids[lot_key]
+            if pinned in lot_reqs and lot_reqs[pinned] is not req:
+                continue
+            targets.append((lot_key, req))
+        return targets
+
+    def reconcile(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Match every result and aggregate coverage per lot requirement.
+
+        Returns:
+            {"lots": {lot_key: {"requirements": [...]}}, "files": [...], "summary": {...}}
+        """
+        coverage: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        files = []
+        matched = 0
+
+        for result in results:
+            match = self.match_cert(result)
+            entry = {
+                "filename": result.get("filename"),
+                "resource_name": result.get("resource_name"),
+                "status": result.get("status"),
+                "matched_cert": match[0] if match else None,
+                "match_score": match[1] if match else 0.0,
+                "requirements": [],
+            }
+            files.append(entry)
+            if not match:
+                continue
+            matched += 1
+
+            resource = resource_key(result.get("resource_name"))
+            for lot_key, req in self._target_reqs(match[0], result.get("req_code")):
+                entry["requirements"].append({"lot_key": lot_key, "req_id": req.get("id")})
+                cov = coverage.setdefault((lot_key, req.get("id")), {"holders": {}, "excluded": {}, "names": {}})
+                if result.get("status") not in CLAIMABLE_STATUSES or not resource:
+                    status = result.get("status") or "unknown"
+                    cov["excluded"][status] = cov["excluded"].get(status, 0) + 1
+                    continue
+                cov["holders"].setdefault(normalize_label(match[0]), set()).add(resource)
+                cov["names"].setdefault(resource, result.get("resource_name"))
+
+        lots_out = {}
+        for lot_key, lot in self.lots.items():
+            reqs_out = []
+            for req in lot.get("reqs", []):
+                if req.get("type") != "resource":
+                    continue
+                reqs_out.append(self._requirement_coverage(req, coverage.get((lot_key, req.get("id")))))
+            lots_out[lot_key] = {"requirements": reqs_out}
+
+        logger.info(f"Reconciled {len(results)} certificates against {len(self.lots)} lots: {matched} matched")
+        return {
+            "lots": lots_out,
+            "files": files,
+            "summary": {"total": len(results), "matched": matched, "unmatched": len(results) - matched},
+        }
+
+    def _requirement_coverage(self, req: Dict[str, Any], cov: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        max_r, max_c = requirement_caps(req)
+        selected = req.get("selected_prof_certs") or []
+        weights = req.get("prof_certs_weights") or {}
+        holders = cov["holders"] if cov else {}
+
+        cert_counts = {cert: len(holders.get(normalize_label(cert), ())) for cert in selected}
+        resources = set().union(*holders.values()) if holders else set()
+        c_val = sum(min(count, max_c) * weights.get(cert, 1.0) for cert, count in cert_counts.items())
+
+        return {
+            "req_id": req.get("id"),
+            "label": req.get("label"),
+            "prof_R": req.get("prof_R"),
+            "prof_C": req.get("prof_C"),
+            "max_res": req.get("max_res"),
+            "max_certs": req.get("max_certs"),
+            "resources_found": len(resources),
+            "resources": sorted(cov["names"][r] for r in resources) if cov else [],
+            "cert_counts": cert_counts,
+            "r_val": min(len(resources), max_r),
+            "c_val": round(c_val, 4),
+            "excluded": cov["excluded"] if cov else {},
+        }
+
+
+def _clip_company_counts(company_counts: Dict[str, Any], cert_counts: Dict[str, int]) -> Dict[str, Any]:
+    """Reduce per-company assignments so they never exceed the new per-cert totals."""
+    clipped = {}
+    for cert, per_company in (company_counts or {}).items():
+        remaining = cert_counts.get(cert, 0)
+        clipped[cert] = {}
+        for company, count in (per_company or {}).items():
+            clipped[cert][company] = min(count, remaining)
+            remaining -= clipped[cert][company]
+    return clipped
+
+
+def coverage_to_tech_inputs(
+    coverage: List[Dict[str, Any]],
+    saved_inputs: Dict[str, Any],
+    reqs: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Merge reconciled coverage into a lot state's tech_inputs.
+
+    Resource requirements get r_val / c_val / cert_counts from the verified
+    certificates, clamped to max_res / max_certs as the scoring engine does;
+    every other input (references, projects, RTI assignments) is kept.
+    """
+    req_map = {r.get("id"): r for r in reqs}
+    tech_inputs = {req_id: dict(value) for req_id, value in (saved_inputs or {}).items()}
+    for cov in coverage:
+        req = req_map.get(cov["req_id"], {})
+        r_val = cov["r_val"]
+        c_val = cov["c_val"]
+        if isinstance(req.get("max_res"), int):
+            r_val = min(r_val, req["max_res"])
+        if isinstance(req.get("max_certs"), int):
+            c_val = min(c_val, req["max_certs"])
+        current = tech_inputs.get(cov["req_id"], {})
+        tech_inputs[cov["req_id"]] = {
+            **current,
+            "r_val": r_val,
+            "c_val": c_val,
+            "cert_counts": dict(cov["cert_counts"]),
+            "cert_company_counts": _clip_company_counts(current.get("cert_company_counts"), cov["cert_counts"]),
+        }
+    return tech_inputs
+
+
+def reconcile_results(db, results: List[Dict[str, Any]], lot_keys: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Reconcile results against the stored lots (all, or `lot_keys`) and master prof_certs."""
+    lots = {
+        lot.name: {"reqs": lot.reqs or []}
+        for lot in crud.get_lot_configs(db)
+        if not lot_keys or lot.name in lot_keys
+    }
+    master = crud.get_master_data(db)
+    master_certs = (master.prof_certs or []) if master else []
+    return CertReconciler(lots, master_certs).reconcile(results)
@@ -5,12 +5,18 @@ Verifies PDF certificates against lot requirements using OCR
 
 import os
 import re
+import hashlib
 import logging
 import unicodedata
 import json
+import shutil
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
 from datetime import datetime, date
-from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
+from typing import List, Dict, Any, Iterator, Optional, Tuple, TYPE_CHECKING
 from dataclasses import dataclass, asdict, field
 from difflib import SequenceMatcher
 
@@ -35,14 +41,148 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 # Import default vendors from shared module (avoids duplication with crud.py)
+from metrics import StageTimer, timed
 from vendor_defaults import DEFAULT_VENDORS
 KNOWN_VENDORS = DEFAULT_VENDORS
 
+from services.cert_extraction_rules import (
+    CERT_CODE_FALLBACK_RULES,
+    CERT_NAME_GARBAGE_RE,
+    CERT_NAME_RULES,
+    EXPIRY_DATE_RULES,
+    ISSUE_DATE_RULES,
+    get_extraction_rules,
+)
+
 
 def _log_ocr_attempt_failure(stage: str, exc: Exception) -> None:
     logger.debug("OCR attempt failed during %s: %s", stage, exc)
 
 
+def _page_runs(pages: List[int]) -> List[Tuple[int, int]]:
+    """Group sorted 1-based page numbers into (first, last) runs of consecutive pages."""
+    runs: List[Tuple[int, int]] = []
+    for page in sorted(pages):
+        if runs and page == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], page)
+        else:
+            runs.append((page, page))
+    return runs
+
+
+def normalize_folder_path(folder_path: str) -> str:
+    """
+    Normalize a user-supplied folder path: strip quotes, expand user, normalize,
+    and map /Users/<user>/... -> /host_home/<rest> when that exists (Docker).
+    """
+    raw_path = folder_path.strip().strip("'").strip('"').strip()
+    normalized_path = os.path.normpath(os.path.expanduser(raw_path)) if raw_path else ""
+    if normalized_path.startswith("/Users/"):
+        parts = normalized_path.split("/", 3)  # ["", "Users", "user", "rest"]
+        if len(parts) >= 4:
+            candidate = "/host_home/" + parts[3]
+            if os.path.exists(candidate):
+                normalized_path = candidate
+    return normalized_path
+
+
+def zip_member_is_safe(extract_dir: str, member: str) -> bool:
+    """True if a ZIP member name stays inside `extract_dir` (no path traversal)."""
+    base_dir = os.path.realpath(extract_dir)
+    member_path = os.path.realpath(os.path.join(base_dir, member))
+    return os.path.commonpath([base_dir, member_path]) == base_dir
+
+
+def zip_pdf_members(zip_ref: zipfile.ZipFile) -> List[Tuple[zipfile.ZipInfo, str]]:
+    """
+    PDF members of a certificate ZIP as (info, relative filename), in archive
+    order, read from the central directory only (nothing is extracted).
+    
+    Skips directories, macOS artifacts and hidden files. When everything sits
+    in a single top-level folder, relative filenames start below it.
+    
+    Raises:
+        ValueError: if any member would escape the archive root (path traversal)
+    """
+    virtual_root = os.path.join(tempfile.gettempdir(), "cert_zip_root")
+    infos = zip_ref.infolist()
+    for info in infos:
+        if not zip_member_is_safe(virtual_root, info.filename):
+            raise ValueError("ZIP file contains unsafe paths")
+    
+    entries = [i for i in infos if not i.filename.startswith("__MACOSX/")]
+    top_level = {i.filename.split("/", 1)[0] for i in entries if not i.filename.startswith(".")}
+    prefix = ""
+    if len(top_level) == 1:
+        root = next(iter(top_level)) + "/"
+        if all(i.filename.startswith(root) for i in entries if not i.filename.startswith(".")):
+            prefix = root
+    
+    members = []
+    for info in entries:
+        basename = info.filename.rsplit("/", 1)[-1]
+        if info.is_dir() or not basename or basename.startswith("."):
+            continue
+        if Path(basename).suffix.lower() != ".pdf":
+            continue
+        members.append((info, info.filename[len(prefix):]))
+    return members
+
+
+def build_expected_certs_map(lot_config: Any) -> Dict[str, List[str]]:
+    """Return req_id -> expected professional cert names for OCR result enrichment."""
+    expected_certs_map: Dict[str, List[str]] = {}
+    if not lot_config or not lot_config.reqs:
+        return expected_certs_map
+
+    for req in lot_config.reqs:
+        req_id = req.get("id", "")
+        selected_certs = req.get("selected_prof_certs", [])
+        if req_id and selected_certs:
+            expected_certs_map[req_id] = selected_certs
+
+    return expected_certs_map
+
+
+def find_pdf_files(folder: Path) -> List[Path]:
+    """
+    All PDFs under `folder` (subfolders included), case-insensitive on the
+    extension and sorted so runs over the same folder are reproducible.
+    """
+    return sorted(p for p in folder.rglob("*") if p.suffix.lower() == ".pdf" and p.is_file())
+
+
+def summarize_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the verification summary (status counts, per requirement, per resource)."""
+    summary = {
+        "total": len(results),
+        "valid": sum(1 for r in results if r["status"] == "valid"),
+        "expired": sum(1 for r in results if r["status"] == "expired"),
+        "mismatch": sum(1 for r in results if r["status"] == "mismatch"),
+        "unreadable": sum(1 for r in results if r["status"] == "unreadable"),
+        "error": sum(1 for r in results if r["status"] == "error"),
+        "by_requirement": {},
+        "by_resource": {},
+    }
+    
+    for r in results:
+        req = r["req_code"]
+        if req not in summary["by_requirement"]:
+            summary["by_requirement"][req] = {"total": 0, "valid": 0}
+        summary["by_requirement"][req]["total"] += 1
+        if r["status"] == "valid":
+            summary["by_requirement"][req]["valid"] += 1
+        
+        res = r["resource_name"]
+        if res not in summary["by_resource"]:
+            summary["by_resource"][res] = {"total": 0, "valid": 0}
+        summary["by_resource"][res]["total"] += 1
+        if r["status"] == "valid":
+            summary["by_resource"][res]["valid"] += 1
+    
+    return summary
+
+
 @dataclass
 class CertVerificationResult:
     """Result of verifying a single certificate PDF"""
@@ -98,6 +238,42 @@ DEFAULT_TECH_TERMS = {
 
 DEFAULT_OCR_DPI = 600
 DEFAULT_MAX_FILE_SIZE_MB = 20  # Skip OCR for files larger than this (fix #5)
+DEFAULT_OCR_WORKERS = 2  # Parallel OCR workers for ZIP pipelines (Tesseract runs as a subprocess)
+
+# OCR retry ladder: preprocessing variants, from cheapest to most destructive
+OCR_LADDER_STEPS = ("original", "light", "aggressive")
+OCR_PROBE_MAX_SIDE = 1600  # Longest side (px) of the downscaled probe image
+# Tesseract OSD orientation confidence below which the answer is close to a guess
+OSD_MIN_CONFIDENCE = 3.0
+
+# Process-wide memory of which ladder step produced the OCR text, per vendor:
+# {vendor_key: {step: count}}. New files from a known vendor start there.
+_vendor_ladder_steps: Dict[str, Dict[str, int]] = {}
+_vendor_ladder_lock = threading.Lock()
+
+
+def record_ladder_step(vendor: Optional[str], step: Optional[str]) -> None:
+    """Remember that `step` produced usable OCR text for `vendor`."""
+    if not vendor or step not in OCR_LADDER_STEPS:
+        return
+    with _vendor_ladder_lock:
+        counts = _vendor_ladder_steps.setdefault(vendor, {})
+        counts[step] = counts.get(step, 0) + 1
+
+
+def preferred_ladder_step(vendor: Optional[str]) -> str:
+    """Ladder step that most often succeeded for `vendor` (default: original)."""
+    with _vendor_ladder_lock:
+        counts = _vendor_ladder_steps.get(vendor or "")
+        if not counts:
+            return OCR_LADDER_STEPS[0]
+        return max(OCR_LADDER_STEPS, key=lambda step: counts.get(step, 0))
+
+
+def get_ladder_stats() -> Dict[str, Dict[str, int]]:
+    """Snapshot of the per-vendor ladder step counters."""
+    with _vendor_ladder_lock:
+        return {vendor: dict(counts) for vendor, counts in _vendor_ladder_steps.items()}
 
 
 class CertVerificationService:
@@ -138,6 +314,10 @@ class CertVerificationService:
         self.tech_terms = set(self._load_setting('tech_terms', list(DEFAULT_TECH_TERMS)))
         self.ocr_dpi = int(self._load_setting('ocr_dpi', DEFAULT_OCR_DPI))
         self.max_file_size_mb = float(self._load_setting('max_file_size_mb', DEFAULT_MAX_FILE_SIZE_MB))
+        self.ocr_workers = max(1, int(self._load_setting('ocr_workers', DEFAULT_OCR_WORKERS)))
+        
+        # Regexes compiled once per configuration and shared across instances
+        self.rules = get_extraction_rules(self.vendors, self.date_patterns)
     
     def _load_setting(self, key: str, default: Any) -> Any:
         """Load a setting from the settings dict, parsing JSON if needed."""
@@ -336,7 +516,12 @@ class CertVerificationService:
     
     def extract_text_from_pdf(self, pdf_path: str) -> str:
         """
-        Extract text from PDF - first tries embedded text, then falls back to OCR
+        Extract text from PDF, deciding per page between embedded text and OCR
+        
+        Vendor certificates are often mixed (digital page 1, scanned page 2 or
+        the reverse): pages with a usable text layer are taken from PyMuPDF,
+        only the remaining pages are rasterised and OCR'd. Results are merged
+        in page order.
         
         Args:
             pdf_path: Path to the PDF file
@@ -344,55 +529,114 @@ class CertVerificationService:
         Returns:
             Extracted text
         """
-        # First, try to extract embedded text using PyMuPDF (much faster and more accurate)
+        text, _ = self._extract_text(pdf_path)
+        return text
+    
+    def _extract_text(
+        self, pdf_path: str, start_step: str = OCR_LADDER_STEPS[0]
+    ) -> Tuple[str, List[str]]:
+        """
+        Same as extract_text_from_pdf, also returning the OCR ladder step used
+        for each OCR'd page (empty when only embedded text was used).
+        """
+        # First, read the embedded text page by page using PyMuPDF (much faster and more accurate)
+        page_texts: Optional[List[str]] = None
         if PYMUPDF_AVAILABLE:
             try:
-                embedded_text = self._extract_embedded_text(pdf_path)
-                if embedded_text and len(embedded_text.strip()) > 50:
-                    # Check if text contains meaningful content
-                    score = self._score_ocr_text(embedded_text)
-                    if score >= 5:
-                        logger.debug(f"Using embedded text extraction (score={score}, length={len(embedded_text)})")
-                        return embedded_text
-                    else:
-                        logger.debug(f"Embedded text score too low ({score}), falling back to OCR")
+                page_texts = self._extract_embedded_pages(pdf_path)
             except Exception as e:
                 logger.debug(f"Embedded text extraction failed: {e}, falling back to OCR")
         
-        # Fall back to OCR if embedded text extraction fails or is insufficient
+        if page_texts is None:
+            return self._ocr_pdf_pages(pdf_path, start_step)
+        
+        ocr_pages = self._pages_needing_ocr(page_texts)
+        if not ocr_pages:
+            logger.debug(f"Using embedded text extraction for all {len(page_texts)} pages")
+            return "\n".join(t for t in page_texts if t), []
+        
+        logger.debug(
+            f"Hybrid extraction: {len(page_texts) - len(ocr_pages)} embedded, "
+            f"{len(ocr_pages)} OCR of {len(page_texts)} pages"
+        )
+        merged = list(page_texts)
+        steps = []
+        for page_num, (text, step) in self._ocr_pages(pdf_path, ocr_pages, start_step).items():
+            merged[page_num - 1] = text
+            steps.append(step)
+        return "\n".join(t for t in merged if t), steps
+    
+    def _pages_needing_ocr(self, page_texts: List[str]) -> List[int]:
+        """
+        Decide which pages (1-based) must be OCR'd.
+        
+        A page keeps its embedded text when it carries more than 50 characters
+        and the document's text layer as a whole scores as meaningful
+        certificate content (score >= 5). If the text layer is junk (e.g. an
+        invisible layer added by a scanner) every page goes through OCR.
+        """
+        text_pages = [t for t in page_texts if t and len(t.strip()) > 50]
+        if not text_pages:
+            return list(range(1, len(page_texts) + 1))
+        
+        score = self._score_ocr_text("\n".join(text_pages))
+        if score < 5:
+            logger.debug(f"Embedded text score too low ({score}), falling back to OCR")
+            return list(range(1, len(page_texts) + 1))
+        
+        return [
+            i + 1 for i, t in enumerate(page_texts)
+            if not t or len(t.strip()) <= 50
+        ]
+    
+    def _ocr_pdf_pages(self, pdf_path: str, start_step: str) -> Tuple[str, List[str]]:
+        """OCR every page of the PDF (used when no text layer can be read)."""
         try:
             # Convert PDF to images using configurable DPI
-            images = pdf2image.convert_from_path(pdf_path, dpi=self.ocr_dpi)
-            
-            text_parts = []
-            for i, image in enumerate(images):
-                # Try OCR with original orientation
-                text = self._ocr_with_rotation(image)
-                text_parts.append(text)
-            
-            return "\n".join(text_parts)
+            with timed("ocr", "rasterise"):
+                images = pdf2image.convert_from_path(pdf_path, dpi=self.ocr_dpi)
+            pages = [self._ocr_with_rotation(image, start_step) for image in images]
+            return "\n".join(text for text, _ in pages), [step for _, step in pages]
+        except Exception as e:
+            logger.error(f"Error extracting text from PDF {pdf_path}: {e}")
+            raise
+    
+    def _ocr_pages(
+        self, pdf_path: str, pages: List[int], start_step: str
+    ) -> Dict[int, Tuple[str, str]]:
+        """
+        Rasterise and OCR only the given pages (1-based), one pdf2image call
+        per run of consecutive pages.
         
+        Returns:
+            Dict page_number -> (OCR text, ladder step used)
+        """
+        texts: Dict[int, Tuple[str, str]] = {}
+        try:
+            for first, last in _page_runs(pages):
+                with timed("ocr", "rasterise"):
+                    images = pdf2image.convert_from_path(
+                        pdf_path, dpi=self.ocr_dpi, first_page=first, last_page=last
+                    )
+                for offset, image in enumerate(images):
+                    texts[first + offset] = self._ocr_with_rotation(image, start_step)
         except Exception as e:
             logger.error(f"Error extracting text from PDF {pdf_path}: {e}")
             raise
+        return texts
     
-    def _extract_embedded_text(self, pdf_path: str) -> str:
+    def _extract_embedded_pages(self, pdf_path: str) -> List[str]:
         """
-        Extract embedded text from PDF using PyMuPDF (fitz)
+        Extract embedded text from PDF using PyMuPDF (fitz), one entry per page
         
         Args:
             pdf_path: Path to the PDF file
             
         Returns:
-            Extracted embedded text
+            List of page texts (empty string for pages without a text layer)
         """
-        text_parts = []
-        with fitz.open(pdf_path) as doc:
-            for page in doc:
-                text = page.get_text()
-                if text:
-                    text_parts.append(text)
-        return "\n".join(text_parts)
+        with timed("ocr", "embedded_text"), fitz.open(pdf_path) as doc:
+            return [page.get_text() or "" for page in doc]
     
     def _preprocess_image(self, image: "PILImage.Image") -> "PILImage.Image":
         """
@@ -421,92 +665,116 @@ class CertVerificationService:
         binarized = enhanced.point(lambda x: 255 if x > threshold else 0, '1')
         return binarized.convert('L')
     
-    def _ocr_with_rotation(self, image: "PILImage.Image") -> str:
+    def _ladder_image(self, image: "PILImage.Image", step: str) -> "PILImage.Image":
+        """Return the image variant for an OCR ladder step."""
+        if step == "light":
+            return self._preprocess_image(image)
+        if step == "aggressive":
+            return self._preprocess_image_aggressive(image)
+        return image
+    
+    def _ocr_pass(self, image: "PILImage.Image", stage: str) -> Tuple[str, int]:
+        """Run one Tesseract pass and score it; failures count as empty text."""
+        try:
+            with timed("ocr", "tesseract"):
+                text = pytesseract.image_to_string(image, lang='eng+ita', config="--oem 3 --psm 6")
+        except Exception as exc:
+            _log_ocr_attempt_failure(stage, exc)
+            return "", 0
+        return text, self._score_ocr_text(text)
+    
+    def _detect_rotation(self, probe: "PILImage.Image") -> Optional[Tuple[int, float]]:
         """
-        Try OCR on image with limited rotation attempts for performance.
-        Only try preprocessing if original fails.
+        Detect page orientation with Tesseract OSD on the downscaled probe.
+        
+        Returns:
+            (clockwise rotation 0/90/180/270 needed to make the page upright,
+            OSD confidence), or None when OSD fails (e.g. too little text)
         """
-        configs = ["--oem 3 --psm 6"]
-        best_text = ""
-        best_score = 0
-        best_rotation = 0
+        try:
+            with timed("ocr", "orientation"):
+                osd = pytesseract.image_to_osd(probe, output_type=pytesseract.Output.DICT)
+        except Exception as exc:
+            _log_ocr_attempt_failure("orientation detection", exc)
+            return None
+        return int(osd.get("rotate", 0)) % 360, float(osd.get("orientation_conf", 0))
+    
+    def _ocr_with_rotation(
+        self, image: "PILImage.Image", start_step: str = OCR_LADDER_STEPS[0]
+    ) -> Tuple[str, str]:
+        """
+        OCR a page image with a cheap retry ladder.
         
-        # First try original image (most common case)
-        for cfg in configs:
-            try:
-                text = pytesseract.image_to_string(image, lang='eng+ita', config=cfg)
-            except Exception as exc:
-                _log_ocr_attempt_failure("original image", exc)
-                continue
-            score = self._score_ocr_text(text)
-            if score > best_score:
-                best_score = score
-                best_text = text
-                if score >= 10:
-                    logger.debug(f"Good OCR result at rotation 0° (score={best_score})")
-                    return best_text
-        
-        # If original has low score, try light preprocessing
-        if best_score < 10:
-            preprocessed = self._preprocess_image(image)
-            for cfg in configs:
-                try:
-                    text = pytesseract.image_to_string(preprocessed, lang='eng+ita', config=cfg)
-                except Exception as exc:
-                    _log_ocr_attempt_failure("light preprocessing", exc)
-                    continue
-                score = self._score_ocr_text(text)
-                if score > best_score:
-                    best_score = score
-                    best_text = text
-                    if score >= 10:
-                        logger.debug(f"Good OCR result with light preprocessing (score={best_score})")
-                        return best_text
+        Orientation is detected first (Tesseract OSD on a downscaled copy). A
+        confident OSD answer means the page has legible text: the rotation is
+        applied and `start_step` (typically the step that last worked for the
+        same vendor) is OCR'd at full resolution directly, the other steps only
+        if that pass is unusable (score < 5): at most 4 Tesseract calls.
+        
+        Otherwise the preprocessing ladder (original -> light -> aggressive) is
+        probed on the downscaled copy from `start_step`, with a 180° probe when
+        none of them is usable, and the best variant is OCR'd at full
+        resolution (steps left unprobed are tried there if it is unusable): at
+        most 6 calls, 4 of them on the downscaled copy.
+        
+        Returns:
+            Tuple of (best text, ladder step that produced it)
+        """
+        scale = min(1.0, OCR_PROBE_MAX_SIDE / max(image.size))
+        probe = image.resize(
+            (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+        ) if scale < 1.0 else image
+        
+        osd = self._detect_rotation(probe)
+        rotation = osd[0] if osd and osd[1] >= OSD_MIN_CONFIDENCE else None
+        if rotation:
+            image = image.rotate(-rotation, expand=True)
+            probe = probe.rotate(-rotation, expand=True)
+        
+        start = OCR_LADDER_STEPS.index(start_step) if start_step in OCR_LADDER_STEPS else 0
+        order = OCR_LADDER_STEPS[start:] + OCR_LADDER_STEPS[:start]
+        
+        # Probe the ladder on the downscaled copy, unless OSD already vouched for the page
+        probe_scores: Dict[str, int] = {}
+        if rotation is None:
+            for step in order:
+                _, probe_scores[step] = self._ocr_pass(self._ladder_image(probe, step), f"{step} probe")
+                if probe_scores[step] >= 10:
+                    break
+        
+            # No usable probe and no confident OSD: check it is not upside down (rare case)
+            if max(probe_scores.values()) < 5:
+                flipped = probe.rotate(180, expand=True)
+                _, flipped_score = self._ocr_pass(self._ladder_image(flipped, order[0]), "rotation 180 probe")
+                if flipped_score > max(probe_scores.values()):
+                    rotation = 180
+                    image = image.rotate(-180, expand=True)
+                    probe_scores[order[0]] = flipped_score
+        
+        chosen = max(order, key=lambda step: probe_scores.get(step, -1))
+        best_text, best_score = self._ocr_pass(self._ladder_image(image, chosen), chosen)
+        best_step = chosen
         
-        # If still failing badly, try aggressive binarization (for patterned backgrounds)
+        # Full-resolution fallback through the steps no probe has ruled out
         if best_score < 5:
-            preprocessed_aggr = self._preprocess_image_aggressive(image)
-            for cfg in configs:
-                try:
-                    text = pytesseract.image_to_string(preprocessed_aggr, lang='eng+ita', config=cfg)
-                except Exception as exc:
-                    _log_ocr_attempt_failure("aggressive preprocessing", exc)
+            for step in order:
+                if step == chosen or step in probe_scores:
                     continue
-                score = self._score_ocr_text(text)
+                text, score = self._ocr_pass(self._ladder_image(image, step), step)
                 if score > best_score:
-                    best_score = score
-                    best_text = text
-                    if score >= 10:
-                        logger.debug(f"Good OCR result with aggressive preprocessing (score={best_score})")
-                        return best_text
-        
-        # Only try rotation if still failing (rare case)
-        if best_score < 5:
-            for rotation in [180]:
-                rotated = image.rotate(-rotation, expand=True)
-                for cfg in configs:
-                    try:
-                        text = pytesseract.image_to_string(rotated, lang='eng+ita', config=cfg)
-                    except Exception as exc:
-                        _log_ocr_attempt_failure(f"rotation {rotation}", exc)
-                        continue
-                    score = self._score_ocr_text(text)
-                    if score > best_score:
-                        best_score = score
-                        best_text = text
-                        best_rotation = rotation
-                        if score >= 10:
-                            break
+                    best_text, best_score, best_step = text, score, step
                 if best_score >= 10:
                     break
         
         # Log result
         if best_score == 0:
             logger.debug("Could not extract meaningful text from image")
-        elif best_score >= 5:
-            logger.debug(f"OCR result at rotation {best_rotation}° (score={best_score})")
+        else:
+            logger.debug(
+                f"OCR result at rotation {rotation or 0}° with {best_step} step (score={best_score})"
+            )
         
-        return best_text
+        return best_text, best_step
     
     def _score_ocr_text(self, text: str) -> int:
         """
@@ -554,6 +822,16 @@ class CertVerificationService:
         
         return score
     
+    def _vendor_from_filename(self, cert_name_from_file: str) -> Optional[str]:
+        """Guess the vendor key from aliases in the filename's cert name (whole words only)."""
+        name_lower = (cert_name_from_file or "").lower()
+        if not name_lower:
+            return None
+        for vendor_key, alias_res in self.rules.vendor_aliases.items():
+            if any(alias_re.search(name_lower) for alias_re in alias_res):
+                return vendor_key
+        return None
+    
     def detect_vendor(self, text: str) -> Tuple[Optional[str], float]:
         """
         Detect certification vendor from OCR text
@@ -579,10 +857,7 @@ class CertVerificationService:
                     break
             
             # Check for certification patterns
-            pattern_matches = 0
-            for pattern in vendor_info["cert_patterns"]:
-                if re.search(pattern, text_lower):
-                    pattern_matches += 1
+            pattern_matches = self.rules.vendor_patterns[vendor_key].count(text_lower)
             
             if pattern_matches > 0:
                 score += min(0.5, pattern_matches * 0.2)
@@ -609,42 +884,20 @@ class CertVerificationService:
         
         text_upper = text.upper()
         
-        # Use vendor's configured cert_patterns to find codes
-        # Look for patterns that look like codes (contain numbers/dashes)
-        vendor_patterns = self.vendors[vendor].get("cert_patterns", [])
-        
-        for pattern in vendor_patterns:
-            try:
-                # Check if pattern contains code-like elements (digits, specific formats)
-                if re.search(r'\\d|[A-Z]{2,}[-_]\\d', pattern, re.IGNORECASE):
-                    match = re.search(pattern, text_upper, re.IGNORECASE)
-                    if match:
-                        code = match.group(0) if match.group(0) else None
-                        if code and len(code) >= 4 and re.search(r'\d', code):
-                            return code.upper()
-            except re.error:
-                # Skip invalid regex patterns
-                continue
+        # Use vendor's configured cert_patterns that look like codes (contain numbers/dashes)
+        for _, match in self.rules.vendor_code_patterns[vendor].scan(text_upper):
+            code = match.group(0) if match.group(0) else None
+            if code and len(code) >= 4 and re.search(r'\d', code):
+                return code.upper()
         
         # Fallback: vendor-specific code patterns (for common formats)
-        fallback_patterns = {
-            "aws": r"(SAA-C\d+|DVA-C\d+|SOA-C\d+|CLF-C\d+)",
-            "microsoft": r"(AZ-\d+|MS-\d+|DP-\d+|AI-\d+|PL-\d+)",
-            "sap": r"(C_\w+_\d+|E_\w+_\d+|P_\w+_\d+)",
-            "oracle": r"(1Z0-\d+)",
-            "redhat": r"(EX\d+)",
-        }
-        
-        if vendor in fallback_patterns:
-            match = re.search(fallback_patterns[vendor], text_upper)
+        if vendor in CERT_CODE_FALLBACK_RULES:
+            match = CERT_CODE_FALLBACK_RULES[vendor].first(text_upper)
             if match:
                 return match.group(1)
         
         return None
     
-    # Date pattern with context keywords for better identification
-    DATE_PATTERN_GENERIC = r'(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4}|\d{4}[\/\-\.]\d{1,2}[\/\-\.]\d{1,2}|(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+\d{1,2},?\s*\d{4}|\d{1,2}\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s*\d{4})'
-    
     def extract_dates(self, text: str) -> Tuple[Optional[str], Optional[str]]:
         """
         Extract validity dates from text
@@ -659,52 +912,27 @@ class CertVerificationService:
         valid_from = None
         valid_until = None
         
-        # First, try to find dates with explicit context keywords
-        # Patterns for expiry/end dates (allow newlines between keyword and date)
-        expiry_patterns = [
-            rf'expir(?:es?|ation|y)\s*(?:date)?\s*[:\-]?\s*{self.DATE_PATTERN_GENERIC}',
-            rf'valid\s*(?:until|thru|through|to)\s*[:\-]?\s*{self.DATE_PATTERN_GENERIC}',
-            rf'end(?:s|ing)?\s*(?:date)?\s*[:\-]?\s*{self.DATE_PATTERN_GENERIC}',
-        ]
-        
-        # Patterns for issue/start dates
-        issue_patterns = [
-            rf'issue[d]?\s*(?:date|on)?\s*[:\-]?\s*{self.DATE_PATTERN_GENERIC}',
-            rf'valid\s*(?:from|since)\s*[:\-]?\s*{self.DATE_PATTERN_GENERIC}',
-            rf'effective\s*(?:from|date|day)?\s*[:\-]?\s*{self.DATE_PATTERN_GENERIC}',
-            rf'start(?:s|ing)?\s*(?:date)?\s*[:\-]?\s*{self.DATE_PATTERN_GENERIC}',
-            rf'date\s*(?:registered|of\s*issue)\s*[:\-]?\s*{self.DATE_PATTERN_GENERIC}',
-        ]
-        
-        # Try to find expiry date with context (use re.DOTALL to match across newlines)
-        for pattern in expiry_patterns:
-            match = re.search(pattern, text_lower, re.IGNORECASE | re.DOTALL)
-            if match:
-                date_str = match.group(1)
-                if self._parse_date(date_str):
-                    valid_until = date_str
-                    logger.debug(f"Found expiry date with context: {valid_until}")
-                    break
+        # First, try to find dates with explicit context keywords (expiry, then issue)
+        for _, match in EXPIRY_DATE_RULES.scan(text_lower):
+            date_str = match.group(1)
+            if self._parse_date(date_str):
+                valid_until = date_str
+                logger.debug(f"Found expiry date with context: {valid_until}")
+                break
         
-        # Try to find issue date with context
-        for pattern in issue_patterns:
-            match = re.search(pattern, text_lower, re.IGNORECASE | re.DOTALL)
-            if match:
-                date_str = match.group(1)
-                if self._parse_date(date_str):
-                    valid_from = date_str
-                    logger.debug(f"Found issue date with context: {valid_from}")
-                    break
+        for _, match in ISSUE_DATE_RULES.scan(text_lower):
+            date_str = match.group(1)
+            if self._parse_date(date_str):
+                valid_from = date_str
+                logger.debug(f"Found issue date with context: {valid_from}")
+                break
         
         # If we found both with context, return them
         if valid_from and valid_until:
             return valid_from, valid_until
         
         # Fallback: find all dates and sort chronologically
-        dates_found = []
-        for pattern in self.date_patterns:
-            matches = re.findall(pattern, text_lower, re.IGNORECASE)
-            dates_found.extend(matches)
+        dates_found = self.rules.date_patterns.findall(text_lower)
         
         # Try to parse and sort dates
         parsed_dates = []
@@ -851,6 +1079,40 @@ class CertVerificationService:
         
         return min(1.0, score)
     
+    def _new_result(self, filename: str) -> CertVerificationResult:
+        """Empty result for a file, with the fields parsed from its name."""
+        req_code, cert_name, resource_name = self.parse_filename(filename)
+        return CertVerificationResult(
+            filename=filename,
+            req_code=req_code,
+            cert_name_from_file=cert_name,
+            resource_name=resource_name,
+        )
+    
+    def _check_file_size(self, result: CertVerificationResult, file_size: int) -> bool:
+        """
+        Flag empty (cloud placeholder) and oversized files before OCR.
+        
+        Returns:
+            True if the file can be processed
+        """
+        # Check if file exists and has content (cloud-synced files may be 0 bytes if not downloaded)
+        if file_size == 0:
+            result.status = "not_downloaded"
+            result.errors.append("File non scaricato: il file è vuoto (0 bytes). Scarica il file localmente da OneDrive/SharePoint prima di verificare.")
+            logger.warning(f"File {result.filename} has 0 bytes - likely a cloud placeholder not downloaded locally")
+            return False
+        
+        # Check if file is too large for OCR (fix #5 - prevent timeout on huge files)
+        file_size_mb = file_size / (1024 * 1024)
+        if file_size_mb > self.max_file_size_mb:
+            result.status = "too_large"
+            result.errors.append(f"File troppo grande ({file_size_mb:.1f} MB > {self.max_file_size_mb} MB max). Ridurre dimensione o aumentare limite.")
+            logger.warning(f"File {result.filename} is {file_size_mb:.1f} MB, exceeds max {self.max_file_size_mb} MB")
+            return False
+        
+        return True
+    
     def verify_certificate(self, pdf_path: str) -> CertVerificationResult:
         """
         Extract information from a certificate PDF
@@ -861,35 +1123,18 @@ class CertVerificationService:
         Returns:
             CertVerificationResult with extracted details
         """
-        filename = os.path.basename(pdf_path)
-        req_code, cert_name, resource_name = self.parse_filename(filename)
-        
-        result = CertVerificationResult(
-            filename=filename,
-            req_code=req_code,
-            cert_name_from_file=cert_name,
-            resource_name=resource_name,
-        )
+        result = self._new_result(os.path.basename(pdf_path))
+        filename = result.filename
+        cert_name = result.cert_name_from_file
+        resource_name = result.resource_name
         
         try:
-            # Check if file exists and has content (cloud-synced files may be 0 bytes if not downloaded)
-            file_size = os.path.getsize(pdf_path)
-            if file_size == 0:
-                result.status = "not_downloaded"
-                result.errors.append("File non scaricato: il file è vuoto (0 bytes). Scarica il file localmente da OneDrive/SharePoint prima di verificare.")
-                logger.warning(f"File {filename} has 0 bytes - likely a cloud placeholder not downloaded locally")
-                return result
-            
-            # Check if file is too large for OCR (fix #5 - prevent timeout on huge files)
-            file_size_mb = file_size / (1024 * 1024)
-            if file_size_mb > self.max_file_size_mb:
-                result.status = "too_large"
-                result.errors.append(f"File troppo grande ({file_size_mb:.1f} MB > {self.max_file_size_mb} MB max). Ridurre dimensione o aumentare limite.")
-                logger.warning(f"File {filename} is {file_size_mb:.1f} MB, exceeds max {self.max_file_size_mb} MB")
+            if not self._check_file_size(result, os.path.getsize(pdf_path)):
                 return result
             
-            # Extract text via OCR
-            text = self.extract_text_from_pdf(pdf_path)
+            # Extract text via OCR, starting the OCR ladder where this vendor last succeeded
+            vendor_hint = self._vendor_from_filename(cert_name)
+            text, ladder_steps = self._extract_text(pdf_path, preferred_ladder_step(vendor_hint))
             result.ocr_text_preview = text[:500] if text else None
             
             if not text or len(text.strip()) < 30:
@@ -897,10 +1142,15 @@ class CertVerificationService:
                 result.errors.append("Could not extract sufficient text from PDF")
                 return result
             
+            # Field extraction (regex rules) from here to the dates
+            extraction = StageTimer("ocr")
+            
             # Detect vendor
             vendor, vendor_conf = self.detect_vendor(text)
             result.vendor_detected = self.vendors.get(vendor, {}).get("name") if vendor else None
             result.vendor_confidence = vendor_conf
+            for step in ladder_steps:
+                record_ladder_step(vendor or vendor_hint, step)
             
             # Extract cert code
             result.cert_code_detected = self.extract_cert_code(text, vendor)
@@ -925,6 +1175,7 @@ class CertVerificationService:
             valid_from, valid_until = self.extract_dates(text)
             result.valid_from = valid_from
             result.valid_until = valid_until
+            extraction.lap("extraction")
             logger.debug(f"Dates extracted: from={valid_from}, until={valid_until}")
             
             # Determine status based on extraction success
@@ -984,136 +1235,41 @@ class CertVerificationService:
         
         logger.debug(f"extract_cert_name: normalized text = {repr(text_normalized[:200] if text_normalized else 'EMPTY')}")
         
-        # Month names for date terminators
-        months = r'(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)'
-        
-        # Common certification title patterns - order matters, more specific first
-        cert_patterns = [
-            # Cisco patterns - must be before generic ones (include months as terminators for expiration dates)
-            rf'Cisco\s+Certified\s+Specialist\s*[-–]\s*([A-Za-z][A-Za-z\s\-]+?)(?:\s+Issued|\s+Date|\s+Cisco|\s+Expir|\s+{months}|\s+CSCO|\s+\d{{4}}|\s*$)',
-            rf'Cisco\s+Certified\s+([A-Za-z][A-Za-z\s\-]+?)(?:\s+Issued|\s+Date|\s+Cisco|\s+Expir|\s+{months}|\s+CSCO|\s+\d{{4}}|\s*$)',
-            r'(CCNA|CCNP|CCIE|CCDA|CCDP)\s*[-–]?\s*([A-Za-z][A-Za-z\s\-]*?)(?:\s+Issued|\s+Date|\s+Cisco|\s*$)',
-            # Microsoft patterns (English)
-            r'Microsoft\s+Certified[:\s]+([A-Za-z][A-Za-z\s\-]+?(?:Expert|Associate|Fundamentals))',
-            # Microsoft Italian - "Certificato Microsoft:" pattern (Italian cert names)
-            r'Certificat[oi]\s+Microsoft[:\s]+([A-Za-zÀ-ÿ][A-Za-zÀ-ÿ\s\-]+?)(?:\s+ID\s+della|\s+Numero|\s+Verifica|\s+Credential|\s*$)',
-            # Microsoft Italian - "Certificazione Microsoft:" alternate pattern  
-            r'Certificazione\s+Microsoft[:\s]+([A-Za-zÀ-ÿ][A-Za-zÀ-ÿ\s\-]+?)(?:\s+ID|\s+Numero|\s+Verifica|\s*$)',
-            # ServiceNow - capture full cert name (greedy until Issued/line-end)
-            r'requirements\s+for\s+(.+?)(?:\s+Issued|\s+Certification)',
-            r'requirements\s+for\s+([A-Za-z][A-Za-z\s\-]+(?:Administrator|Developer|Specialist|Manager|Expert))',
-            # Red Hat - allow more chars
-            r'RED\s*HAT\s+CERTIFIED\s+([A-Z][A-Za-z\s\-]+)(?:\s+Red|\s+Issued)',
-            r'Red\s*Hat\s+Certified\s+([A-Za-z][A-Za-z\s\-]+)(?:\s+Red|\s+Issued)',
-            r'certified\s+as\s+a\s+RED\s+HAT\s+([A-Z][A-Za-z\s\-]+)',
-            # AWS
-            r'AWS\s+Certified\s+([A-Za-z][A-Za-z\s\-]+?)(?:\s+Validation|\s+Badge|\s+AWS|\s+Issued)',
-            # Google Cloud (more variants)
-            r'Google\s+Cloud\s+(?:Certified\s+)?([A-Za-z][A-Za-z\s\-]+?)(?:\s+Credential|\s+Google|\s+Issued)',
-            r'Google\s+Cloud\s+([A-Za-z][A-Za-z\s\-]+?)(?:Professional|Associate)',
-            # Oracle
-            r'Oracle\s+Certified\s+([A-Za-z][A-Za-z\s\-]+?)(?:\s+Oracle|\s+Credential|\s+Issued)',
-            # SAP
-            r'SAP\s+Certified\s+([A-Za-z][A-Za-z\s\-]+?)(?:\s+SAP|\s+Credential|\s+Issued)',
-            # VMware / VCP / VCAP
-            r'VMware\s+Certified\s+([A-Za-z][A-Za-z\s\-]+?)(?:\s+Professional|\s+Advanced|\s+Design|\s+VCAP|\s+VCP)',
-            r'VCP[\-\s]*(?:\d{2}|[A-Z]{2,})?\s*([A-Za-z][A-Za-z\s\-]+?)(?:\s+Certification|\s+Issued)',
-            # PMI/PMP / ITIL
-            r'(Project\s+Management\s+Professional)',
-            r'(ITIL\s+\d\s+[A-Za-z][A-Za-z\s\-]+?)(?:\s+Certificate|\s+ITIL|\s+Axelos|\s+Issued)',  # ITIL 4 Managing Professional
-            r'ITIL\s+(?:v\d\s+)?([A-Za-z][A-Za-z\s\-]+?)(?:\s+Certificate|\s+ITIL|\s+Axelos|\s+Issued)',
-            # PRINCE2 / PeopleCert / Axelos - full name patterns FIRST
-            r'(PRINCE2®?\s+Foundation\s+Certificate(?:\s+in\s+Project\s+Management)?)',
-            r'(PRINCE2®?\s+Practitioner\s+Certificate(?:\s+in\s+Project\s+Management)?)',
-            r'(PRINCE2®?\s+Agile\s+(?:Foundation|Practitioner)(?:\s+Certificate)?)',
-            r'PeopleCert[:\s]+([A-Za-z][A-Za-z\s\-0-9]+?)(?:\s+Certificate|\s+Issued|\s+Valid|\s*$)',
-            r'Axelos[:\s]+([A-Za-z][A-Za-z\s\-0-9]+?)(?:\s+Certificate|\s+Issued|\s+Valid|\s*$)',
-            # PRINCE2 fallback - only level name if full pattern didn't match
-            r'(PRINCE2®?\s+(?:Foundation|Practitioner|Agile))',
-            # IAPP - Privacy certifications - specific patterns first
-            r'(CIPP(?:/[A-Z]{1,2})?)',  # CIPP, CIPP/E, CIPP/US, CIPP/C, etc.
-            r'(CIPM)',  # Certified Information Privacy Manager
-            r'(CIPT)',  # Certified Information Privacy Technologist
-            r'(FIP)',   # Fellow of Information Privacy
-            r'confer\s+upon.*?the\s+designation\s+of\s+([A-Z]{3,5}(?:/[A-Z]{1,2})?)',  # IAPP "confer upon X the designation of CIPM"
-            r'(Certified\s+Information\s+Privacy\s+(?:Professional|Manager|Technologist))',  # Full IAPP cert name
-            r'knowledge\s+of[.\s]+information\s+privacy\s+management.*(CIPM)',  # Map "information privacy management" context to CIPM
-            # ISACA - Governance/Audit certifications
-            r'(CGEIT)',  # Certified in Governance of Enterprise IT
-            r'(CISA)',   # Certified Information Systems Auditor
-            r'(CISM)',   # Certified Information Security Manager
-            r'(CRISC)',  # Certified in Risk and Information Systems Control
-            r'(CDPSE)',  # Certified Data Privacy Solutions Engineer
-            r'qualified\s+as\s+(?:a\s+)?Certified\s+in\s+(?:the\s+)?(Governance\s+of\s+Enterprise\s+IT)',  # CGEIT full name
-            r'Certified\s+in\s+(?:the\s+)?(Governance\s+of\s+Enterprise\s+IT)',
-            r'Certified\s+Information\s+(Systems?\s+Auditor)',
-            r'Certified\s+Information\s+(Security\s+Manager)',
-            r'Certified\s+in\s+(Risk\s+and\s+Information\s+Systems?\s+Control)',
-            # The Open Group - TOGAF
-            r'(TOGAF\s+\d+\s+Certified)',  # TOGAF 9 Certified
-            r'(TOGAF\s+\d+\s+Foundation)',
-            r'(TOGAF\s+\d+\s+Practitioner)',
-            r'TOGAF\s+\d+\s+Certification.*at\s+the\s+(TOGAF\s+\d+\s+Certified)\s+level',
-            r'requirements\s+of\s+the\s+(TOGAF\s+\d+)\s+Certification',
-            r'(ArchiMate\s+\d+\s+(?:Foundation|Practitioner|Certified))',
-            # APMG - Agile/Programme Management
-            r'(Agile\s+Project\s+Management\s+(?:Foundation|Practitioner))',
-            r'(AgilePM\s+(?:Foundation|Practitioner))',
-            r'(MSP\s+(?:Foundation|Practitioner|Advanced\s+Practitioner))',
-            r'(Managing\s+Successful\s+Programmes?\s+(?:Foundation|Practitioner))',
-            r'(MoR\s+(?:Foundation|Practitioner))',  # Management of Risk
-            r'(Management\s+of\s+Risk\s+(?:Foundation|Practitioner))',
-            r'(P3O\s+(?:Foundation|Practitioner))',
-            r'(Change\s+Management\s+(?:Foundation|Practitioner))',
-            r'APMG.*?(Agile\s+Project\s+Management)\s*(?:Foundation|Practitioner)',  # APMG Agile PM
-            # Generic patterns
-            r'Certificate\s+of\s+([A-Za-z][A-Za-z\s\-]+?)(?:\s+Issued|\s+Date|\s+This)',
-            r'certified\s+as\s+(?:a|an)?\s*([A-Za-z][A-Za-z\s\-]+?)(?:\s+on|\s+by|\s+Issued|\s+Date)',
-            # Fallback: any "Certified <Title>" stopping before date-like text
-            r'Certified\s+([A-Za-z][A-Za-z\s\-]+?)(?:\s+Issued|\s+Date|\s+Expiration|\s+Valid|\s+Certification)'
-        ]
-        
-        for pattern in cert_patterns:
-            match = re.search(pattern, text_normalized, re.IGNORECASE)
-            if match:
-                cert_name = match.group(1).strip() if match.group(1) else None
-                logger.debug(f"extract_cert_name: pattern matched, raw cert_name = {repr(cert_name)}")
-                if not cert_name:
-                    continue
-                    
-                # Clean up: normalize whitespace
-                cert_name = re.sub(r'\s+', ' ', cert_name)
-                
-                # Must start with uppercase letter
-                if not cert_name or not cert_name[0].isupper():
-                    continue
-                
-                # Remove trailing garbage (only words that should NEVER appear in cert names)
-                garbage_words = ['Issued', 'ID', 'Credential', 'Number', 'No',
-                                 'Ottenuta', 'Scadenza', 'Verific',
-                                 'THE', 'WORLD', 'WORKS', 'WITH', 'Jayney', 'Howson', 'UL', 'Uf']
-                for gw in garbage_words:
-                    cert_name = re.sub(rf'\s+{gw}.*$', '', cert_name, flags=re.IGNORECASE)
-                
-                # Remove trailing dates
-                cert_name = re.sub(r'\s+\d{1,2}\s+\w+\s+\d{4}.*$', '', cert_name)
-                cert_name = re.sub(r'\s+\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4}.*$', '', cert_name)
-                
-                # Trim trailing hyphens, spaces, underscores
-                cert_name = cert_name.rstrip(' -_')
+        for _, match in CERT_NAME_RULES.scan(text_normalized):
+            cert_name = match.group(1).strip() if match.group(1) else None
+            logger.debug(f"extract_cert_name: pattern matched, raw cert_name = {repr(cert_name)}")
+            if not cert_name:
+                continue
                 
-                # Validate length
-                if 3 <= len(cert_name) <= 120:
-                    # IAPP-specific mapping: infer cert code from context
-                    if vendor == 'iapp' and cert_name.lower() in ['manager', 'professional', 'technologist']:
-                        text_lower = text.lower()
-                        if 'privacy management' in text_lower or 'privacy manager' in text_lower:
-                            cert_name = 'CIPM'  # Certified Information Privacy Manager
-                        elif 'privacy professional' in text_lower:
-                            cert_name = 'CIPP'  # Certified Information Privacy Professional
-                        elif 'privacy technologist' in text_lower:
-                            cert_name = 'CIPT'  # Certified Information Privacy Technologist
-                    return cert_name
+            # Clean up: normalize whitespace
+            cert_name = re.sub(r'\s+', ' ', cert_name)
+            
+            # Must start with uppercase letter
+            if not cert_name or not cert_name[0].isupper():
+                continue
+            
+            # Remove trailing garbage (only words that should NEVER appear in cert names)
+            cert_name = CERT_NAME_GARBAGE_RE.sub('', cert_name)
+            
+            # Remove trailing dates
+            cert_name = re.sub(r'\s+\d{1,2}\s+\w+\s+\d{4}.*$', '', cert_name)
+            cert_name = re.sub(r'\s+\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4}.*$', '', cert_name)
+            
+            # Trim trailing hyphens, spaces, underscores
+            cert_name = cert_name.rstrip(' -_')
+            
+            # Validate length
+            if 3 <= len(cert_name) <= 120:
+                # IAPP-specific mapping: infer cert code from context
+                if vendor == 'iapp' and cert_name.lower() in ['manager', 'professional', 'technologist']:
+                    text_lower = text.lower()
+                    if 'privacy management' in text_lower or 'privacy manager' in text_lower:
+                        cert_name = 'CIPM'  # Certified Information Privacy Manager
+                    elif 'privacy professional' in text_lower:
+                        cert_name = 'CIPP'  # Certified Information Privacy Professional
+                    elif 'privacy technologist' in text_lower:
+                        cert_name = 'CIPT'  # Certified Information Privacy Technologist
+                return cert_name
         
         # Fallback: IAPP inference from text when no pattern matched
         if vendor == 'iapp':
@@ -1208,11 +1364,47 @@ class CertVerificationService:
         
         return None
     
+    def config_fingerprint(self) -> str:
+        """Hash of the vendor/OCR configuration; cached results are only valid for the same one."""
+        settings = {k: v for k, v in self.settings.items() if k != "ocr_workers"}  # throughput only
+        payload = json.dumps({"vendors": self.vendors, "settings": settings}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def refresh_expiry(self, result_dict: Dict[str, Any]) -> Dict[str, Any]:
+        """Re-check the expiry date of a stored result against today's date."""
+        if result_dict.get("status") in ("valid", "mismatch") and result_dict.get("valid_until"):
+            expiry = self._parse_date(result_dict["valid_until"])
+            if expiry and expiry < date.today():
+                result_dict["status"] = "expired"
+        return result_dict
+    
+    def verify_certificate_cached(self, pdf_path: Path, manifest=None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Verify a PDF, reusing its manifest entry when the file is unchanged.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            manifest: Optional FolderManifest (incremental mode)
+            
+        Returns:
+            (result dict, True if it came from the manifest)
+        """
+        if manifest is not None:
+            cached = manifest.lookup(pdf_path)
+            if cached is not None:
+                return self.refresh_expiry(cached), True
+        
+        result_dict = self.verify_certificate(str(pdf_path)).to_dict()
+        if manifest is not None:
+            manifest.store(pdf_path, result_dict)
+        return result_dict, False
+    
     def verify_folder(
         self, 
         folder_path: str,
         req_filter: Optional[str] = None,
-        max_files: Optional[int] = None
+        max_files: Optional[int] = None,
+        manifest=None,
     ) -> Dict[str, Any]:
         """
         Verify all PDF certificates in a folder
@@ -1221,6 +1413,7 @@ class CertVerificationService:
             folder_path: Path to the folder containing PDFs
             req_filter: Optional requirement code to filter by
             max_files: Optional maximum number of files to process (fix #9)
+            manifest: Optional FolderManifest; unchanged files reuse their last result
             
         Returns:
             Dictionary with verification results and summary
@@ -1236,7 +1429,7 @@ class CertVerificationService:
             }
         
         # Find all PDFs (including subfolders)
-        pdf_files = list(folder.rglob("*.pdf")) + list(folder.rglob("*.PDF"))
+        pdf_files = find_pdf_files(folder)
         
         if not pdf_files:
             return {
@@ -1255,14 +1448,13 @@ class CertVerificationService:
         
         results = []
         for pdf_path in pdf_files:
-            result = self.verify_certificate(str(pdf_path))
+            result_dict, _ = self.verify_certificate_cached(pdf_path, manifest)
             
             # Apply filter if specified
-            if req_filter and result.req_code != req_filter:
+            if req_filter and result_dict.get("req_code") != req_filter:
                 continue
             
             # Store relative path from folder root for retry support
-            result_dict = result.to_dict()
             try:
                 relative_path = pdf_path.relative_to(folder)
                 result_dict["filename"] = str(relative_path)
@@ -1272,34 +1464,7 @@ class CertVerificationService:
             
             results.append(result_dict)
         
-        # Calculate summary
-        summary = {
-            "total": len(results),
-            "valid": sum(1 for r in results if r["status"] == "valid"),
-            "expired": sum(1 for r in results if r["status"] == "expired"),
-            "unreadable": sum(1 for r in results if r["status"] == "unreadable"),
-            "error": sum(1 for r in results if r["status"] == "error"),
-            "by_requirement": {},
-            "by_resource": {},
-        }
-        
-        # Group by requirement
-        for r in results:
-            req = r["req_code"]
-            if req not in summary["by_requirement"]:
-                summary["by_requirement"][req] = {"total": 0, "valid": 0}
-            summary["by_requirement"][req]["total"] += 1
-            if r["status"] == "valid":
-                summary["by_requirement"][req]["valid"] += 1
-        
-        # Group by resource
-        for r in results:
-            res = r["resource_name"]
-            if res not in summary["by_resource"]:
-                summary["by_resource"][res] = {"total": 0, "valid": 0}
-            summary["by_resource"][res]["total"] += 1
-            if r["status"] == "valid":
-                summary["by_resource"][res]["valid"] += 1
+        summary = summarize_results(results)
         
         result_dict = {
             "success": True,
@@ -1314,9 +1479,85 @@ class CertVerificationService:
             result_dict["truncated"] = True
             result_dict["total_files_found"] = total_found
         
+        if manifest is not None:
+            incremental = manifest.stats()
+            # A truncated run has not seen every file: keep their entries
+            incremental["removed"] = 0 if truncated else manifest.prune()
+            result_dict["incremental"] = incremental
+        
         return result_dict
 
 
+    def verify_zip(
+        self,
+        zip_ref: zipfile.ZipFile,
+        members: Optional[List[Tuple[zipfile.ZipInfo, str]]] = None,
+    ) -> Iterator[Tuple[int, str, Dict[str, Any]]]:
+        """
+        Verify the PDFs of an open ZIP without extracting the archive.
+        
+        Members are read lazily, one at a time, into a scratch file and handed
+        to a pool of `ocr_workers` OCR threads; read-ahead is bounded so disk
+        usage stays at a few PDFs regardless of the archive size. Empty and
+        oversized members are flagged from the central directory without being
+        read.
+        
+        Args:
+            zip_ref: Open ZIP archive (a seekable upload is enough)
+            members: Output of zip_pdf_members(zip_ref), if already computed
+            
+        Yields:
+            (member index, relative filename, result dict) in completion order
+        """
+        if members is None:
+            members = zip_pdf_members(zip_ref)
+        
+        work_dir = tempfile.mkdtemp(prefix="cert_zip_")
+        pool = ThreadPoolExecutor(max_workers=self.ocr_workers, thread_name_prefix="cert-ocr")
+        in_flight: Dict[Any, Tuple[int, str]] = {}
+        
+        def verify_member(path: str) -> CertVerificationResult:
+            try:
+                return self.verify_certificate(path)
+            finally:
+                shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+        
+        def completed():
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, relative_name = in_flight.pop(future)
+                result_dict = future.result().to_dict()
+                result_dict["filename"] = relative_name
+                yield index, relative_name, result_dict
+        
+        try:
+            for index, (info, relative_name) in enumerate(members):
+                result = self._new_result(os.path.basename(relative_name))
+                if not self._check_file_size(result, info.file_size):
+                    result_dict = result.to_dict()
+                    result_dict["filename"] = relative_name
+                    yield index, relative_name, result_dict
+                    continue
+                
+                # Bounded read-ahead: keep at most two files per worker on disk
+                while len(in_flight) >= self.ocr_workers * 2:
+                    yield from completed()
+                
+                member_dir = os.path.join(work_dir, str(index))
+                os.makedirs(member_dir)
+                member_path = os.path.join(member_dir, os.path.basename(relative_name))
+                with zip_ref.open(info) as src, open(member_path, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                in_flight[pool.submit(verify_member, member_path)] = (index, relative_name)
+            
+            while in_flight:
+                yield from completed()
+        finally:
+            # On early close (client disconnect) drop queued work; running OCR finishes on its own
+            pool.shutdown(wait=False, cancel_futures=True)
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
 def check_ocr_available() -> Dict[str, Any]:
     """Check if OCR dependencies are available"""
     status = {
@@ -1359,4 +1600,7 @@ def check_ocr_available() -> Dict[str, Any]:
     except ImportError:
         pass
     
+    # Which OCR ladder step has been working per vendor in this process
+    status["ocr_ladder_by_vendor"] = get_ladder_stats()
+    
     return status
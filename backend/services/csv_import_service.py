@@ -0,0 +1,179 @@
+"""
+CSV Import Service
+Streaming parse of master-data CSV uploads and short-lived preview tokens for confirm
+"""
+
+import csv
+import io
+import itertools
+import json
+import logging
+import os
+import secrets
+import tempfile
+import threading
+import time
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Text read up front to sniff the delimiter and the header row
+SNIFF_CHUNK_SIZE = 64 * 1024
+
+LUTECH_HEADER_KEYWORDS = {"cert_name", "nome_certificazione", "certification", "resource_name", "resource_id", "vendor"}
+LUTECH_POSITIONAL_FIELDS = ["resource_id", "cert_name", "vendor"]
+
+PREVIEW_TOKEN_TTL_SECONDS = 15 * 60
+PREVIEW_TOKEN_MAX_ENTRIES = 32
+# Shared by the server processes on this host
+PREVIEW_TOKEN_DIR = os.getenv("PREVIEW_TOKEN_DIR", os.path.join(tempfile.gettempdir(), "simulator_poste_previews"))
+
+
+def sniff_delimiter(sample: str) -> str:
+    """';' when it outnumbers ',' in the sample (Italian Excel exports), else ','."""
+    return ";" if sample.count(";") > sample.count(",") else ","
+
+
+def iter_csv_rows(
+    binary_file: BinaryIO,
+    header_keywords: set,
+    positional_fields: List[str],
+) -> Iterator[Dict[str, Optional[str]]]:
+    """
+    Parse an uploaded CSV incrementally from its (spooled) file object.
+
+    The delimiter and header are detected on the first chunk; the rest is
+    decoded and parsed line by line, so memory does not grow with the file.
+    A first row containing any of `header_keywords` is used as header,
+    otherwise columns are mapped to `positional_fields`.
+    """
+    binary_file.seek(0)
+    text = io.TextIOWrapper(binary_file, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        sample = text.read(SNIFF_CHUNK_SIZE)
+        if sample and not sample.endswith(("\n", "\r")):
+            sample += text.readline()  # complete the last line of the chunk
+        sep = sniff_delimiter(sample)
+
+        first_line = next((line for line in sample.splitlines() if line.strip()), "")
+        first_cols = [c.strip().lower() for c in first_line.split(sep)]
+        has_header = any(c in header_keywords for c in first_cols)
+        logger.info(f"[preview] sep='{sep}' has_header={has_header} first_line={first_line[:80]!r}")
+
+        lines = itertools.chain(io.StringIO(sample), text)
+        reader = csv.DictReader(lines, delimiter=sep, fieldnames=None if has_header else positional_fields)
+        yield from reader
+    finally:
+        # Leave the upload open for its owner (UploadFile closes it)
+        text.detach()
+
+
+def aggregate_lutech_resources(
+    rows: Iterator[Dict[str, Optional[str]]],
+    resolve_vendor: Callable[[str], str],
+) -> Tuple[Dict[str, int], Dict[str, str]]:
+    """
+    Count resources per certification name while rows stream in.
+
+    Returns:
+        (cert_counts, cert_vendors) — vendor resolved once per raw CSV value
+    """
+    cert_counts: Dict[str, int] = {}
+    cert_vendors: Dict[str, str] = {}
+    resolved: Dict[str, str] = {}
+    for row in rows:
+        cert_name = (row.get("cert_name") or row.get("nome_certificazione") or row.get("certification") or "").strip()
+        if not cert_name:
+            continue
+        cert_counts[cert_name] = cert_counts.get(cert_name, 0) + 1
+        raw_vendor = (row.get("vendor") or "").strip()
+        if raw_vendor and not cert_vendors.get(cert_name):
+            if raw_vendor not in resolved:
+                resolved[raw_vendor] = resolve_vendor(raw_vendor)
+            cert_vendors[cert_name] = resolved[raw_vendor]
+    return cert_counts, cert_vendors
+
+
+class PreviewTokenStore:
+    """
+    Store of parsed import aggregates, keyed by an opaque token.
+
+    Entries are JSON files in `directory`, so with several server processes the
+    confirm request finds the preview whichever worker parsed it (None = a
+    private temporary directory). Entries expire after `ttl` seconds and the
+    oldest are dropped beyond `max_entries`. A token is discarded once the
+    confirm step succeeds; an unknown or expired token means the client must
+    upload the file again.
+    """
+
+    def __init__(
+        self,
+        ttl: float = PREVIEW_TOKEN_TTL_SECONDS,
+        max_entries: int = PREVIEW_TOKEN_MAX_ENTRIES,
+        directory: Optional[str] = None,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.directory = directory or tempfile.mkdtemp(prefix="preview_tokens_")
+        self._lock = threading.Lock()
+
+    def _path(self, token: str) -> str:
+        return os.path.join(self.directory, f"{token}.json")
+
+    def _evict(self, now: float) -> None:
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                mtime = os.path.getmtime(path)
+            except FileNotFoundError:
+                continue
+            if mtime + self.ttl <= now:
+                self._remove(path)
+            else:
+                entries.append((mtime, path))
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_entries + 1)]:
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def put(self, value: Any) -> str:
+        token = secrets.token_urlsafe(16)
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            self._evict(time.time())
+            tmp_path = self._path(token) + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump(value, fh)
+            # Exact creation time (the filesystem's own mtime is coarse): orders the eviction
+            now_ns = time.time_ns()
+            os.utime(tmp_path, ns=(now_ns, now_ns))
+            os.replace(tmp_path, self._path(token))
+        return token
+
+    def get(self, token: str) -> Optional[Any]:
+        if not token or not token.replace("-", "").replace("_", "").isalnum():
+            return None  # Never let a token name a path outside the directory
+        path = self._path(token)
+        try:
+            if os.path.getmtime(path) + self.ttl <= time.time():
+                return None
+            with open(path, encoding="utf-8") as fh:
+                return json.load(fh)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def discard(self, token: str) -> None:
+        if token and token.replace("-", "").replace("_", "").isalnum():
+            self._remove(self._path(token))
+
+
+lutech_preview_tokens = PreviewTokenStore(directory=PREVIEW_TOKEN_DIR)
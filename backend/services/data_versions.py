@@ -0,0 +1,114 @@
+"""
+Data Versions
+Per-table change counters shared by every worker process, and caches that rebuild when they move
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session
+
+import models
+
+logger = logging.getLogger(__name__)
+
+# Tables whose changes must reach the caches of other workers
+VERSIONED_TABLES = frozenset({
+    "lot_configs", "master_data", "vendor_configs", "ocr_settings", "practices", "business_plans",
+})
+
+# Child tables whose rows are part of a parent's data
+_SCOPE_OF_TABLE = {
+    "lot_requirements": "lot_configs",
+    "lot_company_certs": "lot_configs",
+    "lot_state_entries": "lot_configs",
+}
+
+_versions = models.DataVersionModel.__table__
+
+
+def bump_versions(session: Session, scopes: Iterable[str]) -> None:
+    """Increment the counters of `scopes` in the session's transaction."""
+    for scope in sorted(set(scopes)):
+        result = session.execute(
+            update(_versions).where(_versions.c.scope == scope).values(version=_versions.c.version + 1)
+        )
+        if result.rowcount == 0:
+            # The UPDATE already holds SQLite's write lock, so no other writer can insert in between
+            session.execute(insert(_versions).values(scope=scope, version=1))
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_changed_tables(session: Session, flush_context, instances) -> None:
+    changed = [obj for obj in session.dirty if session.is_modified(obj)]
+    tables = {
+        obj.__table__.name
+        for obj in (*session.new, *changed, *session.deleted)
+        if getattr(obj, "__table__", None) is not None
+    }
+    scopes = {_SCOPE_OF_TABLE.get(table, table) for table in tables} & VERSIONED_TABLES
+    if scopes:
+        bump_versions(session, scopes)
+
+
+def get_versions(db: Session) -> Dict[str, int]:
+    """Current counter of every versioned table (0 if never written)."""
+    rows = db.execute(select(_versions.c.scope, _versions.c.version)).all()
+    versions = dict.fromkeys(VERSIONED_TABLES, 0)
+    versions.update({scope: version for scope, version in rows})
+    return versions
+
+
+def advance_versions(db: Session, floor: Dict[str, int]) -> None:
+    """
+    Move every counter past both its current value and `floor`, then commit.
+
+    Used after the database file is replaced: the new file's counters may
+    equal ones that other workers have cached against the old file.
+    """
+    current = get_versions(db)
+    for scope in VERSIONED_TABLES:
+        version = max(current[scope], floor.get(scope, 0)) + 1
+        result = db.execute(update(_versions).where(_versions.c.scope == scope).values(version=version))
+        if result.rowcount == 0:
+            db.execute(insert(_versions).values(scope=scope, version=version))
+    db.commit()
+
+
+class VersionedCache:
+    """
+    Per-process cache of a value derived from some tables.
+
+    get() compares the tables' current counters with those the value was built
+    at and rebuilds it when any moved, so a write in another worker is seen on
+    the next request. Reading the counters is one indexed query.
+    """
+
+    def __init__(self, scopes: Tuple[str, ...], build: Callable[[Session], Any]):
+        self.scopes = scopes
+        self.build = build
+        self._lock = threading.Lock()
+        self._entry: Tuple[Tuple[int, ...], Any] = None
+        self.builds = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, db: Session) -> Any:
+        versions = get_versions(db)
+        stamp = tuple(versions[scope] for scope in self.scopes)
+        with self._lock:
+            if self._entry is not None and self._entry[0] == stamp:
+                self.hits += 1
+                return self._entry[1]
+            self.misses += 1
+        value = self.build(db)
+        with self._lock:
+            self._entry = (stamp, value)
+            self.builds += 1
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entry = None
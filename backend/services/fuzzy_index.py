@@ -0,0 +1,111 @@
+"""
+Fuzzy Text Index
+Trigram index for approximate matching of short labels (certification names, people)
+"""
+
+import re
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_MIN_SCORE = 0.6
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+@lru_cache(maxsize=4096)
+def normalize_label(text: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace."""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text)
+    ascii_text = "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+    return _NON_ALNUM_RE.sub(" ", ascii_text).strip()
+
+
+@lru_cache(maxsize=4096)
+def trigrams(normalized: str) -> frozenset:
+    """Character trigrams of a normalized label, padded so short words still count."""
+    if not normalized:
+        return frozenset()
+    padded = f"  {normalized} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def similarity(shared: int, size_a: int, size_b: int) -> float:
+    """
+    Mean of Dice and overlap coefficients on trigram sets.
+
+    Dice penalises length differences; the overlap coefficient rewards a label
+    contained in a longer text ("Solutions Architect" in "AWS Certified
+    Solutions Architect - Associate"). Averaging keeps both signals.
+    """
+    if not shared or not size_a or not size_b:
+        return 0.0
+    dice = 2 * shared / (size_a + size_b)
+    overlap = shared / min(size_a, size_b)
+    return (dice + overlap) / 2
+
+
+class TrigramIndex:
+    """
+    Inverted trigram index over a set of labels.
+
+    A query only scores the labels sharing at least one trigram with it, so
+    matching n queries against m labels costs roughly the size of the posting
+    lists touched instead of n·m full string comparisons.
+    """
+
+    def __init__(self, labels: Iterable[str] = ()):
+        self._labels: List[str] = []
+        self._grams: List[frozenset] = []
+        self._by_normalized: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = {}
+        for label in labels:
+            self.add(label)
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def add(self, label: str) -> Optional[int]:
+        """Index a label (labels equal after normalization are stored once)."""
+        normalized = normalize_label(label)
+        if not normalized:
+            return None
+        if normalized in self._by_normalized:
+            return self._by_normalized[normalized]
+        label_id = len(self._labels)
+        grams = trigrams(normalized)
+        self._labels.append(label)
+        self._grams.append(grams)
+        self._by_normalized[normalized] = label_id
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(label_id)
+        return label_id
+
+    def search(self, query: str, min_score: float = DEFAULT_MIN_SCORE, limit: int = 5) -> List[Tuple[str, float]]:
+        """Labels similar to `query`, best first, as (label, score)."""
+        normalized = normalize_label(query)
+        exact = self._by_normalized.get(normalized)
+        if exact is not None:
+            return [(self._labels[exact], 1.0)]
+
+        query_grams = trigrams(normalized)
+        shared = Counter()
+        for gram in query_grams:
+            for label_id in self._postings.get(gram, ()):
+                shared[label_id] += 1
+
+        scored = []
+        for label_id, count in shared.items():
+            score = similarity(count, len(query_grams), len(self._grams[label_id]))
+            if score >= min_score:
+                scored.append((self._labels[label_id], round(score, 4)))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
+
+    def best(self, query: str, min_score: float = DEFAULT_MIN_SCORE) -> Optional[Tuple[str, float]]:
+        """Best match for `query`, or None below `min_score`."""
+        matches = self.search(query, min_score=min_score, limit=1)
+        return matches[0] if matches else None
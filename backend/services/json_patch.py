@@ -0,0 +1,158 @@
+"""
+JSON Patch
+Applies RFC 7396 merge patches and RFC 6902 JSON Patch documents to plain JSON values
+"""
+
+import copy
+import logging
+from typing import Any, Dict, List, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class PatchError(ValueError):
+    """The patch is malformed or does not apply to the document."""
+
+
+class PatchTestFailed(PatchError):
+    """A JSON Patch "test" operation did not match (the document changed meanwhile)."""
+
+
+def apply_merge_patch(target: Any, patch: Any) -> Any:
+    """RFC 7396: objects merge recursively, null removes a member, anything else replaces."""
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    result = copy.deepcopy(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
+
+
+def _parse_pointer(pointer: str) -> List[str]:
+    if pointer == "":
+        return []
+    if not isinstance(pointer, str) or not pointer.startswith("/"):
+        raise PatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _list_index(container: list, token: str, allow_end: bool) -> int:
+    if token == "-" and allow_end:
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise PatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise PatchError(f"Array index out of range: {index}")
+    return index
+
+
+def _resolve_parent(document: Any, tokens: List[str]) -> Tuple[Any, str]:
+    node = document
+    for token in tokens[:-1]:
+        if isinstance(node, dict) and token in node:
+            node = node[token]
+        elif isinstance(node, list):
+            node = node[_list_index(node, token, allow_end=False)]
+        else:
+            raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+    return node, tokens[-1]
+
+
+def _get(document: Any, pointer: str) -> Any:
+    node = document
+    for token in _parse_pointer(pointer):
+        if isinstance(node, dict) and token in node:
+            node = node[token]
+        elif isinstance(node, list):
+            node = node[_list_index(node, token, allow_end=False)]
+        else:
+            raise PatchError(f"Path not found: {pointer}")
+    return node
+
+
+def _add(document: Any, pointer: str, value: Any) -> Any:
+    tokens = _parse_pointer(pointer)
+    if not tokens:
+        return value
+    parent, token = _resolve_parent(document, tokens)
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_list_index(parent, token, allow_end=True), value)
+    else:
+        raise PatchError(f"Path not found: {pointer}")
+    return document
+
+
+def _remove(document: Any, pointer: str) -> Tuple[Any, Any]:
+    tokens = _parse_pointer(pointer)
+    if not tokens:
+        raise PatchError("Cannot remove the whole document")
+    parent, token = _resolve_parent(document, tokens)
+    if isinstance(parent, dict) and token in parent:
+        return document, parent.pop(token)
+    if isinstance(parent, list):
+        return document, parent.pop(_list_index(parent, token, allow_end=False))
+    raise PatchError(f"Path not found: {pointer}")
+
+
+def apply_json_patch(document: Any, operations: List[Dict[str, Any]]) -> Any:
+    """
+    RFC 6902: apply add/remove/replace/move/copy/test operations in order.
+
+    Works on a copy; the input document is never modified, and a failing
+    operation leaves no partial result behind.
+    """
+    if not isinstance(operations, list):
+        raise PatchError("A JSON Patch must be an array of operations")
+    result = copy.deepcopy(document)
+    for operation in operations:
+        if not isinstance(operation, dict) or "path" not in operation:
+            raise PatchError(f"Invalid operation: {operation!r}")
+        op, path = operation.get("op"), operation["path"]
+        value = operation.get("value", _MISSING)
+        if op in ("add", "replace", "test") and value is _MISSING:
+            raise PatchError(f"Operation {op!r} requires a value")
+
+        if op == "add":
+            result = _add(result, path, copy.deepcopy(value))
+        elif op == "remove":
+            result, _ = _remove(result, path)
+        elif op == "replace":
+            if _parse_pointer(path):
+                result, _ = _remove(result, path)
+                result = _add(result, path, copy.deepcopy(value))
+            else:
+                result = copy.deepcopy(value)
+        elif op in ("move", "copy"):
+            source = operation.get("from")
+            if source is None:
+                raise PatchError(f"Operation {op!r} requires 'from'")
+            if op == "move":
+                if path.startswith(source + "/"):
+                    raise PatchError("Cannot move a value into one of its children")
+                result, moved = _remove(result, source)
+            else:
+                moved = copy.deepcopy(_get(result, source))
+            result = _add(result, path, moved)
+        elif op == "test":
+            if _get(result, path) != value:
+                raise PatchTestFailed(f"Test failed at {path}")
+        else:
+            raise PatchError(f"Unknown operation: {op!r}")
+    return result
+
+
+def apply_patch(document: Any, patch: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Any:
+    """Apply a JSON Patch (array of operations) or a merge patch (object)."""
+    if isinstance(patch, list):
+        return apply_json_patch(document, patch)
+    if isinstance(patch, dict):
+        return apply_merge_patch(document, patch)
+    raise PatchError("The patch must be a JSON object (merge patch) or array (JSON Patch)")
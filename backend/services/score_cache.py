@@ -0,0 +1,79 @@
+"""
+Score Cache
+Short-lived cache of scoring results keyed by lot and a hash of everything the score depends on
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCORE_CACHE_TTL_SECONDS = 60
+SCORE_CACHE_MAX_ENTRIES = 128
+
+
+def state_hash(*parts: Any) -> str:
+    """Stable digest of JSON-serialisable scoring inputs (dict key order does not matter)."""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ScoreCache:
+    """
+    In-process TTL cache of the last scoring results per (lot, state hash).
+
+    An export right after the dashboard recalculated, or several formats of
+    the same lot, reuse one engine run. The hash covers the lot configuration
+    too, so editing a lot never serves a stale score; the TTL only bounds memory.
+    Callers get a deep copy and may mutate it freely.
+    """
+
+    def __init__(self, ttl: float = SCORE_CACHE_TTL_SECONDS, max_entries: int = SCORE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _evict(self, now: float) -> None:
+        for key in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+            del self._entries[key]
+        while len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+    def get(self, lot_key: str, digest: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get((lot_key, digest))
+            if entry is None or entry[0] <= time.monotonic():
+                self.misses += 1
+                return None
+            self.hits += 1
+        return copy.deepcopy(entry[1])
+
+    def put(self, lot_key: str, digest: str, result: Dict[str, Any]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            self._entries[(lot_key, digest)] = (now + self.ttl, copy.deepcopy(result))
+
+    def get_or_compute(self, lot_key: str, digest: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Cached result for (lot_key, digest), computing and storing it on a miss."""
+        result = self.get(lot_key, digest)
+        if result is None:
+            result = compute()
+            self.put(lot_key, digest, result)
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+score_cache = ScoreCache()
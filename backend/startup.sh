@@ -18,13 +18,27 @@ else
     echo "This is normal for first deployment"
 fi
 
+# Seed the database once, before any worker starts (workers also seed under a
+# file lock, so this step only saves them the wait)
+echo "Seeding initial data..."
+if ! python -c 'from main import initialize_database; initialize_database()'; then
+    echo "WARNING: Seeding failed; workers will retry on startup"
+fi
+
+# Workers write their metrics here and /metrics sums them (see metrics.py);
+# start from an empty directory so a previous run's counters are not added
+export METRICS_MULTIPROC_DIR="${METRICS_MULTIPROC_DIR:-/tmp/simulator_poste_metrics}"
+rm -rf "$METRICS_MULTIPROC_DIR"
+mkdir -p "$METRICS_MULTIPROC_DIR"
+
 echo ""
 echo "Starting Gunicorn server..."
 echo "================================================"
 
 # Start the application with gunicorn
-# Use single worker to avoid race conditions with SQLite and lifespan seeding
-exec gunicorn -w 1 -k uvicorn.workers.UvicornWorker main:app \
+# Workers coordinate startup and background jobs through file locks
+# (see process_coordination.py); WEB_CONCURRENCY overrides the default of one per CPU
+exec gunicorn -w "${WEB_CONCURRENCY:-$(nproc)}" -k uvicorn.workers.UvicornWorker main:app \
     --bind 0.0.0.0:8000 \
     --timeout 120 \
     --graceful-timeout 30 \
@@ -0,0 +1,49 @@
+"""
+Tests that the interactive endpoints keep answering while the default
+threadpool (used by sync endpoints such as OCR and exports) is exhausted.
+"""
+
+import threading
+
+import anyio
+import httpx
+
+from main import app
+
+
+def test_calculate_answers_while_the_threadpool_is_exhausted(db):
+    async def scenario():
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        original_tokens, limiter.total_tokens = limiter.total_tokens, 1
+        release = threading.Event()
+        try:
+            async with anyio.create_task_group() as tg:
+                # A long sync request holds the only threadpool slot
+                tg.start_soon(anyio.to_thread.run_sync, release.wait)
+                await anyio.sleep(0.05)
+                try:
+                    transport = httpx.ASGITransport(app=app)
+                    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                        with anyio.fail_after(10):
+                            config = await client.get("/api/config")
+                            score = await client.post("/api/calculate", json={
+                                "lot_key": "Lotto 1", "base_amount": 1_000_000.0,
+                                "competitor_discount": 30.0, "my_discount": 10.0,
+                                "tech_inputs": [], "selected_company_certs": [],
+                            })
+                            simulation = await client.post("/api/monte-carlo", json={
+                                "lot_key": "Lotto 1", "base_amount": 1_000_000.0, "my_discount": 10.0,
+                                "competitor_discount_mean": 30.0, "current_tech_score": 40.0, "seed": 1,
+                            })
+                finally:
+                    release.set()
+        finally:
+            limiter.total_tokens = original_tokens
+        return config, score, simulation
+
+    config, score, simulation = anyio.run(scenario)
+
+    assert config.status_code == 200 and "Lotto 1" in config.json()
+    assert score.status_code == 200, score.text
+    assert "total_score" in score.json()
+    assert simulation.status_code == 200, simulation.text
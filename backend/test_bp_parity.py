@@ -0,0 +1,46 @@
+"""
+Parity between the Python and frontend Business Plan engines on the golden
+corpus (parity/bp_corpus.json). The live frontend check needs Node.
+"""
+import pytest
+
+from parity import bp_parity
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return bp_parity.load_corpus()
+
+
+def test_corpus_is_not_empty(corpus):
+    assert len(corpus) == bp_parity.CORPUS_SIZE + len(bp_parity.divergence_cases())
+
+
+def test_python_engine_matches_corpus(corpus):
+    report = bp_parity.run(corpus, live=False)
+    assert report["mismatches"] == {}
+
+
+def test_known_divergences_are_reproduced_exactly(corpus):
+    """xfail-style vectors: a divergence that changes or goes away is reported as a mismatch."""
+    divergent = [case for case in corpus if "divergence" in case]
+    assert {case["id"] for case in divergent} == {case["id"] for case in bp_parity.divergence_cases()}
+    assert all(case["python_mismatches"] for case in divergent)
+    assert set(bp_parity.run(divergent, live=False)["known_divergences"]) == {case["id"] for case in divergent}
+
+    changed = {**divergent[0], "python_mismatches": divergent[0]["python_mismatches"][1:]}
+    assert list(bp_parity.run([changed], live=False)["mismatches"]) == [f"{changed['id']} (python)"]
+
+
+@pytest.mark.skipif(not bp_parity.node_available(), reason="node not installed")
+def test_frontend_engine_matches_corpus(corpus):
+    report = bp_parity.run(corpus, live=True)
+    assert report["mismatches"] == {}
+    assert all("js" in timing for timing in report["timings"].values())
+
+
+def test_compare_reports_divergence(corpus):
+    case = corpus[0]
+    actual = bp_parity.python_engine(case)
+    actual["total"] *= 1.01
+    assert any(line.startswith("total") for line in bp_parity.compare(case, case["expected"], actual))
@@ -0,0 +1,201 @@
+"""
+Tests for persistent certificate verification jobs.
+
+OCR is replaced by a fake `verify_certificate` so only the job orchestration
+(persistence, resume, cancellation, API) is exercised.
+"""
+
+import io
+import json
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+import crud
+import models
+from database import SessionLocal
+from main import app
+from services import cert_job_service
+from services.cert_job_service import run_job
+from services.cert_verification_service import CertVerificationResult, CertVerificationService
+
+
+client = TestClient(app)
+
+
+@pytest.fixture()
+def verified(monkeypatch, tmp_path):
+    """Fake OCR; records the basenames it was asked to verify."""
+    calls = []
+
+    def verify_certificate(self, pdf_path):
+        name = pdf_path.replace("\\", "/").rsplit("/", 1)[-1]
+        calls.append(name)
+        req_code, cert_name, resource = self.parse_filename(name)
+        return CertVerificationResult(
+            filename=name, req_code=req_code, cert_name_from_file=cert_name,
+            resource_name=resource, status="valid",
+        )
+
+    monkeypatch.setattr(CertVerificationService, "verify_certificate", verify_certificate)
+    monkeypatch.setenv("CERT_JOBS_DIR", str(tmp_path / "jobs"))
+    return calls
+
+
+def _cert_folder(tmp_path):
+    folder = tmp_path / "certs"
+    (folder / "sub").mkdir(parents=True)
+    for name in ("REQ01_AWS_Mario Rossi.pdf", "REQ01_Azure_Luca Bianchi.PDF", "sub/REQ02_PMP_Anna Verdi.pdf"):
+        (folder / name).write_bytes(b"%PDF-1.4 fake")
+    (folder / "notes.txt").write_text("ignored")
+    return folder
+
+
+def _folder_job(db, folder, **kwargs):
+    return crud.create_cert_job(
+        db, job_id=cert_job_service.new_job_id(), source_type="folder",
+        source_path=str(folder), source_name=str(folder), **kwargs,
+    )
+
+
+def test_run_job_verifies_folder_and_stores_summary(db, tmp_path, verified):
+    job = _folder_job(db, _cert_folder(tmp_path), expected_certs_map={"REQ01": ["AWS Architect"]})
+
+    run_job(job.id)
+
+    db.refresh(job)
+    assert job.status == "completed"
+    assert (job.total, job.processed) == (3, 3)
+    assert job.summary["total"] == 3
+    assert job.summary["by_requirement"]["REQ01"] == {"total": 2, "valid": 2}
+    results = cert_job_service.job_results(db, job)
+    assert "sub/REQ02_PMP_Anna Verdi.pdf" in [r["filename"] for r in results]
+    assert all(r["expected_cert_names"] == ["AWS Architect"] for r in results if r["req_code"] == "REQ01")
+
+
+def test_resume_skips_files_already_verified(db, tmp_path, verified):
+    job = _folder_job(db, _cert_folder(tmp_path))
+
+    run_job(job.id, is_stopping=lambda: len(verified) >= 1)
+    db.refresh(job)
+    assert job.status == "running"
+    assert job.processed == 1
+
+    run_job(job.id)
+    db.refresh(job)
+    assert job.status == "completed"
+    assert job.processed == 3
+    assert sorted(verified) == sorted(set(verified))  # nothing verified twice
+
+
+def test_cancelled_job_keeps_partial_results(db, tmp_path, verified):
+    job = _folder_job(db, _cert_folder(tmp_path))
+
+    run_job(job.id, is_cancelled=lambda: len(verified) >= 2)
+
+    db.refresh(job)
+    assert job.status == "cancelled"
+    assert len(cert_job_service.job_results(db, job)) == 2
+
+
+def test_job_stops_when_cancelled_from_another_worker(db, tmp_path, verified):
+    job = _folder_job(db, _cert_folder(tmp_path))
+
+    def cancel_elsewhere():
+        if len(verified) == 1:
+            other = SessionLocal()
+            other.query(models.CertVerificationJobModel).filter_by(id=job.id).update({"status": "cancelled"})
+            other.commit()
+            other.close()
+        return False
+
+    run_job(job.id, is_stopping=cancel_elsewhere)
+
+    db.refresh(job)
+    assert job.status == "cancelled"
+    assert len(verified) == 1
+
+
+def test_missing_folder_fails_job(db, tmp_path, verified):
+    job = _folder_job(db, tmp_path / "missing")
+
+    run_job(job.id)
+
+    db.refresh(job)
+    assert job.status == "failed"
+    assert "Folder not found" in job.error
+
+
+def _zip_bytes(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for name in members:
+            zf.writestr(name, b"%PDF-1.4 fake")
+    return buffer.getvalue()
+
+
+def test_zip_job_api_roundtrip(tmp_path, verified, monkeypatch):
+    monkeypatch.setattr(cert_job_service.job_runner, "submit", lambda job_id: run_job(job_id))
+    payload = _zip_bytes(["certs/REQ01_AWS_Mario Rossi.pdf", "certs/REQ02_PMP_Anna Verdi.pdf", "__MACOSX/._x.pdf"])
+
+    response = client.post(
+        "/api/verify-certs/jobs/upload",
+        files={"file": ("certs.zip", payload, "application/zip")},
+    )
+    assert response.status_code == 200, response.text
+    job_id = response.json()["id"]
+
+    job = client.get(f"/api/verify-certs/jobs/{job_id}").json()
+    assert job["status"] == "completed"
+    assert job["results"]["upload_filename"] == "certs.zip"
+    assert job["results"]["summary"]["total"] == 2
+    assert not (tmp_path / "jobs" / job_id).exists()  # stored ZIP cleaned up
+
+    listed = client.get("/api/verify-certs/jobs", params={"status": "completed"}).json()
+    assert job_id in [j["id"] for j in listed]
+    assert client.post(f"/api/verify-certs/jobs/{job_id}/cancel").status_code == 409
+    assert client.delete(f"/api/verify-certs/jobs/{job_id}").status_code == 200
+    assert client.get(f"/api/verify-certs/jobs/{job_id}").status_code == 404
+
+
+def test_zip_job_rejects_unsafe_archive(verified, monkeypatch):
+    monkeypatch.setattr(cert_job_service.job_runner, "submit", lambda job_id: None)
+
+    response = client.post(
+        "/api/verify-certs/jobs/upload",
+        files={"file": ("evil.zip", _zip_bytes(["../escape.pdf"]), "application/zip")},
+    )
+
+    assert response.status_code == 400
+
+
+def test_upload_endpoint_verifies_zip_without_extracting(verified):
+    payload = _zip_bytes(["certs/REQ01_AWS_Mario Rossi.pdf", "certs/sub/REQ02_PMP_Anna Verdi.pdf"])
+
+    response = client.post(
+        "/api/verify-certs/upload",
+        params={"req_filter": "REQ02"},
+        files={"file": ("certs.zip", payload, "application/zip")},
+    )
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert [r["filename"] for r in body["results"]] == ["sub/REQ02_PMP_Anna Verdi.pdf"]
+    assert body["summary"]["total"] == 1
+    assert sorted(verified) == ["REQ01_AWS_Mario Rossi.pdf", "REQ02_PMP_Anna Verdi.pdf"]
+
+
+def test_upload_stream_reports_progress_per_member(verified):
+    payload = _zip_bytes(["REQ01_AWS_Mario Rossi.pdf", "REQ02_PMP_Anna Verdi.pdf"])
+
+    response = client.post(
+        "/api/verify-certs/upload/stream",
+        files={"file": ("certs.zip", payload, "application/zip")},
+    )
+
+    events = [json.loads(line[6:]) for line in response.text.splitlines() if line.startswith("data: ")]
+    assert [e["type"] for e in events] == ["start", "progress", "progress", "done"]
+    assert [r["filename"] for r in events[-1]["results"]["results"]] == [
+        "REQ01_AWS_Mario Rossi.pdf", "REQ02_PMP_Anna Verdi.pdf"
+    ]
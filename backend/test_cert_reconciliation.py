@@ -0,0 +1,174 @@
+"""
+Tests for bulk reconciliation of verified certificates with lot requirements.
+"""
+
+from fastapi.testclient import TestClient
+
+import crud
+import models
+from main import app
+from services.cert_matcher import CertMatcher, VendorDetector
+from services.cert_reconciliation_service import CertReconciler
+from services.fuzzy_index import TrigramIndex, normalize_label
+
+
+client = TestClient(app)
+
+LOTS = {
+    "Lotto A": {"reqs": [
+        {
+            "id": "REQ_1", "label": "Cloud architects", "type": "resource",
+            "prof_R": 2, "prof_C": 2, "max_res": 4, "max_certs": 4,
+            "selected_prof_certs": ["AWS Solutions Architect", "Azure Administrator"],
+            "prof_certs_weights": {"Azure Administrator": 0.5},
+        },
+        {
+            "id": "REQ_2", "label": "Project managers", "type": "resource",
+            "prof_R": 3, "prof_C": 1,
+            "selected_prof_certs": ["PMP", "AWS Solutions Architect"],
+        },
+        {"id": "REF_1", "label": "References", "type": "reference"},
+    ]},
+}
+
+
+def _result(resource, cert, status="valid", req_code="", detected=None):
+    return {
+        "filename": f"{req_code}_{cert}_{resource}.pdf",
+        "req_code": req_code,
+        "cert_name_from_file": cert,
+        "cert_name_detected": detected,
+        "resource_name": resource,
+        "status": status,
+    }
+
+
+def test_trigram_index_matches_contained_and_misspelt_labels():
+    index = TrigramIndex(["AWS Solutions Architect", "Azure Administrator", "PMP"])
+
+    assert normalize_label("  Àzure-Administrator ") == "azure administrator"
+    assert index.best("AWS Certified Solutions Architect - Associate")[0] == "AWS Solutions Architect"
+    assert index.best("Azure Adminstrator")[0] == "Azure Administrator"
+    assert index.best("pmp")[1] == 1.0
+    assert index.best("Cisco CCNA") is None
+
+
+def test_cert_matcher_scores_only_indexed_candidates():
+    known = ["AWS Solutions Architect", "Azure Administrator", "Certified Kubernetes Administrator"]
+    matcher = CertMatcher(known, candidates=2)
+
+    assert matcher.match("AZURE administrator") == ("Azure Administrator", 1.0)
+    cert, ratio = matcher.match("Azure Adminstrator")
+    assert cert == "Azure Administrator" and 0.9 < ratio < 1.0
+    assert matcher.match("xyz") == (None, 0.0)
+
+
+def test_vendor_detector_compiles_patterns_once():
+    class Vendor:
+        def __init__(self, key, aliases, cert_patterns):
+            self.key, self.aliases, self.cert_patterns = key, aliases, cert_patterns
+
+    detector = VendorDetector([
+        Vendor("aws", ["Amazon"], ["^aws\\b"]),
+        Vendor("broken", [], ["("]),
+        Vendor("microsoft", ["Azure"], []),
+    ])
+
+    assert detector.detect("AWS Developer") == "aws"
+    assert detector.detect("Microsoft Azure Fundamentals") == "microsoft"
+    assert detector.detect("PMP") == ""
+
+
+def test_import_certs_preview_uses_indexed_matcher(db):
+    master = crud.get_master_data(db)
+    known = master.prof_certs[0]
+    csv_text = f"vendor;cert_name\n;{known.upper()}\n;{known[:-1]}x\n;Qqq Zzz\n"
+
+    response = client.post(
+        "/api/master-data/import-certs/preview",
+        files={"file": ("certs.csv", csv_text.encode(), "text/csv")},
+    )
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert [m["matched_cert"] for m in body["exact"]] == [known]
+    assert body["partial"][0]["file_cert"] == f"{known[:-1]}x"
+    assert [m["file_cert"] for m in body["unmatched"]] == ["Qqq Zzz"]
+
+
+def test_reconcile_counts_distinct_valid_resources_per_requirement():
+    results = [
+        _result("Mario Rossi", "AWS", detected="AWS Certified Solutions Architect Associate"),
+        _result("Rossi Mario", "AWS Solutions Architect"),  # same person, other file
+        _result("Anna Verdi", "Azure Administrator"),
+        _result("Luca Bianchi", "Azure Administrator", status="expired"),
+        _result("Paolo Neri", "PMP", req_code="REQ_2"),
+        _result("Sara Gialli", "AWS Solutions Architect", req_code="REQ_2"),  # pinned to REQ_2
+        _result("Nobody", "Unknown Cert"),
+    ]
+
+    report = CertReconciler(LOTS).reconcile(results)
+
+    req1, req2 = report["lots"]["Lotto A"]["requirements"]
+    assert req1["resources"] == ["Anna Verdi", "Mario Rossi"]
+    assert req1["cert_counts"] == {"AWS Solutions Architect": 1, "Azure Administrator": 1}
+    assert (req1["r_val"], req1["c_val"]) == (2, 1.5)
+    assert req1["excluded"] == {"expired": 1}
+
+    assert req2["cert_counts"] == {"PMP": 1, "AWS Solutions Architect": 2}
+    assert req2["r_val"] == 3
+    assert req2["c_val"] == 2  # per-certificate counts capped at prof_C
+    assert report["summary"] == {"total": 7, "matched": 6, "unmatched": 1}
+
+
+def test_reconcile_endpoint_uses_stored_lots(db):
+    response = client.post("/api/verify-certs/reconcile", json={
+        "results": [_result("Mario Rossi", "Some Certification")],
+        "lot_keys": ["Lotto 1"],
+    })
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert list(body["lots"]) == ["Lotto 1"]
+    assert all(req["r_val"] == 0 for req in body["lots"]["Lotto 1"]["requirements"])
+    assert client.post("/api/verify-certs/reconcile", json={"job_id": "missing"}).status_code == 404
+
+
+def test_score_endpoint_turns_verified_certs_into_tech_inputs(db):
+    reqs = [dict(LOTS["Lotto A"]["reqs"][0], max_points=10.0, gara_weight=10.0)]
+    db.merge(models.LotConfigModel(
+        name="Lotto Cert Score", base_amount=1000.0, max_tech_score=60.0, max_econ_score=40.0,
+        company_certs=[], reqs=reqs,
+        state={"my_discount": 10.0, "competitor_discount": 20.0, "tech_inputs": {
+            "REQ_1": {"r_val": 0, "c_val": 0, "cert_company_counts": {"Azure Administrator": {"Lutech": 2}}},
+        }},
+    ))
+    db.commit()
+    payload = {
+        "lot_key": "Lotto Cert Score",
+        "results": [
+            _result("Mario Rossi", "AWS Solutions Architect"),
+            _result("Anna Verdi", "Azure Administrator"),
+        ],
+    }
+
+    response = client.post("/api/verify-certs/score", json=payload)
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["tech_inputs"]["REQ_1"] == {
+        "r_val": 2,
+        "c_val": 1.5,
+        "cert_counts": {"AWS Solutions Architect": 1, "Azure Administrator": 1},
+        "cert_company_counts": {"Azure Administrator": {"Lutech": 1}},
+    }
+    assert body["saved"]["technical_score"] == 0
+    assert body["delta"]["technical_score"] == body["proposed"]["technical_score"] > 0
+    assert set(body["delta"]["weighted_scores"]) == {"REQ_1"}
+    db.expire_all()
+    assert db.get(models.LotConfigModel, "Lotto Cert Score").state["tech_inputs"]["REQ_1"]["r_val"] == 0
+
+    assert client.post("/api/verify-certs/score", json={**payload, "apply": True}).json()["applied"] is True
+    db.expire_all()
+    assert db.get(models.LotConfigModel, "Lotto Cert Score").state["tech_inputs"]["REQ_1"]["r_val"] == 2
+    assert client.post("/api/verify-certs/score", json={**payload, "lot_key": "missing"}).status_code == 404
@@ -0,0 +1,342 @@
+"""
+Tests for the certificate verification service.
+
+Tesseract and poppler are not required: rasterisation and OCR are replaced
+with fakes so the tests exercise the orchestration logic only.
+"""
+
+import io
+import os
+import zipfile
+
+import fitz
+import pytest
+from PIL import Image
+
+from services import cert_verification_service as cvs
+from services.cert_verification_service import (
+    CertVerificationService,
+    _page_runs,
+    preferred_ladder_step,
+    record_ladder_step,
+    zip_pdf_members,
+)
+
+
+EMBEDDED_PAGE = (
+    "Amazon Web Services\n"
+    "AWS Certified Solutions Architect - Associate\n"
+    "This certificate is issued to Mario Rossi\n"
+    "Issued: 01/02/2024  Expires: 01/02/2027\n"
+)
+OCR_PAGE = "OCR page text Validation Number ABC123"
+
+
+def _make_pdf(path, pages):
+    """Write a PDF where each entry is page text (None = page without text layer)."""
+    doc = fitz.open()
+    for text in pages:
+        page = doc.new_page()
+        if text:
+            page.insert_text((40, 60), text, fontsize=10)
+    doc.save(str(path))
+    doc.close()
+
+
+@pytest.fixture()
+def service():
+    return CertVerificationService()
+
+
+@pytest.fixture()
+def fake_ocr(monkeypatch, service):
+    """Record rasterised page ranges and return a marker text per OCR'd page."""
+    calls = []
+
+    def convert_from_path(pdf_path, dpi=None, first_page=None, last_page=None):
+        calls.append((first_page, last_page))
+        first = first_page or 1
+        last = last_page or len(fitz.open(pdf_path))
+        return [f"page-{n}" for n in range(first, last + 1)]
+
+    monkeypatch.setattr(cvs.pdf2image, "convert_from_path", convert_from_path)
+    monkeypatch.setattr(
+        service, "_ocr_with_rotation", lambda image, start_step: (f"{OCR_PAGE} [{image}]", start_step)
+    )
+    return calls
+
+
+def test_page_runs_groups_consecutive_pages():
+    assert _page_runs([]) == []
+    assert _page_runs([3, 1, 2, 5, 7, 8]) == [(1, 3), (5, 5), (7, 8)]
+
+
+def test_fully_embedded_pdf_skips_ocr(tmp_path, service, fake_ocr):
+    pdf = tmp_path / "cert.pdf"
+    _make_pdf(pdf, [EMBEDDED_PAGE, EMBEDDED_PAGE])
+
+    text = service.extract_text_from_pdf(str(pdf))
+
+    assert fake_ocr == []
+    assert text.count("AWS Certified Solutions Architect") == 2
+
+
+def test_mixed_pdf_only_ocrs_scanned_pages_in_page_order(tmp_path, service, fake_ocr):
+    pdf = tmp_path / "cert.pdf"
+    _make_pdf(pdf, [None, EMBEDDED_PAGE, None, None])
+
+    text = service.extract_text_from_pdf(str(pdf))
+
+    assert fake_ocr == [(1, 1), (3, 4)]
+    positions = [text.index(marker) for marker in ("[page-1]", "AWS Certified", "[page-3]", "[page-4]")]
+    assert positions == sorted(positions)
+
+
+def test_junk_text_layer_falls_back_to_full_ocr(tmp_path, service, fake_ocr):
+    pdf = tmp_path / "cert.pdf"
+    _make_pdf(pdf, ["lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod", None])
+
+    text = service.extract_text_from_pdf(str(pdf))
+
+    assert fake_ocr == [(1, 2)]
+    assert "lorem ipsum" not in text
+    assert "[page-1]" in text and "[page-2]" in text
+
+
+@pytest.fixture()
+def tesseract_calls(monkeypatch):
+    """Fake Tesseract: good text only for grayscale (preprocessed) images when asked."""
+    calls = {"ocr": [], "osd": [], "good_modes": {"RGB", "L"}, "rotate": 0, "conf": 5.0}
+
+    def image_to_string(image, lang=None, config=None):
+        calls["ocr"].append((image.size, image.mode))
+        return EMBEDDED_PAGE if image.mode in calls["good_modes"] else ""
+
+    def image_to_osd(image, output_type=None):
+        calls["osd"].append(image.size)
+        if calls["conf"] is None:
+            raise RuntimeError("Too few characters. Skipping this page")
+        return {"rotate": calls["rotate"], "orientation_conf": calls["conf"]}
+
+    monkeypatch.setattr(cvs.pytesseract, "image_to_string", image_to_string)
+    monkeypatch.setattr(cvs.pytesseract, "image_to_osd", image_to_osd)
+    monkeypatch.setattr(cvs, "_vendor_ladder_steps", {})
+    return calls
+
+
+def test_ocr_ladder_runs_one_full_pass_when_osd_is_confident(service, tesseract_calls):
+    image = Image.new("RGB", (2400, 3200), "white")
+
+    text, step = service._ocr_with_rotation(image)
+
+    assert step == "original"
+    assert "AWS Certified" in text
+    assert all(max(size) <= cvs.OCR_PROBE_MAX_SIDE for size in tesseract_calls["osd"])
+    assert tesseract_calls["ocr"] == [((2400, 3200), "RGB")]  # no probes
+
+
+def test_ocr_ladder_probes_downscaled_when_osd_is_unsure(service, tesseract_calls):
+    tesseract_calls["conf"] = 1.5
+    tesseract_calls["rotate"] = 90
+    image = Image.new("RGB", (2400, 3200), "white")
+
+    text, step = service._ocr_with_rotation(image)
+
+    assert step == "original" and "AWS Certified" in text
+    sizes = [size for size, _ in tesseract_calls["ocr"]]
+    assert len(sizes) == 2 and max(sizes[0]) <= cvs.OCR_PROBE_MAX_SIDE  # probe, then full pass
+    assert sizes[1] == (2400, 3200)  # a low-confidence rotation is not applied
+
+
+@pytest.mark.parametrize("conf, max_calls", [(5.0, 4), (1.5, 6), (None, 6)])
+def test_ocr_ladder_bounds_tesseract_calls_per_unreadable_page(service, tesseract_calls, conf, max_calls):
+    tesseract_calls["conf"] = conf
+    tesseract_calls["good_modes"] = set()
+    image = Image.new("RGB", (2400, 3200), "white")
+
+    text, _ = service._ocr_with_rotation(image)
+
+    assert text == ""
+    assert len(tesseract_calls["osd"]) + len(tesseract_calls["ocr"]) == max_calls
+    probes = [size for size, _ in tesseract_calls["ocr"] if max(size) <= cvs.OCR_PROBE_MAX_SIDE]
+    assert len(probes) == {5.0: 0, 1.5: 4, None: 4}[conf]  # unless OSD is confident, one is the 180° probe
+
+
+def test_ocr_ladder_applies_detected_rotation(service, tesseract_calls):
+    tesseract_calls["rotate"] = 90
+    image = Image.new("RGB", (2400, 3200), "white")
+
+    service._ocr_with_rotation(image)
+
+    assert tesseract_calls["ocr"][-1][0] == (3200, 2400)
+
+
+
+def test_ocr_ladder_flips_an_upside_down_page_when_osd_is_unsure(service, tesseract_calls, monkeypatch):
+    tesseract_calls["conf"] = 1.5
+    image = Image.new("RGB", (2400, 3200), "white")
+    image.paste("black", (0, 0, 400, 400))  # the footer mark, upside down at the top
+
+    def image_to_string(page, lang=None, config=None):
+        tesseract_calls["ocr"].append((page.size, page.mode))
+        upright = page.convert("L").getpixel((page.width - 1, page.height - 1)) < 128
+        return EMBEDDED_PAGE if upright else ""
+
+    monkeypatch.setattr(cvs.pytesseract, "image_to_string", image_to_string)
+
+    text, _ = service._ocr_with_rotation(image)
+
+    assert "AWS Certified" in text
+
+
+def test_ocr_ladder_escalates_preprocessing_and_honours_start_step(service, tesseract_calls):
+    tesseract_calls["good_modes"] = {"L"}
+    image = Image.new("RGB", (2400, 3200), "white")
+
+    _, step = service._ocr_with_rotation(image)
+    assert step == "light"
+    assert len(tesseract_calls["ocr"]) == 2  # original then light, at full resolution
+
+    tesseract_calls["ocr"].clear()
+    _, step = service._ocr_with_rotation(image, start_step="light")
+    assert step == "light"
+    assert len(tesseract_calls["ocr"]) == 1
+
+
+def test_vendor_ladder_memory_prefers_most_successful_step(tesseract_calls):
+    assert preferred_ladder_step("aws") == "original"
+    record_ladder_step("aws", "aggressive")
+    record_ladder_step("aws", "light")
+    record_ladder_step("aws", "light")
+    record_ladder_step("aws", "bogus")
+    assert preferred_ladder_step("aws") == "light"
+    assert preferred_ladder_step("microsoft") == "original"
+
+
+def test_vendor_from_filename_matches_whole_alias_words(service):
+    assert service._vendor_from_filename("AWS Solutions Architect") == "aws"
+    assert service._vendor_from_filename("Casapulla Project Plan") is None
+
+
+def _zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    buffer.seek(0)
+    return zipfile.ZipFile(buffer)
+
+
+def test_zip_pdf_members_drops_single_root_and_junk():
+    zf = _zip({
+        "certs/REQ01_AWS_Mario Rossi.pdf": b"%PDF",
+        "certs/sub/REQ02_PMP_Anna Verdi.PDF": b"%PDF",
+        "certs/notes.txt": b"x",
+        "certs/._REQ01_AWS_Mario Rossi.pdf": b"x",
+        "__MACOSX/certs/._x.pdf": b"x",
+    })
+
+    names = [name for _, name in zip_pdf_members(zf)]
+
+    assert names == ["REQ01_AWS_Mario Rossi.pdf", "sub/REQ02_PMP_Anna Verdi.PDF"]
+    with pytest.raises(ValueError):
+        zip_pdf_members(_zip({"../escape.pdf": b"%PDF"}))
+
+
+def test_verify_zip_reads_members_lazily(monkeypatch, service):
+    seen = []
+
+    def verify_certificate(pdf_path):
+        with open(pdf_path, "rb") as f:
+            seen.append((os.path.basename(pdf_path), f.read()))
+        result = service._new_result(os.path.basename(pdf_path))
+        result.status = "valid"
+        return result
+
+    monkeypatch.setattr(service, "verify_certificate", verify_certificate)
+    service.max_file_size_mb = 0.001
+    zf = _zip({
+        f"REQ0{n}_AWS_Resource {n}.pdf": f"%PDF {n}".encode() for n in range(1, 6)
+    } | {"REQ09_AWS_Big.pdf": b"x" * 4096, "REQ09_AWS_Empty.pdf": b""})
+
+    results = sorted(service.verify_zip(zf))
+
+    assert [r["status"] for _, _, r in results] == ["valid"] * 5 + ["too_large", "not_downloaded"]
+    assert results[0][2]["filename"] == "REQ01_AWS_Resource 1.pdf"
+    assert sorted(seen) == [(f"REQ0{n}_AWS_Resource {n}.pdf", f"%PDF {n}".encode()) for n in range(1, 6)]
+
+
+def test_incremental_folder_reverifies_only_changed_files(db, tmp_path, monkeypatch, service):
+    from services.cert_manifest_service import FolderManifest
+
+    verified = []
+
+    def verify_certificate(pdf_path):
+        verified.append(os.path.basename(pdf_path))
+        result = service._new_result(os.path.basename(pdf_path))
+        result.status = "valid"
+        result.valid_until = "01/01/2020" if "Old" in pdf_path else None
+        return result
+
+    monkeypatch.setattr(service, "verify_certificate", verify_certificate)
+    folder = tmp_path / "certs"
+    folder.mkdir()
+    for name in ("REQ01_AWS_Mario Rossi.pdf", "REQ02_PMP_Anna Verdi.pdf", "REQ03_ITIL_Old Cert.pdf"):
+        (folder / name).write_bytes(b"%PDF " + name.encode())
+
+    def run():
+        verified.clear()
+        manifest = FolderManifest(db, str(folder), service.config_fingerprint())
+        return service.verify_folder(str(folder), manifest=manifest)
+
+    first = run()
+    assert first["incremental"] == {"cached": 0, "verified": 3, "removed": 0}
+
+    # Reused results get today's expiry check (the fake never marks anything expired)
+    second = run()
+    assert verified == []
+    assert second["incremental"]["cached"] == 3
+    assert [r["status"] for r in second["results"]] == ["valid", "valid", "expired"]
+
+    (folder / "REQ01_AWS_Mario Rossi.pdf").write_bytes(b"%PDF replaced with a new certificate")
+    os.utime(folder / "REQ02_PMP_Anna Verdi.pdf", (1, 1))  # touched, same content
+    (folder / "REQ03_ITIL_Old Cert.pdf").unlink()
+    third = run()
+    assert verified == ["REQ01_AWS_Mario Rossi.pdf"]
+    assert third["incremental"] == {"cached": 1, "verified": 1, "removed": 1}
+
+    service.settings = {**service.settings, "ocr_dpi": "300"}
+    run()
+    assert len(verified) == 2  # configuration change invalidates every entry
+
+
+def test_refresh_expiry_marks_lapsed_cached_results(service):
+    assert service.refresh_expiry({"status": "valid", "valid_until": "01/01/2020"})["status"] == "expired"
+    assert service.refresh_expiry({"status": "unreadable", "valid_until": "01/01/2020"})["status"] == "unreadable"
+    assert service.refresh_expiry({"status": "valid", "valid_until": "01/01/2999"})["status"] == "valid"
+
+
+def test_extraction_rules_are_shared_and_timed(service):
+    from services.cert_extraction_rules import get_rule_timing_report, reset_rule_timings
+
+    assert CertVerificationService().rules is service.rules
+    reset_rule_timings()
+
+    valid_from, valid_until = service.extract_dates(EMBEDDED_PAGE)
+    assert (valid_from, valid_until) == ("01/02/2024", "01/02/2027")
+    assert service.extract_cert_name(EMBEDDED_PAGE, "aws").startswith("Solutions Architect - Associate")
+
+    report = {row["rule"]: row for row in get_rule_timing_report()}
+    assert report["expiry_date.expires"]["matches"] == 1
+    assert report["cert_name.0"]["calls"] == 1
+    assert all(row["total_ms"] >= 0 for row in report.values())
+
+
+def test_invalid_configured_pattern_is_skipped():
+    service = CertVerificationService(
+        vendors={"acme": {"name": "Acme", "aliases": ["acme"], "cert_patterns": ["acme(", r"acme\s+pro"]}},
+        settings={"date_patterns": '["(\\\\d{4})", "[unclosed"]'},
+    )
+
+    assert service.detect_vendor("ACME Pro certificate") == ("acme", 0.7)
+    assert service.rules.date_patterns.findall("year 2024") == ["2024"]
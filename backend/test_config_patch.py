@@ -0,0 +1,108 @@
+"""
+Tests for the delta (PATCH) endpoints of lot configuration and simulation state.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from services.json_patch import PatchError, PatchTestFailed, apply_json_patch, apply_merge_patch
+
+client = TestClient(app)
+
+LOT = "Lotto Patch"
+
+
+@pytest.fixture()
+def lot():
+    assert client.post("/api/config/add", params={"lot_key": LOT}).status_code == 200
+    client.post("/api/config", json={LOT: {
+        **client.get("/api/config").json()[LOT],
+        "reqs": [{"id": "REQ_P1", "label": "Referenza", "type": "reference", "max_points": 10.0, "criteria": []}],
+    }})
+    yield client.get("/api/config").json()[LOT]
+    client.delete(f"/api/config/{LOT}")
+
+
+def test_merge_and_json_patch_follow_the_rfcs():
+    doc = {"a": 1, "b": {"c": 2, "d": 3}, "items": [1, 2]}
+
+    assert apply_merge_patch(doc, {"a": None, "b": {"c": 5}}) == {"b": {"c": 5, "d": 3}, "items": [1, 2]}
+    assert apply_json_patch(doc, [
+        {"op": "add", "path": "/items/-", "value": 3},
+        {"op": "move", "from": "/b/d", "path": "/e"},
+        {"op": "replace", "path": "/items/0", "value": 0},
+    ]) == {"a": 1, "b": {"c": 2}, "items": [0, 2, 3], "e": 3}
+    assert doc == {"a": 1, "b": {"c": 2, "d": 3}, "items": [1, 2]}
+    with pytest.raises(PatchTestFailed):
+        apply_json_patch(doc, [{"op": "test", "path": "/a", "value": 2}])
+    with pytest.raises(PatchError):
+        apply_json_patch(doc, [{"op": "remove", "path": "/missing"}])
+
+
+def test_patch_lot_uses_the_version_as_etag(lot):
+    etag = f'"{lot["version"]}"'
+
+    response = client.patch(f"/api/config/{LOT}", json={"alpha": 0.35}, headers={"If-Match": etag})
+
+    assert response.status_code == 200, response.text
+    assert response.json()["alpha"] == 0.35
+    assert response.headers["ETag"] == f'"{lot["version"] + 1}"'
+    assert response.json()["reqs"] == lot["reqs"]
+
+    stale = client.patch(f"/api/config/{LOT}", json={"alpha": 0.4}, headers={"If-Match": etag})
+    assert stale.status_code == 412
+    assert client.get("/api/config").json()[LOT]["alpha"] == 0.35
+
+
+def test_patch_lot_rejects_renames_and_invalid_fields(lot):
+    assert client.patch(f"/api/config/{LOT}", json={"name": "Altro"}).status_code == 422
+    assert client.patch(f"/api/config/{LOT}", json={"base_amount": "molto"}).status_code == 422
+
+
+def test_patch_requirement_with_json_patch(lot):
+    ops = [
+        {"op": "test", "path": "/label", "value": "Referenza"},
+        {"op": "replace", "path": "/label", "value": "Referenza aggiornata"},
+    ]
+
+    response = client.patch(f"/api/config/{LOT}/req/REQ_P1", json=ops)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["version"] == lot["version"] + 1
+    assert client.get("/api/config").json()[LOT]["reqs"][0]["label"] == "Referenza aggiornata"
+    # The test operation now fails: someone else's edit is not overwritten
+    assert client.patch(f"/api/config/{LOT}/req/REQ_P1", json=ops).status_code == 409
+    assert client.patch(f"/api/config/{LOT}/req/REQ_X", json={"label": "x"}).status_code == 404
+
+
+def test_patch_state_merges_and_drops_unknown_inputs(lot):
+    response = client.patch(f"/api/config/{LOT}/state", json={
+        "my_discount": 12.5,
+        "tech_inputs": {"REQ_P1": {"sub_req_vals": {"a": 3}}, "REQ_MISSING": {"r_val": 1}},
+    })
+    assert response.status_code == 200, response.text
+
+    client.patch(f"/api/config/{LOT}/state", json={"competitor_discount": 25.0})
+
+    state = client.get("/api/config").json()[LOT]["state"]
+    assert (state["my_discount"], state["competitor_discount"]) == (12.5, 25.0)
+    assert state["tech_inputs"] == {"REQ_P1": {"sub_req_vals": {"a": 3}}}
+
+
+def test_state_autosave_returns_the_version_for_the_next_lot_patch(lot):
+    # Saving the state bumps the lot version: the client must use the returned one
+    first = client.post("/api/config/state", params={"lot_key": LOT}, json={"my_discount": 10.0})
+    assert first.status_code == 200, first.text
+    assert first.json()["version"] == lot["version"] + 1
+
+    autosave = client.patch(f"/api/config/{LOT}/state", json={"my_discount": 11.0})
+    version = autosave.json()["version"]
+    assert version == lot["version"] + 2
+
+    stale = client.patch(f"/api/config/{LOT}", json={"alpha": 0.4}, headers={"If-Match": f'"{lot["version"]}"'})
+    assert stale.status_code == 412
+
+    response = client.patch(f"/api/config/{LOT}", json={"alpha": 0.4}, headers={"If-Match": f'"{version}"'})
+    assert response.status_code == 200, response.text
+    assert response.json()["state"]["my_discount"] == 11.0
@@ -0,0 +1,95 @@
+"""
+Tests for streaming master-data CSV imports and preview tokens.
+"""
+
+import io
+
+from fastapi.testclient import TestClient
+
+import crud
+from main import app
+from services import csv_import_service
+from services.csv_import_service import (
+    LUTECH_HEADER_KEYWORDS, LUTECH_POSITIONAL_FIELDS, PreviewTokenStore, aggregate_lutech_resources, iter_csv_rows,
+)
+
+
+client = TestClient(app)
+
+
+def test_iter_csv_rows_streams_past_the_sniffed_chunk(monkeypatch):
+    monkeypatch.setattr(csv_import_service, "SNIFF_CHUNK_SIZE", 16)
+    lines = ["resource_id;cert_name;vendor"] + [f"R{i};Cert {i % 3};Vendor,Inc" for i in range(50)]
+    upload = io.BytesIO(("\ufeff" + "\r\n".join(lines)).encode("utf-8"))
+
+    rows = iter_csv_rows(upload, LUTECH_HEADER_KEYWORDS, LUTECH_POSITIONAL_FIELDS)
+    counts, vendors = aggregate_lutech_resources(rows, str.lower)
+
+    assert counts == {"Cert 0": 17, "Cert 1": 17, "Cert 2": 16}
+    assert vendors["Cert 0"] == "vendor,inc"
+    assert not upload.closed
+
+
+def test_iter_csv_rows_maps_headerless_columns_positionally():
+    upload = io.BytesIO("Mario Rossi,PMP\n\nAnna Verdi,PMP,PMI\n".encode("utf-8"))
+
+    rows = list(iter_csv_rows(upload, LUTECH_HEADER_KEYWORDS, LUTECH_POSITIONAL_FIELDS))
+
+    assert [(r["resource_id"], r["cert_name"], r["vendor"]) for r in rows] == [
+        ("Mario Rossi", "PMP", None), ("Anna Verdi", "PMP", "PMI"),
+    ]
+
+
+def test_preview_token_store_expires_and_bounds_entries():
+    store = PreviewTokenStore(ttl=60, max_entries=2)
+    first, second, third = store.put(1), store.put(2), store.put(3)
+
+    assert store.get(first) is None
+    assert (store.get(second), store.get(third)) == (2, 3)
+    store.ttl = -1
+    assert store.get(store.put(4)) is None
+
+
+def test_preview_tokens_are_shared_by_stores_on_the_same_directory(tmp_path):
+    parsing_worker = PreviewTokenStore(directory=str(tmp_path))
+    confirming_worker = PreviewTokenStore(directory=str(tmp_path))
+
+    token = parsing_worker.put({"R1": ["AWS"]})
+
+    assert confirming_worker.get(token) == {"R1": ["AWS"]}
+    confirming_worker.discard(token)
+    assert parsing_worker.get(token) is None
+    assert confirming_worker.get("../" + token) is None
+
+
+def _count(resources, cert):
+    value = resources.get(cert)
+    return len(value) if isinstance(value, list) else int(value or 0)
+
+
+def test_lutech_confirm_reuses_parsed_preview(db, monkeypatch):
+    monkeypatch.setattr(crud, "save_json_file", lambda _filename, _data: True)
+    known = crud.get_master_data(db).prof_certs[0]
+    csv_text = f"resource_id;cert_name\nR1;{known}\nR2;{known}\nR3;Streaming Import Test Cert\n"
+    before = crud.get_master_data(db).prof_certs_resources or {}
+
+    preview = client.post(
+        "/api/master-data/import-lutech-resources/preview",
+        files={"file": ("resources.csv", csv_text.encode(), "text/csv")},
+    ).json()
+    assert preview["exact"][0]["count"] == 2
+    payload = {
+        "accepted": [{"file_cert": known, "matched_cert": known}],
+        "to_create": [{"file_cert": "Streaming Import Test Cert", "vendor_key": ""}],
+        "mode": "delta",
+        "preview_token": preview["preview_token"],
+    }
+
+    response = client.post("/api/master-data/import-lutech-resources/confirm", json=payload)
+
+    assert response.status_code == 200, response.text
+    db.expire_all()
+    resources = crud.get_master_data(db).prof_certs_resources
+    assert resources[known] == _count(before, known) + 2
+    assert resources["Streaming Import Test Cert"] == _count(before, "Streaming Import Test Cert") + 1
+    assert client.post("/api/master-data/import-lutech-resources/confirm", json=payload).status_code == 410
@@ -0,0 +1,78 @@
+"""
+Tests for the SQLite storage tuning (WAL mode, query-only read pool) and the
+multi-worker coordination built on it (data version counters, leader lock).
+"""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+import models
+from database import ReadSessionLocal, SessionLocal, engine
+from process_coordination import LeaderLock
+from services.data_versions import VersionedCache, get_versions
+
+
+def test_database_runs_in_wal_mode_with_tuned_pragmas():
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() > 0
+
+
+def test_reads_proceed_while_a_write_transaction_is_open():
+    writer, reader = SessionLocal(), ReadSessionLocal()
+    try:
+        before = reader.query(models.LotConfigModel).count()
+        reader.rollback()
+        writer.add(models.LotConfigModel(name="WAL Pending Lot", base_amount=1.0))
+        writer.flush()  # holds the write lock, not committed
+
+        assert reader.query(models.LotConfigModel).count() == before
+    finally:
+        writer.rollback()
+        writer.close()
+        reader.close()
+
+
+def test_read_sessions_cannot_write():
+    reader = ReadSessionLocal()
+    try:
+        reader.add(models.LotConfigModel(name="Read Only Lot", base_amount=1.0))
+        with pytest.raises(OperationalError):
+            reader.flush()
+    finally:
+        reader.rollback()
+        reader.close()
+
+
+def test_writes_bump_data_versions_and_rebuild_versioned_caches(db):
+    cache = VersionedCache(("ocr_settings",), lambda session: cache.builds)
+    assert cache.get(db) == cache.get(db) == 0
+    before = get_versions(db)["ocr_settings"]
+
+    # Written through another session, as another worker would
+    writer = SessionLocal()
+    try:
+        writer.add(models.OCRSettingsModel(key="data_versions_test", value="1"))
+        writer.commit()
+        writer.delete(writer.get(models.OCRSettingsModel, "data_versions_test"))
+        writer.commit()
+    finally:
+        writer.close()
+
+    assert get_versions(db)["ocr_settings"] == before + 2
+    assert cache.get(db) == 1
+    assert cache.builds == 2
+
+
+def test_leader_lock_is_held_by_one_holder_at_a_time():
+    first, second = LeaderLock("test-leader"), LeaderLock("test-leader")
+    try:
+        assert first.try_acquire()
+        assert not second.try_acquire()
+        first.release()
+        assert second.try_acquire() and second.is_leader
+    finally:
+        first.release()
+        second.release()
@@ -2,6 +2,12 @@
 Tests that the database seeds reference/master data correctly.
 (Replaces the previous print-only script.)
 """
+import json
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+
 import crud
 import models
 
@@ -41,3 +47,82 @@ def test_build_profile_rates_maps_practice_profiles(db):
     finally:
         db.delete(practice)
         db.commit()
+
+
+
+@contextmanager
+def _recorded_writes(bind):
+    """Collect (verb, table) of every INSERT/UPDATE/DELETE executed on `bind`."""
+    writes = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith(("INSERT", "UPDATE", "DELETE")):
+            words = statement.replace("INTO ", "").replace("FROM ", "").split()
+            writes.append((words[0], words[1]))
+
+    event.listen(bind, "before_cursor_execute", record)
+    try:
+        yield writes
+    finally:
+        event.remove(bind, "before_cursor_execute", record)
+
+
+def test_lot_edits_rewrite_only_the_changed_rows(db):
+    lot = models.LotConfigModel(
+        name="Lotto Righe",
+        base_amount=1000.0,
+        company_certs=[{"label": "ISO 9001", "points": 2.0}],
+        reqs=[{"id": "R1", "max_points": 5}, {"id": "R2", "max_points": 3}],
+        state={"my_discount": 10.0, "tech_inputs": {"R1": {"r_val": 1}, "R2": {"r_val": 2}}, "company_certs": {}},
+    )
+    db.add(lot)
+    db.commit()
+    try:
+        with _recorded_writes(db.get_bind()) as writes:
+            lot.reqs = [{"id": "R1", "max_points": 5}, {"id": "R2", "max_points": 4}]
+            lot.state = {**lot.state, "tech_inputs": {"R1": {"r_val": 1}, "R2": {"r_val": 3}}}
+            db.commit()
+
+        assert [w for w in writes if w[1] != "data_versions"] == [
+            ("UPDATE", "lot_configs"),  # version only
+            ("UPDATE", "lot_requirements"),
+            ("UPDATE", "lot_state_entries"),
+        ]
+        assert lot.version == 2
+        db.expire_all()
+        assert lot.reqs == [{"id": "R1", "max_points": 5}, {"id": "R2", "max_points": 4}]
+        assert lot.state == {
+            "my_discount": 10.0, "tech_inputs": {"R1": {"r_val": 1}, "R2": {"r_val": 3}}, "company_certs": {},
+        }
+        assert lot.company_certs == [{"label": "ISO 9001", "points": 2.0}]
+    finally:
+        db.delete(lot)
+        db.commit()
+
+
+def test_lots_in_legacy_json_columns_are_migrated_to_rows(tmp_path):
+    legacy_engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    models.Base.metadata.create_all(bind=legacy_engine)
+    reqs = [{"id": "REQ_A", "max_points": 4}]
+    with legacy_engine.begin() as conn:
+        for column in ("company_certs", "reqs", "state"):
+            conn.execute(text(f"ALTER TABLE lot_configs ADD COLUMN {column} JSON"))
+        conn.execute(
+            text(
+                "INSERT INTO lot_configs (name, base_amount, version, company_certs, reqs, state) "
+                "VALUES (:n, 1, 1, :c, :r, :s)"
+            ),
+            {"n": "Lotto Legacy", "c": "[]", "r": json.dumps(reqs), "s": json.dumps({"my_discount": 5.0})},
+        )
+
+    session = Session(bind=legacy_engine)
+    try:
+        assert crud.migrate_lot_json_columns(session) == 1
+        assert crud.migrate_lot_json_columns(session) == 0
+
+        lot = crud.get_lot_config(session, "Lotto Legacy")
+        assert (lot.reqs, lot.company_certs, lot.state) == (reqs, [], {"my_discount": 5.0})
+        assert session.execute(text("SELECT reqs FROM lot_configs")).scalar() is None
+    finally:
+        session.close()
+        legacy_engine.dispose()
@@ -8,8 +8,20 @@ ScoringService.calculate_economic_score).
 import io
 
 import openpyxl
+import pytest
+from fastapi.testclient import TestClient
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
 
+import crud
+import export_streaming
+import main
+from excel_business_plan import BusinessPlanExcelGenerator
 from excel_generator import ExcelReportGenerator
+from main import app
+from services.score_cache import score_cache
+
+
+client = TestClient(app)
 
 
 def _make_excel():
@@ -60,3 +72,100 @@ def test_partial_company_cert_status_is_accepted():
         company_certs_status={"ISO 27001": "partial"},
     )
     assert len(gen.generate().getvalue()) > 5000
+
+
+def test_excel_export_scores_server_side_from_the_cache(db, monkeypatch):
+    lot = next(lot for lot in crud.get_lot_configs(db) if lot.base_amount > 0)
+    captured = {}
+    generate = main.generate_excel_report
+    monkeypatch.setattr(main, "generate_excel_report", lambda **kw: captured.update(kw) or generate(**kw))
+    score_cache.clear()
+    main.report_cache.clear()
+    inputs = {"lot_key": lot.name, "my_discount": 20, "competitor_discount": 30}
+
+    calculated = client.post("/api/calculate", json={
+        **inputs, "base_amount": lot.base_amount, "tech_inputs": [], "company_certs_status": {},
+    }).json()
+    response = client.post("/api/export-excel", json={
+        **inputs, "tech_inputs_full": {}, "company_certs_status": {}, "technical_score": 999,
+    })
+
+    assert response.status_code == 200, response.text
+    assert score_cache.hits == 1
+    assert captured["technical_score"] == calculated["technical_score"]
+    assert captured["total_score"] == calculated["total_score"]
+    assert captured["base_amount"] == lot.base_amount
+
+
+
+@pytest.mark.parametrize("path", ["/api/export-pdf", "/api/export-excel"])
+def test_export_rejects_malformed_tech_inputs(path):
+    response = client.post(path, json={
+        "lot_key": "Lotto 1", "my_discount": 20, "competitor_discount": 30,
+        "tech_inputs_full": {"R1": {"r_val": "abc"}},
+    })
+
+    assert response.status_code == 422
+
+
+def test_iter_chunks_reads_fixed_blocks_and_closes():
+    fileobj = export_streaming.spooled_output()
+    fileobj.write(b"x" * 2500)
+
+    assert [len(c) for c in export_streaming.iter_chunks(fileobj, 1024)] == [1024, 1024, 452]
+    assert fileobj.closed
+
+
+def test_business_plan_excel_is_streamed_with_content_length():
+    """The BP export is saved to a spooled file and streamed with a
+    Content-Length; header rows share the registered named style."""
+    intervals = [
+        {"member": f"M{i}", "poste_profile": "P", "lutech_profile": "prac:L1",
+         "start": 1, "end": 12, "fte_eff": 0.5, "rate": 300, "cost": 1000}
+        for i in range(20)
+    ]
+    payload = {
+        "lot_key": "Lotto BP", "business_plan": {"duration_months": 12, "team_composition": [{"profile_id": "P", "label": "P", "fte": 1}]},
+        "costs": {},
+        "clean_team_cost": 0, "base_amount": 1_000_000,
+        "profile_rates": {"prac:L1": 300}, "intervals": intervals,
+    }
+
+    response = client.post("/api/business-plan-export", json=payload)
+
+    assert response.status_code == 200, response.text
+    body = response.content
+    assert int(response.headers["content-length"]) == len(body)
+    ws = openpyxl.load_workbook(io.BytesIO(body))["CRONOPROGRAMMA"]
+    assert ws.cell(row=3, column=1).style == "bp_header"
+    assert ws.cell(row=4, column=7).value.endswith("^0)")
+    assert ws.cell(row=4, column=7).number_format == "#,##0.00"
+
+
+def test_business_plan_row_sheets_are_written_as_they_grow():
+    """Interval and catalog-item rows go to disk as they are produced, and
+    the saved workbook keeps their values, styles and cross-sheet names."""
+    items = [{"id": f"I{i}", "label": f"Voce {i}", "group_pct": 10} for i in range(3)]
+    generator = BusinessPlanExcelGenerator(
+        lot_key="Lotto BP",
+        business_plan={"duration_months": 12, "team_composition": [{"profile_id": "P", "label": "P", "fte": 1}], "tows": [{
+            "tow_id": "C1", "label": "Catalogo", "type": "catalogo", "total_fte": 2,
+            "total_catalog_value": 1000, "catalog_items": items,
+        }]},
+        costs={}, clean_team_cost=0, base_amount=1_000_000,
+        intervals=[{"member": "M1", "lutech_profile": "prac:L1", "start": 2, "end": 12, "fte_eff": 0.5}],
+    )
+
+    wb = openpyxl.load_workbook(generator.generate())
+
+    assert all(isinstance(generator.wb[name], WriteOnlyWorksheet) for name in ("CATALOGO", "CRONOPROGRAMMA"))
+    timeline = wb["CRONOPROGRAMMA"]
+    assert [timeline.cell(row=4, column=c).value for c in (1, 5, 6, 7)] == ["M1", 2, 12, 0]
+    assert timeline.cell(row=4, column=8).number_format == "#,##0.00"
+    catalog = wb["CATALOGO"]
+    assert catalog.column_dimensions["B"].width == 30
+    assert catalog.cell(row=11, column=1).style == "bp_header"
+    assert catalog.cell(row=12, column=8).value.startswith("=IF(B6>0, (C12/B6)*B5*(1-D12)*E12*B9")
+    assert catalog["I15"].value == "=SUM(I12:I14)" and catalog["I15"].font.bold
+    assert catalog["A18"].value == "COSTO TOTALE CATALOGO" and catalog["B18"].value == "=I15"
+    assert generator.named_ranges["CATALOG_COST"] == "CATALOGO!$B$18"
@@ -0,0 +1,119 @@
+"""
+Tests for the per-workload executor pools: bounded admission, 429 backpressure
+and the queue depth / wait time statistics exposed by /metrics.
+"""
+
+import threading
+
+import anyio
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import ClientDisconnect
+
+from executors import PoolSaturated, WorkloadPool, pools
+from main import app
+
+client = TestClient(app)
+
+
+def test_pool_rejects_jobs_beyond_workers_plus_queue():
+    pool = WorkloadPool("test", workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(pool.run, release.wait)
+            tg.start_soon(pool.run, release.wait)
+            await anyio.sleep(0.05)
+            busy = pool.stats()
+            with pytest.raises(PoolSaturated):
+                await pool.run(release.wait)
+            release.set()
+        return busy
+
+    try:
+        busy = anyio.run(scenario)
+    finally:
+        release.set()
+        pool.shutdown()
+
+    assert (busy["running"], busy["queued"], busy["in_flight"]) == (1, 1, 2)
+    stats = pool.stats()
+    assert (stats["in_flight"], stats["submitted"], stats["rejected"], stats["completed"]) == (0, 2, 1, 2)
+    assert stats["max_queued"] == 1 and stats["wait_seconds_max"] > 0
+
+
+def test_streamed_iterator_holds_its_slot_until_closed():
+    pool = WorkloadPool("test-stream", workers=1, max_queue=0)
+    closed = []
+
+    def numbers():
+        try:
+            yield from range(3)
+        finally:
+            closed.append(True)
+
+    async def scenario():
+        stream = pool.iterate(numbers(), pool.reserve())
+        first = await stream.__anext__()
+        with pytest.raises(PoolSaturated):
+            pool.reserve()
+        await stream.aclose()  # client disconnected
+        return first
+
+    try:
+        assert anyio.run(scenario) == 0
+    finally:
+        pool.shutdown()
+    assert closed == [True]
+    assert pool.stats()["in_flight"] == 0
+
+
+
+def test_stream_releases_its_slot_when_the_body_never_starts():
+    pool = WorkloadPool("test-disconnect", workers=1, max_queue=0)
+    closed = []
+
+    class Numbers:
+        def __iter__(self):
+            return self
+
+        def __next__(self):
+            raise AssertionError("the body is never iterated")
+
+        def close(self):
+            closed.append(True)
+
+    response = pool.stream(Numbers(), pool.reserve(), media_type="text/plain")
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            raise OSError("client went away")
+
+    try:
+        with pytest.raises(ClientDisconnect):
+            anyio.run(response, {"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+        assert pool.stats()["in_flight"] == 0
+        pool.reserve().release()  # the slot is available again
+    finally:
+        pool.shutdown()
+    assert closed == [True]
+
+
+def test_saturated_export_pool_answers_429_and_metrics_report_it():
+    pool = pools["export"]
+    slots = [pool.reserve() for _ in range(pool.capacity - pool.stats()["in_flight"])]
+    try:
+        response = client.get("/api/lots/Lotto 1/report/pdf")
+    finally:
+        for slot in slots:
+            slot.release()
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"]
+    executors = client.get("/metrics", params={"format": "json"}).json()["executors"]
+    assert set(executors) == {"interactive", "export", "ocr"}
+    assert executors["export"]["rejected"] >= 1
@@ -0,0 +1,118 @@
+"""
+Tests for the Prometheus instrumentation: exposition format, per-route request
+metrics with DB query counts, the hot-path stage timers and the aggregation
+across gunicorn workers.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+import metrics
+from main import app
+from services.business_plan_service import BusinessPlanService
+
+client = TestClient(app)
+
+
+def _samples(text: str) -> dict:
+    return {
+        line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+        for line in text.splitlines() if line and not line.startswith("#")
+    }
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = metrics.Registry()
+    latency = registry.histogram("test_latency_seconds", "Test latency", ("route",), buckets=(0.1, 1.0))
+    latency.observe(0.05, route='/a"b')
+    latency.observe(0.5, route='/a"b')
+    latency.observe(5.0, route='/a"b')
+
+    text = registry.render()
+
+    assert "# TYPE test_latency_seconds histogram" in text
+    samples = _samples(text)
+    assert samples['test_latency_seconds_bucket{route="/a\\"b",le="0.1"}'] == 1
+    assert samples['test_latency_seconds_bucket{route="/a\\"b",le="1"}'] == 2
+    assert samples['test_latency_seconds_bucket{route="/a\\"b",le="+Inf"}'] == 3
+    assert samples['test_latency_seconds_count{route="/a\\"b"}'] == 3
+    assert samples['test_latency_seconds_sum{route="/a\\"b"}'] == 5.55
+
+
+def test_requests_are_measured_per_route_template_with_db_queries(db):
+    route = {"method": "GET", "route": "/api/lots/{lot_key}/report/{fmt}"}
+    before = metrics.http_request_duration.count(**route)
+    queries_before = metrics.http_request_db_queries.count(**route)
+
+    assert client.get("/api/lots/Lotto inesistente/report/pdf").status_code == 404
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    samples = _samples(response.text)
+    labels = '{method="GET",route="/api/lots/{lot_key}/report/{fmt}"}'
+    assert samples[f"simulator_http_request_duration_seconds_count{labels}"] == before + 1
+    assert samples[f"simulator_http_request_db_queries_count{labels}"] == queries_before + 1
+    assert samples[f"simulator_http_request_db_queries_sum{labels}"] >= 1
+    assert 'simulator_http_requests_total{method="GET",route="/api/lots/{lot_key}/report/{fmt}",status="404"}' in samples
+    assert 'simulator_cache_misses_total{cache="score"}' in samples
+    assert 'simulator_executor_queued{pool="export"}' in samples
+
+
+def test_hot_paths_record_stage_timers(db):
+    before = metrics.stage_duration.count(operation="calculate_score", stage="weighted_scores")
+    response = client.post("/api/calculate", json={
+        "lot_key": "Lotto 1", "base_amount": 1_000_000.0, "competitor_discount": 30.0,
+        "my_discount": 17.25, "tech_inputs": [], "selected_company_certs": [],
+    })
+    assert response.status_code == 200, response.text
+    assert metrics.stage_duration.count(operation="calculate_score", stage="weighted_scores") == before + 1
+
+    team_cost_before = metrics.stage_duration.count(operation="business_plan", stage="team_cost")
+    BusinessPlanService.calculate_team_cost(
+        team_composition=[], volume_adjustments={}, reuse_factor=0.0,
+        profile_mappings={}, profile_rates={}, duration_months=12,
+    )
+    assert metrics.stage_duration.count(operation="business_plan", stage="team_cost") == team_cost_before + 1
+
+
+def _exited_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_multiprocess_render_sums_workers_and_labels_live_gauges(tmp_path):
+    def worker_registry():
+        registry = metrics.Registry(multiprocess_dir=str(tmp_path))
+        requests = registry.counter("test_requests_total", "Test requests", ("route",))
+        latency = registry.histogram("test_latency_seconds", "Test latency", (), buckets=(1.0,))
+        registry.gauge_family("test_threads", "Test threads", (), lambda: [((), 4)])
+        return registry, requests, latency
+
+    # Two other workers' snapshots, as their snapshot threads would have written them:
+    # one still running (the parent of this process), one that has exited
+    for pid, count in ((os.getppid(), 2), (_exited_pid(), 5)):
+        other, requests, latency = worker_registry()
+        requests.inc(count, route="/a")
+        latency.observe(0.5)
+        with open(tmp_path / f"{pid}.json", "w", encoding="utf-8") as f:
+            json.dump(other._collect(), f)
+
+    registry, requests, latency = worker_registry()
+    requests.inc(1, route="/a")
+    latency.observe(2.0)
+
+    samples = _samples(registry.render())
+
+    assert samples['test_requests_total{route="/a"}'] == 8
+    assert samples['test_latency_seconds_bucket{le="1"}'] == 2
+    assert samples['test_latency_seconds_bucket{le="+Inf"}'] == 3
+    assert samples["test_latency_seconds_count"] == 3
+    gauges = {key for key in samples if key.startswith("test_threads")}
+    assert gauges == {f'test_threads{{pid="{os.getpid()}"}}', f'test_threads{{pid="{os.getppid()}"}}'}
+    assert (tmp_path / f"{os.getpid()}.json").exists()
@@ -0,0 +1,187 @@
+"""
+Tests for PDF report chart rendering and caching, and bulk report exports.
+"""
+
+import io
+import json
+import os
+import zipfile
+from concurrent.futures import Future
+
+from fastapi.testclient import TestClient
+
+import chart_renderer
+import crud
+import main
+from chart_renderer import chart_cache, get_chart
+from executors import pools
+from main import app
+from pdf_generator import PDFReportGenerator
+from services import bulk_export_service
+from services.artifact_cache import ArtifactCache, parse_if_none_match
+
+
+client = TestClient(app)
+
+
+def _generator(**overrides):
+    kwargs = dict(
+        lot_key="Lotto 2",
+        lot_config={"reqs": [], "company_certs": [], "rti_enabled": True, "rti_companies": ["Partner"]},
+        base_amount=1_000_000, my_discount=25, competitor_discount=30,
+        technical_score=50, economic_score=20, total_score=70,
+        details={}, weighted_scores={},
+        category_scores={"company_certs": 0, "resource": 0, "reference": 0, "project": 0},
+        max_tech_score=60, max_econ_score=40, alpha=0.3, win_probability=65,
+        rti_quotas={"Lutech": 70, "Partner": 30},
+    )
+    kwargs.update(overrides)
+    return PDFReportGenerator(**kwargs)
+
+
+def test_charts_are_rendered_once_per_distinct_input(monkeypatch):
+    chart_cache.clear()
+    rendered = []
+    render = chart_renderer.render_chart
+    monkeypatch.setattr(chart_renderer, "render_chart", lambda spec: rendered.append(spec[0]) or render(spec))
+
+    first = _generator().generate().getvalue()
+    second = _generator(lot_key="Lotto 3").generate().getvalue()
+
+    assert first.startswith(b"%PDF") and second.startswith(b"%PDF")
+    assert sorted(rendered) == ["gauge", "gauge", "rti_pie", "score_curve"]
+    assert chart_cache.hits == 4
+    assert get_chart("rti_pie", (("Lutech", 0),)) is None
+
+
+def test_bulk_export_zips_each_lot_scored_from_state(db):
+    lot_keys = [lot.name for lot in crud.get_lot_configs(db) if lot.base_amount > 0][:2]
+    assert len(lot_keys) == 2
+
+    response = client.post("/api/export-reports", json={"lot_keys": lot_keys + lot_keys[:1]})
+
+    assert response.status_code == 200, response.text
+    assert "report_lotti.zip" in response.headers["content-disposition"]
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    expected = {f"report_{key.replace(' ', '_')}.{fmt}" for key in lot_keys for fmt in ("pdf", "xlsx")}
+    assert set(archive.namelist()) == expected
+    for name in expected:
+        assert archive.read(name)[:4] in (b"%PDF", b"PK\x03\x04")
+    assert client.post("/api/export-reports", json={"lot_keys": ["Missing Lot"]}).status_code == 404
+
+
+def test_bulk_export_lists_failed_reports(monkeypatch):
+    def render(fmt, kwargs):
+        if kwargs["lot_key"] == "bad":
+            raise ValueError("boom")
+        return fmt.encode()
+
+    monkeypatch.setattr(bulk_export_service, "render_report", render)
+    jobs = [("ok.pdf", "pdf", {"lot_key": "ok"}), ("bad.pdf", "pdf", {"lot_key": "bad"})]
+
+    data = b"".join(bulk_export_service.iter_reports_zip(jobs, {"Lotto X": "Lot not found"}, max_workers=1))
+
+    archive = zipfile.ZipFile(io.BytesIO(data))
+    assert archive.read("ok.pdf") == b"pdf"
+    assert json.loads(archive.read("errori.json")) == {"Lotto X": "Lot not found", "bad.pdf": "boom"}
+
+
+class _KillsWorker:
+    """Unpickled in an export worker, ends that process."""
+
+    def __reduce__(self):
+        return os._exit, (3,)
+
+
+def test_bulk_export_keeps_every_report_when_a_worker_dies(monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+    kwargs = dict(
+        lot_config={"reqs": [], "company_certs": []}, base_amount=1_000_000, my_discount=25,
+        competitor_discount=30, technical_score=50, economic_score=20, total_score=70,
+        details={}, weighted_scores={},
+        category_scores={"company_certs": 0, "resource": 0, "reference": 0, "project": 0},
+        max_tech_score=60, max_econ_score=40, alpha=0.3, win_probability=65,
+    )
+    jobs = [(f"lot{i}.pdf", "pdf", {**kwargs, "lot_key": f"Lotto {i}"}) for i in range(4)]
+    jobs.insert(2, ("killer.pdf", "pdf", {**kwargs, "lot_key": "Lotto X", "die": _KillsWorker()}))
+
+    data = b"".join(bulk_export_service.iter_reports_zip(jobs, max_workers=2))
+
+    archive = zipfile.ZipFile(io.BytesIO(data))
+    reports = set(archive.namelist()) - {"errori.json"}
+    errors = json.loads(archive.read("errori.json"))
+    assert reports | set(errors) == {job[0] for job in jobs}
+    assert len(reports) + len(errors) == len(jobs)
+    assert set(errors) == {"killer.pdf"}
+    assert all(archive.read(name).startswith(b"%PDF") for name in reports)
+
+
+def test_lot_report_is_rendered_once_and_revalidated_by_etag(db, monkeypatch):
+    lot = next(lot for lot in crud.get_lot_configs(db) if lot.base_amount > 0)
+    generated = []
+    generate = main.generate_pdf_report
+    monkeypatch.setattr(main, "generate_pdf_report", lambda **kw: generated.append(kw) or generate(**kw))
+    main.report_cache.clear()
+    url = f"/api/lots/{lot.name}/report/pdf"
+
+    first = client.get(url)
+    etag = first.headers["etag"]
+    revalidated = client.get(url, headers={"If-None-Match": f'W/{etag}, "other"'})
+    repeated = client.get(url)
+
+    assert first.status_code == 200 and first.content.startswith(b"%PDF")
+    assert revalidated.status_code == 304 and revalidated.headers["etag"] == etag
+    assert repeated.content == first.content and repeated.headers["etag"] == etag
+    assert len(generated) == 1 and main.report_cache.hits == 1
+
+
+def test_artifact_cache_evicts_least_recently_used(tmp_path):
+    cache = ArtifactCache(str(tmp_path), max_bytes=25)
+    for key in ("a", "b"):
+        cache.put(key, "pdf", io.BytesIO(b"x" * 10))
+    os.utime(tmp_path / "a.pdf", (1, 1))
+    os.utime(tmp_path / "b.pdf", (2, 2))
+    cache.open("a", "pdf").close()  # refreshes a
+
+    cache.put("c", "pdf", io.BytesIO(b"y" * 10))
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.pdf", "c.pdf"]
+    assert cache.open("b", "pdf") is None
+    assert parse_if_none_match("*", '"a"') and not parse_if_none_match(None, '"a"')
+
+
+
+class _InlineProcesses:
+    """ProcessPoolExecutor stand-in that records how many pools are created."""
+
+    created = []
+
+    def __init__(self, max_workers, mp_context=None):
+        self.max_workers = max_workers
+        self.created.append(self)
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+def test_bulk_exports_share_one_process_pool_sized_like_the_export_pool(monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: 64)
+    monkeypatch.setattr(bulk_export_service, "ProcessPoolExecutor", _InlineProcesses)
+    monkeypatch.setattr(bulk_export_service, "render_report", lambda fmt, kwargs: b"%PDF")
+    monkeypatch.setattr(bulk_export_service, "_processes", None)
+    _InlineProcesses.created.clear()
+    jobs = [(f"lot{i}.pdf", "pdf", {}) for i in range(3)]
+
+    # Concurrent exports, interleaved as the export pool streams them
+    streams = [bulk_export_service.iter_reports_zip(jobs, max_workers=4) for _ in range(4)]
+    archives = [next(stream) for stream in streams]
+    archives = [first + b"".join(stream) for first, stream in zip(archives, streams)]
+
+    assert all(len(zipfile.ZipFile(io.BytesIO(data)).namelist()) == 3 for data in archives)
+    assert len(_InlineProcesses.created) == 1
+    assert _InlineProcesses.created[0].max_workers == pools["export"].workers
@@ -0,0 +1,106 @@
+"""
+Tests for the opt-in request profiler and the slow-request watchdog.
+"""
+
+import logging
+import threading
+import time
+
+import anyio
+import pytest
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+import main
+from main import app
+from profiling import SlowRequestMonitor, slow_requests
+
+client = TestClient(app)
+
+
+def test_profiled_request_stores_a_downloadable_report():
+    response = client.post("/api/calculate", params={"profile": "1"}, json={
+        "lot_key": "Lotto 1", "base_amount": 1_000_000.0, "competitor_discount": 30.0,
+        "my_discount": 11.5, "tech_inputs": [], "selected_company_certs": [],
+    })
+    assert response.status_code == 200, response.text
+    profile_id = response.headers["X-Profile-Id"]
+
+    assert profile_id in [report["id"] for report in client.get("/api/system/profiles").json()]
+    report = client.get(f"/api/system/profiles/{profile_id}")
+    assert report.status_code == 200
+    assert report.text.startswith("POST /api/calculate -> 200")
+    assert "Inclusive (on the stack)" in report.text
+    assert client.get(f"/api/system/profiles/{profile_id}", params={"format": "folded"}).status_code == 200
+    assert client.get("/api/system/profiles/../../etc/passwd").status_code == 404
+    assert client.get(f"/api/system/profiles/{'0' * 32}").status_code == 404
+
+
+def test_unprofiled_requests_carry_no_profile():
+    assert "X-Profile-Id" not in client.get("/api/config").headers
+
+
+class ManualMonitor(SlowRequestMonitor):
+    """Checked only by the test: the background thread would race it for the entry."""
+
+    def _run(self) -> None:
+        pass
+
+
+def test_slow_request_monitor_logs_the_busy_stacks(caplog):
+    monitor = ManualMonitor(threshold=0.05)
+    stop = threading.Event()
+
+    def crunch_lot_numbers():
+        while not stop.is_set():
+            sum(range(1000))
+
+    worker = threading.Thread(target=crunch_lot_numbers)
+    worker.start()
+    token = monitor.start("POST /api/business-plan/Lotto 1/calculate")
+    try:
+        time.sleep(0.1)
+        with caplog.at_level(logging.WARNING, logger="profiling"):
+            monitor.check()
+            monitor.check()  # logged once per request
+    finally:
+        stop.set()
+        worker.join()
+        monitor.finish(token)
+
+    slow = [r.getMessage() for r in caplog.records if "running for" in r.getMessage()]
+    assert len(slow) == 1
+    assert "POST /api/business-plan/Lotto 1/calculate" in slow[0]
+    assert "crunch_lot_numbers" in slow[0]
+
+
+
+def test_profiled_request_finishes_when_the_client_leaves_before_the_response(monkeypatch):
+    monkeypatch.setattr(main, "_is_admin", lambda request, user: True)
+    reports = len(client.get("/api/system/profiles").json())
+    request = Request({
+        "type": "http", "method": "GET", "path": "/api/export", "headers": [],
+        "query_string": b"profile=1", "state": {},
+    })
+
+    async def call_next(_request):
+        return StreamingResponse(iter([b"never sent"]))
+
+    async def receive():
+        await anyio.sleep_forever()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            raise OSError("client went away")
+
+    async def scenario():
+        response = await main.profile_requests(request, call_next)
+        with pytest.raises(OSError):
+            await response(request.scope, receive, send)
+
+    anyio.run(scenario)
+
+    assert not slow_requests._active
+    assert not [t for t in threading.enumerate() if t.name == "profile-sampler"]
+    assert len(client.get("/api/system/profiles").json()) == reports + 1
@@ -18,6 +18,7 @@ import { ConfigProvider, useConfig } from './features/config/context/ConfigConte
 import { SimulationProvider, useSimulation } from './features/simulation/context/SimulationContext';
 import { ToastProvider, useToast } from './shared/components/ui/Toast';
 import { API_URL } from './utils/api';
+import { createMergePatch, MERGE_PATCH_HEADERS } from './utils/mergePatch';
 
 const TechEvaluator = lazy(() => import('./components/TechEvaluator'));
 const ConfigPage = lazy(() => import('./components/ConfigPage'));
@@ -88,7 +89,7 @@ function AppContent() {
   }, []);
 
   // Use contexts instead of local state
-  const { config, loading: configLoading, updateConfig, refetch: refetchConfig } = useConfig();
+  const { config, loading: configLoading, updateConfig, refetch: refetchConfig, setLotVersion } = useConfig();
   const {
     selectedLot,
     myDiscount,
@@ -111,6 +112,7 @@ function AppContent() {
   const [isDeleting, setIsDeleting] = useState(false); // Guard for deletion race conditions
   const lastLoadedLot = useRef(null); // Track last loaded lot to prevent loops
   const isLoadingState = useRef(false); // Prevent auto-save during state load
+  const lastSavedState = useRef({ lot: null, state: null }); // Autosave sends only the changes since this
 
   // Derived values from context
   const baseAmount = config && selectedLot && config[selectedLot] ? config[selectedLot].base_amount : 0;
@@ -208,7 +210,19 @@ function AppContent() {
         tech_inputs: techInputs,
         company_certs: companyCerts
       };
-      await axios.post(`${API_URL}/config/state?lot_key=${encodeURIComponent(selectedLot)}`, statePayload);
+      const previous = lastSavedState.current.lot === selectedLot ? lastSavedState.current.state : null;
+      let res;
+      if (previous) {
+        // Send only what changed since the last save (merge patch)
+        const patch = createMergePatch(previous, statePayload);
+        if (Object.keys(patch).length === 0) return true;
+        res = await axios.patch(`${API_URL}/config/${encodeURIComponent(selectedLot)}/state`, patch, { headers: MERGE_PATCH_HEADERS });
+      } else {
+        res = await axios.post(`${API_URL}/config/state?lot_key=${encodeURIComponent(selectedLot)}`, statePayload);
+      }
+      lastSavedState.current = { lot: selectedLot, state: statePayload };
+      // The save bumped the lot version: keep the cached one current for patchLot's If-Match
+      setLotVersion(selectedLot, res.data?.version);
 
       // State saved to server successfully
       logger.info("Simulation state saved", { lot: selectedLot });
@@ -218,7 +232,7 @@ function AppContent() {
       logger.error("Failed to save state", err, { component: "App", lot: selectedLot });
       return false;
     }
-  }, [config, selectedLot, myDiscount, competitorDiscount, competitorTechScore, competitorEconDiscount, techInputs, companyCerts]);
+  }, [config, selectedLot, setLotVersion, myDiscount, competitorDiscount, competitorTechScore, competitorEconDiscount, techInputs, companyCerts]);
 
   // Unified save function for top bar button
   const handleUnifiedSave = async () => {
@@ -39,6 +39,7 @@ export default function Dashboard({ onNavigate }) {
         competitorTechScore,
         competitorEconDiscount,
         techInputs,
+        companyCerts,
         results,
         simulationData,
         setCompetitorParam,
@@ -151,26 +152,14 @@ export default function Dashboard({ onNavigate }) {
         setExcelExportLoading(true);
         try {
             const res = await axios.post(`${API_URL}/export-excel`, {
+                // Scores are computed server-side from these inputs
                 lot_key: lotKey,
                 base_amount: lotData.base_amount,
-                technical_score: results.technical_score,
-                economic_score: results.economic_score,
-                total_score: results.total_score,
                 my_discount: myDiscount,
                 competitor_discount: competitorDiscount,
-                alpha: lotData.alpha || 0.3,
                 win_probability: monteCarlo?.win_probability || 50,
-                details: results.details,
-                weighted_scores: results.weighted_scores || {},
-                category_scores: {
-                    company_certs: results.category_company_certs || 0,
-                    resource: results.category_resource || 0,
-                    reference: results.category_reference || 0,
-                    project: results.category_project || 0
-                },
-                max_tech_score: results?.calculated_max_tech_score || lotData.max_tech_score || 60,
-                max_econ_score: lotData.max_econ_score || 40,
                 tech_inputs_full: techInputs || {},
+                company_certs_status: companyCerts || {},
                 rti_quotas: lotData.rti_quotas || {}
             }, { responseType: 'blob' });
 
@@ -367,6 +367,7 @@ export default function MasterDataConfig() {
                     accepted: acceptedList,
                     to_create: toCreateList,
                     mode,
+                    preview_token: preview.preview_token,
                 });
                 const masterRes = await axios.get(`${API_URL}/master-data`);
                 setData(prev => ({ ...prev, ...masterRes.data }));
@@ -2,6 +2,7 @@ import React, { useState, useEffect, useRef, useCallback, useMemo } from 'react'
 import { Settings, X, FileSearch, Building2, AlertCircle, Briefcase, Home, Languages, Filter } from 'lucide-react';
 import { useTranslation } from 'react-i18next';
 import { formatCurrency } from '../utils/formatters';
+import { logger } from '../utils/logger';
 import { useConfig } from '../features/config/context/ConfigContext';
 import { useSimulation } from '../features/simulation/context/SimulationContext';
 import { buildLotReadiness } from '../features/config/utils/lotValidation';
@@ -26,7 +27,7 @@ export default function Sidebar({
     const quotaSaveTimeoutRef = useRef(null);
 
     // Get data from contexts (no more prop drilling!)
-    const { config, masterData, updateConfig, setConfig } = useConfig();
+    const { config, masterData, patchLot, setConfig, refetch } = useConfig();
     const {
         selectedLot,
         myDiscount,
@@ -77,11 +78,29 @@ export default function Sidebar({
         businessPlanData
     }), [lotData, masterData, techInputs, companyCerts, results, monteCarlo, businessPlanData]);
 
-    // Keep a stable ref to updateConfig to avoid re-triggering the effect
-    const updateConfigRef = useRef(updateConfig);
+    // Save the quotas of a lot. A 412 means the cached lot version is stale
+    // (another session edited the lot): reload the config and retry once.
+    const saveLotQuotas = useCallback(async (lotKey, quotas) => {
+        let result = await patchLot(lotKey, { rti_quotas: quotas });
+        if (result.conflict) {
+            try {
+                await refetch();
+                result = await patchLot(lotKey, { rti_quotas: quotas });
+            } catch (err) {
+                logger.warn('Config reload after conflict failed', err);
+            }
+        }
+        if (!result.success) {
+            setQuotaError(t('simulation.rti_save_failed'));
+        }
+        return result;
+    }, [patchLot, refetch, t]);
+
+    // Keep a stable ref to saveLotQuotas to avoid re-triggering the effect
+    const saveLotQuotasRef = useRef(saveLotQuotas);
     useEffect(() => {
-        updateConfigRef.current = updateConfig;
-    }, [updateConfig]);
+        saveLotQuotasRef.current = saveLotQuotas;
+    }, [saveLotQuotas]);
 
     // Stable ref for lotData to use inside effect without causing re-triggers
     const lotDataRef = useRef(lotData);
@@ -132,8 +151,7 @@ export default function Sidebar({
             // Only save once per lot to avoid loops
             if (currentLotData && selectedLot && !savedDefaultQuotasRef.current.has(selectedLot)) {
                 savedDefaultQuotasRef.current.add(selectedLot);
-                const updatedLot = { ...currentLotData, rti_quotas: defaultQuotas };
-                updateConfigRef.current({ [selectedLot]: updatedLot });
+                saveLotQuotasRef.current(selectedLot, defaultQuotas);
             }
         } else {
             setLocalQuotas({});
@@ -166,9 +184,9 @@ export default function Sidebar({
         const updatedConfig = { ...config, [selectedLot]: updatedLot };
         setConfig(updatedConfig);
 
-        // Save to backend
-        await updateConfig({ [selectedLot]: updatedLot });
-    }, [lotData, selectedLot, config, setConfig, updateConfig, t]);
+        // Save to backend (only the quotas of this lot)
+        await saveLotQuotas(selectedLot, quotas);
+    }, [lotData, selectedLot, config, setConfig, saveLotQuotas, t]);
 
     // Handle quota change — update config context immediately, debounce backend save
     const handleQuotaChange = (company, value) => {
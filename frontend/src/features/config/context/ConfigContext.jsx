@@ -3,6 +3,8 @@ import axios from 'axios';
 import { useMutation, useQuery, useQueryClient } from '@tanstack/react-query';
 import { logger } from '../../../utils/logger';
 import { API_URL } from '../../../utils/api';
+import { MERGE_PATCH_HEADERS } from '../../../utils/mergePatch';
+import { lotIfMatch, withLotVersion } from '../utils/lotVersion';
 import { useAuth } from '../../../contexts/AuthContext';
 
 const ConfigContext = createContext(null);
@@ -94,6 +96,30 @@ export const ConfigProvider = ({ children }) => {
     }
   }, [updateConfigMutation]);
 
+  // Apply a merge patch to one lot. The lot's version goes in If-Match, so an
+  // edit made meanwhile in another session is reported instead of overwritten.
+  const patchLot = useCallback(async (lotKey, patch) => {
+    try {
+      const ifMatch = lotIfMatch(queryClient.getQueryData(CONFIG_BUNDLE_QUERY_KEY), lotKey);
+      const headers = { ...MERGE_PATCH_HEADERS };
+      if (ifMatch) headers['If-Match'] = ifMatch;
+      const res = await axios.patch(`${API_URL}/config/${encodeURIComponent(lotKey)}`, patch, { headers });
+      queryClient.setQueryData(CONFIG_BUNDLE_QUERY_KEY, (current) => ({
+        config: { ...(current?.config ?? {}), [lotKey]: res.data },
+        masterData: current?.masterData ?? null
+      }));
+      return { success: true, data: res.data };
+    } catch (err) {
+      logger.error('Failed to patch lot', err, { lot: lotKey });
+      return { success: false, error: err.message, conflict: err.response?.status === 412 };
+    }
+  }, [queryClient]);
+
+  // Record the version returned by a save that bypasses patchLot (the state autosave)
+  const setLotVersion = useCallback((lotKey, version) => {
+    queryClient.setQueryData(CONFIG_BUNDLE_QUERY_KEY, (current) => withLotVersion(current, lotKey, version));
+  }, [queryClient]);
+
   const config = configBundle?.config ?? null;
   const masterData = configBundle?.masterData ?? null;
   const loading = authLoading || (queryEnabled && isConfigBundleLoading);
@@ -106,7 +132,9 @@ export const ConfigProvider = ({ children }) => {
     loading,
     error,
     refetch: fetchConfig,
-    updateConfig
+    updateConfig,
+    patchLot,
+    setLotVersion
   };
 
   return (
@@ -0,0 +1,32 @@
+import { describe, expect, it } from 'vitest';
+import { lotIfMatch, withLotVersion } from '../lotVersion';
+
+const bundle = {
+  config: { 'Lotto 1': { name: 'Lotto 1', version: 3 }, 'Lotto 2': { name: 'Lotto 2', version: 7 } },
+  masterData: { certs: [] }
+};
+
+describe('withLotVersion', () => {
+  it('sends the version returned by an autosave in the next lot patch', () => {
+    expect(lotIfMatch(bundle, 'Lotto 1')).toBe('"3"');
+    // The state autosave answers with the bumped version...
+    const afterAutosave = withLotVersion(bundle, 'Lotto 1', 4);
+    // ...and patchLot builds its precondition from the updated cache
+    expect(lotIfMatch(afterAutosave, 'Lotto 1')).toBe('"4"');
+    expect(afterAutosave.config['Lotto 2']).toBe(bundle.config['Lotto 2']);
+    expect(afterAutosave.masterData).toBe(bundle.masterData);
+    expect(bundle.config['Lotto 1'].version).toBe(3);
+  });
+
+  it('leaves the bundle untouched when there is nothing to update', () => {
+    expect(withLotVersion(bundle, 'Lotto 9', 4)).toBe(bundle);
+    expect(withLotVersion(bundle, 'Lotto 1', null)).toBe(bundle);
+    expect(withLotVersion(bundle, 'Lotto 1', 3)).toBe(bundle);
+    expect(withLotVersion(undefined, 'Lotto 1', 4)).toBeUndefined();
+  });
+
+  it('omits If-Match when the lot has no version', () => {
+    expect(lotIfMatch({ config: { A: {} } }, 'A')).toBeNull();
+    expect(lotIfMatch(null, 'A')).toBeNull();
+  });
+});
@@ -0,0 +1,17 @@
+// Helpers for the per-lot version used as the If-Match precondition of lot patches.
+
+export function lotIfMatch(bundle, lotKey) {
+  const version = bundle?.config?.[lotKey]?.version;
+  return version != null ? `"${version}"` : null;
+}
+
+// State saves bump the lot version too, so the version they return has to be
+// written back into the cached bundle or the next lot patch fails with 412.
+export function withLotVersion(bundle, lotKey, version) {
+  const lot = bundle?.config?.[lotKey];
+  if (!lot || version == null || lot.version === version) return bundle;
+  return {
+    ...bundle,
+    config: { ...bundle.config, [lotKey]: { ...lot, version } }
+  };
+}
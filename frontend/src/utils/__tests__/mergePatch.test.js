@@ -0,0 +1,21 @@
+import { describe, expect, it } from 'vitest';
+import { createMergePatch } from '../mergePatch';
+
+describe('createMergePatch', () => {
+  it('returns an empty patch for equal documents', () => {
+    const state = { my_discount: 10, tech_inputs: { REQ1: { r_val: 2 } } };
+    expect(createMergePatch(state, structuredClone(state))).toEqual({});
+  });
+
+  it('keeps only the changed nested members', () => {
+    const previous = { my_discount: 10, tech_inputs: { REQ1: { r_val: 2 }, REQ2: { r_val: 1 } } };
+    const next = { my_discount: 10, tech_inputs: { REQ1: { r_val: 3 }, REQ2: { r_val: 1 } } };
+    expect(createMergePatch(previous, next)).toEqual({ tech_inputs: { REQ1: { r_val: 3 } } });
+  });
+
+  it('removes members with null and replaces arrays whole', () => {
+    const previous = { company_certs: { 'ISO 9001': 'all' }, tags: [1, 2] };
+    const next = { company_certs: {}, tags: [1] };
+    expect(createMergePatch(previous, next)).toEqual({ company_certs: { 'ISO 9001': null }, tags: [1] });
+  });
+});
@@ -0,0 +1,28 @@
+import { isEqual } from './isEqual';
+
+export const MERGE_PATCH_HEADERS = { 'Content-Type': 'application/merge-patch+json' };
+
+const isPlainObject = (value) => value !== null && typeof value === 'object' && !Array.isArray(value);
+
+/**
+ * Build an RFC 7396 merge patch turning `previous` into `next`.
+ *
+ * Nested objects are diffed member by member, removed members become null,
+ * arrays and scalars are replaced whole. Returns {} when nothing changed.
+ */
+export function createMergePatch(previous, next) {
+  const patch = {};
+  for (const key of Object.keys(previous || {})) {
+    if (!(key in next)) patch[key] = null;
+  }
+  for (const [key, value] of Object.entries(next || {})) {
+    const before = previous?.[key];
+    if (isPlainObject(before) && isPlainObject(value)) {
+      const nested = createMergePatch(before, value);
+      if (Object.keys(nested).length > 0) patch[key] = nested;
+    } else if (!isEqual(before, value)) {
+      patch[key] = value;
+    }
+  }
+  return patch;
+}